@@ -5,10 +5,39 @@
 
 import * as functions from "firebase-functions/v1";
 import * as admin from "firebase-admin";
+import fetch from "node-fetch";
 
 // Firebase Admin SDK'yı başlat
 admin.initializeApp();
 
+/**
+ * Çoklu cihaza FCM gönderimi.
+ * Emülatörde PUSH_SINK_URL tanımlıysa (functions/.env.local) mesaj FCM yerine
+ * bu adrese POST edilir; test harness'inin yerel alıcısı (harness.notify)
+ * teslimat gecikmesini ölçer. Production'da her zaman FCM kullanılır.
+ */
+async function sendMulticast(message: admin.messaging.MulticastMessage): Promise<admin.messaging.BatchResponse> {
+  const sinkUrl = process.env.FUNCTIONS_EMULATOR === "true" ? process.env.PUSH_SINK_URL : undefined;
+  if (!sinkUrl) {
+    return admin.messaging().sendEachForMulticast(message);
+  }
+  const res = await fetch(sinkUrl, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(message),
+  });
+  const body = await res.json() as { responses?: Array<{ success: boolean; messageId?: string; error?: string }> };
+  const responses = message.tokens.map((_, idx) => {
+    const r = body.responses?.[idx];
+    if (res.ok && r?.success) {
+      return { success: true, messageId: r.messageId } as admin.messaging.SendResponse;
+    }
+    return { success: false, error: { code: r?.error || `sink-http-${res.status}` } } as any;
+  });
+  const successCount = responses.filter((r) => r.success).length;
+  return { responses, successCount, failureCount: responses.length - successCount };
+}
+
 // Basit test fonksiyonu
 export const testFunction = functions.https.onCall(async (data: any, context: any) => {
   return {
@@ -160,7 +189,7 @@ export const sendPushOnNotificationCreate = functions
 
             try {
               // MULTI-DEVICE: sendEachForMulticast ile tüm cihazlara gönder
-              const response = await admin.messaging().sendEachForMulticast({
+              const response = await sendMulticast({
                 tokens: tokensToSend,
                 notification: { title, body: message },
                 data: {
@@ -305,7 +334,7 @@ export const sendPushOnNotificationCreate = functions
       });
       
       // MULTI-DEVICE: sendEachForMulticast ile tüm cihazlara gönder
-      const response = await admin.messaging().sendEachForMulticast({
+      const response = await sendMulticast({
         tokens: tokens,
         notification: {
           title: title,
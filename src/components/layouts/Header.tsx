@@ -165,6 +165,7 @@ export const Header: React.FC<HeaderProps> = ({
           <div className="relative" ref={notificationsRef}>
             <button
               onClick={() => setNotificationsOpen(!notificationsOpen)}
+              data-testid="notifications-menu"
               className="relative p-2 rounded-md text-gray-600 dark:text-gray-300 hover:text-gray-900 dark:hover:text-gray-100 hover:bg-gray-100 dark:hover:bg-gray-700"
             >
               <Bell className="h-5 w-5" />
@@ -247,6 +248,7 @@ export const Header: React.FC<HeaderProps> = ({
           {/* User menu */}
           <div className="relative" ref={userMenuRef}>
             <button
+              data-testid="user-menu"
               onClick={() => setUserMenuOpen(!userMenuOpen)}
               className="flex items-center space-x-2 p-2 rounded-md text-gray-600 dark:text-gray-300 hover:text-gray-900 dark:hover:text-gray-100 hover:bg-gray-100 dark:hover:bg-gray-700"
             >
@@ -1,4 +1,4 @@
-import React, { forwardRef } from 'react';
+import React, { forwardRef, useId } from 'react';
 
 interface InputProps extends React.InputHTMLAttributes<HTMLInputElement> {
   label?: string;
@@ -10,10 +10,13 @@ interface InputProps extends React.InputHTMLAttributes<HTMLInputElement> {
 
 export const Input = forwardRef<HTMLInputElement, InputProps>(
   ({ label, error, leftIcon, rightIcon, helperText, className = '', ...props }, ref) => {
+    // Label'ı alana bağla (erişilebilirlik ve getByLabel için)
+    const generatedId = useId();
+    const fieldId = props.id ?? generatedId;
     return (
       <div className="space-y-1">
         {label && (
-          <label className="block text-sm font-medium text-gray-700">
+          <label htmlFor={fieldId} className="block text-sm font-medium text-gray-700">
             {label}
             {props.required && <span className="text-red-500 ml-1">*</span>}
           </label>
@@ -28,6 +31,7 @@ export const Input = forwardRef<HTMLInputElement, InputProps>(
           
           <input
             ref={ref}
+            id={fieldId}
             className={`
               block w-full rounded-md border-gray-300 shadow-sm
               focus:border-primary-500 focus:ring-primary-500
@@ -69,10 +73,12 @@ interface TextareaProps extends React.TextareaHTMLAttributes<HTMLTextAreaElement
 
 export const Textarea = forwardRef<HTMLTextAreaElement, TextareaProps>(
   ({ label, error, helperText, className = '', ...props }, ref) => {
+    const generatedId = useId();
+    const fieldId = props.id ?? generatedId;
     return (
       <div className="space-y-1">
         {label && (
-          <label className="block text-sm font-medium text-gray-700">
+          <label htmlFor={fieldId} className="block text-sm font-medium text-gray-700">
             {label}
             {props.required && <span className="text-red-500 ml-1">*</span>}
           </label>
@@ -80,6 +86,7 @@ export const Textarea = forwardRef<HTMLTextAreaElement, TextareaProps>(
         
         <textarea
           ref={ref}
+          id={fieldId}
           className={`
             block w-full rounded-md border-gray-300 shadow-sm
             focus:border-primary-500 focus:ring-primary-500
@@ -115,10 +122,12 @@ interface SelectProps extends React.SelectHTMLAttributes<HTMLSelectElement> {
 
 export const Select = forwardRef<HTMLSelectElement, SelectProps>(
   ({ label, error, helperText, options, placeholder, className = '', children, ...props }, ref) => {
+    const generatedId = useId();
+    const fieldId = props.id ?? generatedId;
     return (
       <div className="space-y-1">
         {label && (
-          <label className="block text-sm font-medium text-gray-700">
+          <label htmlFor={fieldId} className="block text-sm font-medium text-gray-700">
             {label}
             {props.required && <span className="text-red-500 ml-1">*</span>}
           </label>
@@ -126,6 +135,7 @@ export const Select = forwardRef<HTMLSelectElement, SelectProps>(
         
         <select
           ref={ref}
+          id={fieldId}
           className={`
             block w-full rounded-md border-gray-300 shadow-sm
             focus:border-primary-500 focus:ring-primary-500
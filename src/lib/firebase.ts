@@ -1,8 +1,8 @@
 import { initializeApp } from 'firebase/app';
-import { getAuth, browserLocalPersistence, setPersistence, indexedDBLocalPersistence, initializeAuth, inMemoryPersistence, browserSessionPersistence } from 'firebase/auth';
-import { getFirestore, enableIndexedDbPersistence, enableNetwork, disableNetwork, initializeFirestore } from 'firebase/firestore';
+import { getAuth, connectAuthEmulator, browserLocalPersistence, setPersistence, indexedDBLocalPersistence, initializeAuth, inMemoryPersistence, browserSessionPersistence } from 'firebase/auth';
+import { getFirestore, connectFirestoreEmulator, enableIndexedDbPersistence, enableNetwork, disableNetwork, initializeFirestore } from 'firebase/firestore';
 import { connectFunctionsEmulator, getFunctions } from 'firebase/functions';
-import { getStorage } from 'firebase/storage';
+import { connectStorageEmulator, getStorage } from 'firebase/storage';
 import { Capacitor } from '@capacitor/core';
 import { Preferences } from '@capacitor/preferences';
 
@@ -54,6 +54,28 @@ export { auth, db };
 export const storage = getStorage(app);
 export const functions = getFunctions(app, 'us-central1');
 
+// Yerel emülatörler - sadece E2E/yük testleri için (VITE_USE_FIREBASE_EMULATORS=true)
+// Persistence'dan önce bağlanmalı, yoksa Firestore production'a başlar
+export const usesEmulators = import.meta.env?.VITE_USE_FIREBASE_EMULATORS === 'true';
+export const emulatorHost = import.meta.env?.VITE_FIREBASE_EMULATOR_HOST || 'localhost';
+if (usesEmulators) {
+  const host = emulatorHost;
+  connectAuthEmulator(auth, `http://${host}:9099`, { disableWarnings: true });
+  // 2FA SMS adımı emülatörde reCAPTCHA olmadan çalışsın (E2E rol testleri)
+  auth.settings.appVerificationDisabledForTesting = true;
+  connectFirestoreEmulator(db, host, 8080);
+  connectStorageEmulator(storage, host, 9199);
+  connectFunctionsEmulator(functions, host, 5001);
+  console.info(`🧪 Firebase emülatörlerine bağlanıldı (${host})`);
+  // E2E harness'ı uygulamanın Firebase örneklerine ve servislerine buradan ulaşır;
+  // dev sunucusunda da build edilmiş preview'da da çalışır (sadece emülatör build'i)
+  (window as any).__harness = {
+    auth,
+    db,
+    service: (name: string) => import(`../services/${name}.ts`),
+  };
+}
+
 // Firestore offline persistence
 if (!isNativePlatform) {
   enableIndexedDbPersistence(db).catch((err) => {
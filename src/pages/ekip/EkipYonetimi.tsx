@@ -38,6 +38,15 @@ interface Santral {
 
 const EkipYonetimi: React.FC = () => {
   const { userProfile, canPerformAction } = useAuth();
+
+  // Audit loglarında işlemi yapan kullanıcı
+  const auditActor = () => ({
+    id: userProfile?.id || '',
+    email: userProfile?.email || '',
+    name: userProfile?.ad || '',
+    role: userProfile?.rol || '',
+    companyId: userProfile?.companyId
+  });
   const { company } = useCompany();
   const [showInviteModal, setShowInviteModal] = useState(false);
   const [selectedUser, setSelectedUser] = useState<EkipUyesi | null>(null);
@@ -174,7 +183,7 @@ const EkipYonetimi: React.FC = () => {
         emailVerified: false
       };
 
-      await createEkipUyesi(ekipData, inviteForm.password);
+      await createEkipUyesi(ekipData, inviteForm.password, auditActor());
       
       toast.success('Ekip üyesi başarıyla eklendi ve davet emaili gönderildi');
       setShowInviteModal(false);
@@ -211,7 +220,7 @@ const EkipYonetimi: React.FC = () => {
         rol: editForm.rol,
         sahalar: editForm.sahalar,
         santraller: editForm.santraller
-      });
+      }, auditActor());
       
       toast.success('Kullanıcı bilgileri güncellendi');
       setSelectedUser(null);
@@ -227,7 +236,7 @@ const EkipYonetimi: React.FC = () => {
     if (!window.confirm('Bu kullanıcıyı silmek istediğinize emin misiniz?')) return;
     
     try {
-      await deleteEkipUyesi(userId);
+      await deleteEkipUyesi(userId, auditActor());
       toast.success('Kullanıcı başarıyla silindi');
       fetchData();
     } catch (error) {
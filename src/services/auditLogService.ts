@@ -45,6 +45,7 @@ export type AuditAction =
   | 'company.delete'
   | 'company.subscription_update'
   | 'company.status_change'
+  | 'company.delete.complete'
   // User management
   | 'user.create'
   | 'user.update'
@@ -272,9 +273,18 @@ async function notifyCriticalEvent(log: Omit<AuditLog, 'id' | 'timestamp'>): Pro
   }
 }
 
+// İşlemi yapan kullanıcı
+export interface AuditActor {
+  id: string;
+  email: string;
+  name: string;
+  role: string;
+  companyId?: string | null;
+}
+
 // Yaygın kullanım için helper fonksiyonlar
 export const logUserAction = async (
-  user: { id: string; email: string; name: string; role: string; companyId?: string | null },
+  user: AuditActor,
   action: AuditAction,
   resource: string,
   resourceId?: string,
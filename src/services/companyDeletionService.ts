@@ -16,7 +16,7 @@ import {
 } from 'firebase/storage';
 import { httpsCallable } from 'firebase/functions';
 import { db, functions } from '../lib/firebase';
-import { logUserAction } from './auditLogService';
+import { createAuditLog } from './auditLogService';
 import { getDocs as getDocsFs } from 'firebase/firestore';
 
 interface DeletionResult {
@@ -444,8 +444,8 @@ export const deleteCompanyCompletely = async (
     // 13. Son olarak şirket belgesini sil
     await deleteDoc(doc(db, 'companies', companyId));
     
-    // 14. Silme işlemini logla
-    await logUserAction({
+    // 14. Silme işlemini logla (platform kaydı; şirketin silinen loglarına bağlanmaz)
+    await createAuditLog({
       action: 'company.delete.complete',
       resource: 'company',
       resourceId: companyId,
@@ -458,7 +458,10 @@ export const deleteCompanyCompletely = async (
       severity: 'critical',
       userId: deletedBy.userId,
       userEmail: deletedBy.userEmail,
-      userName: deletedBy.userName
+      userName: deletedBy.userName,
+      userRole: 'superadmin',
+      companyId: null,
+      success: true
     });
     
     result.success = true;
@@ -11,11 +11,13 @@ import {
   serverTimestamp,
   Timestamp
 } from 'firebase/firestore';
-import { createUserWithEmailAndPassword, sendEmailVerification as firebaseSendEmailVerification, getAuth } from 'firebase/auth';
+import { connectAuthEmulator, createUserWithEmailAndPassword, sendEmailVerification as firebaseSendEmailVerification, getAuth } from 'firebase/auth';
 import { httpsCallable } from 'firebase/functions';
-import { db, functions } from '../lib/firebase';
+import { db, functions, emulatorHost, usesEmulators } from '../lib/firebase';
 import { initializeApp } from 'firebase/app';
 import { firebaseConfig } from '../lib/firebase';
+import { logUserAction } from './auditLogService';
+import type { AuditActor } from './auditLogService';
 import type { User, UserRole } from '../types';
 
 export interface EkipUyesi extends Omit<User, 'davetTarihi'> {
@@ -28,12 +30,16 @@ export interface EkipUyesi extends Omit<User, 'davetTarihi'> {
 // Ekip üyesi oluştur
 export const createEkipUyesi = async (
   ekipData: Omit<EkipUyesi, 'id' | 'olusturmaTarihi' | 'guncellenmeTarihi'>,
-  password: string
+  password: string,
+  actor: AuditActor
 ): Promise<string> => {
   try {
     // Secondary app ile kullanıcı oluştur (yönetici session'ını koru)
     const secondaryApp = initializeApp(firebaseConfig, 'secondary');
     const secondaryAuth = getAuth(secondaryApp);
+    if (usesEmulators) {
+      connectAuthEmulator(secondaryAuth, `http://${emulatorHost}:9099`, { disableWarnings: true });
+    }
     const userCredential = await createUserWithEmailAndPassword(
       secondaryAuth,
       ekipData.email,
@@ -61,6 +67,9 @@ export const createEkipUyesi = async (
     
     console.log('Ekip üyesi oluşturuldu:', userId);
 
+    // Audit log
+    await logUserAction(actor, 'user.create', 'user', userId, { email: ekipData.email, rol: ekipData.rol });
+
     try {
       // Secondary app'i kapat
       await secondaryApp.delete();
@@ -171,7 +180,8 @@ const generateInvitationToken = (): string => {
 // Ekip üyesini güncelle
 export const updateEkipUyesi = async (
   userId: string,
-  updates: Partial<EkipUyesi>
+  updates: Partial<EkipUyesi>,
+  actor: AuditActor
 ): Promise<void> => {
   try {
     const userDocRef = doc(db, 'kullanicilar', userId);
@@ -181,6 +191,9 @@ export const updateEkipUyesi = async (
     });
     
     console.log('Ekip üyesi güncellendi:', userId);
+
+    // Audit log
+    await logUserAction(actor, 'user.update', 'user', userId, { fields: Object.keys(updates) });
   } catch (error) {
     console.error('Ekip üyesi güncelleme hatası:', error);
     throw error;
@@ -326,13 +339,16 @@ export const getUsersBySantral = async (santralId: string): Promise<EkipUyesi[]>
 };
 
 // Ekip üyesini sil (hem Firestore'dan hem Firebase Auth'tan)
-export const deleteEkipUyesi = async (userId: string): Promise<void> => {
+export const deleteEkipUyesi = async (userId: string, actor: AuditActor): Promise<void> => {
   try {
     // Cloud Function ile hem Auth'tan hem Firestore'dan sil
     const deleteUserAccount = httpsCallable(functions, 'deleteUserAccount');
     const result = await deleteUserAccount({ userId });
     
     console.log('✅ Ekip üyesi başarıyla silindi (Auth + Firestore):', userId, result.data);
+
+    // Audit log
+    await logUserAction(actor, 'user.delete', 'user', userId);
   } catch (error: any) {
     console.error('❌ Ekip üyesi silme hatası:', error);
     
@@ -1,5 +1,7 @@
 import asyncio
 from playwright import async_api
+from harness.authmatrix import print_report, run_matrix
+from harness.flows import instrumented
 
 async def run_test():
     pw = None
@@ -25,78 +27,34 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC001") as run:
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click the 'Giriş Yap' link to open the login form
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Enter email and password for SuperAdmin user and click login
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Log out current user to prepare for next role login test
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/header/div/div[3]/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click 'Çıkış Yap' button to log out current user
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/header/div/div[3]/div[3]/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Enter email and password for Manager role and click login
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('manager@example.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Log all six seeded roles in at once, one context each, answering the SMS step from the Auth emulator
+            report = await run_matrix(browser=browser, attach=run.attach)
+            print_report(report)
+            assert not report["failed"], 'Login failed for: ' + ', '.join(report["failed"])
+            assert not report["navigation"], 'Sidebar differs from the access matrix: ' + '; '.join(
+                '%(role)s %(link)s %(kind)s' % finding for finding in report["navigation"])
     
     finally:
         if context:
@@ -1,5 +1,7 @@
 import asyncio
 from playwright import async_api
+from harness.flows import instrumented, login, require_emulators
+from harness.isolation import print_report, seeded_login, sweep
 
 async def run_test():
     pw = None
@@ -25,102 +27,42 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC002"):
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on the 'Giriş Yap' (Login) button to start login as the first user role.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input email and password for the first user role and click 'Giriş Yap' to log in.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Attempt to access restricted pages and features not permitted for Admin role to verify access control.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[10]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Attempt to access a restricted page or feature not permitted for Admin role to verify access denial.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Attempt to access another restricted page or feature to verify access control for Admin role.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[6]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Attempt to access data or features from another tenant to verify tenant isolation enforcement.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/header/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Log out from Admin role and log in as the next user role to continue role-based access and tenant isolation testing.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/header/div/div[3]/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click the 'Çıkış Yap' (Logout) button to log out from the Admin role.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/header/div/div[3]/div[3]/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input credentials for the next user role and log in to begin testing their access permissions and tenant isolation.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('nextuser@example.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('password123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Log in as the technician of the second seeded tenant ('python -m harness.isolation seed') on the emulators
+            email, password = seeded_login('tekniker', company=2)
+            try:
+                await login(page, email, password)
+            except async_api.Error:
+                raise AssertionError('Seeded tekniker login (%s) did not reach the dashboard' % email) from None
+            await require_emulators(page)
+            
 
-        assert False, 'Test plan execution failed: Access control and tenant isolation verification failed.'
-        await asyncio.sleep(5)
+            # Probe firestore.rules over REST as every role against its own and the other seeded tenants
+            report = await sweep()
+            print_report(report)
+            assert not report["leaks"], 'Cross-tenant access allowed: ' + '; '.join(
+                '%(role)s %(op)s %(collection)s (%(count)d)' % leak for leak in report["leaks"])
     
     finally:
         if context:
@@ -1,5 +1,7 @@
 import asyncio
 from playwright import async_api
+from harness.flows import instrumented
+from harness.locators import locators
 
 async def run_test():
     pw = None
@@ -25,163 +27,169 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC005"):
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Giriş Yap' (Login) to start login process as Manager or Engineer.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Interact with the page elements to simulate user flow
+            # Click on 'Giriş Yap' (Login) to start login process as Manager or Engineer.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Giriş Yap')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Input email and password, then click 'Giriş Yap' to log in.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
+            # Input email and password, then click 'Giriş Yap' to log in.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('E-posta')
+            await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Şifre')
+            await page.wait_for_timeout(3000); await elem.fill('123456')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Giriş Yap')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'Bakım' (Maintenance) to schedule a maintenance task with detailed checklist items.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on 'Bakım' (Maintenance) to schedule a maintenance task with detailed checklist items.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Bakım')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'Bakım' (Maintenance) menu to proceed with scheduling a maintenance task.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on 'Bakım' (Maintenance) menu to proceed with scheduling a maintenance task.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Bakım')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Try clicking on other related menu items or buttons that might lead to scheduling maintenance tasks, or report the issue if no alternative navigation is found.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Try clicking on other related menu items or buttons that might lead to scheduling maintenance tasks, or report the issue if no alternative navigation is found.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Arızalar')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on the 'Bakım' (Maintenance) button with index 5 to open the maintenance scheduling section.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on the 'Bakım' (Maintenance) button with index 5 to open the maintenance scheduling section.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Bakım')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'Elektrik Bakım' (index 6) to schedule a new electrical maintenance task with detailed checklist items.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on 'Elektrik Bakım' (index 6) to schedule a new electrical maintenance task with detailed checklist items.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Elektrik Bakım')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click the 'Görüntüle' (View) button on the first maintenance record to verify checklist completion and documentation upload.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[4]/div/div/div/div[2]/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click the 'Görüntüle' (View) button on the first maintenance record to verify checklist completion and documentation upload.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Görüntüle')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Close the modal and navigate to 'Mekanik Bakım' tab to verify mechanical maintenance tasks similarly.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Close the modal and navigate to 'Mekanik Bakım' tab to verify mechanical maintenance tasks similarly.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Kapat')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'Mekanik Bakım' tab (index 6) to verify mechanical maintenance tasks similarly.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/div/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on 'Mekanik Bakım' tab (index 6) to verify mechanical maintenance tasks similarly.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Mekanik Bakım')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click the 'Görüntüle' (View) button on the first mechanical maintenance record (index 43) to verify checklist completion and documentation upload.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[4]/div/div/div/div[2]/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click the 'Görüntüle' (View) button on the first mechanical maintenance record (index 43) to verify checklist completion and documentation upload.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Görüntüle')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Close the modal and verify the status update of the completed mechanical maintenance task in the main list.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Close the modal and verify the status update of the completed mechanical maintenance task in the main list.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Kapat')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Verify that notifications are sent as per workflow after task completion by checking notification logs or test notification section.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[13]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Verify that notifications are sent as per workflow after task completion by checking notification logs or test notification section.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Bildirimler')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            elem = await locators(frame).resolve('Tümünü görüntüle')
+            await elem.click(timeout=5000)
+            
 
-        # Click the 'Basit Test Bildirimi' (Simple Test Notification) button to verify that notifications are sent as per workflow after task completion.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click the 'Basit Test Bildirimi' (Simple Test Notification) button to verify that notifications are sent as per workflow after task completion.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Basit Test Bildirimi')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Assert that the maintenance tasks for electrical and mechanical are scheduled and checklist items are present
-        electrical_task_view_button = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[4]/div/div/div/div[2]/div[4]/button').nth(0)
-        assert await electrical_task_view_button.is_visible(), 'Electrical maintenance task view button should be visible indicating task is scheduled'
-        # Open electrical maintenance task details and verify checklist completion and documentation upload
-        await electrical_task_view_button.click()
-        await page.wait_for_timeout(2000)
-        checklist_items = frame.locator('css=.checklist-item.completed')
-        assert await checklist_items.count() > 0, 'Checklist items should be completed for electrical maintenance task'
-        documentation_uploads = frame.locator('css=.documentation-upload')
-        assert await documentation_uploads.count() > 0, 'Documentation/photos should be uploaded for electrical maintenance task'
-        # Close electrical maintenance modal
-        close_modal_button = frame.locator('xpath=html/body/div[21]/div/div/div/button').nth(0)
-        await close_modal_button.click()
-        await page.wait_for_timeout(1000)
-        # Navigate to mechanical maintenance tab and verify tasks similarly
-        mechanical_tab = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/div/a[2]').nth(0)
-        await mechanical_tab.click()
-        await page.wait_for_timeout(2000)
-        mechanical_task_view_button = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[4]/div/div/div/div[2]/div[4]/button').nth(0)
-        assert await mechanical_task_view_button.is_visible(), 'Mechanical maintenance task view button should be visible indicating task is scheduled'
-        await mechanical_task_view_button.click()
-        await page.wait_for_timeout(2000)
-        checklist_items_mech = frame.locator('css=.checklist-item.completed')
-        assert await checklist_items_mech.count() > 0, 'Checklist items should be completed for mechanical maintenance task'
-        documentation_uploads_mech = frame.locator('css=.documentation-upload')
-        assert await documentation_uploads_mech.count() > 0, 'Documentation/photos should be uploaded for mechanical maintenance task'
-        # Close mechanical maintenance modal
-        await close_modal_button.click()
-        await page.wait_for_timeout(1000)
-        # Verify status update to finished for mechanical maintenance task in main list
-        status_label = frame.locator('css=.task-status.finished')
-        assert await status_label.count() > 0, 'At least one maintenance task should have status updated to finished'
-        # Verify notifications are sent as per workflow by checking notification test center
-        await frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[13]').nth(0).click()
-        await page.wait_for_timeout(2000)
-        notification_test_button = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div/div[2]/div/button').nth(0)
-        assert await notification_test_button.is_visible(), 'Notification test button should be visible'
-        await notification_test_button.click()
-        await page.wait_for_timeout(2000)
-        # Optionally verify notification success message or log if available
-        notification_success_message = frame.locator('css=.notification-success')
-        assert await notification_success_message.is_visible(), 'Notification success message should be visible after sending test notification'
-        await asyncio.sleep(5)
+            # Assert that the maintenance tasks for electrical and mechanical are scheduled and checklist items are present
+            electrical_task_view_button = locators(frame)['Görüntüle']
+            assert await electrical_task_view_button.is_visible(), 'Electrical maintenance task view button should be visible indicating task is scheduled'
+            # Open electrical maintenance task details and verify checklist completion and documentation upload
+            await electrical_task_view_button.click()
+            await page.wait_for_timeout(2000)
+            checklist_items = frame.locator('css=.checklist-item.completed')
+            assert await checklist_items.count() > 0, 'Checklist items should be completed for electrical maintenance task'
+            documentation_uploads = frame.locator('css=.documentation-upload')
+            assert await documentation_uploads.count() > 0, 'Documentation/photos should be uploaded for electrical maintenance task'
+            # Close electrical maintenance modal
+            close_modal_button = locators(frame)['Kapat']
+            await close_modal_button.click()
+            await page.wait_for_timeout(1000)
+            # Navigate to mechanical maintenance tab and verify tasks similarly
+            mechanical_tab = locators(frame)['Mekanik Bakım']
+            await mechanical_tab.click()
+            await page.wait_for_timeout(2000)
+            mechanical_task_view_button = locators(frame)['Görüntüle']
+            assert await mechanical_task_view_button.is_visible(), 'Mechanical maintenance task view button should be visible indicating task is scheduled'
+            await mechanical_task_view_button.click()
+            await page.wait_for_timeout(2000)
+            checklist_items_mech = frame.locator('css=.checklist-item.completed')
+            assert await checklist_items_mech.count() > 0, 'Checklist items should be completed for mechanical maintenance task'
+            documentation_uploads_mech = frame.locator('css=.documentation-upload')
+            assert await documentation_uploads_mech.count() > 0, 'Documentation/photos should be uploaded for mechanical maintenance task'
+            # Close mechanical maintenance modal
+            await close_modal_button.click()
+            await page.wait_for_timeout(1000)
+            # Verify status update to finished for mechanical maintenance task in main list
+            status_label = frame.locator('css=.task-status.finished')
+            assert await status_label.count() > 0, 'At least one maintenance task should have status updated to finished'
+            # Verify notifications are sent as per workflow by checking notification test center
+            await locators(frame)['Bildirimler'].click()
+            await locators(frame)['Tümünü görüntüle'].click()
+            await page.wait_for_timeout(2000)
+            notification_test_button = locators(frame)['Basit Test Bildirimi']
+            assert await notification_test_button.is_visible(), 'Notification test button should be visible'
+            await notification_test_button.click()
+            await page.wait_for_timeout(2000)
+            # Optionally verify notification success message or log if available
+            notification_success_message = frame.locator('css=.notification-success')
+            assert await notification_success_message.is_visible(), 'Notification success message should be visible after sending test notification'
+            await asyncio.sleep(5)
     
     finally:
         if context:
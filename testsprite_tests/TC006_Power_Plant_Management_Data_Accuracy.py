@@ -1,5 +1,7 @@
 import asyncio
 from playwright import async_api
+from harness.flows import instrumented
+from harness.locators import locators
 
 async def run_test():
     pw = None
@@ -25,131 +27,133 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC006"):
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Giriş Yap' (Login) to start login process as Engineer
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input email and password, then click 'Giriş Yap' to log in as Engineer
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Interact with the page elements to simulate user flow
+            # Click on 'Giriş Yap' (Login) to start login process as Engineer
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Giriş Yap')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
+            # Input email and password, then click 'Giriş Yap' to log in as Engineer
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('E-posta')
+            await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Şifre')
+            await page.wait_for_timeout(3000); await elem.fill('123456')
+            
 
-        # Navigate to create a new solar power plant page or section
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Giriş Yap')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'GES Yönetimi' in the sidebar to access power plant management section
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Navigate to create a new solar power plant page or section
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Dashboard')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'Yeni Santral Ekle' button to start creating a new solar power plant
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on 'GES Yönetimi' in the sidebar to access power plant management section
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('GES Yönetimi')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Fill in the new solar power plant form with all required details including name, site, capacity, installation date, monthly production estimates, panel count, panel power, inverter count, and description
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Solar Plant #1')
-        
+            # Click on 'Yeni Santral Ekle' button to start creating a new solar power plant
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Yeni Santral Ekle')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div/div/div[2]/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Fill in the new solar power plant form with all required details including name, site, capacity, installation date, monthly production estimates, panel count, panel power, inverter count, and description
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Santral Adı')
+            await page.wait_for_timeout(3000); await elem.fill('Test Solar Plant #1')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div/div/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1500')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Bağlı Saha')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div/div/div[4]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('2023-01-01')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Kurulu Güç')
+            await page.wait_for_timeout(3000); await elem.fill('1500')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div[2]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1000')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Kurulum Tarihi')
+            await page.wait_for_timeout(3000); await elem.fill('2023-01-01')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div[2]/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('900')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Ocak')
+            await page.wait_for_timeout(3000); await elem.fill('1000')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div[2]/div/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1100')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Şubat')
+            await page.wait_for_timeout(3000); await elem.fill('900')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div[2]/div/div[4]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1200')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Mart')
+            await page.wait_for_timeout(3000); await elem.fill('1100')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div[2]/div/div[5]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1300')
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Nisan')
+            await page.wait_for_timeout(3000); await elem.fill('1200')
+            
 
-        # Manually select the 'CENTURİON' site from the dropdown or retry selection, then submit the form to create the new solar power plant.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div/div[2]/form/div/div/div[2]/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Mayıs')
+            await page.wait_for_timeout(3000); await elem.fill('1300')
+            
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Manually select the 'CENTURİON' site from the dropdown or retry selection, then submit the form to create the new solar power plant.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Bağlı Saha')
+            # Option 0 is the disabled "Saha seçin..." placeholder
+            await page.wait_for_timeout(3000); await elem.select_option(index=1, timeout=5000)
+            
 
-        # Submit the 'Yeni Santral Ekle' form to create the new solar power plant.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[27]/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Submit the 'Yeni Santral Ekle' form to create the new solar power plant.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Santralı Ekle')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        assert False, 'Test plan execution failed: generic failure assertion as expected result is unknown.'
-        await asyncio.sleep(5)
+            # The new plant's card lists the name and capacity that were entered
+            heading = page.get_by_role('heading', name='Test Solar Plant #1').first
+            await heading.wait_for(timeout=10000)
+            card = page.locator('div', has=heading).filter(has_text='kW').last
+            assert '1.500 kW' in await card.inner_text(), 'New plant card does not show the entered 1.500 kW capacity'
     
     finally:
         if context:
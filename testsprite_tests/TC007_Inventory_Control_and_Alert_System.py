@@ -1,5 +1,7 @@
 import asyncio
 from playwright import async_api
+from harness.flows import instrumented
+from harness.stockalerts import print_report, run_alerts
 
 async def run_test():
     pw = None
@@ -25,94 +27,35 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC007"):
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Giriş Yap' (Login) to start login process
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input email and password, then click 'Giriş Yap' to log in
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Navigate to 'Arızalar' (Faults) to find a fault record to associate stock usage
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click on 'Arızalar' (Faults) button to navigate to faults section
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try navigating to 'Bakım' (Maintenance) section as an alternative to find maintenance tasks for stock usage recording
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click on 'Yapılan İşler' (Performed Works) to find a maintenance task to associate stock usage
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div[2]/div/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click 'Görüntüle' button on the first maintenance task card to view details and record stock usage
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[4]/div/div/div/div[2]/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Locate and click the button or link to record stock usage for this maintenance task
-        await page.mouse.wheel(0, window.innerHeight)
-        
-
-        # Click on the button or control at index 481 to proceed with recording stock usage for the maintenance task
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[15]/div/div/div[2]/div/div[3]/div/div[3]/img').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Locate and interact with the 'Stok Kullanımı Ekle' (Add Stock Usage) button or link to record stock usage for the maintenance task
-        await page.mouse.wheel(0, window.innerHeight)
-        
-
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Book maintenance material usage from several mühendis contexts at once against the seeded alert items
+            report = await run_alerts(browser=browser)
+            print_report(report)
+            assert not report["lost_updates"], '%d stock decrements lost under concurrent consumers' % report["lost_updates"]
+            assert not report["missing_alerts"], 'No low-stock push for: ' + ', '.join(report["missing_alerts"])
+            assert not report["stale_ui"], 'Stok Uyarıları card does not match stoklar: ' + ', '.join(
+                '%(stokId)s shows %(ui)s, holds %(actual)s' % row for row in report["stale_ui"])
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness.flows import instrumented
 
 async def run_test():
     pw = None
@@ -25,28 +26,38 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC010") as run:
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        assert False, 'Test plan execution failed: generic failure assertion'
-        await asyncio.sleep(5)
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Let the start page finish loading, then use the sample the recorder takes after the navigation
+            try:
+                await page.wait_for_load_state("load", timeout=10000)
+            except async_api.Error:
+                pass
+            await run.perf.settle()
+            start = run.perf.navigation_sample()
+            assert start is not None, 'Start performance sample could not be collected'
+            assert start['lcp_ms'] is not None, 'Largest Contentful Paint was not reported for the start page'
+            assert not run.perf.violations, 'Start performance budget exceeded: ' + '; '.join(run.perf.violations)
     
     finally:
         if context:
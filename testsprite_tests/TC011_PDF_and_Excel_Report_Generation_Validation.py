@@ -1,5 +1,9 @@
 import asyncio
 from playwright import async_api
+from harness.exports import capture_download, displayed_fault_count, print_report, validate, write_report
+from harness.flows import instrumented, login, require_emulators
+from harness.isolation import seeded_login
+from harness.locators import locators
 
 async def run_test():
     pw = None
@@ -25,74 +29,68 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC011"):
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Giriş Yap' (Login) to proceed to login page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input email and password, then click the login button.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Log in as the manager of the first seeded tenant ('python -m harness.isolation seed') on the emulators
+            email, password = seeded_login('yonetici')
+            try:
+                await login(page, email, password)
+            except async_api.Error:
+                raise AssertionError('Seeded yonetici login (%s) did not reach the dashboard' % email) from None
+            await require_emulators(page)
 
-        # Click on the 'Arızalar' tab to access fault reports and apply filters.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on the 'Arızalar' tab to access fault reports and apply filters.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Arızalar')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click on 'Arıza Kayıtları' submenu to access fault records and apply filters.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click on 'Arıza Kayıtları' submenu to access fault records and apply filters.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Arıza Kayıtları')
+            await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+            
 
-        # Click the 'Rapor' button to export the filtered fault report to PDF format.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[2]/div/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click the 'Rapor' button to export the filtered fault report to PDF format.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Rapor')
+            await page.wait_for_timeout(3000)
+            pdf = await capture_download(page, lambda: elem.click(timeout=5000), "TC011-pdf")
+            
 
-        # Click the 'Excel' button to export the filtered fault report to Excel format.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[2]/div/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+            # Click the 'Excel' button to export the filtered fault report to Excel format.
+            frame = context.pages[-1]
+            elem = await locators(frame).resolve('Excel')
+            await page.wait_for_timeout(3000)
+            xlsx = await capture_download(page, lambda: elem.click(timeout=5000), "TC011-xlsx")
+            
 
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+            # Parse both downloads and cross-check their counts with each other and the list header
+            report = validate(pdf["path"], xlsx["path"], await displayed_fault_count(page))
+            report["downloads"] = {"pdf": pdf, "xlsx": xlsx}
+            write_report(report, "TC011")
+            print_report(report)
+            assert not report["problems"], 'Export validation failed: ' + '; '.join(report["problems"])
     
     finally:
         if context:
@@ -1,5 +1,7 @@
 import asyncio
 from playwright import async_api
+from harness.auditlog import findings, print_report, run_lifecycle
+from harness.flows import instrumented
 
 async def run_test():
     pw = None
@@ -25,146 +27,34 @@ async def run_test():
         context = await browser.new_context()
         context.set_default_timeout(5000)
         
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
+        # Record perf, console errors and Firestore queries, keep a trace only on failure,
+        # and check the console budgets before the test counts as passed
+        async with instrumented(context, "TC012"):
+            # Open a new page in the browser context
+            page = await context.new_page()
+            
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+            
+            # Wait for the main page to reach DOMContentLoaded state (optional for stability)
             try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                await page.wait_for_load_state("domcontentloaded", timeout=3000)
             except async_api.Error:
                 pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Giriş Yap' (Login) to proceed to login page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input email and password, then click 'Giriş Yap' to login.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('tkececi@edeonenerji.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Navigate to 'Ekip Yönetimi' (Team Management) to create personal data for testing.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/nav/a[5]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click 'Yeni Üye Ekle' button to start creating a new team member with personal data.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Fill in the new team member's email, password, name, phone, select role, assign sites, and submit the form.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test1234')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('+905551234567')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[5]/div/label/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[5]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[6]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Close the modal if still open, verify the new team member appears in the list, and check audit logs for creation entry.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Retry creating the new team member with personal data, ensure form submission success, then verify presence in team list and audit logs.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/main/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Fill in the new team member form with valid data and submit to create the user.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser2@example.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test1234')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User 2')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('+905551234568')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[5]/div/label/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[5]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[21]/div/div/div[2]/div/div[6]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+            
+            # Iterate through all iframes and wait for them to load as well
+            for frame in page.frames:
+                try:
+                    await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+                except async_api.Error:
+                    pass
+            
+            # Run the team lifecycle against the emulators and verify the audit trail and deletion propagation
+            report = await run_lifecycle(browser=browser)
+            print_report(report)
+            problems = findings(report)
+            assert not problems, "%d audit/privacy findings, first: %s" % (len(problems), problems[0])
+            await asyncio.sleep(5)
     
     finally:
         if context:
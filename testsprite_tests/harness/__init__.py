@@ -0,0 +1,5 @@
+"""Local Playwright harness used next to the generated TestSprite TC files.
+
+Modules are imported individually (``from harness.perf import PerfRecorder``)
+so the report and store tools keep working where Playwright is not installed.
+"""
@@ -0,0 +1,292 @@
+"""Accessibility and Turkish-locale audit across every app route (TC013).
+
+Routes come from the ``<Route path>`` table in ``src/App.tsx``, minus the
+test, debug and payment pages and anything with parameters. Public pages are
+crawled signed out and the app pages are crawled signed in, each by
+``--workers`` parallel browser contexts. Every settled page gets
+``a11y_rules.js`` injected, which provides:
+
+* accessibility rules with axe-core's ids, impacts and result shape. A local
+  axe-core copy (``AXE_CORE_PATH``, default
+  ``node_modules/axe-core/axe.min.js``) runs in their place when it exists.
+* a scan of the visible text for formatting tr-TR would not produce:
+  dates that are not ``dd.MM.yyyy``, English month names, 12-hour times,
+  decimal points and thousands commas
+* a SHA-256 of the rendered DOM
+
+Results are cached per route in ``.harness/a11y/cache.json``. On later runs,
+a route whose DOM hash and engine version are unchanged is reported from the
+cache instead of being audited again. Pages that render relative times
+("3 dakika önce") change hash on every load and are always audited.
+
+The contexts use the ``en-US`` browser locale by default, so text formatted
+with the browser's locale instead of an explicit ``'tr-TR'`` shows up as a
+finding::
+
+    python -m harness.a11y routes
+    python -m harness.a11y run --workers 4
+    python -m harness.a11y run --routes /arizalar /bakim --no-cache --credentials users.csv
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+from playwright import async_api
+
+from .config import REPO_ROOT, RUN_ID, credential_pool, output_path
+from .flows import login, wait_for_spinners
+from .session import browser_session, new_context, open_app
+
+RULES_PATH = Path(__file__).resolve().parent / "a11y_rules.js"
+APP_PATH = REPO_ROOT / "src" / "App.tsx"
+AXE_CORE_PATH = Path(os.environ.get("AXE_CORE_PATH", REPO_ROOT / "node_modules" / "axe-core" / "axe.min.js"))
+ROUTE_RE = re.compile(r'<Route\s+path="([^"]+)"')
+SKIPPED_PREFIXES = ("test/", "debug/", "payment/")
+IMPACTS = ("critical", "serious", "moderate", "minor")
+FAIL_ON = ("critical", "serious")
+WORKERS = 4
+BROWSER_LOCALE = "en-US"
+NETWORK_IDLE_MS = 3000
+TIMEOUT_MS = 15000
+
+AXE_SCRIPT = """
+async () => {
+  const result = await axe.run(document, { resultTypes: ['violations'] });
+  return result.violations.map((v) => ({
+    id: v.id, impact: v.impact, help: v.help, count: v.nodes.length,
+    nodes: v.nodes.slice(0, 20).map((n) => ({ target: n.target, html: n.html.slice(0, 200) })),
+  }));
+}
+"""
+
+
+def discover_routes(app_path=APP_PATH):
+    """``(public, app)`` route lists from the router in ``src/App.tsx``."""
+    public, app = [], []
+    with open(app_path, encoding="utf-8") as fh:
+        paths = ROUTE_RE.findall(fh.read())
+    for path in paths:
+        if "*" in path or ":" in path or path.lstrip("/").startswith(SKIPPED_PREFIXES):
+            continue
+        # Top-level routes are absolute; the ones nested under the protected layout are relative
+        bucket, route = (public, path) if path.startswith("/") else (app, "/" + path)
+        if route not in bucket:
+            bucket.append(route)
+    return public, app
+
+
+class Engine:
+    """The injected rules, plus axe-core when a local copy exists."""
+
+    def __init__(self, axe_path=AXE_CORE_PATH):
+        self.source = RULES_PATH.read_text(encoding="utf-8")
+        self.axe_source = Path(axe_path).read_text(encoding="utf-8") if Path(axe_path).is_file() else None
+        self.name = "axe-core" if self.axe_source else "harness"
+        digest = hashlib.sha256(self.source.encode("utf-8"))
+        if self.axe_source:
+            digest.update(self.axe_source.encode("utf-8"))
+        self.version = digest.hexdigest()[:12]
+
+    async def inject(self, page):
+        await page.add_script_tag(content=self.source)
+
+    async def violations(self, page):
+        if self.axe_source is None:
+            return (await page.evaluate("() => window.__harnessAudit.rules()"))["violations"]
+        await page.add_script_tag(content=self.axe_source)
+        return await page.evaluate(AXE_SCRIPT)
+
+
+def load_cache(path=None):
+    try:
+        with open(path or output_path("a11y", "cache.json"), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=None):
+    with open(path or output_path("a11y", "cache.json"), "w", encoding="utf-8") as fh:
+        json.dump(cache, fh, indent=2, ensure_ascii=False)
+
+
+async def _settle(page, timeout_ms):
+    try:
+        await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_MS)
+    except async_api.Error:
+        pass    # Firestore listeners keep a channel open; the spinners are the real signal
+    try:
+        await wait_for_spinners(page, timeout_ms)
+    except async_api.Error:
+        pass
+
+
+async def audit_route(page, route, engine, cache, timeout_ms=TIMEOUT_MS, use_cache=True):
+    """Open ``route`` and audit it, or reuse the cached result if its DOM hash is unchanged."""
+    await open_app(page, route)
+    await _settle(page, timeout_ms)
+    landed = urlparse(page.url).path.rstrip("/") or "/"
+    if landed != route:
+        return {"route": route, "status": "redirected", "redirected_to": landed}
+    await engine.inject(page)
+    dom_hash = await page.evaluate("() => window.__harnessAudit.domHash()")
+    cached = cache.get(route)
+    if use_cache and cached and cached["hash"] == dom_hash and cached["engine"] == engine.version:
+        return dict(cached["result"], route=route, status="cached")
+    result = {"violations": await engine.violations(page),
+              "locale": await page.evaluate("() => window.__harnessAudit.locale()")}
+    cache[route] = {"hash": dom_hash, "engine": engine.version, "result": result,
+                    "audited_at": datetime.now(timezone.utc).isoformat()}
+    return dict(result, route=route, status="audited")
+
+
+async def _crawl(browser, routes, credential, engine, cache, workers, timeout_ms, use_cache, browser_locale):
+    queue = asyncio.Queue()
+    for route in routes:
+        queue.put_nowait(route)
+    results = []
+
+    async def worker():
+        context = await new_context(browser, timeout_ms=timeout_ms, locale=browser_locale)
+        try:
+            page = await context.new_page()
+            if credential:
+                await login(page, credential["email"], credential["password"], timeout_ms=timeout_ms)
+            while not queue.empty():
+                route = queue.get_nowait()
+                try:
+                    results.append(await audit_route(page, route, engine, cache, timeout_ms, use_cache))
+                except Exception as exc:    # one broken page should not stop the crawl
+                    results.append({"route": route, "status": "error",
+                                    "error": (str(exc).splitlines() or [type(exc).__name__])[0][:200]})
+        finally:
+            await context.close()
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, len(routes)))))
+    return results
+
+
+def summarize_audit(results, fail_on=FAIL_ON):
+    """Totals per rule and locale check, and the findings that fail the audit."""
+    rules, rule_routes = Counter(), defaultdict(set)
+    locale, locale_routes, examples = Counter(), defaultdict(set), {}
+    blocking = []
+    for result in results:
+        for violation in result.get("violations", ()):
+            rules[(violation["id"], violation["impact"])] += violation["count"]
+            rule_routes[violation["id"]].add(result["route"])
+            if violation["impact"] in fail_on:
+                blocking.append({"route": result["route"], "id": violation["id"], "impact": violation["impact"],
+                                 "count": violation["count"]})
+        for finding in result.get("locale", ()):
+            locale[finding["id"]] += finding["count"]
+            locale_routes[finding["id"]].add(result["route"])
+            examples.setdefault(finding["id"], (finding["text"], result["route"]))
+            blocking.append({"route": result["route"], "id": "locale/" + finding["id"], "impact": "locale",
+                             "count": finding["count"], "text": finding["text"]})
+    return {
+        "rules": [{"id": rule, "impact": impact, "nodes": n, "routes": len(rule_routes[rule])}
+                  for (rule, impact), n in rules.most_common()],
+        "locale_checks": [{"id": check, "matches": n, "routes": len(locale_routes[check]),
+                           "example": examples[check][0], "example_route": examples[check][1]}
+                          for check, n in locale.most_common()],
+        "blocking": blocking,
+    }
+
+
+async def run_audit(routes=None, credential=None, workers=WORKERS, use_cache=True, fail_on=FAIL_ON,
+                    browser_locale=BROWSER_LOCALE, timeout_ms=TIMEOUT_MS, browser=None):
+    """Crawl the routes in parallel contexts and return the audit report.
+
+    ``routes`` defaults to every route of the app. Pass ``browser`` to reuse a
+    running browser (TC013) instead of launching one.
+    """
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_audit(routes, credential, workers, use_cache, fail_on, browser_locale, timeout_ms,
+                                   own_browser)
+    public, app = discover_routes()
+    if routes:
+        public, app = [r for r in public if r in routes], [r for r in app if r in routes]
+    credential = credential or credential_pool()[0]
+    engine = Engine()
+    cache = load_cache()
+    crawled = await asyncio.gather(
+        _crawl(browser, public, None, engine, cache, workers, timeout_ms, use_cache, browser_locale),
+        _crawl(browser, app, credential, engine, cache, workers, timeout_ms, use_cache, browser_locale))
+    save_cache(cache)
+    results = sorted(crawled[0] + crawled[1], key=lambda r: r["route"])
+    statuses = Counter(r["status"] for r in results)
+    report = {"run_id": RUN_ID, "engine": engine.name, "engine_version": engine.version,
+              "browser_locale": browser_locale, "account": credential["email"], "fail_on": list(fail_on),
+              "audited": statuses["audited"], "cached": statuses["cached"], "redirected": statuses["redirected"],
+              "errors": statuses["error"], "routes": results}
+    report.update(summarize_audit(results, fail_on))
+    return report
+
+
+def print_report(report):
+    print("%s engine %s: %d routes, %d audited, %d from cache, %d redirected, %d errors" % (
+        report["engine"], report["engine_version"], len(report["routes"]), report["audited"], report["cached"],
+        report["redirected"], report["errors"]))
+    print("%-28s %-10s %5s %5s %5s %5s %6s" % ("route", "status", "crit", "ser", "mod", "min", "locale"))
+    for result in report["routes"]:
+        if result["status"] in ("redirected", "error"):
+            print("%-28s %-10s %s" % (result["route"], result["status"],
+                                      result.get("redirected_to") or result.get("error")))
+            continue
+        nodes = Counter()
+        for violation in result["violations"]:
+            nodes[violation["impact"]] += violation["count"]
+        print("%-28s %-10s %5d %5d %5d %5d %6d" % (
+            result["route"], result["status"], *(nodes[impact] for impact in IMPACTS),
+            sum(f["count"] for f in result["locale"])))
+    for rule in report["rules"]:
+        print("  %-20s %-9s %5d nodes on %d routes" % (rule["id"], rule["impact"], rule["nodes"], rule["routes"]))
+    for check in report["locale_checks"]:
+        print("  %-20s %-9s %5d matches on %d routes, e.g. %r on %s" % (
+            check["id"], "locale", check["matches"], check["routes"], check["example"], check["example_route"]))
+    print("%d blocking findings (%s and locale)" % (len(report["blocking"]), ", ".join(report["fail_on"])))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.a11y")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("routes", help="list the routes the audit would crawl")
+    run_cmd = sub.add_parser("run", help="audit the routes and write the report")
+    run_cmd.add_argument("--routes", nargs="+", default=None, help="only these routes (default: all)")
+    run_cmd.add_argument("--workers", type=int, default=WORKERS, help="parallel contexts per route group")
+    run_cmd.add_argument("--credentials", default=None, help="JSON or CSV credential pool; the first entry is used")
+    run_cmd.add_argument("--no-cache", action="store_true", help="audit every route even if its DOM is unchanged")
+    run_cmd.add_argument("--fail-on", nargs="+", choices=IMPACTS, default=list(FAIL_ON))
+    run_cmd.add_argument("--browser-locale", default=BROWSER_LOCALE)
+    args = parser.parse_args(argv)
+
+    if args.command == "routes":
+        public, app = discover_routes()
+        for route in public:
+            print("public  %s" % route)
+        for route in app:
+            print("app     %s" % route)
+        return 0
+
+    report = asyncio.run(run_audit(args.routes, credential_pool(args.credentials)[0], args.workers,
+                                   not args.no_cache, tuple(args.fail_on), args.browser_locale))
+    out = output_path("a11y", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if report["blocking"] or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
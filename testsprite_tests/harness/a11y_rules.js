@@ -0,0 +1,201 @@
+// Accessibility and Turkish-locale checks injected by harness/a11y.py.
+//
+// The accessibility rules reuse axe-core's rule ids, impacts and result shape
+// ({ violations: [{ id, impact, help, nodes: [{ target, html }] }] }) so the
+// report reads the same whether this engine or a local axe-core copy ran.
+// Only the rules that matter for this app's markup are implemented.
+(() => {
+  const MAX_NODES = 20;
+  const MAX_TEXT = 300;
+  const FOCUSABLE = 'a[href], button:not([disabled]), input:not([disabled]):not([type="hidden"]), '
+    + 'select:not([disabled]), textarea:not([disabled]), [tabindex]:not([tabindex="-1"])';
+  const SKIP_TEXT = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'CODE', 'PRE', 'TEXTAREA']);
+
+  const visible = (el) => {
+    const style = getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none') return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+  };
+
+  const selector = (el) => {
+    const parts = [];
+    for (let node = el; node && node.nodeType === 1 && parts.length < 5; node = node.parentElement) {
+      if (node.id) {
+        parts.unshift('#' + CSS.escape(node.id));
+        break;
+      }
+      let part = node.tagName.toLowerCase();
+      const parent = node.parentElement;
+      if (parent) {
+        const same = Array.from(parent.children).filter((c) => c.tagName === node.tagName);
+        if (same.length > 1) part += ':nth-of-type(' + (same.indexOf(node) + 1) + ')';
+      }
+      parts.unshift(part);
+    }
+    return parts.join(' > ');
+  };
+
+  const textOf = (ids) => ids.split(/\s+/).map((id) => document.getElementById(id)).filter(Boolean)
+    .map((node) => node.textContent.trim()).join(' ').trim();
+
+  // Accessible name, in roughly the order of the accname spec
+  const accessibleName = (el) => {
+    const labelledby = el.getAttribute('aria-labelledby');
+    if (labelledby && textOf(labelledby)) return textOf(labelledby);
+    const label = (el.getAttribute('aria-label') || '').trim();
+    if (label) return label;
+    if (el.labels && el.labels.length) {
+      const text = Array.from(el.labels).map((l) => l.textContent.trim()).join(' ').trim();
+      if (text) return text;
+    }
+    if (['INPUT', 'SELECT', 'TEXTAREA'].includes(el.tagName)) {
+      if (['submit', 'button', 'reset'].includes(el.type) && el.value) return el.value;
+      const placeholder = (el.getAttribute('placeholder') || '').trim();
+      if (placeholder) return placeholder;
+    } else {
+      const text = (el.innerText || '').trim();
+      if (text) return text;
+      const img = el.querySelector('img[alt]:not([alt=""])');
+      if (img) return img.alt;
+      const title = el.querySelector('svg title');
+      if (title && title.textContent.trim()) return title.textContent.trim();
+    }
+    return (el.getAttribute('title') || '').trim();
+  };
+
+  const rgba = (color) => {
+    const match = /^rgba?\(([^)]+)\)$/.exec(color);
+    if (!match) return null;
+    const parts = match[1].split(/[\s,/]+/).filter(Boolean).map(Number);
+    return [parts[0], parts[1], parts[2], parts.length > 3 ? parts[3] : 1];
+  };
+
+  const luminance = ([r, g, b]) => {
+    const channel = (v) => {
+      v /= 255;
+      return v <= 0.03928 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+    };
+    return 0.2126 * channel(r) + 0.7152 * channel(g) + 0.0722 * channel(b);
+  };
+
+  // First opaque background behind the element; null when images or translucent layers make it unknowable
+  const background = (el) => {
+    for (let node = el; node; node = node.parentElement) {
+      const style = getComputedStyle(node);
+      if (style.backgroundImage !== 'none') return null;
+      const color = rgba(style.backgroundColor);
+      if (color && color[3] >= 1) return color;
+      if (color && color[3] > 0) return null;
+    }
+    return [255, 255, 255, 1];
+  };
+
+  const contrastOk = (el) => {
+    const style = getComputedStyle(el);
+    const fg = rgba(style.color);
+    const bg = background(el);
+    if (!fg || fg[3] < 1 || !bg) return true;
+    const [hi, lo] = [luminance(fg), luminance(bg)].sort((a, b) => b - a);
+    const size = parseFloat(style.fontSize);
+    const large = size >= 24 || (size >= 18.66 && Number(style.fontWeight) >= 700);
+    return (hi + 0.05) / (lo + 0.05) >= (large ? 3 : 4.5);
+  };
+
+  const ownText = (el) => Array.from(el.childNodes).some((n) => n.nodeType === 3 && n.textContent.trim());
+  const all = (css) => Array.from(document.querySelectorAll(css)).filter(visible);
+  const root = () => [document.documentElement];
+
+  const RULES = [
+    { id: 'document-title', impact: 'serious', help: 'Documents must have <title> element to aid in navigation',
+      nodes: root, check: () => document.title.trim() !== '' },
+    { id: 'html-has-lang', impact: 'serious', help: '<html> element must have a lang attribute',
+      nodes: root, check: (el) => (el.getAttribute('lang') || '').trim() !== '' },
+    { id: 'html-lang-tr', impact: 'moderate', help: '<html lang> must be Turkish for Turkish content',
+      nodes: root, check: (el) => /^tr\b/i.test(el.getAttribute('lang') || '') },
+    { id: 'image-alt', impact: 'critical', help: 'Images must have alternate text',
+      nodes: () => all('img'),
+      check: (el) => el.hasAttribute('alt') || ['presentation', 'none'].includes(el.getAttribute('role'))
+        || accessibleName(el) !== '' },
+    { id: 'button-name', impact: 'critical', help: 'Buttons must have discernible text',
+      nodes: () => all('button, [role="button"]'), check: (el) => accessibleName(el) !== '' },
+    { id: 'link-name', impact: 'serious', help: 'Links must have discernible text',
+      nodes: () => all('a[href]'), check: (el) => accessibleName(el) !== '' },
+    { id: 'label', impact: 'critical', help: 'Form elements must have labels',
+      nodes: () => all('input:not([type="hidden"]):not([type="submit"]):not([type="button"])'
+        + ':not([type="reset"]):not([type="image"]), select, textarea'),
+      check: (el) => accessibleName(el) !== '' },
+    { id: 'tabindex', impact: 'serious', help: 'Elements should not have tabindex greater than zero',
+      nodes: () => all('[tabindex]'), check: (el) => !(Number(el.getAttribute('tabindex')) > 0) },
+    { id: 'aria-hidden-focus', impact: 'serious',
+      help: 'ARIA hidden element must not be focusable or contain focusable elements',
+      nodes: () => all('[aria-hidden="true"]'),
+      check: (el) => !(el.matches(FOCUSABLE) || Array.from(el.querySelectorAll(FOCUSABLE)).some(visible)) },
+    { id: 'duplicate-id', impact: 'minor', help: 'id attribute value must be unique',
+      nodes: () => all('[id]'), check: (el) => document.querySelectorAll('#' + CSS.escape(el.id)).length === 1 },
+    { id: 'color-contrast', impact: 'serious', help: 'Elements must meet minimum color contrast ratio thresholds',
+      nodes: () => all('body *').filter(ownText), check: contrastOk },
+  ];
+
+  const rules = () => {
+    const violations = [];
+    for (const rule of RULES) {
+      const failing = rule.nodes().filter((el) => !rule.check(el));
+      if (!failing.length) continue;
+      violations.push({
+        id: rule.id, impact: rule.impact, help: rule.help, count: failing.length,
+        nodes: failing.slice(0, MAX_NODES).map((el) => ({ target: [selector(el)], html: el.outerHTML.slice(0, 200) })),
+      });
+    }
+    return { engine: 'harness', violations };
+  };
+
+  // Text that tr-TR formatting (toLocaleDateString / toLocaleString('tr-TR')) would never produce
+  const LOCALE_CHECKS = [
+    { id: 'date-slash', help: 'Tarih gg.aa.yyyy olmalı, / ile yazılmış',
+      pattern: /(?<![\d/])\d{1,2}\/\d{1,2}\/\d{2,4}(?![\d/])/g },
+    { id: 'date-iso', help: 'Tarih gg.aa.yyyy olmalı, yyyy-aa-gg yazılmış',
+      pattern: /(?<![\d-])\d{4}-\d{2}-\d{2}(?![\d-])/g },
+    { id: 'date-unpadded', help: 'Gün ve ay iki haneli olmalı (gg.aa.yyyy)',
+      pattern: /(?<![\d.])(?:\d\.\d{1,2}|\d{2}\.\d)\.\d{4}(?![\d.])/g },
+    { id: 'date-english-month', help: 'Ay adı İngilizce yazılmış',
+      pattern: /\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? \d{1,2},? \d{4}\b/g },
+    { id: 'time-12h', help: 'Saat 24 saat biçiminde olmalı',
+      pattern: /\b\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)\b/g },
+    { id: 'decimal-point', help: 'Ondalık ayırıcı virgül olmalı',
+      pattern: /(?<![\d.,])\d+\.\d{1,2}(?![\d.,])\s?(?:%|kWh|MWh|GWh|kWp|kW|MW|TL|₺)|%\s?\d+\.\d+(?![\d.])/g },
+    { id: 'thousands-comma', help: 'Binlik ayırıcı nokta olmalı',
+      pattern: /(?<![\d.,])\d{1,3}(?:,\d{3}){2,}(?:\.\d+)?(?![\d,])|(?<![\d.,])\d{1,3}(?:,\d{3})+\.\d+(?![\d.])/g },
+  ];
+
+  const locale = () => {
+    const scanned = new Set();
+    const found = new Map();
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+      const parent = node.parentElement;
+      if (!parent || !node.textContent.trim() || SKIP_TEXT.has(parent.tagName) || scanned.has(parent)) continue;
+      if (!visible(parent)) continue;
+      scanned.add(parent);
+      // Short elements are scanned whole so values split from their unit across spans still match
+      const text = parent.textContent.length <= MAX_TEXT ? parent.textContent : node.textContent;
+      for (const check of LOCALE_CHECKS) {
+        for (const match of text.matchAll(check.pattern)) {
+          const key = check.id + '\u0000' + match[0];
+          const entry = found.get(key);
+          if (entry) entry.count += 1;
+          else found.set(key, { id: check.id, help: check.help, text: match[0], target: selector(parent), count: 1 });
+        }
+      }
+    }
+    return Array.from(found.values());
+  };
+
+  const domHash = async () => {
+    const html = document.documentElement.outerHTML.replace(/<script\b[\s\S]*?<\/script>/gi, '');
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(html));
+    return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+  };
+
+  window.__harnessAudit = { rules, locale, domHash };
+})();
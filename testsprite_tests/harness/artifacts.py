@@ -0,0 +1,188 @@
+"""Failure-only Playwright traces and videos in a size-bounded artifact store.
+
+``FailureArtifacts`` starts tracing (screenshots, DOM snapshots, network) when
+it is attached to a context and keeps the recording in the browser as one
+trace chunk. If the test passes, the chunk is dropped without being written.
+If it fails, the chunk is saved as ``trace.zip``. With ``window_s`` the chunk
+is restarted periodically, so long load runs only ever hold the last window
+in memory. Videos are optional (``video=True``). They are recorded into a
+scratch folder and moved into the store only for failures.
+
+The ``ArtifactStore`` evicts least recently used files once the total size
+passes ``HARNESS_ARTIFACT_BYTES`` (default 2 GB)::
+
+    python -m harness.artifacts list
+    python -m harness.artifacts prune --max-bytes 500000000
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from playwright import async_api
+
+from .config import OUTPUT_DIR, RUN_ID
+
+DEFAULT_MAX_BYTES = int(os.environ.get("HARNESS_ARTIFACT_BYTES", 2 * 1024 ** 3))
+
+
+class ArtifactStore:
+    """Flat folder of artifacts with LRU eviction by total bytes (file mtime = last use)."""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else OUTPUT_DIR / "artifacts"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def entries(self):
+        """``[(path, size, mtime)]`` oldest first."""
+        out = []
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                stat = entry.stat()
+                out.append((Path(entry.path), stat.st_size, stat.st_mtime))
+        return sorted(out, key=lambda e: e[2])
+
+    def add(self, source, name):
+        """Move ``source`` into the store as ``name`` and evict down to the byte limit."""
+        target = self.root / name
+        shutil.move(str(source), target)
+        os.utime(target)
+        self.prune(keep=target)
+        return target
+
+    def touch(self, name):
+        """Mark an artifact as used so eviction keeps it longer."""
+        os.utime(self.root / name)
+
+    def prune(self, max_bytes=None, keep=None):
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= limit:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        return evicted, total
+
+
+class FailureArtifacts:
+    """Trace (and optionally video) recorder that only writes anything for failures."""
+
+    def __init__(self, test_id, store=None, window_s=None, video=False, screenshots=True):
+        self.test_id = test_id
+        self.store = store or ArtifactStore()
+        self.window_s = window_s
+        self.screenshots = screenshots
+        self.video_dir = Path(tempfile.mkdtemp(prefix="harness-video-")) if video else None
+        self.saved = []
+        self.passed = False
+        self._context = None
+        self._lock = asyncio.Lock()
+        self._rotation = None
+        self._chunk_started = None
+
+    def context_options(self):
+        """Extra ``new_context`` kwargs; videos can only be enabled at context creation."""
+        return {"record_video_dir": str(self.video_dir)} if self.video_dir else {}
+
+    async def attach(self, context):
+        self._context = context
+        await context.tracing.start(screenshots=self.screenshots, snapshots=True, sources=False)
+        await context.tracing.start_chunk(title=self.test_id)
+        self._chunk_started = time.monotonic()
+        if self.window_s:
+            self._rotation = asyncio.ensure_future(self._rotate_loop())
+
+    async def _rotate_loop(self):
+        while True:
+            await asyncio.sleep(self.window_s)
+            try:
+                await self.discard()
+            except async_api.Error:
+                return
+
+    async def discard(self):
+        """Drop the current chunk unwritten and start a new one (e.g. between tests sharing a context)."""
+        async with self._lock:
+            # Stopping a chunk without a path discards it in the browser
+            await self._context.tracing.stop_chunk()
+            await self._context.tracing.start_chunk(title=self.test_id)
+            self._chunk_started = time.monotonic()
+
+    async def save(self, label="failure"):
+        """Write the current chunk to the store and keep recording in a new one."""
+        async with self._lock:
+            name = "%s-%s-%d-%s-trace.zip" % (self.test_id, RUN_ID, len(self.saved) + 1, label)
+            scratch = Path(tempfile.mkdtemp(prefix="harness-trace-")) / "trace.zip"
+            try:
+                await self._context.tracing.stop_chunk(path=str(scratch))
+                path = self.store.add(scratch, name)
+                self.saved.append(path)
+                await self._context.tracing.start_chunk(title=self.test_id)
+                self._chunk_started = time.monotonic()
+                return path
+            except async_api.Error:
+                return None
+            finally:
+                shutil.rmtree(scratch.parent, ignore_errors=True)
+
+    def mark_passed(self):
+        self.passed = True
+
+    async def finalize(self):
+        """Save the trace unless ``mark_passed`` was called; call before closing the context."""
+        if self._rotation:
+            self._rotation.cancel()
+        if self._context is None:
+            return
+        if not self.passed:
+            path = await self.save()
+            if path:
+                print("%s failed; trace saved to %s (npx playwright show-trace)" % (self.test_id, path))
+        try:
+            await self._context.tracing.stop()
+        except async_api.Error:
+            pass
+
+    def after_close(self):
+        """Move recorded videos into the store for failures; call after the context is closed."""
+        if not self.video_dir:
+            return
+        if not self.passed:
+            for index, video in enumerate(sorted(self.video_dir.glob("*.webm")), 1):
+                self.saved.append(self.store.add(video, "%s-%s-%d.webm" % (self.test_id, RUN_ID, index)))
+        shutil.rmtree(self.video_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.artifacts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="artifacts, least recently used first")
+    prune = sub.add_parser("prune", help="evict down to a byte limit")
+    prune.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore()
+    if args.command == "list":
+        entries = store.entries()
+        for path, size, mtime in entries:
+            print("%s  %10d  %s" % (time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime)), size, path.name))
+        print("%d artifacts, %d bytes (limit %d)" % (len(entries), sum(e[1] for e in entries), store.max_bytes))
+    else:
+        evicted, total = store.prune(args.max_bytes)
+        print("evicted %d artifacts, %d bytes left" % (evicted, total))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,503 @@
+"""Audit-log and personal-data lifecycle verifier (TC012).
+
+For each ``--volumes`` step, a batch of team members goes through the same
+lifecycle the Ekip page drives:
+
+* create - ``ekipService.createEkipUyesi`` in the yönetici's page, one member
+  at a time: it signs up through a Firebase app named "secondary", so two
+  creates in flight collide
+* update - ``ekipService.updateEkipUyesi``, once as the app does it and once
+  followed by a second, harness-tagged ``logUserAction``. The difference is
+  what one audit write costs the request.
+* delete - ``ekipService.deleteEkipUyesi`` (the ``deleteUserAccount`` callable)
+* self-delete - ``--self-delete`` bekçiler with a vardiya report and a
+  notification each sign in and call ``accountDeletionService.deleteUserAccount``
+
+After the volumes, a second tenant is re-seeded and removed by the
+superadmin through ``companyDeletionService.deleteCompanyCompletely``.
+
+While the run is in progress, auditLogs entries are streamed from the emulator
+by polling on ``timestamp``. The report checks:
+
+* completeness - each operation left the AuditAction it stands for
+* ordering - each user's entries follow the lifecycle
+* stream coverage - entries the stream missed because they committed after
+  later timestamps, and how long entries took to become visible
+* deletion propagation - Auth accounts, profiles and personal-data documents
+  that survive a deletion, plus audit entries that keep the e-mail address
+* company deletion - documents left per collection and accounts left in Auth
+
+Per volume it reports create/update/delete latency with and without the
+audit write::
+
+    python -m harness.auditlog seed
+    python -m harness.auditlog run --volumes 10 50 200 --concurrency 10
+    python -m harness.auditlog run --volumes 20 --self-delete 2 --no-company-deletion --ip-lookup blocked
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from itertools import chain
+
+from .config import RUN_ID, output_path
+from .dataset import DEFAULT_PASSWORD, company_id, create_logins, generate, load, user_email
+from .emulator import AuthEmulator, EmulatorError, FirestoreEmulator
+from .flows import login
+from .isolation import fixture_docs, load_tenants, seed_tenants, superadmin_email
+from .notify import latency_summary
+from .session import browser_session, new_context
+
+DEFAULT_SEED = 47
+VOLUMES = (10, 50, 200)
+CONCURRENCY = 10
+SELF_DELETE = 3
+POLL_S = 0.5
+SETTLE_TIMEOUT_S = 30.0
+IPIFY = "https://api.ipify.org/**"
+# Order in which a user's entries may appear
+LIFECYCLE = ("user.create", "user.login", "user.update", "user.account.delete", "user.delete")
+# AuditAction each operation stands for (companyDeletionService logs 'company.delete.complete')
+EXPECTED_ACTIONS = {"create": ("user.create",), "update": ("user.update",), "delete": ("user.delete",),
+                    "self_delete": ("user.login", "user.account.delete"),
+                    "company_delete": ("company.delete.complete",)}
+# (collection, field) pairs that point at a user's personal data
+PERSONAL_DATA = (("vardiyaBildirimleri", "olusturanId"), ("arizalar", "olusturanKisi"), ("notifications", "userId"),
+                 ("leaveRequests", "userId"))
+COMPANY_COLLECTIONS = ("kullanicilar", "sahalar", "santraller", "arizalar", "elektrikBakimlar", "mekanikBakimlar",
+                       "stoklar", "stokHareketleri", "vardiyaBildirimleri", "musteriler", "notifications",
+                       "elektrikKesintileri", "leaveRequests", "backups", "subscriptions", "auditLogs")
+
+CREATE_SCRIPT = """
+async ({ members, companyId, password, actor }) => {
+  const { createEkipUyesi } = await window.__harness.service('ekipService');
+  const out = [];
+  for (const [n, member] of members.entries()) {
+    const started = Date.now();
+    try {
+      const uid = await createEkipUyesi({
+        email: member.email, ad: 'Denetim Üyesi ' + n, telefon: '+90 555 000 ' + String(n).padStart(4, '0'),
+        rol: member.rol, companyId, sahalar: [], santraller: [], emailVerified: false,
+      }, password, actor);
+      out.push({ email: member.email, uid, op: 'create', started, ended: Date.now(), error: null });
+    } catch (e) {
+      out.push({ email: member.email, uid: null, op: 'create', started, ended: Date.now(),
+                 error: String((e && e.message) || e) });
+    }
+  }
+  return out;
+}
+"""
+
+OPS_SCRIPT = """
+async ({ op, uids, concurrency, actor, tag }) => {
+  const { updateEkipUyesi, deleteEkipUyesi } = await window.__harness.service('ekipService');
+  const { logUserAction } = await window.__harness.service('auditLogService');
+  const run = async (uid, n) => {
+    const started = Date.now();
+    let audit_ms = null;
+    try {
+      if (op === 'delete') {
+        await deleteEkipUyesi(uid, actor);
+      } else {
+        await updateEkipUyesi(uid, { telefon: '+90 555 ' + String(n).padStart(7, '0') }, actor);
+      }
+      if (op === 'audited_update') {
+        const t = Date.now();
+        await logUserAction(actor, 'user.update', 'user', uid, { fields: ['telefon'], harness: tag });
+        audit_ms = Date.now() - t;
+      }
+      return { uid, op, started, ended: Date.now(), audit_ms, error: null };
+    } catch (e) {
+      return { uid, op, started, ended: Date.now(), audit_ms, error: String((e && e.message) || e) };
+    }
+  };
+  const out = [];
+  let next = 0;
+  const worker = async () => {
+    while (next < uids.length) {
+      const n = next++;
+      out.push(await run(uids[n], n));
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(concurrency, uids.length) }, worker));
+  return out;
+}
+"""
+
+SELF_DELETE_SCRIPT = """
+async () => {
+  const { auth } = window.__harness;
+  const { getUserById } = await window.__harness.service('userService');
+  const { deleteUserAccount } = await window.__harness.service('accountDeletionService');
+  const started = Date.now();
+  try {
+    await deleteUserAccount(auth.currentUser, await getUserById(auth.currentUser.uid));
+    return { started, ended: Date.now(), error: null };
+  } catch (e) {
+    return { started, ended: Date.now(), error: String((e && e.message) || e) };
+  }
+}
+"""
+
+COMPANY_DELETE_SCRIPT = """
+async ({ companyId, deletedBy }) => {
+  const { deleteCompanyCompletely } = await window.__harness.service('companyDeletionService');
+  const started = Date.now();
+  const result = await deleteCompanyCompletely(companyId, deletedBy);
+  return { started, ended: Date.now(), success: result.success, errors: result.errors,
+           deletedCounts: result.deletedCounts };
+}
+"""
+
+
+def seed_audit(seed=DEFAULT_SEED):
+    """Two tenants with one user per role and a superadmin (``harness.isolation`` layout)."""
+    return seed_tenants(seed, companies=2)
+
+
+def timestamp_ms(value):
+    """Epoch ms of a Firestore REST timestamp (``2025-10-19T12:00:00.123456Z``)."""
+    head, _, fraction = value.rstrip("Z").partition(".")
+    seconds = datetime.strptime(head, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    return seconds * 1000 + (float("0." + fraction) * 1000 if fraction else 0.0)
+
+
+def _equal(field, value):
+    kind = "timestampValue" if field == "timestamp" else "stringValue"
+    return {"fieldFilter": {"field": {"fieldPath": field}, "op": "EQUAL", "value": {kind: value}}}
+
+
+def audit_query(since):
+    return {"from": [{"collectionId": "auditLogs"}],
+            "where": {"fieldFilter": {"field": {"fieldPath": "timestamp"}, "op": "GREATER_THAN_OR_EQUAL",
+                                      "value": {"timestampValue": since}}},
+            "orderBy": [{"field": {"fieldPath": "timestamp"}, "direction": "ASCENDING"}]}
+
+
+def _count(client, collection, field, value):
+    return len(client.run_query({"from": [{"collectionId": collection}], "where": _equal(field, value)}))
+
+
+class AuditStream:
+    """Background poller that collects auditLogs entries in timestamp order as they become visible."""
+
+    def __init__(self, since, client=None, interval_s=POLL_S):
+        self.client = client or FirestoreEmulator()
+        self.cursor = since
+        self.interval_s = interval_s
+        self.entries = []
+        self._ids = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def poll(self):
+        rows = self.client.run_query(audit_query(self.cursor))
+        received = time.time() * 1000
+        for path, fields in rows:
+            if path in self._ids:
+                continue
+            self._ids.add(path)
+            self.entries.append(dict(fields, id=path.split("/", 1)[1], received_ms=received))
+            stamp = fields.get("timestamp")
+            if isinstance(stamp, str) and timestamp_ms(stamp) > timestamp_ms(self.cursor):
+                self.cursor = stamp
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.poll()
+            except (EmulatorError, OSError):
+                pass    # the next poll retries from the same cursor
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.poll()
+
+
+def personal_data(cid, uid, tag):
+    """A vardiya report and a notification owned by ``uid``, for the deletion propagation check."""
+    now = datetime.now(timezone.utc)
+    return [
+        ("vardiyaBildirimleri/%s-%s" % (tag, uid), {
+            "companyId": cid, "olusturanId": uid, "olusturanAdi": "Denetim Bekçisi", "olusturanRol": "bekci",
+            "sahaId": "%s-s01" % cid, "sahaAdi": "Saha 1", "tarih": now, "vardiyaTipi": "sabah", "durum": "normal",
+            "aciklama": "Harness %s" % tag, "olusturmaTarihi": now, "guncellenmeTarihi": now}),
+        ("notifications/%s-%s" % (tag, uid), {
+            "companyId": cid, "userId": uid, "title": "Harness %s" % tag, "message": "Kişisel veri", "type": "info",
+            "read": False, "createdAt": now}),
+    ]
+
+
+def residue(client, auth, uid, email):
+    """What is left of a deleted user: Auth account, profile, personal-data documents, audit entries."""
+    try:
+        auth.sign_in(email, DEFAULT_PASSWORD)
+        account = True
+    except EmulatorError:
+        account = False
+    documents = {"%s.%s" % pair: _count(client, pair[0], pair[1], uid) for pair in PERSONAL_DATA}
+    return {"uid": uid, "email": email, "auth_account": account,
+            "profile": client.get("kullanicilar/%s" % uid) is not None,
+            "documents": {key: n for key, n in documents.items() if n},
+            "audit_entries_with_email": _count(client, "auditLogs", "userEmail", email)}
+
+
+def check_audit(ops, streamed, final, tag):
+    """Completeness, per-user ordering and stream coverage of the audit trail."""
+    app_entries = [e for e in final if (e.get("details") or {}).get("harness") != tag]
+    by_resource = defaultdict(set)
+    for entry in app_entries:
+        by_resource[entry.get("resourceId")].add(entry.get("action"))
+    completeness = {}
+    for kind, actions in EXPECTED_ACTIONS.items():
+        done = [op for op in ops if op["op"] == kind and op["error"] is None]
+        missing = Counter(action for op in done for action in actions if action not in by_resource[op["uid"]])
+        completeness[kind] = {"ops": len(done), "audited": sum(1 for op in done
+                                                               if all(a in by_resource[op["uid"]] for a in actions)),
+                              "missing": dict(missing)}
+
+    per_user = defaultdict(list)
+    for entry in final:
+        if entry.get("action") in LIFECYCLE and isinstance(entry.get("timestamp"), str):
+            per_user[entry.get("resourceId")].append((timestamp_ms(entry["timestamp"]), entry["action"]))
+    out_of_order = []
+    for uid, events in per_user.items():
+        ranks = [LIFECYCLE.index(action) for _, action in sorted(events)]
+        if ranks != sorted(ranks):
+            out_of_order.append({"uid": uid, "actions": [action for _, action in sorted(events)]})
+
+    seen = {e["id"] for e in streamed}
+    lag = [e["received_ms"] - timestamp_ms(e["timestamp"]) for e in streamed if isinstance(e.get("timestamp"), str)]
+    return {"entries": len(final), "completeness": completeness, "out_of_order": out_of_order,
+            "streamed": len(streamed), "missed_by_stream": sorted(e["id"] for e in final if e["id"] not in seen),
+            "visible_ms": latency_summary(lag)}
+
+
+def _summary(records):
+    return latency_summary([r["ended"] - r["started"] for r in records if r["error"] is None])
+
+
+async def _self_delete(browser, email, timeout_ms):
+    context = await new_context(browser, timeout_ms=timeout_ms)
+    try:
+        page = await context.new_page()
+        await login(page, email, DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+        return await page.evaluate(SELF_DELETE_SCRIPT)
+    except Exception as exc:    # keep the other deletions going; the report counts the failure
+        return {"started": None, "ended": None, "error": (str(exc).splitlines() or [type(exc).__name__])[0][:200]}
+    finally:
+        await context.close()
+
+
+async def _company_deletion(browser, client, auth, spec, seed, timeout_ms):
+    """Re-seed tenant 2, delete it as the superadmin and report what is left."""
+    loop = asyncio.get_running_loop()
+    cid = company_id(seed, 2)
+    credentials = output_path("auditlog", "ds%d-c2-credentials.csv" % seed)
+    uids, _ = await loop.run_in_executor(None, lambda: create_logins(spec, auth, companies=[2], path=credentials))
+    await loop.run_in_executor(None, load, client, chain(generate(spec, uids.get, companies=[2]),
+                                                         fixture_docs(spec, 2, uids.get)))
+    admin = superadmin_email(seed)
+    context = await new_context(browser, timeout_ms=timeout_ms)
+    try:
+        page = await context.new_page()
+        await login(page, admin, DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+        admin_uid = auth.sign_in(admin, DEFAULT_PASSWORD)["localId"]
+        outcome = await page.evaluate(COMPANY_DELETE_SCRIPT, {"companyId": cid, "deletedBy": {
+            "userId": admin_uid, "userEmail": admin, "userName": "Platform Yöneticisi"}})
+        outcome["error"] = None
+    except Exception as exc:
+        outcome = {"started": None, "ended": None, "success": False,
+                   "error": (str(exc).splitlines() or [type(exc).__name__])[0][:200]}
+    finally:
+        await context.close()
+
+    def leftovers():
+        docs = {name: _count(client, name, "companyId", cid) for name in COMPANY_COLLECTIONS}
+        accounts = []
+        for email in uids:
+            try:
+                auth.sign_in(email, DEFAULT_PASSWORD)
+                accounts.append(email)
+            except EmulatorError:
+                pass
+        return {name: n for name, n in docs.items() if n}, accounts
+
+    outcome["leftover_documents"], outcome["leftover_accounts"] = await loop.run_in_executor(None, leftovers)
+    outcome.update({"op": "company_delete", "uid": cid, "companyId": cid})
+    return outcome
+
+
+async def run_lifecycle(seed=DEFAULT_SEED, volumes=VOLUMES, concurrency=CONCURRENCY, self_delete=SELF_DELETE,
+                        company_deletion=True, ip_lookup="live", timeout_s=SETTLE_TIMEOUT_S, browser=None):
+    """Run the lifecycle at each volume and return the audit, propagation and latency report.
+
+    ``ip_lookup="blocked"`` aborts the api.ipify.org lookup every audit write
+    makes. Pass ``browser`` to reuse a running browser (TC012) instead of
+    launching one.
+    """
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_lifecycle(seed, volumes, concurrency, self_delete, company_deletion, ip_lookup,
+                                       timeout_s, own_browser)
+    spec, _, _ = load_tenants(seed)
+    loop = asyncio.get_running_loop()
+    client, auth = FirestoreEmulator(), AuthEmulator()
+    cid = company_id(seed, 1)
+    manager = user_email(seed, 1, "yonetici", 1)
+    signed_in = auth.sign_in(manager, DEFAULT_PASSWORD)
+    actor = {"id": signed_in["localId"], "email": manager, "name": "Yönetici 1", "role": "yonetici",
+             "companyId": cid}
+    tag = "AL-%s" % RUN_ID[-6:]
+    timeout_ms = int(timeout_s * 1000)
+    since = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+    ops, steps, deleted, company = [], [], [], None
+    with AuditStream(since) as stream:
+        context = await new_context(browser, timeout_ms=timeout_ms)
+        try:
+            if ip_lookup == "blocked":
+                await context.route(IPIFY, lambda route: route.abort())
+            page = await context.new_page()
+            await login(page, manager, DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+            for volume in volumes:
+                emails = ["audit-%s-v%d-%d@ds%d.test" % (tag.lower(), volume, n, seed) for n in range(volume)]
+                selves = min(self_delete, volume)
+                roles = ["bekci"] * selves + ["tekniker"] * (volume - selves)
+                created = await page.evaluate(CREATE_SCRIPT, {
+                    "members": [{"email": email, "rol": role} for email, role in zip(emails, roles)],
+                    "companyId": cid, "password": DEFAULT_PASSWORD, "actor": actor})
+                uids = [r["uid"] for r in created if r["error"] is None]
+                args = {"uids": uids, "concurrency": concurrency, "actor": actor, "tag": tag}
+                updated = await page.evaluate(OPS_SCRIPT, dict(args, op="update"))
+                audited = await page.evaluate(OPS_SCRIPT, dict(args, op="audited_update"))
+                email_of = {r["uid"]: r["email"] for r in created}
+                own = [uid for uid in uids if email_of[uid] in emails[:selves]]
+                client.set_many([doc for uid in own for doc in personal_data(cid, uid, tag)])
+                removed = await page.evaluate(OPS_SCRIPT, dict(args, uids=[u for u in uids if u not in own],
+                                                               op="delete"))
+                selfs = await asyncio.gather(*(_self_delete(browser, email_of[uid], timeout_ms) for uid in own))
+                selfs = [dict(r, uid=uid, op="self_delete") for uid, r in zip(own, selfs)]
+                ops += created + updated + removed + selfs
+                deleted += [(r["uid"], email_of[r["uid"]]) for r in removed + selfs]
+                no_audit, with_audit = _summary(updated), _summary(audited)
+                steps.append({
+                    "volume": volume, "create_ms": _summary(created), "update_ms": no_audit,
+                    "audited_update_ms": with_audit,
+                    "audit_write_ms": latency_summary([r["audit_ms"] for r in audited]),
+                    "audit_overhead_ms": (round(with_audit["median"] - no_audit["median"], 1)
+                                          if with_audit["n"] and no_audit["n"] else None),
+                    "delete_ms": _summary(removed), "self_delete_ms": _summary([r for r in selfs if r["started"]]),
+                    "errors": Counter(r["error"] for r in created + updated + audited + removed + selfs
+                                      if r["error"]).most_common(),
+                })
+        finally:
+            await context.close()
+        if company_deletion:
+            company = await _company_deletion(browser, client, auth, spec, seed, timeout_ms)
+            ops.append(company)
+        # Entries can become visible after the last write returned
+        await asyncio.sleep(2 * POLL_S)
+
+    final = [dict(fields, id=path.split("/", 1)[1]) for path, fields in client.run_query(audit_query(since))]
+    propagation = await loop.run_in_executor(None, lambda: [residue(client, auth, uid, email)
+                                                            for uid, email in deleted])
+    report = {"run_id": RUN_ID, "seed": seed, "tag": tag, "ip_lookup": ip_lookup, "concurrency": concurrency,
+              "volumes": steps, "company_deletion": company,
+              "residue": [r for r in propagation if r["auth_account"] or r["profile"] or r["documents"]],
+              "audit_retained": sum(1 for r in propagation if r["audit_entries_with_email"])}
+    report.update(check_audit(ops, stream.entries, final, tag))
+    return report
+
+
+def findings(report):
+    """Failures of the verifier: unaudited operations, misordered trails and data that survived deletion."""
+    out = ["%s: %d of %d operations without %s" % (kind, c["ops"] - c["audited"], c["ops"], ", ".join(c["missing"]))
+           for kind, c in report["completeness"].items() if c["missing"]]
+    out += ["%s: entries out of lifecycle order (%s)" % (r["uid"], " > ".join(r["actions"]))
+            for r in report["out_of_order"]]
+    out += ["%s: left after deletion: %s" % (r["email"], ", ".join(
+        (["auth account"] if r["auth_account"] else []) + (["profile"] if r["profile"] else [])
+        + ["%d %s" % (n, key) for key, n in r["documents"].items()])) for r in report["residue"]]
+    company = report["company_deletion"]
+    if company:
+        if company["error"]:
+            out.append("company deletion failed: %s" % company["error"])
+        out += ["%s: %d documents left after company deletion" % (name, n)
+                for name, n in company["leftover_documents"].items()]
+        if company["leftover_accounts"]:
+            out.append("%d Auth accounts left after company deletion" % len(company["leftover_accounts"]))
+    if report["missed_by_stream"]:
+        out.append("%d audit entries never reached the stream" % len(report["missed_by_stream"]))
+    return out
+
+
+def print_report(report):
+    print("audit-log lifecycle, concurrency %d, ip lookup %s: %d entries, %d streamed" % (
+        report["concurrency"], report["ip_lookup"], report["entries"], report["streamed"]))
+    print("%7s %9s %9s %9s %9s %9s %9s  (p50 ms)" % ("volume", "create", "update", "+audit", "audit", "delete",
+                                                   "self-del"))
+    for step in report["volumes"]:
+        cells = [step[key]["median"] for key in ("create_ms", "update_ms", "audited_update_ms", "audit_write_ms",
+                                                 "delete_ms", "self_delete_ms")]
+        print("%7d %s" % (step["volume"], " ".join("%9s" % ("-" if v is None else "%.0f" % v) for v in cells)))
+        for error, count in step["errors"]:
+            print("    %3d x %s" % (count, error))
+    for kind, c in report["completeness"].items():
+        print("  %-15s %4d/%-4d audited%s" % (kind, c["audited"], c["ops"],
+                                              "  missing %s" % c["missing"] if c["missing"] else ""))
+    visible = report["visible_ms"]
+    if visible["n"]:
+        print("entries visible to the stream after p50 %.0f / p95 %.0f ms" % (visible["median"], visible["p95"]))
+    print("%d deleted users still named in audit entries (retained by design of auditLogs)" % report["audit_retained"])
+    problems = findings(report)
+    for problem in problems:
+        print("FINDING  %s" % problem)
+    print("%d findings" % len(problems))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.auditlog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="load the two tenants, their logins and a superadmin")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd = sub.add_parser("run", help="run the lifecycle at each volume and verify the audit trail")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--volumes", type=int, nargs="+", default=list(VOLUMES), help="team members per step")
+    run_cmd.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                         help="updates and deletes in flight; creates run one at a time")
+    run_cmd.add_argument("--self-delete", type=int, default=SELF_DELETE,
+                         help="members per step that delete their own account")
+    run_cmd.add_argument("--no-company-deletion", action="store_true")
+    run_cmd.add_argument("--ip-lookup", choices=("live", "blocked"), default="live",
+                         help="let audit writes reach api.ipify.org or abort the lookup")
+    run_cmd.add_argument("--timeout", type=float, default=SETTLE_TIMEOUT_S)
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        manifest = seed_audit(args.seed)
+        print("%d users, logins in %s" % (len(manifest["uids"]), manifest["credentials"]))
+        return 0
+
+    report = asyncio.run(run_lifecycle(args.seed, args.volumes, args.concurrency, args.self_delete,
+                                       not args.no_company_deletion, args.ip_lookup, args.timeout))
+    out = output_path("auditlog", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if findings(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
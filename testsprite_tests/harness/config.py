@@ -0,0 +1,104 @@
+"""Shared settings for the local E2E harness.
+
+Values come from the TestSprite ``tmp/config.json`` so the harness targets the
+same endpoint and account as the generated TC files. Environment variables
+override them for CI and for runs against the local emulator stand-in.
+"""
+import csv
+import functools
+import json
+import os
+import subprocess
+import time
+import uuid
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = TESTS_DIR.parent
+TMP_DIR = TESTS_DIR / "tmp"
+OUTPUT_DIR = Path(os.environ.get("HARNESS_OUTPUT_DIR", TESTS_DIR / ".harness"))
+
+
+def _load_testsprite_config():
+    try:
+        with open(TMP_DIR / "config.json", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+_config = _load_testsprite_config()
+
+BASE_URL = os.environ.get("HARNESS_BASE_URL", _config.get("localEndpoint", "http://localhost:5173")).rstrip("/")
+LOGIN_EMAIL = os.environ.get("HARNESS_LOGIN_EMAIL", _config.get("loginUser", ""))
+LOGIN_PASSWORD = os.environ.get("HARNESS_LOGIN_PASSWORD", _config.get("loginPassword", ""))
+
+
+def _firebase_project():
+    try:
+        with open(REPO_ROOT / ".firebaserc", encoding="utf-8") as fh:
+            return json.load(fh)["projects"]["default"]
+    except (OSError, ValueError, KeyError):
+        return "demo-harness"
+
+
+# Local emulator stand-in (ports from firebase.json); the harness never writes to production
+FIREBASE_PROJECT = os.environ.get("HARNESS_FIREBASE_PROJECT") or _firebase_project()
+FIRESTORE_EMULATOR = os.environ.get("FIRESTORE_EMULATOR_HOST", "localhost:8080")
+AUTH_EMULATOR = os.environ.get("FIREBASE_AUTH_EMULATOR_HOST", "localhost:9099")
+FUNCTIONS_EMULATOR = os.environ.get("FUNCTIONS_EMULATOR_HOST", "localhost:5001")
+
+# Same flags the generated TC files launch Chromium with
+LAUNCH_ARGS = [
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--ipc=host",
+    "--single-process",
+]
+DEFAULT_TIMEOUT_MS = 5000
+
+# One id per harness process so samples from all tests of a run group together
+RUN_ID = os.environ.get("HARNESS_RUN_ID") or "%s-%s" % (time.strftime("%Y%m%dT%H%M%S"), uuid.uuid4().hex[:6])
+
+
+def output_path(*parts):
+    """Return a path under the harness output dir, creating parent folders."""
+    path = OUTPUT_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def release_label():
+    """Identify the build under test so results can be compared across releases."""
+    label = os.environ.get("HARNESS_RELEASE")
+    if label:
+        return label
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--tags", "--always", "--dirty"],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=5,
+        )
+        if out.returncode == 0 and out.stdout.strip():
+            return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return "unknown"
+
+
+def credential_pool(path=None):
+    """Load ``[{"email", "password", ...}]`` from a JSON or CSV file.
+
+    CSV files need an ``email,password`` header; extra columns (e.g. ``role``)
+    are kept. Without a file the TestSprite login is the only credential.
+    """
+    if not path:
+        return [{"email": LOGIN_EMAIL, "password": LOGIN_PASSWORD}]
+    with open(path, encoding="utf-8", newline="") as fh:
+        if str(path).endswith(".json"):
+            pool = json.load(fh)
+        else:
+            pool = list(csv.DictReader(fh))
+    if not pool:
+        raise ValueError("credential pool %s is empty" % path)
+    return pool
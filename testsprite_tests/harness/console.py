@@ -0,0 +1,227 @@
+"""Console, page-error and failed-request capture with per-test error budgets.
+
+A ``ConsoleCapture`` attached to a browser context records every console
+message, uncaught page error, failed request and HTTP error response together
+with its source location. Each event is appended to one NDJSON stream per run
+(``.harness/console/<run_id>.ndjson``) as soon as it happens; only counters
+per error class stay in memory.
+
+Events are grouped into classes by the same fingerprint ``harness.report``
+uses for the TestSprite console dumps. ``console_budgets.json`` allowlists known
+noise (per default and per test) and sets a budget per severity. An error
+class that is neither allowlisted nor in ``console_known.json`` (versioned
+next to the budgets) stops the test at its next step; ``check()`` fails it on
+budget overruns and is called before the test is marked passed::
+
+    python -m harness.console summary .harness/console/<run_id>.ndjson
+    python -m harness.console accept .harness/console/<run_id>.ndjson
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from .config import RUN_ID, output_path
+from .report import fingerprint
+
+BUDGETS_PATH = Path(__file__).resolve().parent / "console_budgets.json"
+KNOWN_PATH = Path(__file__).resolve().parent / "console_known.json"
+MAX_TEXT = 1000
+ERROR_KINDS = ("error", "pageerror", "requestfailed")
+
+_STACK_FRAME = re.compile(r"\(?(https?://[^\s()]+?):(\d+):(\d+)\)?")
+_LEVELS = {"warning": "WARNING", "error": "ERROR", "info": "INFO", "debug": "DEBUG", "log": "LOG"}
+
+
+class ConsoleBudgetError(AssertionError):
+    """Raised when a test produced an unknown error class or exceeded a budget."""
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def rules_for(test_id, budgets):
+    """Merged allowlist and budgets of ``test_id`` (test entries extend the default)."""
+    default = budgets.get("default", {})
+    test = budgets.get("tests", {}).get(test_id, {})
+    allow = [dict(rule, text=re.compile(rule["text"]) if "text" in rule else None)
+             for rule in default.get("allow", []) + test.get("allow", [])]
+    limits = dict(default.get("budgets", {}))
+    limits.update(test.get("budgets", {}))
+    return allow, limits
+
+
+def load_known_classes(path=KNOWN_PATH):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _strip_query(url):
+    return url.split("?")[0] if url else None
+
+
+def _allowed(event, allow):
+    for rule in allow:
+        if rule.get("kind") and rule["kind"] != event["kind"]:
+            continue
+        if rule.get("source") and rule["source"] not in (event["source"] or ""):
+            continue
+        if rule["text"] and not rule["text"].search(event["text"]):
+            continue
+        return True
+    return False
+
+
+class ConsoleCapture:
+    """Streams console/page-error/request events of the attached contexts to NDJSON."""
+
+    def __init__(self, test_id, budgets=None, known=None, fail_fast=True, stream_path=None):
+        self.test_id = test_id
+        self.allow, self.limits = rules_for(test_id, budgets if budgets is not None else load_budgets())
+        self.known = known if known is not None else load_known_classes()
+        self.fail_fast = fail_fast
+        self.stream_path = stream_path or output_path("console", "%s.ndjson" % RUN_ID)
+        self._stream = open(self.stream_path, "a", encoding="utf-8", buffering=1)
+        self.counts = Counter()       # kind -> events outside the allowlist
+        self.classes = Counter()      # fingerprint -> events
+        self.new_classes = {}         # fingerprint -> first event text
+        self.stopped = None
+
+    async def attach(self, context):
+        context.on("page", self._track)
+        for page in context.pages:
+            self._track(page)
+
+    def _track(self, page):
+        page.on("console", lambda message: self._on_console(page, message))
+        page.on("pageerror", lambda error: self._on_page_error(page, error))
+        page.on("requestfailed", lambda request: self._on_request_failed(page, request))
+        page.on("response", lambda response: self._on_response(page, response))
+
+    def _on_console(self, page, message):
+        if message.text.startswith("Failed to load resource"):
+            return  # the response / requestfailed event carries the same failure
+        location = message.location or {}
+        source = _strip_query(location.get("url")) or None
+        line = "%s:%s:%s" % (source, location.get("lineNumber"), location.get("columnNumber")) if source else None
+        kind = message.type if message.type in ("error", "warning") else "log"
+        self._record(page, kind, _LEVELS.get(message.type, message.type.upper()), message.text, source, line)
+
+    def _on_page_error(self, page, error):
+        frame = _STACK_FRAME.search(getattr(error, "stack", None) or "")
+        source = _strip_query(frame.group(1)) if frame else None
+        line = "%s:%s:%s" % (source, frame.group(2), frame.group(3)) if frame else None
+        self._record(page, "pageerror", "ERROR", "%s: %s" % (error.name, error.message), source, line)
+
+    def _on_request_failed(self, page, request):
+        self._record(page, "requestfailed", "ERROR", "%s %s" % (request.method, request.failure or "failed"),
+                     _strip_query(request.url), None)
+
+    def _on_response(self, page, response):
+        if response.status >= 400:
+            self._record(page, "http", "ERROR", "%s status of %d" % (response.request.method, response.status),
+                         _strip_query(response.url), None)
+
+    def _record(self, page, kind, level, text, source, location):
+        text = text[:MAX_TEXT]
+        key = fingerprint(level, text, source)
+        event = {"t": round(time.time(), 3), "run_id": RUN_ID, "test_id": self.test_id, "kind": kind,
+                 "level": level, "text": text, "source": source, "location": location, "fingerprint": key,
+                 "page": page.url.split("?")[0]}
+        event["allowed"] = _allowed(event, self.allow)
+        self._stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        if event["allowed"]:
+            return
+        self.counts[kind] += 1
+        self.classes[key] += 1
+        if kind in ERROR_KINDS and key not in self.known and key not in self.new_classes:
+            self.new_classes[key] = "%s %s (%s)" % (kind, text.splitlines()[0][:200], location or source)
+            if self.fail_fast and not self.stopped:
+                self.stopped = self.new_classes[key]
+                # Closing the page makes the test's next step fail right away; the
+                # context stays open so a failure trace can still be saved
+                asyncio.ensure_future(page.close())
+
+    def violations(self):
+        out = ["new error class: %s" % text for text in self.new_classes.values()]
+        for kind, limit in self.limits.items():
+            if self.counts[kind] > limit:
+                out.append("%s budget exceeded: %d > %d" % (kind, self.counts[kind], limit))
+        return out
+
+    def check(self):
+        violations = self.violations()
+        if violations:
+            raise ConsoleBudgetError("%s: %s" % (self.test_id, "; ".join(violations)))
+
+    def close(self, check=True):
+        """Close the stream and fail the test on any new error class or budget overrun."""
+        if self._stream.closed:
+            return
+        self._stream.close()
+        if check:
+            self.check()
+
+
+def _events(path):
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def summarize_stream(path):
+    """Aggregate an NDJSON stream per error class without loading it at once."""
+    classes = {}
+    for event in _events(path):
+        entry = classes.get(event["fingerprint"])
+        if entry is None:
+            entry = classes[event["fingerprint"]] = {
+                "kind": event["kind"], "text": event["text"].splitlines()[0][:160], "location": event["location"] or event["source"],
+                "allowed": event["allowed"], "count": 0, "tests": set()}
+        entry["count"] += 1
+        entry["tests"].add(event["test_id"])
+    return classes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.console")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="error classes in a capture stream")
+    summary.add_argument("stream")
+    accept = sub.add_parser("accept", help="add the error classes of a stream to the known classes")
+    accept.add_argument("stream")
+    args = parser.parse_args(argv)
+
+    classes = summarize_stream(args.stream)
+    if args.command == "summary":
+        for key, c in sorted(classes.items(), key=lambda item: -item[1]["count"]):
+            print("%s %-13s %5d  %-3s %s  [%s] %s" % (
+                key, c["kind"], c["count"], len(c["tests"]), "allowed" if c["allowed"] else "       ",
+                c["location"], c["text"]))
+        return 0
+
+    known = load_known_classes()
+    added = 0
+    for key, c in classes.items():
+        if c["kind"] in ERROR_KINDS and not c["allowed"] and key not in known:
+            known[key] = "%s %s" % (c["kind"], c["text"])
+            added += 1
+    with open(KNOWN_PATH, "w", encoding="utf-8") as fh:
+        json.dump(known, fh, indent=2, ensure_ascii=False, sort_keys=True)
+        fh.write("\n")
+    print("%d new error classes accepted, %d known" % (added, len(known)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
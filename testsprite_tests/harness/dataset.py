@@ -0,0 +1,491 @@
+"""Seeded multi-tenant datasets for scale tests, bulk-loaded into the Firestore emulator.
+
+TC006 creates a single santral with twelve hand-typed monthly estimates.
+This generator builds whole tenants with the field names the services
+read: companies, kullanicilar, sahalar, santraller, years of daily
+uretimVerileri, arizalar, elektrik/mekanik bakım records, vardiyaBildirimleri,
+stoklar and stokHareketleri. Production follows the season and each plant's capacity,
+and stock levels are the result of their own movement history.
+
+Every document id derives from the seed and the entity's position
+(``ds7-c002-s01-p3-20240105``), and every company draws from its own seeded
+RNG. The same seed and cardinalities therefore always produce the same
+documents, whatever order the workers load them in, and reloading
+overwrites instead of duplicating. Documents are committed in batches of
+500 from a thread pool; ``--logins`` also creates Auth emulator accounts
+for the generated users and writes them as a credential pool::
+
+    python -m harness.dataset load --preset medium --seed 7 --workers 16
+    python -m harness.dataset load --companies 20 --years 3 --logins --reset
+    python -m harness.dataset count --preset large
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from .config import FIREBASE_PROJECT, FIRESTORE_EMULATOR, output_path
+from .emulator import MAX_BATCH_WRITES, AuthEmulator, FirestoreEmulator
+
+PRESETS = {
+    "small": {"companies": 2, "sahalar": 2, "santraller": 2, "years": 1, "faults": 20, "bakim": 6,
+              "vardiya": 60, "stok": 30, "movements": 10},
+    "medium": {"companies": 5, "sahalar": 4, "santraller": 3, "years": 2, "faults": 60, "bakim": 12,
+               "vardiya": 240, "stok": 80, "movements": 25},
+    "large": {"companies": 12, "sahalar": 5, "santraller": 4, "years": 3, "faults": 150, "bakim": 24,
+              "vardiya": 700, "stok": 200, "movements": 40},
+}
+# One-company tenants with this many records in every list collection (see scale_tenant)
+SCALE_SAHALAR = 5
+SCALE_SANTRALLER = 4
+# Users generated per company and role
+ROLE_COUNTS = {"yonetici": 1, "muhendis": 2, "tekniker": 4, "musteri": 2, "bekci": 2}
+ROLE_NAMES = {"yonetici": "Yönetici", "muhendis": "Mühendis", "tekniker": "Tekniker", "musteri": "Müşteri",
+              "bekci": "Bekçi"}
+DEFAULT_PASSWORD = "harness-123"
+END_DATE = date(2025, 10, 1)
+
+CITIES = [("İzmir", 38.42, 27.14), ("Konya", 37.87, 32.48), ("Antalya", 36.89, 30.71), ("Kayseri", 38.73, 35.48),
+          ("Karaman", 37.18, 33.22), ("Denizli", 37.78, 29.09), ("Mersin", 36.81, 34.64), ("Ankara", 39.93, 32.86)]
+FAULT_TITLES = ["İnvertör arızası", "String kesintisi", "Panel kırığı", "Trafo alarmı", "Kablo hasarı",
+                "Haberleşme kaybı", "Toplama kutusu sigortası", "Topraklama hatası", "SCADA veri kaybı"]
+FAULT_STATUS = (["cozuldu"] * 6) + ["acik", "acik", "devam-ediyor", "beklemede"]
+PRIORITIES = ["dusuk", "normal", "normal", "normal", "yuksek", "kritik"]
+ELEKTRIK_KONTROLLERI = ["OG Sistemleri Kontrolü", "Trafo Kontrolleri", "AG Dağıtım Panosu",
+                        "İnvertör Kontrolleri", "Toplama Kutuları", "PV Modül Kontrolleri"]
+MEKANIK_KONTROLLERI = ["Panel Temizliği", "Yapısal Kontroller", "Kablo Kontrolleri", "Güvenlik Ekipmanları",
+                       "Montaj Elemanları", "Çelik Konstrüksiyon"]
+MATERIALS = [("Solar kablo 6mm²", "Kablo", "metre", 18.5), ("MC4 konnektör", "Bağlantı", "adet", 42.0),
+             ("String sigortası 15A", "Elektrik", "adet", 95.0), ("DC parafudr", "Elektrik", "adet", 1250.0),
+             ("Panel 550W", "Panel", "adet", 4800.0), ("Kablo bağı", "Sarf", "paket", 65.0),
+             ("Topraklama çubuğu", "Topraklama", "adet", 310.0), ("Temizlik deterjanı", "Sarf", "litre", 120.0)]
+# Check-in windows the shift page shows for each vardiya type
+SHIFTS = {"sabah": ("08:00", "10:00"), "ogle": ("15:00", "17:00"), "aksam": ("20:00", "22:00"),
+          "gece": ("03:00", "05:00")}
+OBSERVATIONS = ["Tel örgüde hasar", "Kamera görüntüsü yok", "Panel yüzeyinde kirlenme", "Aydınlatma arızası",
+                "Yetkisiz giriş denemesi", "İnvertör alarm ışığı"]
+MONTHS = ["ocak", "subat", "mart", "nisan", "mayis", "haziran", "temmuz", "agustos", "eylul", "ekim", "kasim",
+          "aralik"]
+
+
+class DatasetSpec:
+    """Cardinalities of one dataset; ``years`` of daily production end at ``END_DATE``."""
+
+    def __init__(self, seed=1, companies=2, sahalar=2, santraller=2, years=1, faults=20, bakim=6, vardiya=60,
+                 stok=30, movements=10, production=True, role_counts=None):
+        self.seed = seed
+        self.companies = companies
+        self.sahalar = sahalar          # per company
+        self.santraller = santraller    # per saha
+        self.years = years
+        self.faults = faults            # per santral
+        self.bakim = bakim              # per santral and bakım type
+        self.vardiya = vardiya          # shift reports per saha
+        self.stok = stok                # per company
+        self.movements = movements      # per stock item
+        self.production = production    # daily uretimVerileri for every day of ``years``
+        self.role_counts = role_counts or ROLE_COUNTS
+
+    @property
+    def days(self):
+        return int(self.years * 365)
+
+    def counts(self):
+        """Documents per collection, without generating them."""
+        plants = self.companies * self.sahalar * self.santraller
+        return {
+            "companies": self.companies,
+            "kullanicilar": self.companies * sum(self.role_counts.values()),
+            "sahalar": self.companies * self.sahalar,
+            "santraller": plants,
+            "uretimVerileri": plants * self.days if self.production else 0,
+            "arizalar": plants * self.faults,
+            "elektrikBakimlar": plants * self.bakim,
+            "mekanikBakimlar": plants * self.bakim,
+            "vardiyaBildirimleri": self.companies * self.sahalar * self.vardiya,
+            "stoklar": self.companies * self.stok,
+            "stokHareketleri": self.companies * self.stok * self.movements,
+        }
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def company_id(seed, index):
+    return "ds%d-c%03d" % (seed, index)
+
+
+def user_email(seed, index, role, n):
+    return "%s%d@c%03d.ds%d.test" % (role, n, index, seed)
+
+
+def _ts(day, rng, start_hour=7, end_hour=18):
+    return datetime(day.year, day.month, day.day, rng.randint(start_hour, end_hour - 1), rng.randint(0, 59),
+                    tzinfo=timezone.utc)
+
+
+def _sun_hours(day, lat):
+    """Peak sun hours for Turkey: ~7.5 h at the summer solstice, ~2.5 h in winter, less further north."""
+    season = math.cos(2 * math.pi * (day.timetuple().tm_yday - 172) / 365)
+    return max(0.5, 5.0 + 2.5 * season - 0.08 * (lat - 37))
+
+
+def generate_company(spec, index, uid_for=None):
+    """Yield ``(path, fields)`` for one tenant; deterministic for ``(spec, index)``."""
+    rng = random.Random("%d-%d" % (spec.seed, index))
+    cid = company_id(spec.seed, index)
+    start = END_DATE - timedelta(days=spec.days)
+    created = datetime.combine(start - timedelta(days=rng.randint(30, 400)), datetime.min.time(), timezone.utc)
+
+    yield "companies/%s" % cid, {
+        "name": "%s Enerji %d A.Ş." % (rng.choice(CITIES)[0], index),
+        "email": "info@c%03d.ds%d.test" % (index, spec.seed),
+        "phone": "+90 5%02d %03d %04d" % (rng.randint(30, 59), rng.randint(0, 999), rng.randint(0, 9999)),
+        "subscriptionStatus": "active", "subscriptionPlan": "enterprise", "isActive": True,
+        "subscriptionLimits": {"users": 1000, "storage": "100GB", "storageLimit": 102400, "sahalar": 1000,
+                               "santraller": 1000, "arizaKaydi": -1, "bakimKaydi": -1},
+        "createdAt": created, "createdBy": "dataset-%d" % spec.seed,
+        "settings": {"theme": "light", "language": "tr"},
+    }
+
+    users = {}
+    for role, count in spec.role_counts.items():
+        for n in range(1, count + 1):
+            email = user_email(spec.seed, index, role, n)
+            uid = uid_for(email) if uid_for else "%s-u-%s%d" % (cid, role, n)
+            users.setdefault(role, []).append(
+                {"uid": uid, "email": email, "ad": "%s %d" % (ROLE_NAMES.get(role, role), n)})
+    field_staff = users.get("tekniker", []) + users.get("muhendis", [])
+
+    sahalar, plants = [], []
+    for si in range(1, spec.sahalar + 1):
+        city, lat, lng = rng.choice(CITIES)
+        saha = {"id": "%s-s%02d" % (cid, si), "ad": "%s Saha %d" % (city, si), "lat": lat + rng.uniform(-0.3, 0.3),
+                "lng": lng + rng.uniform(-0.3, 0.3), "city": city, "santralIds": []}
+        musteri = users["musteri"][(si - 1) % len(users["musteri"])] if users.get("musteri") else None
+        saha["musteri"] = musteri
+        for pi in range(1, spec.santraller + 1):
+            kapasite = float(rng.choice([250, 500, 750, 1000, 1500, 2000, 5000]))
+            plant = {"id": "%s-p%d" % (saha["id"], pi), "ad": "%s GES-%d" % (city, pi), "saha": saha,
+                     "kapasite": kapasite, "pr": rng.uniform(0.74, 0.86), "fiyat": round(rng.uniform(2.2, 3.4), 2),
+                     "dagitim": round(rng.uniform(0.35, 0.6), 2),
+                     "kurulum": start - timedelta(days=rng.randint(30, 900))}
+            saha["santralIds"].append(plant["id"])
+            plants.append(plant)
+        sahalar.append(saha)
+
+    for role, members in users.items():
+        for n, user in enumerate(members):
+            # Customers see their own sites; guards and technicians a slice of the fleet
+            if role == "musteri":
+                assigned = [s for s in sahalar if s["musteri"] is user]
+            elif role in ("bekci", "tekniker"):
+                assigned = sahalar[n % len(sahalar)::max(1, len(members))]
+            else:
+                assigned = sahalar
+            yield "kullanicilar/%s" % user["uid"], {
+                "companyId": cid, "email": user["email"], "ad": user["ad"], "rol": role,
+                "telefon": "+90 5%02d %03d %04d" % (rng.randint(30, 59), rng.randint(0, 999), rng.randint(0, 9999)),
+                "sahalar": [s["id"] for s in assigned],
+                "santraller": [p for s in assigned for p in s["santralIds"]],
+                "emailVerified": True, "adminApproved": True, "aktif": True, "odemeDurumu": "odendi",
+                "olusturmaTarihi": created, "guncellenmeTarihi": created,
+            }
+
+    for saha in sahalar:
+        musteri = saha["musteri"]
+        yield "sahalar/%s" % saha["id"], {
+            "companyId": cid, "ad": saha["ad"], "musteriId": musteri["uid"] if musteri else "",
+            "musteriAdi": musteri["ad"] if musteri else "", "santralIds": saha["santralIds"],
+            "konum": {"lat": saha["lat"], "lng": saha["lng"], "adres": "%s, Türkiye" % saha["city"]},
+            "toplamKapasite": sum(p["kapasite"] for p in plants if p["saha"] is saha), "aktif": True,
+            "olusturmaTarihi": created, "guncellenmeTarihi": created,
+        }
+
+    for plant in plants:
+        saha = plant["saha"]
+        yearly = sum(plant["kapasite"] * _sun_hours(date(2024, 1, 1) + timedelta(days=d), saha["lat"]) * plant["pr"]
+                     for d in range(0, 365, 7)) * 7
+        monthly = {m: round(plant["kapasite"] * _sun_hours(date(2024, i + 1, 15), saha["lat"]) * plant["pr"] * 30)
+                   for i, m in enumerate(MONTHS)}
+        total = 0.0
+        last = 0.0
+        for d in range(spec.days if spec.production else 0):
+            day = start + timedelta(days=d)
+            if day < plant["kurulum"]:
+                continue
+            age = (day - plant["kurulum"]).days / 365
+            sun = _sun_hours(day, saha["lat"])
+            cloud = 1.0 - (rng.random() ** 3) * 0.85       # mostly clear, a few overcast days
+            pr = plant["pr"] * (1 - 0.005 * age)              # 0.5 % yearly degradation
+            kwh = round(plant["kapasite"] * sun * pr * cloud, 1)
+            total += kwh
+            last = kwh
+            temp = round(17 + 12 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 200) / 365) + rng.gauss(0, 3), 1)
+            yield "uretimVerileri/%s-%s" % (plant["id"], day.strftime("%Y%m%d")), {
+                "companyId": cid, "santralId": plant["id"], "tarih": _ts(day, rng, 19, 21),
+                "gunlukUretim": kwh, "anlikGuc": round(plant["kapasite"] * cloud * rng.uniform(0.5, 0.95), 1),
+                "performansOrani": round(pr * cloud * 100, 1), "gelir": round(kwh * plant["fiyat"], 2),
+                "dagitimBedeli": round(kwh * plant["dagitim"], 2), "tasarrufEdilenCO2": round(kwh * 0.44, 1),
+                "hava": {"sicaklik": temp, "nem": rng.randint(20, 85), "radyasyon": round(sun * 1000 * cloud / 8, 1)},
+                "olusturanKisi": {"id": "dataset", "ad": "Veri üretici"}, "olusturmaTarihi": _ts(day, rng, 19, 21),
+            }
+        yield "santraller/%s" % plant["id"], {
+            "companyId": cid, "ad": plant["ad"], "sahaId": saha["id"], "sahaAdi": saha["ad"],
+            "musteriAdi": saha["musteri"]["ad"] if saha["musteri"] else "", "kapasite": plant["kapasite"],
+            "konum": {"lat": saha["lat"], "lng": saha["lng"], "adres": "%s, Türkiye" % saha["city"]},
+            "kurulumTarihi": _ts(plant["kurulum"], rng), "elektrikFiyati": plant["fiyat"],
+            "dagitimBedeli": plant["dagitim"], "durum": "aktif", "aktif": True,
+            "yillikHedefUretim": round(yearly), "aylikHedefUretim": round(yearly / 12),
+            "gunlukHedefUretim": round(yearly / 365), "yazVerimlilikOrani": 85, "kisVerimlilikOrani": 60,
+            "aylikTahminler": monthly, "sonUretim": last, "performans": round(plant["pr"] * 100, 1),
+            "toplamUretim": round(total, 1), "musteriSayisi": 1,
+            "panelSayisi": int(plant["kapasite"] * 1000 / 550), "panelGucu": 550,
+            "inverterSayisi": max(1, int(plant["kapasite"] / 100)),
+            "olusturmaTarihi": _ts(plant["kurulum"], rng), "guncellenmeTarihi": _ts(END_DATE, rng),
+        }
+
+        for fi in range(1, spec.faults + 1):
+            day = start + timedelta(days=rng.randrange(spec.days))
+            opened = _ts(day, rng)
+            status = rng.choice(FAULT_STATUS)
+            reporter = rng.choice(field_staff or users["yonetici"])
+            fault = {
+                "companyId": cid, "santralId": plant["id"], "saha": saha["ad"], "baslik": rng.choice(FAULT_TITLES),
+                "aciklama": "%s - otomatik üretilmiş kayıt #%d" % (plant["ad"], fi), "durum": status,
+                "oncelik": rng.choice(PRIORITIES), "konum": "Blok %s" % rng.choice("ABCDE"), "fotograflar": [],
+                "raporlayanId": reporter["uid"], "atananKisi": rng.choice(field_staff or [reporter])["uid"],
+                "olusturmaTarihi": opened, "guncellenmeTarihi": opened,
+            }
+            if status == "cozuldu":
+                fault["cozumTarihi"] = fault["guncellenmeTarihi"] = opened + timedelta(hours=rng.randint(2, 120))
+                fault["cozumAciklamasi"] = "Arıza giderildi."
+            yield "arizalar/%s-f%04d" % (plant["id"], fi), fault
+
+        for collection, suffix, checks in (("elektrikBakimlar", "e", ELEKTRIK_KONTROLLERI),
+                                           ("mekanikBakimlar", "m", MEKANIK_KONTROLLERI)):
+            for bi in range(1, spec.bakim + 1):
+                day = start + timedelta(days=int(spec.days * (bi - rng.random()) / spec.bakim))
+                worker = rng.choice(field_staff or users["yonetici"])
+                yield "%s/%s-%s%03d" % (collection, plant["id"], suffix, bi), {
+                    "companyId": cid, "santralId": plant["id"], "sahaId": saha["id"], "tarih": _ts(day, rng),
+                    "yapanKisi": worker["ad"], "yapanKisiId": worker["uid"],
+                    "kontroller": {check: rng.random() > 0.08 for check in checks},
+                    "genelDurum": rng.choice(["iyi", "iyi", "iyi", "orta", "kotu"]),
+                    "notlar": "Periyodik bakım", "fotograflar": [], "olusturmaTarihi": _ts(day, rng),
+                }
+
+    guards = users.get("bekci", []) + field_staff
+    for saha in sahalar:
+        for vi in range(1, spec.vardiya + 1):
+            day = start + timedelta(days=int(spec.days * (vi - rng.random()) / spec.vardiya))
+            tip = rng.choice(list(SHIFTS))
+            author = rng.choice(guards or users["yonetici"])
+            role = next(r for r, members in users.items() if author in members)
+            observations = [{"baslik": rng.choice(OBSERVATIONS), "aciklama": "Vardiya sırasında tespit edildi.",
+                             "oncelik": rng.choice(["dusuk", "orta", "yuksek"])}
+                            for _ in range(rng.choice([0, 0, 1, 2]))]
+            durum = "acil" if any(o["oncelik"] == "yuksek" for o in observations) else \
+                "dikkat" if observations else "normal"
+            plant = rng.choice([p for p in plants if p["saha"] is saha])
+            yield "vardiyaBildirimleri/%s-v%05d" % (saha["id"], vi), {
+                "companyId": cid, "olusturanId": author["uid"], "olusturanAdi": author["ad"], "olusturanRol": role,
+                "sahaId": saha["id"], "sahaAdi": saha["ad"], "santralId": plant["id"], "santralAdi": plant["ad"],
+                "tarih": _ts(day, rng, 0, 23), "vardiyaTipi": tip,
+                "vardiyaSaatleri": {"baslangic": SHIFTS[tip][0], "bitis": SHIFTS[tip][1]},
+                "personeller": [{"id": author["uid"], "ad": author["ad"], "rol": role}],
+                "durum": durum, "acilDurum": durum == "acil", "gozlemler": observations,
+                "yapılanIsler": ["Çevre turu", "Kamera kontrolü"], "fotograflar": [],
+                "konum": {"lat": saha["lat"], "lng": saha["lng"], "adres": "%s, Türkiye" % saha["city"]},
+                "guvenlikKontrolleri": {"kameraKontrol": True, "telOrguKontrol": rng.random() > 0.1,
+                                        "aydinlatmaKontrol": rng.random() > 0.1, "girisKontrol": True},
+                "olusturmaTarihi": _ts(day, rng, 0, 23),
+            }
+
+    for ki in range(1, spec.stok + 1):
+        name, kategori, birim, fiyat = rng.choice(MATERIALS)
+        saha = rng.choice(sahalar)
+        minimum = rng.choice([5, 10, 20, 50, 100])
+        level = rng.randint(minimum, minimum * 6)
+        sid = "%s-k%04d" % (cid, ki)
+        moments = sorted(start + timedelta(days=rng.randrange(spec.days)) for _ in range(spec.movements))
+        for hi, day in enumerate(moments, 1):
+            # Usage outweighs deliveries, so some items end below their minimum
+            kind = "giris" if rng.random() < 0.3 else "cikis"
+            amount = rng.randint(1, max(1, minimum)) * (3 if kind == "giris" else 1)
+            new = level + amount if kind == "giris" else max(0, level - amount)
+            yield "stokHareketleri/%s-h%03d" % (sid, hi), {
+                "stokId": sid, "companyId": cid, "hareketTipi": kind, "miktar": amount if kind == "giris" else level - new,
+                "eskiMiktar": level, "yeniMiktar": new, "yapanKisi": rng.choice(field_staff or users["yonetici"])["ad"],
+                "aciklama": "Saha kullanımı" if kind == "cikis" else "Tedarikçi teslimatı", "tarih": _ts(day, rng),
+                "hedefSaha": saha["id"],
+            }
+            level = new
+        status = "kritik" if level <= 0 else "dusuk" if level <= minimum else "normal"
+        yield "stoklar/%s" % sid, {
+            "companyId": cid, "sahaId": saha["id"], "malzemeAdi": "%s #%d" % (name, ki), "kategori": kategori,
+            "birim": birim, "mevcutStok": level, "minimumStokSeviyesi": minimum, "minimumStok": minimum,
+            "birimFiyat": fiyat, "tedarikci": "Tedarikçi %d" % rng.randint(1, 5), "durum": status,
+            "sonGuncelleme": _ts(moments[-1] if moments else END_DATE, rng), "olusturmaTarihi": created,
+        }
+
+
+def scale_tenant(seed, size):
+    """One-company spec with about ``size`` arıza, elektrik bakım, vardiya and stok records.
+
+    The company index is ``size`` itself (``ds7-c10000``), so tenants of
+    different sizes live side by side in one emulator. Production history and
+    stock movements are left out; the list pages do not read them.
+    """
+    plants = SCALE_SAHALAR * SCALE_SANTRALLER
+    return DatasetSpec(seed=seed, companies=1, sahalar=SCALE_SAHALAR, santraller=SCALE_SANTRALLER, years=1,
+                       faults=max(1, size // plants), bakim=max(1, size // plants),
+                       vardiya=max(1, size // SCALE_SAHALAR), stok=size, movements=0, production=False)
+
+
+def generate(spec, uid_for=None, companies=None):
+    for index in (companies or range(1, spec.companies + 1)):
+        yield from generate_company(spec, index, uid_for)
+
+
+def _batches(docs, size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load(client, docs, workers=8, batch_size=MAX_BATCH_WRITES, progress_s=5.0):
+    """Commit ``docs`` in batches from ``workers`` threads; return counts and throughput."""
+    per_collection = Counter()
+    in_flight = threading.BoundedSemaphore(workers * 2)   # keeps generated-but-unsent batches bounded
+    lock = threading.Lock()
+    started = time.monotonic()
+    state = {"docs": 0, "reported": started}
+
+    def commit(batch):
+        try:
+            client.set_many(batch)
+        finally:
+            in_flight.release()
+        with lock:
+            state["docs"] += len(batch)
+            now = time.monotonic()
+            if progress_s and now - state["reported"] >= progress_s:
+                state["reported"] = now
+                print("%9d docs  %8.0f docs/min" % (state["docs"], state["docs"] * 60 / (now - started)), flush=True)
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in _batches(docs, batch_size):
+            for path, _ in batch:
+                per_collection[path.split("/", 1)[0]] += 1
+            in_flight.acquire()
+            futures.append(pool.submit(commit, batch))
+            # Surface the first failed commit instead of generating the rest of the dataset
+            while futures and futures[0].done():
+                futures.pop(0).result()
+    for future in futures:
+        future.result()
+    seconds = time.monotonic() - started
+    return {"docs": state["docs"], "seconds": round(seconds, 2),
+            "docs_per_min": round(state["docs"] * 60 / seconds) if seconds else None,
+            "collections": dict(per_collection)}
+
+
+def create_logins(spec, auth, password=DEFAULT_PASSWORD, companies=None, path=None):
+    """Auth emulator accounts for every generated user; return ``{email: uid}`` and the credential pool path."""
+    uids, rows = {}, []
+    for index in (companies or range(1, spec.companies + 1)):
+        for role, count in spec.role_counts.items():
+            for n in range(1, count + 1):
+                email = user_email(spec.seed, index, role, n)
+                uids[email] = auth.ensure_user(email, password)
+                rows.append({"email": email, "password": password, "role": role,
+                             "companyId": company_id(spec.seed, index), "uid": uids[email]})
+    path = path or output_path("dataset", "ds%d-credentials.csv" % spec.seed)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return uids, path
+
+
+def manifest_path(seed):
+    return output_path("dataset", "ds%d.json" % seed)
+
+
+def load_manifest(seed):
+    """Spec and uid map of a loaded dataset, so other tools can regenerate and cross-check it."""
+    with open(manifest_path(seed), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    spec = DatasetSpec(**manifest["spec"])
+    uids = manifest.get("uids") or {}
+    return spec, (uids.get if uids else None), manifest
+
+
+def spec_from_args(args):
+    values = dict(PRESETS[args.preset])
+    for key in values:
+        if getattr(args, key, None) is not None:
+            values[key] = getattr(args, key)
+    return DatasetSpec(seed=args.seed, **values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.dataset")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("load", "generate and bulk-load a dataset"), ("count", "documents per collection")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--preset", choices=sorted(PRESETS), default="small")
+        cmd.add_argument("--seed", type=int, default=1)
+        for key in PRESETS["small"]:
+            cmd.add_argument("--" + key, type=float if key == "years" else int, default=None)
+    load_cmd = sub.choices["load"]
+    load_cmd.add_argument("--workers", type=int, default=8)
+    load_cmd.add_argument("--logins", action="store_true", help="create Auth emulator accounts for the users")
+    load_cmd.add_argument("--reset", action="store_true", help="wipe the emulator project first")
+    args = parser.parse_args(argv)
+
+    spec = spec_from_args(args)
+    counts = spec.counts()
+    if args.command == "count":
+        for collection, n in counts.items():
+            print("%-18s %10d" % (collection, n))
+        print("%-18s %10d" % ("total", sum(counts.values())))
+        return 0
+
+    client = FirestoreEmulator()
+    print("loading %d documents into %s (project %s)" % (sum(counts.values()), FIRESTORE_EMULATOR, FIREBASE_PROJECT))
+    uids, credentials = {}, None
+    if args.reset:
+        client.reset()
+    if args.logins:
+        auth = AuthEmulator()
+        if args.reset:
+            auth.reset()
+        uids, credentials = create_logins(spec, auth)
+        print("%d logins written to %s" % (len(uids), credentials))
+    stats = load(client, generate(spec, uids.get if uids else None), workers=args.workers)
+    with open(manifest_path(spec.seed), "w", encoding="utf-8") as fh:
+        json.dump({"spec": spec.as_dict(), "project": FIREBASE_PROJECT, "stats": stats, "uids": uids,
+                   "credentials": str(credentials) if credentials else None,
+                   "companies": [company_id(spec.seed, i) for i in range(1, spec.companies + 1)]},
+                  fh, indent=2, ensure_ascii=False)
+    print("%d documents in %.1f s (%d docs/min)" % (stats["docs"], stats["seconds"], stats["docs_per_min"] or 0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Minimal REST clients for the Firestore, Auth and Functions emulators.
+
+Bulk loaders and probes talk to the emulators over their REST APIs instead of
+going through the app. Requests carry ``Authorization: Bearer owner`` unless
+a user ID token is passed. The emulators treat ``owner`` as an admin token
+that bypasses security rules. A user token makes them evaluate
+``firestore.rules`` like they would for the app.
+
+Each thread keeps one keep-alive connection per emulator, so a thread pool
+can commit batches in parallel without reconnecting for every request.
+"""
+import base64
+import http.client
+import json
+import threading
+from datetime import date, datetime, time, timezone
+from urllib.parse import quote
+
+from .config import AUTH_EMULATOR, FIREBASE_PROJECT, FIRESTORE_EMULATOR, FUNCTIONS_EMULATOR
+
+MAX_BATCH_WRITES = 500
+API_KEY = "harness"
+
+
+class EmulatorError(RuntimeError):
+    """Non-2xx answer from an emulator."""
+
+    def __init__(self, status, body):
+        super().__init__("HTTP %d: %s" % (status, body[:300]))
+        self.status = status
+        self.body = body
+
+
+def encode_value(value):
+    """Python value -> Firestore REST ``Value``."""
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return {"timestampValue": value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")}
+    if isinstance(value, date):
+        return encode_value(datetime.combine(value, time(), timezone.utc))
+    if isinstance(value, bytes):
+        return {"bytesValue": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": encode_fields(value)}}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [encode_value(v) for v in value]}}
+    raise TypeError("cannot encode %r for Firestore" % type(value).__name__)
+
+
+def encode_fields(doc):
+    return {key: encode_value(value) for key, value in doc.items()}
+
+
+def decode_value(value):
+    """Firestore REST ``Value`` -> Python value (timestamps stay ISO strings)."""
+    kind, inner = next(iter(value.items()))
+    if kind == "integerValue":
+        return int(inner)
+    if kind == "mapValue":
+        return decode_fields(inner.get("fields", {}))
+    if kind == "arrayValue":
+        return [decode_value(v) for v in inner.get("values", [])]
+    return inner
+
+
+def decode_fields(fields):
+    return {key: decode_value(value) for key, value in fields.items()}
+
+
+class _Client:
+    def __init__(self, host, token="owner"):
+        self.host = host
+        self.token = token
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        token = self.token if token is None else token
+        if token:
+            headers["Authorization"] = "Bearer %s" % token
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        for retry in (True, False):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(self.host, timeout=120)
+            try:
+                connection.request(method, path, payload, headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The emulator dropped an idle keep-alive connection; reconnect once
+                connection.close()
+                self._local.connection = None
+                if not retry:
+                    raise
+        if response.status >= 400:
+            raise EmulatorError(response.status, data.decode("utf-8", "replace"))
+        return json.loads(data) if data else {}
+
+
+class FirestoreEmulator(_Client):
+    """Documents, batched commits and queries against the Firestore emulator."""
+
+    def __init__(self, host=FIRESTORE_EMULATOR, project=FIREBASE_PROJECT, token="owner"):
+        super().__init__(host, token)
+        self.project = project
+        self.root = "projects/%s/databases/(default)/documents" % project
+
+    def name(self, path):
+        return "%s/%s" % (self.root, path)
+
+    def get(self, path, token=None):
+        """Decoded fields of the document at ``path``, or None if it does not exist."""
+        try:
+            doc = self.request("GET", "/v1/%s" % quote(self.name(path)), token=token)
+        except EmulatorError as exc:
+            if exc.status == 404:
+                return None
+            raise
+        return decode_fields(doc.get("fields", {}))
+
+    def commit(self, writes, token=None):
+        return self.request("POST", "/v1/%s:commit" % quote(self.root), {"writes": writes}, token=token)
+
+    def set_many(self, docs, token=None):
+        """Overwrite ``[(path, fields)]`` in one atomic commit (at most ``MAX_BATCH_WRITES``)."""
+        writes = [{"update": {"name": self.name(path), "fields": encode_fields(fields)}} for path, fields in docs]
+        return self.commit(writes, token=token)
+
+    def update_many(self, docs, token=None):
+        """Merge ``[(path, fields)]`` into existing documents in one atomic commit; other fields are kept."""
+        writes = [{"update": {"name": self.name(path), "fields": encode_fields(fields)},
+                   "updateMask": {"fieldPaths": list(fields)}, "currentDocument": {"exists": True}}
+                  for path, fields in docs]
+        return self.commit(writes, token=token)
+
+    def delete_many(self, paths, token=None):
+        """Delete ``paths`` in one atomic commit (at most ``MAX_BATCH_WRITES``); missing documents are ignored."""
+        return self.commit([{"delete": self.name(path)} for path in paths], token=token)
+
+    def run_query(self, structured_query, parent="", token=None):
+        """Run a ``StructuredQuery``; return ``[(path, fields)]``."""
+        target = "%s/%s" % (self.root, parent) if parent else self.root
+        rows = self.request("POST", "/v1/%s:runQuery" % quote(target),
+                            {"structuredQuery": structured_query}, token=token)
+        prefix = self.root + "/"
+        return [(row["document"]["name"][len(prefix):], decode_fields(row["document"].get("fields", {})))
+                for row in rows if "document" in row]
+
+    def reset(self):
+        """Delete every document in the emulator project."""
+        self.request("DELETE", "/emulator/v1/projects/%s/databases/(default)/documents" % self.project)
+
+
+class AuthEmulator(_Client):
+    """Email/password accounts and SMS codes in the Auth emulator."""
+
+    def __init__(self, host=AUTH_EMULATOR, project=FIREBASE_PROJECT):
+        super().__init__(host, token="owner")
+        self.project = project
+
+    def _identity(self, method, body):
+        return self.request("POST", "/identitytoolkit.googleapis.com/v1/accounts:%s?key=%s" % (method, API_KEY),
+                            body, token="")
+
+    def sign_in(self, email, password):
+        """``{"localId", "idToken", ...}`` for an existing account."""
+        return self._identity("signInWithPassword", {"email": email, "password": password, "returnSecureToken": True})
+
+    def ensure_user(self, email, password):
+        """Create the account unless it exists; return its uid."""
+        try:
+            return self._identity("signUp", {"email": email, "password": password,
+                                             "returnSecureToken": True})["localId"]
+        except EmulatorError as exc:
+            if "EMAIL_EXISTS" not in exc.body:
+                raise
+        return self.sign_in(email, password)["localId"]
+
+    def verification_codes(self):
+        """``[{"phoneNumber", "sessionInfo", "code"}]`` of the SMS codes the emulator "sent", oldest first."""
+        return self.request("GET", "/emulator/v1/projects/%s/verificationCodes" % self.project,
+                            token="").get("verificationCodes", [])
+
+    def reset(self):
+        self.request("DELETE", "/emulator/v1/projects/%s/accounts" % self.project)
+
+
+class FunctionsEmulator(_Client):
+    """Callable functions in the Functions emulator, invoked like the web SDK's ``httpsCallable``."""
+
+    def __init__(self, host=FUNCTIONS_EMULATOR, project=FIREBASE_PROJECT, region="us-central1"):
+        super().__init__(host, token="")
+        self.project = project
+        self.region = region
+
+    def call(self, name, data, token=None):
+        """Run callable ``name`` as the user of ``token`` (an ID token); return its ``result``."""
+        return self.request("POST", "/%s/%s/%s" % (self.project, self.region, name), {"data": data},
+                            token=token).get("result")
@@ -0,0 +1,500 @@
+"""Download capture and streaming validation for the fault PDF and Excel exports.
+
+``capture_download`` clicks an export button inside ``page.expect_download``,
+saves the file under ``.harness/exports/<run_id>/`` and times the click until
+the download starts (``start_ms``) and until it is written (``saved_ms``).
+
+Both parsers use the standard library and read one unit at a time:
+
+* ``pdf_pages`` walks the PDF object by object and yields the text runs of
+  each page as soon as its content stream has been read (jsPDF writes every
+  page right before its content, so nothing else is buffered).
+* ``xlsx_rows`` iterparses the first worksheet and clears every row after
+  yielding it; only the shared-strings table is held in memory.
+
+``cross_check`` compares the PDF summary page (status and priority boxes,
+"Toplam Ariza Sayisi"), the "#n" fault pages, the Excel rows and the count in
+the list header. ``compare_seeded`` matches every Excel row against the arıza
+records the dataset generator wrote (see ``harness.dataset``/``harness.scale``)
+and, when the whole list was loaded, also checks for missing rows and the
+total resolution time::
+
+    python -m harness.exports validate ariza_raporu.pdf arizalar-raporu.xlsx
+    python -m harness.exports run --scale 20000 --seed 7 --durum cozuldu
+    python -m harness.exports run --seed 7 --company 2 --max-pdf-ms 60000
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+from collections import Counter, deque
+
+from .config import RUN_ID, output_path, release_label
+from .dataset import DEFAULT_PASSWORD, company_id, generate_company, load_manifest, scale_tenant, user_email
+from .flows import filter_faults, login, open_fault_list, require_emulators, wait_for_spinners
+from .locators import DASHBOARD_READY
+from .session import browser_session, new_context
+
+SUMMARY_LABELS = {"Acik": "acik", "Devam Ediyor": "devam-ediyor", "Beklemede": "beklemede", "Cozuldu": "cozuldu"}
+PRIORITY_LABELS = {"Kritik": "kritik", "Yuksek": "yuksek", "Normal": "normal", "Dusuk": "dusuk"}
+TOTAL_LABEL = "Toplam Ariza Sayisi"
+EXPORT_TIMEOUT_MS = 600000
+
+_OBJ = re.compile(rb"(\d+)\s+\d+\s+obj\b")
+_STREAM_OR_END = re.compile(rb"(?<![A-Za-z])stream\r?\n|\bendobj\b")
+_ENDSTREAM = re.compile(rb"\r?\n?endstream\b")
+_ENDOBJ = re.compile(rb"\bendobj\b")
+_LENGTH = re.compile(rb"/Length\s+(\d+)(\s+\d+\s+R)?")
+_PAGE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+_CONTENTS = re.compile(rb"/Contents\s*(\[[^\]]*\]|\d+\s+\d+\s+R)")
+_REF = re.compile(rb"(\d+)\s+\d+\s+R")
+_NOT_CONTENT = re.compile(rb"/Subtype|/Type|/Length1")
+_TEXT_OP = re.compile(rb"(\((?:\\.|[^\\()])*\)|<[0-9A-Fa-f\s]*>)\s*(?:Tj|'|\")|\[((?:\\.|[^\]\\])*)\]\s*TJ", re.S)
+_ARRAY_STRING = re.compile(rb"\((?:\\.|[^\\()])*\)|<[0-9A-Fa-f\s]*>", re.S)
+_ESCAPE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+_FAULT_NUMBER = re.compile(r"^#(\d+)$")
+_SURE = re.compile(r"(\d+)sa (\d+)dk")
+_CELL_REF = re.compile(r"([A-Z]+)")
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+class _Buffer:
+    """Growing window over a binary file; callers drop what they have consumed."""
+
+    def __init__(self, fh, chunk_size):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.data = b""
+
+    def fill(self):
+        chunk = self.fh.read(self.chunk_size)
+        self.data += chunk
+        return bool(chunk)
+
+    def search(self, pattern, start=0):
+        while True:
+            match = pattern.search(self.data, start)
+            if match or not self.fill():
+                return match
+            # Keep scanning from just before the old end in case a token was split
+            start = max(start, len(self.data) - self.chunk_size - 32)
+
+    def need(self, size):
+        while len(self.data) < size and self.fill():
+            pass
+
+    def consume(self, end):
+        self.data = self.data[end:]
+
+
+def _objects(fh, chunk_size):
+    """Yield ``(number, dictionary, stream or None)`` for each object in file order."""
+    buf = _Buffer(fh, chunk_size)
+    while True:
+        head = buf.search(_OBJ)
+        if head is None:
+            return
+        number = int(head.group(1))
+        body = buf.search(_STREAM_OR_END, head.end())
+        if body is None:
+            return
+        header = buf.data[head.end():body.start()]
+        if body.group(0).startswith(b"endobj"):
+            buf.consume(body.end())
+            yield number, header, None
+            continue
+        length = _LENGTH.search(header)
+        if length and not length.group(2):
+            end = body.end() + int(length.group(1))
+            buf.need(end)
+            stream = buf.data[body.end():end]
+        else:
+            # Indirect or missing /Length: fall back to the endstream keyword
+            stop = buf.search(_ENDSTREAM, body.end())
+            end = stop.start() if stop else len(buf.data)
+            stream = buf.data[body.end():end]
+        tail = buf.search(_ENDOBJ, end)
+        buf.consume(tail.end() if tail else len(buf.data))
+        if b"/FlateDecode" in header:
+            stream = zlib.decompressobj().decompress(stream)
+        yield number, header, stream
+
+
+def _literal(raw):
+    def unescape(match):
+        token = match.group(1)
+        if token[:1].isdigit():
+            return bytes([int(token, 8) & 0xFF])
+        if token in (b"\n", b"\r"):
+            return b""   # line continuation
+        return _ESCAPES.get(token, token)
+    return _ESCAPE.sub(unescape, raw)
+
+
+def _decode(token):
+    if token.startswith(b"<"):
+        digits = re.sub(rb"\s", b"", token[1:-1])
+        raw = bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii"))
+    else:
+        raw = _literal(token[1:-1])
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "replace")
+    return raw.decode("cp1252", "replace")
+
+
+def text_runs(content):
+    """Strings drawn by the ``Tj``/``TJ`` operators of one content stream, in drawing order."""
+    runs = []
+    for match in _TEXT_OP.finditer(content):
+        if match.group(1) is not None:
+            runs.append(_decode(match.group(1)))
+        else:
+            runs.append("".join(_decode(s.group(0)) for s in _ARRAY_STRING.finditer(match.group(2))))
+    return runs
+
+
+def pdf_pages(path, chunk_size=1 << 16):
+    """Yield the text runs of every page, one page at a time."""
+    waiting = deque()   # content stream numbers of the pages seen so far
+    streams = {}        # content streams read before their page object
+    with open(path, "rb") as fh:
+        for number, header, stream in _objects(fh, chunk_size):
+            if stream is None:
+                if _PAGE.search(header):
+                    contents = _CONTENTS.search(header)
+                    waiting.append([int(n) for n in _REF.findall(contents.group(1))] if contents else [])
+            elif not _NOT_CONTENT.search(header):
+                streams[number] = text_runs(stream)
+            while waiting and all(n in streams for n in waiting[0]):
+                yield [run for n in waiting.popleft() for run in streams.pop(n)]
+
+
+def _shared_strings(archive):
+    try:
+        fh = archive.open("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    strings = []
+    with fh:
+        for _, elem in ET.iterparse(fh):
+            if elem.tag == _SHEET_NS + "si":
+                strings.append("".join(t.text or "" for t in elem.iter(_SHEET_NS + "t")))
+                elem.clear()
+    return strings
+
+
+def _column(ref, default):
+    match = _CELL_REF.match(ref or "")
+    if not match:
+        return default
+    index = 0
+    for letter in match.group(1):
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _cell_value(cell, shared):
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(_SHEET_NS + "t"))
+    value = cell.findtext(_SHEET_NS + "v")
+    if value is None:
+        return None
+    if kind == "s":
+        return shared[int(value)]
+    if kind == "b":
+        return value == "1"
+    if kind in ("str", "e", "d"):
+        return value
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def xlsx_rows(path):
+    """Yield the cell values of each row of the first worksheet."""
+    with zipfile.ZipFile(path) as archive:
+        shared = _shared_strings(archive)
+        sheets = sorted(n for n in archive.namelist() if re.match(r"xl/worksheets/sheet\d+\.xml$", n))
+        with archive.open(sheets[0]) as fh:
+            for _, elem in ET.iterparse(fh):
+                if elem.tag != _SHEET_NS + "row":
+                    continue
+                row = []
+                for cell in elem.iter(_SHEET_NS + "c"):
+                    index = _column(cell.get("r"), len(row))
+                    row.extend([None] * (index + 1 - len(row)))
+                    row[index] = _cell_value(cell, shared)
+                yield row
+                elem.clear()
+
+
+def read_fault_pdf(path):
+    """Summary-page numbers and fault-page count of an ``exportArizalarToPDF`` report."""
+    report = {"pages": 0, "durum": {}, "oncelik": {}, "total": None, "faults": 0, "last_number": 0}
+    for page, runs in enumerate(pdf_pages(path), 1):
+        report["pages"] = page
+        if page == 1:
+            for label, value in zip(runs, runs[1:]):
+                if not value.isdigit():
+                    continue
+                if label in SUMMARY_LABELS:
+                    report["durum"][SUMMARY_LABELS[label]] = int(value)
+                elif label in PRIORITY_LABELS:
+                    report["oncelik"][PRIORITY_LABELS[label]] = int(value)
+                elif label == TOTAL_LABEL:
+                    report["total"] = int(value)
+        for run in runs:
+            match = _FAULT_NUMBER.match(run)
+            if match:
+                report["faults"] += 1
+                report["last_number"] = max(report["last_number"], int(match.group(1)))
+    return report
+
+
+def parse_sure(text):
+    """``"12sa 5dk"`` -> 725 minutes; None for unresolved faults ("-")."""
+    match = _SURE.match(text or "")
+    return int(match.group(1)) * 60 + int(match.group(2)) if match else None
+
+
+def fault_rows(path):
+    """Rows of the Excel export as dicts keyed by the header row."""
+    rows = xlsx_rows(path)
+    header = next(rows, [])
+    for row in rows:
+        yield dict(zip(header, row))
+
+
+def read_fault_xlsx(path):
+    """Row count, status/priority counts and total resolution minutes of the Excel export."""
+    report = {"rows": 0, "durum": Counter(), "oncelik": Counter(), "sure_minutes": 0}
+    for row in fault_rows(path):
+        report["rows"] += 1
+        report["durum"][row.get("Durum")] += 1
+        report["oncelik"][row.get("Oncelik")] += 1
+        report["sure_minutes"] += parse_sure(row.get("Sure")) or 0
+    return report
+
+
+def cross_check(pdf, xlsx, displayed=None):
+    """Problems between the PDF, the Excel file and the number of faults the list showed."""
+    problems = []
+    if pdf["total"] is None:
+        problems.append("PDF summary page has no '%s'" % TOTAL_LABEL)
+    elif pdf["total"] != pdf["faults"]:
+        problems.append("PDF summary says %d faults but has %d fault pages" % (pdf["total"], pdf["faults"]))
+    if pdf["faults"] != pdf["last_number"]:
+        problems.append("PDF fault numbers are not 1..%d (last is #%d)" % (pdf["faults"], pdf["last_number"]))
+    if pdf["total"] is not None and xlsx["rows"] != pdf["total"]:
+        problems.append("Excel has %d rows, PDF total is %d" % (xlsx["rows"], pdf["total"]))
+    for field in ("durum", "oncelik"):
+        for key, count in pdf[field].items():
+            if xlsx[field].get(key, 0) != count:
+                problems.append("%s=%s: PDF %d, Excel %d" % (field, key, count, xlsx[field].get(key, 0)))
+    if displayed is not None and xlsx["rows"] != displayed:
+        problems.append("the list showed %d faults, Excel has %d rows" % (displayed, xlsx["rows"]))
+    return problems
+
+
+def _fault_key(baslik, saha, durum, oncelik):
+    return baslik, saha, durum, oncelik
+
+
+def expected_faults(docs, durum=None, oncelik=None):
+    """Seeded arıza records as a multiset of row keys plus their status/priority counts and resolution time."""
+    expected = {"rows": 0, "keys": Counter(), "durum": Counter(), "oncelik": Counter(), "sure_minutes": 0}
+    for path, fields in docs:
+        if not path.startswith("arizalar/"):
+            continue
+        if (durum and fields["durum"] != durum) or (oncelik and fields["oncelik"] != oncelik):
+            continue
+        expected["rows"] += 1
+        expected["keys"][_fault_key(fields["baslik"], fields["saha"], fields["durum"], fields["oncelik"])] += 1
+        expected["durum"][fields["durum"]] += 1
+        expected["oncelik"][fields["oncelik"]] += 1
+        if fields.get("cozumTarihi"):
+            expected["sure_minutes"] += int((fields["cozumTarihi"] - fields["olusturmaTarihi"]).total_seconds() // 60)
+    return expected
+
+
+def compare_seeded(xlsx_path, expected, complete=True):
+    """Stream the Excel rows against the seeded records; ``complete`` when the list loaded every page."""
+    remaining = Counter(expected["keys"])
+    problems, rows, minutes, unexpected = [], 0, 0, 0
+    for row in fault_rows(xlsx_path):
+        rows += 1
+        minutes += parse_sure(row.get("Sure")) or 0
+        key = _fault_key(row.get("Baslik"), row.get("Saha"), row.get("Durum"), row.get("Oncelik"))
+        if remaining[key] > 0:
+            remaining[key] -= 1
+        else:
+            unexpected += 1
+            if unexpected <= 5:
+                problems.append("row %d is not in the seeded data: %s" % (rows + 1, " / ".join(map(str, key))))
+    if unexpected > 5:
+        problems.append("%d more unexpected rows" % (unexpected - 5))
+    if complete:
+        if rows != expected["rows"]:
+            problems.append("Excel has %d rows, the seeded data %d" % (rows, expected["rows"]))
+        if minutes != expected["sure_minutes"]:
+            problems.append("total resolution time is %d min, the seeded data gives %d min"
+                            % (minutes, expected["sure_minutes"]))
+    return problems
+
+
+async def capture_download(page, click, label, timeout_ms=EXPORT_TIMEOUT_MS):
+    """Run ``click`` and save the download it triggers; return path, size and timings."""
+    started = time.perf_counter()
+    async with page.expect_download(timeout=timeout_ms) as info:
+        await click()
+    download = await info.value
+    start_ms = (time.perf_counter() - started) * 1000
+    path = output_path("exports", RUN_ID, "%s-%s" % (label, download.suggested_filename))
+    await download.save_as(path)
+    failure = await download.failure()
+    if failure:
+        raise AssertionError("%s download failed: %s" % (label, failure))
+    return {"path": path, "name": download.suggested_filename, "bytes": path.stat().st_size,
+            "start_ms": round(start_ms), "saved_ms": round((time.perf_counter() - started) * 1000)}
+
+
+async def displayed_fault_count(page):
+    """Faults the Arızalar header reports ("Toplam N arıza" / "N arıza gösteriliyor")."""
+    text = await page.get_by_text(re.compile(r"Toplam \d+ arıza|\d+ arıza gösteriliyor")).first.inner_text()
+    return int(re.search(r"\d+", text).group(0))
+
+
+def validate(pdf_path, xlsx_path, displayed=None):
+    """Parse both exports with timings and cross-check them; return the report dict."""
+    started = time.perf_counter()
+    pdf = read_fault_pdf(pdf_path)
+    pdf_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    xlsx = read_fault_xlsx(xlsx_path)
+    xlsx_ms = (time.perf_counter() - started) * 1000
+    return {"pdf": pdf, "xlsx": xlsx, "parse_ms": {"pdf": round(pdf_ms), "xlsx": round(xlsx_ms)},
+            "problems": cross_check(pdf, xlsx, displayed)}
+
+
+async def _load_all(page, max_pages):
+    more = page.get_by_role("button", name="Daha Fazla Yükle")
+    for _ in range(max_pages):
+        if not await more.count():
+            return True
+        await more.click()
+        await wait_for_spinners(page, EXPORT_TIMEOUT_MS)
+    return not await more.count()
+
+
+async def run_export(tenant, docs, durum=None, oncelik=None, max_pages=1000, headless=True):
+    """Export the tenant's (filtered) fault list as PDF and Excel and validate both against ``docs``."""
+    async with browser_session(headless=headless) as browser:
+        context = await new_context(browser, timeout_ms=EXPORT_TIMEOUT_MS, accept_downloads=True)
+        try:
+            page = await context.new_page()
+            await login(page, tenant["email"], tenant["password"], timeout_ms=120000)
+            await page.locator(DASHBOARD_READY).first.wait_for()
+            await require_emulators(page)
+            await open_fault_list(page)
+            if durum or oncelik:
+                await filter_faults(page, durum=durum, oncelik=oncelik)
+            complete = await _load_all(page, max_pages)
+            displayed = await displayed_fault_count(page)
+            buttons = page.get_by_role("button", name=re.compile(r"^(Rapor|Excel)( İndir)?$"))
+            pdf = await capture_download(page, lambda: buttons.filter(has_text="Rapor").first.click(), "pdf")
+            xlsx = await capture_download(page, lambda: buttons.filter(has_text="Excel").first.click(), "xlsx")
+        finally:
+            await context.close()
+
+    report = validate(pdf["path"], xlsx["path"], displayed)
+    expected = expected_faults(docs, durum, oncelik)
+    report["problems"] += compare_seeded(xlsx["path"], expected, complete)
+    report.update({"displayed": displayed, "complete": complete, "expected_rows": expected["rows"],
+                   "downloads": {"pdf": pdf, "xlsx": xlsx}})
+    return report
+
+
+def _tenant_docs(args):
+    if args.scale:
+        with open(output_path("scale", "ds%d.json" % args.seed), encoding="utf-8") as fh:
+            tenant = json.load(fh)["tenants"][str(args.scale)]
+        spec, index, uid_for = scale_tenant(args.seed, args.scale), args.scale, None
+    else:
+        spec, uid_for, _ = load_manifest(args.seed)
+        index = args.company
+        tenant = {"email": user_email(args.seed, index, "yonetici", 1), "password": DEFAULT_PASSWORD,
+                  "companyId": company_id(args.seed, index)}
+    # Rows are matched on title, saha, status and priority, which do not depend on the user ids
+    return tenant, generate_company(spec, index, uid_for)
+
+
+def print_report(report):
+    pdf, xlsx = report["pdf"], report["xlsx"]
+    print("PDF   %6d pages  %6s faults  parsed in %6d ms" % (pdf["pages"], pdf["total"], report["parse_ms"]["pdf"]))
+    print("Excel %6d rows                  parsed in %6d ms" % (xlsx["rows"], report["parse_ms"]["xlsx"]))
+    for kind, download in report.get("downloads", {}).items():
+        print("%-5s export: download after %6d ms, saved after %6d ms, %d bytes" % (
+            kind, download["start_ms"], download["saved_ms"], download["bytes"]))
+    for problem in report["problems"]:
+        print("PROBLEM %s" % problem)
+    print("%d problems" % len(report["problems"]))
+
+
+def _jsonable(report):
+    return json.loads(json.dumps(report, default=str))
+
+
+def write_report(report, label=None):
+    """Save ``report`` as ``.harness/exports/<run_id>[-<label>].json``; return the path."""
+    out = output_path("exports", "%s.json" % "-".join(filter(None, (RUN_ID, label))))
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(_jsonable(report), fh, indent=2, ensure_ascii=False)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.exports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("validate", help="parse and cross-check a downloaded PDF and Excel export")
+    check.add_argument("pdf")
+    check.add_argument("xlsx")
+    check.add_argument("--displayed", type=int, default=None, help="fault count the list showed")
+    run = sub.add_parser("run", help="export a seeded tenant's fault list and validate it against the dataset")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--company", type=int, default=1, help="company index of a 'harness.dataset load' dataset")
+    run.add_argument("--scale", type=int, default=None, help="size of a 'harness.scale seed' tenant instead")
+    run.add_argument("--durum", default=None)
+    run.add_argument("--oncelik", default=None)
+    run.add_argument("--max-pages", type=int, default=1000, help="'Daha Fazla Yükle' clicks before exporting")
+    run.add_argument("--max-pdf-ms", type=int, default=None, help="fail if the PDF download takes longer")
+    run.add_argument("--max-xlsx-ms", type=int, default=None, help="fail if the Excel download takes longer")
+    run.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "validate":
+        report = validate(args.pdf, args.xlsx, args.displayed)
+        print_report(report)
+        return 1 if report["problems"] else 0
+
+    tenant, docs = _tenant_docs(args)
+    report = asyncio.run(run_export(tenant, docs, args.durum, args.oncelik, args.max_pages, not args.headed))
+    for kind, limit in (("pdf", args.max_pdf_ms), ("xlsx", args.max_xlsx_ms)):
+        if limit and report["downloads"][kind]["saved_ms"] > limit:
+            report["problems"].append("%s export took %d ms (limit %d)" % (
+                kind, report["downloads"][kind]["saved_ms"], limit))
+    report.update({"run_id": RUN_ID, "release": release_label(), "seed": args.seed,
+                   "tenant": tenant.get("companyId"), "filters": {"durum": args.durum, "oncelik": args.oncelik}})
+    out = write_report(report)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""TC runner that reruns failures, scores flakiness and quarantines chronic flakers.
+
+Every TC script already starts its own browser and context, so each attempt
+runs in a fresh process: nothing carries over between a failure and its
+rerun. A failing test is rerun up to ``--reruns`` times and classified:
+
+* ``passed``        - passed on the first attempt
+* ``flaky``         - failed, then passed on a rerun, or failed with a
+  different error signature each time
+* ``deterministic`` - failed every attempt with the same signature
+
+Attempts go into the results store and every test keeps an exponentially
+weighted flake score (1 for a flaky outcome, 0 otherwise). A test whose score
+crosses ``QUARANTINE_SCORE`` moves to the quarantine lane. That lane runs after
+the blocking lane and never fails the build. It leaves quarantine once its
+score drops below ``RELEASE_SCORE``::
+
+    python -m harness.flaky run --reruns 2
+    python -m harness.flaky run --base origin/main
+    python -m harness.flaky scores
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import RUN_ID, TESTS_DIR, output_path
+from .impact import changed_files, select, tc_scripts
+from .results import ResultsStore, utc_now
+
+SCORE_ALPHA = 0.3
+QUARANTINE_SCORE = 0.4
+RELEASE_SCORE = 0.1
+MIN_RUNS = 3
+ATTEMPT_TIMEOUT_S = 900
+
+_ERROR_LINE = re.compile(r"^(?:[\w.]+\.)?(\w*(?:Error|Exception)\b.*)$")
+_VOLATILE = re.compile(r"\d+|0x[0-9a-f]+|\"[^\"]*\"|'[^']*'")
+
+
+def error_signature(output):
+    """Exception type and message of the last traceback line, with numbers and quoted values masked."""
+    for line in reversed(output.splitlines()):
+        match = _ERROR_LINE.match(line.strip())
+        if match:
+            return _VOLATILE.sub("#", match.group(1))[:200]
+    return "exit"
+
+
+def run_attempt(tc, script, attempt):
+    """Run one TC script in its own process; the log goes to .harness/flaky/<run>/."""
+    log_path = output_path("flaky", RUN_ID, "%s-%d.log" % (tc, attempt))
+    env = dict(os.environ, HARNESS_RUN_ID=RUN_ID, HARNESS_ATTEMPT=str(attempt))
+    started = utc_now()
+    t0 = time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log:
+        try:
+            code = subprocess.run([sys.executable, script], cwd=TESTS_DIR, env=env, stdout=log,
+                                  stderr=subprocess.STDOUT, timeout=ATTEMPT_TIMEOUT_S).returncode
+        except subprocess.TimeoutExpired:
+            code = None
+    duration = time.monotonic() - t0
+    if code == 0:
+        return {"status": "PASSED", "started": started, "duration_s": duration, "signature": None, "error": None}
+    with open(log_path, encoding="utf-8", errors="replace") as fh:
+        tail = fh.read()[-4000:]
+    signature = "timeout" if code is None else error_signature(tail)
+    return {"status": "FAILED", "started": started, "duration_s": duration,
+            "signature": signature, "error": tail.strip().splitlines()[-1] if tail.strip() else signature}
+
+
+def classify(attempts):
+    if attempts[0]["status"] == "PASSED":
+        return "passed"
+    if any(a["status"] == "PASSED" for a in attempts[1:]):
+        return "flaky"
+    if len({a["signature"] for a in attempts}) > 1:
+        return "flaky"
+    return "deterministic"
+
+
+def run_test(tc, script, reruns):
+    attempts = [run_attempt(tc, script, 1)]
+    while attempts[-1]["status"] == "FAILED" and len(attempts) <= reruns:
+        attempts.append(run_attempt(tc, script, len(attempts) + 1))
+        # A different failure already proves the test unstable; more reruns add nothing
+        if attempts[-1]["status"] == "FAILED" and attempts[-1]["signature"] != attempts[0]["signature"]:
+            break
+    return attempts
+
+
+def update_score(store, tc, outcome):
+    """Fold one outcome into the test's flake score and apply the quarantine hysteresis."""
+    previous = store.flake_score(tc) or {"score": 0.0, "runs": 0, "flaky_runs": 0, "quarantined": 0}
+    flaky = outcome == "flaky"
+    score = (1 - SCORE_ALPHA) * previous["score"] + SCORE_ALPHA * flaky
+    runs = previous["runs"] + 1
+    quarantined = bool(previous["quarantined"])
+    if not quarantined and runs >= MIN_RUNS and score >= QUARANTINE_SCORE:
+        quarantined = True
+    elif quarantined and score < RELEASE_SCORE:
+        quarantined = False
+    store.set_flake_score(tc, score, runs, previous["flaky_runs"] + flaky, quarantined)
+    return score, quarantined
+
+
+def run_lane(store, run_id, tests, scripts, reruns, jobs):
+    """Run ``tests`` with reruns; return ``{tc: {"outcome", "attempts", "score", "quarantined"}}``."""
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {tc: pool.submit(run_test, tc, scripts[tc], reruns) for tc in tests}
+    results = {}
+    for tc, future in futures.items():
+        attempts = future.result()
+        outcome = classify(attempts)
+        store.add_attempts(run_id, tc, attempts)
+        score, quarantined = update_score(store, tc, outcome)
+        results[tc] = {"outcome": outcome, "attempts": attempts, "score": score, "quarantined": quarantined}
+        print("%-6s %-13s attempts %d  flake score %.2f%s" % (
+            tc, outcome, len(attempts), score, "  (quarantined)" if quarantined else ""), flush=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.flaky")
+    parser.add_argument("--db", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="run TC scripts with reruns and a quarantine lane")
+    run.add_argument("tests", nargs="*", help="TC ids (default: every script)")
+    run.add_argument("--base", default=None, help="only the tests affected since this git ref")
+    run.add_argument("--reruns", type=int, default=2)
+    run.add_argument("--jobs", type=int, default=1, help="TC scripts run in parallel")
+    run.add_argument("--skip-quarantine", action="store_true", help="do not run the quarantine lane")
+    sub.add_parser("scores", help="print flake scores")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    try:
+        if args.command == "scores":
+            for tc, s in store.flake_scores().items():
+                print("%-6s score %.2f  flaky %d/%d%s" % (
+                    tc, s["score"], s["flaky_runs"], s["runs"], "  quarantined" if s["quarantined"] else ""))
+            return 0
+
+        scripts = tc_scripts()
+        tests = args.tests or sorted(scripts)
+        if args.base:
+            affected, _ = select(changed_files(args.base))
+            tests = [tc for tc in tests if tc in affected]
+        tests = [tc for tc in tests if tc in scripts]
+        quarantine = {tc for tc, s in store.flake_scores().items() if s["quarantined"]}
+        blocking = [tc for tc in tests if tc not in quarantine]
+        quarantined = [tc for tc in tests if tc in quarantine]
+
+        # HARNESS_RUN_ID may be shared by a whole pipeline; each invocation is its own run
+        run_id = store.add_local_run("%s-%s" % (RUN_ID, uuid.uuid4().hex[:6]))
+        print("blocking lane: %s" % (", ".join(blocking) or "-"))
+        report = {"run_id": RUN_ID, "blocking": run_lane(store, run_id, blocking, scripts, args.reruns, args.jobs)}
+        if quarantined and not args.skip_quarantine:
+            print("quarantine lane (non-blocking): %s" % ", ".join(quarantined))
+            report["quarantine"] = run_lane(store, run_id, quarantined, scripts, args.reruns, args.jobs)
+    finally:
+        store.close()
+
+    out = output_path("flaky", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    # A test that passed on a rerun does not block; one that never passed does
+    failed = [tc for tc, r in report["blocking"].items()
+              if all(a["status"] == "FAILED" for a in r["attempts"])]
+    print("%d failing test(s) in the blocking lane%s" % (len(failed), ": " + ", ".join(failed) if failed else ""))
+    print("report written to %s" % out)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
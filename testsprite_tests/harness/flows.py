@@ -0,0 +1,128 @@
+"""Reusable user flows shared by the harness scenarios."""
+from contextlib import asynccontextmanager
+
+from .artifacts import FailureArtifacts
+from .config import LOGIN_EMAIL, LOGIN_PASSWORD
+from .console import ConsoleCapture
+from .indexes import QueryRecorder
+from .locators import locators
+from .perf import PerfRecorder
+from .session import open_app
+
+
+async def login(page, email=LOGIN_EMAIL, password=LOGIN_PASSWORD, timeout_ms=15000):
+    """Sign in through the login form and wait for the dashboard route."""
+    if "/login" not in page.url:
+        await open_app(page, "/login")
+    ui = locators(page)
+    await ui["E-posta"].fill(email)
+    await ui["Şifre"].fill(password)
+    await ui["Giriş Yap"].click()
+    await page.wait_for_url("**/dashboard**", timeout=timeout_ms)
+
+
+async def wait_for_spinners(page, timeout_ms=15000):
+    """Wait until no loading spinner is rendered on the page."""
+    await page.wait_for_function("() => !document.querySelector('.animate-spin')", timeout=timeout_ms)
+
+
+async def open_fault_list(page):
+    """Open Arıza Kayıtları and wait for the first page of records (TC011)."""
+    await open_app(page, "/arizalar")
+    await page.locator("select", has_text="Tüm Durumlar").first.wait_for()
+    await wait_for_spinners(page)
+
+
+async def filter_faults(page, durum=None, oncelik=None):
+    """Apply the status/priority filters of the fault list and wait for the reload."""
+    if durum is not None:
+        await page.locator("select", has_text="Tüm Durumlar").first.select_option(durum)
+    if oncelik is not None:
+        await page.locator("select", has_text="Tüm Öncelikler").first.select_option(oncelik)
+    await wait_for_spinners(page)
+
+
+async def open_shift_wizard(page):
+    """Open the shift page and the "Yeni Vardiya Bildirimi" wizard (TC014)."""
+    await open_app(page, "/vardiya")
+    await locators(page)["Yeni Vardiya"].click()
+    await page.get_by_text("Yeni Vardiya Bildirimi").first.wait_for()
+
+
+# The helpers below reach the app's own modules through ``window.__harness``,
+# which src/lib/firebase.ts only sets in an emulator build (dev server or built
+# preview), so they share the page's Firebase instances (auth state, IndexedDB cache).
+
+async def require_emulators(page):
+    """Refuse to write bulk test data unless the app talks to the local emulators."""
+    uses = await page.evaluate("() => window.__harness !== undefined")
+    if not uses:
+        raise RuntimeError(
+            "the app is not connected to the Firebase emulators; "
+            "start 'firebase emulators:start' and serve the app built with VITE_USE_FIREBASE_EMULATORS=true")
+
+
+async def current_profile(page):
+    """Return uid, companyId, name and role of the signed-in user."""
+    return await page.evaluate("""async () => {
+      const { auth } = window.__harness;
+      const { getUserById } = await window.__harness.service('userService');
+      const user = await getUserById(auth.currentUser.uid);
+      return { uid: auth.currentUser.uid, companyId: user.companyId, ad: user.ad, rol: user.rol };
+    }""")
+
+
+async def send_test_notification(page, profile, title):
+    """Trigger the createScopedNotification callable for the user's own role (TC008)."""
+    await page.evaluate("""async ({ profile, title }) => {
+      const { notificationService } = await window.__harness.service('notificationService');
+      await notificationService.createScopedNotificationClient({
+        companyId: profile.companyId,
+        title,
+        message: 'Harness test bildirimi',
+        type: 'info',
+        actionUrl: '/bildirimler',
+        roles: [profile.rol],
+      });
+    }""", {"profile": profile, "title": title})
+
+
+class Instruments:
+    """The recorders ``instrumented`` attaches for one TC run."""
+
+    def __init__(self, test_id):
+        self.perf = PerfRecorder(test_id)
+        self.console = ConsoleCapture(test_id)
+        self.queries = QueryRecorder(test_id)
+        self.artifacts = FailureArtifacts(test_id)
+
+    async def attach(self, context):
+        """Record perf samples, console errors and Firestore queries of another context too (no trace)."""
+        await self.perf.attach(context)
+        await self.console.attach(context)
+        await self.queries.attach(context)
+
+
+@asynccontextmanager
+async def instrumented(context, test_id):
+    """Attach the perf, console, query and failure-trace recorders to a TC's ``context``.
+
+    A clean exit checks the console budgets and only then marks the test
+    passed, so a budget overrun still keeps the trace. Teardown flushes the
+    perf samples and the trace, closes ``context`` and then the recorders'
+    streams, so late page events never hit a closed file.
+    """
+    run = Instruments(test_id)
+    await run.attach(context)
+    await run.artifacts.attach(context)
+    try:
+        yield run
+        run.console.check()
+        run.artifacts.mark_passed()
+    finally:
+        await run.perf.flush()
+        await run.artifacts.finalize()
+        await context.close()
+        run.perf.close()
+        run.console.close(check=False)
+        run.queries.close()
@@ -0,0 +1,370 @@
+"""Impact-based selection of the TC files affected by a change.
+
+Changed files are mapped to TC scripts in three hops:
+
+1. ``tmp/code_summary.json`` maps features to their source files
+   (``FEATURE_FILES_EXTRA`` adds pages the summary lists under stale names).
+2. A static import graph of ``src/`` (what Vite would bundle: static and
+   dynamic imports, no ``import type``) makes a feature depend on everything
+   its files import transitively. Named imports through barrel files such as
+   ``src/services/index.ts`` only depend on the modules that export those
+   names, so ``import { arizaService } from '../../services'`` does not pull in
+   every service.
+3. ``TC_FEATURES`` maps the test plan ids to the features they exercise.
+
+The parsed graph is cached in ``.harness/impact/graph.json`` and only files
+whose mtime or size changed are parsed again.
+
+Build files, Firestore rules, Cloud Functions and the harness itself select
+every test, and so does any ``src/`` file no feature reaches::
+
+    python -m harness.impact --base origin/main
+    python -m harness.impact --files src/services/vardiyaService.ts --run
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict, deque
+
+from .config import REPO_ROOT, TESTS_DIR, TMP_DIR, output_path
+
+SRC_DIR = REPO_ROOT / "src"
+CODE_SUMMARY_PATH = TMP_DIR / "code_summary.json"
+TEST_PLAN_PATH = TESTS_DIR / "testsprite_frontend_test_plan.json"
+GRAPH_CACHE_VERSION = 1
+
+SOURCE_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+
+# Every TC logs in first, so authentication is part of all of them
+COMMON_FEATURES = ("Authentication & Authorization",)
+
+TC_FEATURES = {
+    "TC001": ("Authentication & Authorization",),
+    "TC002": ("Authentication & Authorization", "Ekip (Team) Management"),
+    "TC003": ("Dashboard & Analytics",),
+    "TC004": ("Arıza (Fault) Management", "Notification System"),
+    "TC005": ("Bakım (Maintenance) Management",),
+    "TC006": ("GES/Santral (Power Plant) Management",),
+    "TC007": ("Stok (Inventory) Management", "Envanter (Inventory) System"),
+    "TC008": ("Notification System",),
+    "TC009": ("SaaS Subscription Management",),
+    "TC010": ("Mobile Responsive UI",),
+    "TC011": ("PDF & Excel Export", "Arıza (Fault) Management"),
+    "TC012": ("Activity Feed & Audit Logs", "Ekip (Team) Management"),
+    "TC013": ("UI Component Library", "Theme System"),
+    "TC014": ("Vardiya (Shift) Management", "Notification System"),
+    "TC015": ("Settings & Profile", "Theme System"),
+}
+
+# Pages that code_summary.json lists under names that no longer exist
+FEATURE_FILES_EXTRA = {
+    "Arıza (Fault) Management": ["src/pages/ariza/Arizalar.tsx"],
+    "GES/Santral (Power Plant) Management": ["src/pages/ges/GesYonetimi.tsx", "src/pages/ges/UretimVerileri.tsx"],
+    "Saha (Site) Management": ["src/pages/saha/Sahalar.tsx"],
+    "Ekip (Team) Management": ["src/pages/ekip/EkipYonetimi.tsx"],
+    "Stok (Inventory) Management": ["src/pages/stok/StokKontrol.tsx"],
+    "Vardiya (Shift) Management": ["src/pages/vardiya/VardiyaBildirimleri.tsx"],
+    "Elektrik Kesinti (Power Outage) Tracking": ["src/pages/ariza/ElektrikKesintileri.tsx"],
+    "PDF & Excel Export": ["src/utils/exportUtils.ts", "src/utils/pdfReportUtils.ts"],
+    "Leave Management": ["src/pages/ekip/IzinYonetimi.tsx"],
+    "Storage & File Management": ["src/pages/storage/StorageManagement.tsx"],
+    "Settings & Profile": ["src/pages/settings/CompanySettings.tsx"],
+    "Envanter (Inventory) System": ["src/pages/envanter/Envanter.tsx"],
+}
+
+# Paths outside the import graph that still change what every test sees
+RUN_ALL_PATHS = (
+    "package.json", "package-lock.json", "vite.config.ts", "index.html", "tsconfig",
+    "tailwind.config", "postcss.config", "firebase.json", "firestore.rules",
+    "firestore.indexes.json", "storage.rules", "functions/", "public/",
+    "testsprite_tests/harness/", "testsprite_tests/tmp/config.json",
+)
+
+_IMPORT_FROM = re.compile(r"\b(import|export)\s+(type\s+)?([\w$*{}\s,]*?)\s*from\s*['\"]([^'\"]+)['\"]", re.S)
+_SIDE_EFFECT_IMPORT = re.compile(r"^\s*import\s*['\"]([^'\"]+)['\"]", re.M)
+_DYNAMIC_IMPORT = re.compile(r"\bimport\(\s*['\"]([^'\"]+)['\"]\s*\)")
+_LOCAL_EXPORT = re.compile(
+    r"\bexport\s+(?:declare\s+)?(?:default\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(?:function\s*\*?|class|const|let|var|interface|type|enum)\s+([A-Za-z_$][\w$]*)")
+_EXPORT_LIST = re.compile(r"\bexport\s+(?:type\s+)?\{([^}]*)\}(?!\s*from)")
+_COMMENT = re.compile(r"/\*.*?\*/|(?<![:'\"])//[^\n]*", re.S)
+
+
+def _rel(path):
+    return path.relative_to(REPO_ROOT).as_posix()
+
+
+def _names(clause):
+    """Imported names of an import clause; None when the whole module is used."""
+    if "{" not in clause or "*" in clause:
+        return None
+    before, _, rest = clause.partition("{")
+    if before.strip(" ,"):
+        return None  # default import alongside the named ones
+    names = []
+    for part in rest.partition("}")[0].split(","):
+        part = re.sub(r"^\s*type\s+", "", part).strip()
+        if part:
+            names.append(part.split(" as ")[0].strip())
+    return names
+
+
+def parse_module(text):
+    """Return the imports, re-exports and local exports of one source file."""
+    text = _COMMENT.sub("", text)
+    imports, stars = [], []
+    for match in _IMPORT_FROM.finditer(text):
+        keyword, type_only, clause, spec = match.groups()
+        if type_only:
+            continue
+        if keyword == "export" and clause.strip() == "*":
+            stars.append(spec)
+        else:
+            imports.append([spec, _names(clause)])
+    imports.extend([spec, None] for spec in _SIDE_EFFECT_IMPORT.findall(text))
+    imports.extend([spec, None] for spec in _DYNAMIC_IMPORT.findall(text))
+    exports = set(_LOCAL_EXPORT.findall(text))
+    for group in _EXPORT_LIST.findall(text):
+        for part in group.split(","):
+            part = part.strip()
+            if part:
+                exports.add(part.split(" as ")[-1].strip())
+    return {"imports": imports, "stars": stars, "exports": sorted(exports)}
+
+
+def _resolve(spec, importer):
+    if spec.startswith("@/"):
+        base = SRC_DIR / spec[2:]
+    elif spec.startswith("."):
+        base = (REPO_ROOT / importer).parent / spec
+    else:
+        return None  # npm package
+    base = base.resolve()
+    candidates = [base] + [base.with_name(base.name + ext) for ext in SOURCE_EXTENSIONS]
+    candidates += [base / ("index" + ext) for ext in SOURCE_EXTENSIONS]
+    for candidate in candidates:
+        if candidate.is_file():
+            return _rel(candidate)
+    return None
+
+
+class ImportGraph:
+    """Static import graph of ``src/`` with an mtime-keyed parse cache."""
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or output_path("impact", "graph.json")
+        self.modules = {}
+        self.parsed = 0
+        self._load_cache()
+        self._refresh()
+        self.edges = {path: self._edges(path) for path in self.modules}
+        self.reverse = defaultdict(set)
+        for path, targets in self.edges.items():
+            for target in targets:
+                self.reverse[target].add(path)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as fh:
+                cache = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if cache.get("version") == GRAPH_CACHE_VERSION:
+            self.modules = cache["modules"]
+
+    def _refresh(self):
+        seen = set()
+        for root, _, files in os.walk(SRC_DIR):
+            for name in files:
+                if not name.endswith(SOURCE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, REPO_ROOT).replace(os.sep, "/")
+                seen.add(rel)
+                stat = os.stat(path)
+                cached = self.modules.get(rel)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    continue
+                with open(path, encoding="utf-8", errors="replace") as fh:
+                    entry = parse_module(fh.read())
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self.modules[rel] = entry
+                self.parsed += 1
+        for rel in set(self.modules) - seen:
+            del self.modules[rel]
+        if self.parsed or len(seen) != len(self.modules):
+            with open(self.cache_path, "w", encoding="utf-8") as fh:
+                json.dump({"version": GRAPH_CACHE_VERSION, "modules": self.modules}, fh)
+
+    def _providers(self, module, name, seen=None):
+        """Modules that actually define ``name`` when it is imported from ``module``."""
+        seen = seen if seen is not None else set()
+        if module in seen or module not in self.modules:
+            return set()
+        seen.add(module)
+        entry = self.modules[module]
+        if name in entry["exports"]:
+            return {module}
+        found = set()
+        for spec in entry["stars"]:
+            target = _resolve(spec, module)
+            if target:
+                found |= self._providers(target, name, seen)
+        return found
+
+    def _star_closure(self, module, seen=None):
+        seen = seen if seen is not None else set()
+        if module in seen or module not in self.modules:
+            return seen
+        seen.add(module)
+        for spec in self.modules[module]["stars"]:
+            target = _resolve(spec, module)
+            if target:
+                self._star_closure(target, seen)
+        return seen
+
+    def _edges(self, path):
+        targets = set()
+        for spec, names in self.modules[path]["imports"]:
+            target = _resolve(spec, path)
+            if not target:
+                continue
+            targets.add(target)
+            if not self.modules.get(target, {}).get("stars"):
+                continue
+            if names is None:
+                targets |= self._star_closure(target)
+                continue
+            for name in names:
+                # Fall back to the whole barrel when a name cannot be traced
+                targets |= self._providers(target, name) or self._star_closure(target)
+        targets.discard(path)
+        return targets
+
+    def dependents(self, changed):
+        """Every module that imports one of ``changed``, directly or transitively."""
+        seen = set(changed)
+        queue = deque(changed)
+        while queue:
+            for importer in self.reverse.get(queue.popleft(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    queue.append(importer)
+        return seen
+
+
+def load_features(path=CODE_SUMMARY_PATH):
+    """Feature name -> existing source files, with directory entries expanded."""
+    with open(path, encoding="utf-8") as fh:
+        summary = json.load(fh)
+    features = {}
+    for feature in summary["features"]:
+        files = set()
+        for entry in feature["files"] + FEATURE_FILES_EXTRA.get(feature["name"], []):
+            target = REPO_ROOT / entry
+            if target.is_dir():
+                files.update(_rel(p) for p in target.rglob("*") if p.is_file())
+            elif target.is_file():
+                files.add(entry)
+        features[feature["name"]] = files
+    return features
+
+
+def tc_scripts():
+    """Test plan id -> TC script file name for the scripts that exist."""
+    return {p.name[:5]: p.name for p in sorted(TESTS_DIR.glob("TC[0-9][0-9][0-9]_*.py"))}
+
+
+def changed_files(base="HEAD"):
+    """Files changed since the merge base with ``base``, including uncommitted and untracked ones."""
+    def git(*args):
+        out = subprocess.run(["git"] + list(args), cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        return [line for line in out.stdout.splitlines() if line]
+
+    merge_base = git("merge-base", base, "HEAD")[0]
+    files = git("diff", "--name-only", "--no-renames", merge_base)
+    files += git("ls-files", "--others", "--exclude-standard")
+    return sorted(set(files))
+
+
+def select(changed, graph=None, features=None):
+    """Return ``(selected, reasons)`` for a list of repo-relative changed paths.
+
+    ``selected`` is the sorted list of test plan ids to run and ``reasons``
+    maps each id to the changes that selected it.
+    """
+    graph = graph or ImportGraph()
+    features = features if features is not None else load_features()
+    plan_ids = sorted(set(TC_FEATURES) | set(tc_scripts()))
+    reasons = defaultdict(list)
+
+    def select_all(why):
+        for tc in plan_ids:
+            reasons[tc].append(why)
+
+    for path in changed:
+        script = re.match(r"testsprite_tests/(TC\d{3})_\w+\.py$", path)
+        if script:
+            reasons[script.group(1)].append(path)
+        elif path.startswith(RUN_ALL_PATHS):
+            select_all("%s (global)" % path)
+        elif path.startswith("src/"):
+            affected = graph.dependents([path])
+            hit = {name for name, files in features.items() if files & affected}
+            if not hit:
+                select_all("%s (not reached by any feature)" % path)
+                continue
+            for tc in plan_ids:
+                via = hit.intersection(TC_FEATURES.get(tc, ()) + COMMON_FEATURES)
+                if tc not in TC_FEATURES:
+                    reasons[tc].append("%s (unmapped test)" % path)
+                elif via:
+                    reasons[tc].append("%s via %s" % (path, ", ".join(sorted(via))))
+    return sorted(reasons), dict(reasons)
+
+
+def run_scripts(tc_ids):
+    """Run the selected TC scripts one after another; return the failed ids."""
+    scripts = tc_scripts()
+    failed = []
+    for tc in tc_ids:
+        if tc not in scripts:
+            continue
+        print("== %s" % scripts[tc], flush=True)
+        if subprocess.run([sys.executable, scripts[tc]], cwd=TESTS_DIR).returncode != 0:
+            failed.append(tc)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.impact")
+    parser.add_argument("--base", default="HEAD", help="git ref to diff against (merge base with HEAD)")
+    parser.add_argument("--files", nargs="+", default=None, help="changed paths instead of a git diff")
+    parser.add_argument("--run", action="store_true", help="run the selected TC scripts")
+    parser.add_argument("--json", action="store_true", help="print the selection as JSON")
+    args = parser.parse_args(argv)
+
+    changed = args.files if args.files is not None else changed_files(args.base)
+    graph = ImportGraph()
+    selected, reasons = select(changed, graph)
+    scripts = tc_scripts()
+
+    if args.json:
+        print(json.dumps({"changed": changed, "selected": selected, "reasons": reasons}, indent=2, ensure_ascii=False))
+    else:
+        print("%d changed files, import graph of %d modules (%d parsed)" % (
+            len(changed), len(graph.modules), graph.parsed))
+        for tc in selected:
+            print("%-6s %-60s %s" % (tc, scripts.get(tc, "(no script)"), reasons[tc][0]))
+        if not selected:
+            print("no TC affected")
+    if args.run:
+        return 1 if run_scripts(selected) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
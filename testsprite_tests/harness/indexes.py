@@ -0,0 +1,470 @@
+"""Composite-index coverage of the Firestore queries the E2E tests actually run.
+
+The Firestore emulator neither logs queries nor enforces composite indexes, so
+a missing index only shows up in production (see ``FIREBASE_INDEX_CREATE.md``).
+A ``QueryRecorder`` attached to a browser context records every query target
+the app opens on the Listen channel, and every REST ``runQuery`` /
+``runAggregationQuery``, together with its latency (``addTarget`` until the
+target is CURRENT) and the number of documents returned. Events are appended
+to one NDJSON stream per run (``.harness/queries/<run_id>.ndjson``).
+
+``report`` normalizes the recorded queries (and any HAR recordings) into
+(collection, equality filters, array-contains, orderBy) shapes, matches each
+shape against ``firestore.indexes.json`` and lists
+
+* missing indexes, ranked by frequency x p95 latency, each with the entry to
+  add to ``firestore.indexes.json``,
+* declared indexes no recorded query used,
+* redundant indexes (duplicates, or single-field ones Firestore builds itself).
+
+Unused only means "not exercised by these recordings", not "safe to delete"::
+
+    python -m harness.indexes report
+    python -m harness.indexes report .harness/queries/*.ndjson recordings/*.har --fail-on missing
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qsl
+
+from .config import REPO_ROOT, RUN_ID, output_path
+from .stats import percentile, summarize
+
+INDEXES_PATH = REPO_ROOT / "firestore.indexes.json"
+MAX_DISJUNCTS = 30  # Firestore's own limit on the DNF of an OR query
+
+EQUALITY_OPS = {"EQUAL", "IN", "IS_NULL", "IS_NAN"}
+ARRAY_OPS = {"ARRAY_CONTAINS", "ARRAY_CONTAINS_ANY"}
+INEQUALITY_OPS = {"LESS_THAN", "LESS_THAN_OR_EQUAL", "GREATER_THAN", "GREATER_THAN_OR_EQUAL", "NOT_EQUAL",
+                  "NOT_IN", "IS_NOT_NULL", "IS_NOT_NAN"}
+
+# Injected before any app script runs. Listen targets are read from the
+# WebChannel forward-channel bodies (req<N>___data__=<ListenRequest JSON>) and
+# resolved from the length-prefixed frames of the back channel.
+QUERY_INIT_SCRIPT = r"""
+(() => {
+  if (window.__harnessQueries || !window.__harnessQuery) return;
+  window.__harnessQueries = true;
+  const targets = new Map();
+  const report = (event) => {
+    try { window.__harnessQuery(Object.assign({ route: location.pathname }, event)); } catch (e) {}
+  };
+  const finish = (id, status, error) => {
+    const target = targets.get(id);
+    if (!target) return;
+    targets.delete(id);
+    report({ kind: 'listen', parent: target.parent, structuredQuery: target.structuredQuery,
+      latency_ms: status === 'pending' ? null : performance.now() - target.t0, docs: target.docs, status, error });
+  };
+
+  const onRequest = (body) => {
+    for (const [key, value] of new URLSearchParams(body)) {
+      if (!/^req\d+___data__$/.test(key)) continue;
+      let data;
+      try { data = JSON.parse(value); } catch (e) { continue; }
+      const add = data.addTarget;
+      if (add && add.query) {
+        targets.set(add.targetId, { parent: add.query.parent, structuredQuery: add.query.structuredQuery,
+          t0: performance.now(), docs: 0 });
+      } else if (data.removeTarget !== undefined) {
+        finish(data.removeTarget, 'pending');
+      }
+    }
+  };
+
+  const onMessage = (message) => {
+    const change = message.targetChange;
+    if (change) {
+      const ids = change.targetIds || [];
+      if (change.targetChangeType === 'CURRENT') ids.forEach((id) => finish(id, 'ok'));
+      if (change.targetChangeType === 'REMOVE' && change.cause) {
+        ids.forEach((id) => finish(id, 'error', change.cause.message || String(change.cause.code)));
+      }
+    }
+    const doc = message.documentChange;
+    if (doc) {
+      (doc.targetIds || []).forEach((id) => { const t = targets.get(id); if (t) t.docs += 1; });
+    }
+  };
+
+  // Back-channel frames are "<length>\n<JSON array of [seq, [ListenResponse]]>"
+  const onResponse = (xhr) => {
+    let offset = 0;
+    return () => {
+      let text;
+      try { text = xhr.responseText; } catch (e) { return; }
+      while (offset < text.length) {
+        const newline = text.indexOf('\n', offset);
+        if (newline < 0) return;
+        const length = Number(text.slice(offset, newline));
+        if (!Number.isFinite(length) || newline + 1 + length > text.length) return;
+        const frame = text.slice(newline + 1, newline + 1 + length);
+        offset = newline + 1 + length;
+        let chunks;
+        try { chunks = JSON.parse(frame); } catch (e) { continue; }
+        if (!Array.isArray(chunks)) continue;
+        for (const chunk of chunks) {
+          const payload = Array.isArray(chunk) ? chunk[1] : null;
+          (Array.isArray(payload) ? payload : []).forEach((m) => { if (m && typeof m === 'object') onMessage(m); });
+        }
+      }
+    };
+  };
+
+  const open = XMLHttpRequest.prototype.open;
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.open = function (method, url) {
+    this.__harnessListen = String(url).includes('/Listen/channel');
+    if (this.__harnessListen) {
+      const scan = onResponse(this);
+      this.addEventListener('progress', scan);
+      this.addEventListener('load', scan);
+    }
+    return open.apply(this, arguments);
+  };
+  XMLHttpRequest.prototype.send = function (body) {
+    if (this.__harnessListen && typeof body === 'string') {
+      try { onRequest(body); } catch (e) {}
+    }
+    return send.apply(this, arguments);
+  };
+
+  const fetch = window.fetch;
+  window.fetch = async function (input, init) {
+    const url = String(input && input.url ? input.url : input);
+    const match = /\/v1\/(.+):(runQuery|runAggregationQuery)/.exec(url);
+    if (!match || !init || typeof init.body !== 'string') return fetch.apply(this, arguments);
+    let body = {};
+    try { body = JSON.parse(init.body); } catch (e) {}
+    const query = body.structuredQuery || (body.structuredAggregationQuery || {}).structuredQuery;
+    const t0 = performance.now();
+    try {
+      const response = await fetch.apply(this, arguments);
+      response.clone().json().then((rows) => {
+        const docs = Array.isArray(rows) ? rows.filter((r) => r.document || r.result).length : null;
+        report({ kind: match[2], parent: decodeURIComponent(match[1]), structuredQuery: query,
+          latency_ms: performance.now() - t0, docs, status: response.ok ? 'ok' : 'error',
+          error: response.ok ? undefined : String(response.status) });
+      }).catch(() => {});
+      return response;
+    } catch (e) {
+      report({ kind: match[2], parent: decodeURIComponent(match[1]), structuredQuery: query,
+        latency_ms: null, docs: null, status: 'error', error: String(e) });
+      throw e;
+    }
+  };
+
+  // Targets still open when the page goes away are recorded without a latency
+  window.addEventListener('pagehide', () => Array.from(targets.keys()).forEach((id) => finish(id, 'pending')));
+})();
+"""
+
+
+class QueryRecorder:
+    """Streams the Firestore queries of the attached contexts to NDJSON."""
+
+    def __init__(self, test_id, stream_path=None):
+        self.test_id = test_id
+        self.stream_path = stream_path or output_path("queries", "%s.ndjson" % RUN_ID)
+        self._stream = open(self.stream_path, "a", encoding="utf-8", buffering=1)
+        self.count = 0
+
+    async def attach(self, context):
+        await context.expose_binding("__harnessQuery", self._on_query)
+        await context.add_init_script(QUERY_INIT_SCRIPT)
+
+    def _on_query(self, source, event):
+        if self._stream.closed or not isinstance(event, dict) or not event.get("structuredQuery"):
+            return
+        event.update({"t": round(time.time(), 3), "run_id": RUN_ID, "test_id": self.test_id})
+        if event.get("latency_ms") is not None:
+            event["latency_ms"] = round(event["latency_ms"], 1)
+        self._stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        if not self._stream.closed:
+            self._stream.close()
+
+
+# --- Recorded queries -------------------------------------------------------
+
+def _ndjson_queries(path):
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _form_fields(post):
+    text = post.get("text")
+    if text:
+        return parse_qsl(text, keep_blank_values=True)
+    return [(param.get("name", ""), param.get("value", "")) for param in post.get("params", [])]
+
+
+def _har_queries(path):
+    """Queries in a HAR recording: Listen targets (no latency) and REST queries (HAR ``time``)."""
+    with open(path, encoding="utf-8") as fh:
+        har = json.load(fh)
+    test_id = os.path.splitext(os.path.basename(path))[0]
+    for entry in har.get("log", {}).get("entries", []):
+        request = entry.get("request", {})
+        url, post = request.get("url", ""), request.get("postData") or {}
+        if "/Listen/channel" in url and request.get("method") == "POST":
+            for key, value in _form_fields(post):
+                if not (key.startswith("req") and key.endswith("___data__")):
+                    continue
+                try:
+                    add = json.loads(value).get("addTarget") or {}
+                except ValueError:
+                    continue
+                if add.get("query"):
+                    yield {"test_id": test_id, "kind": "listen", "parent": add["query"].get("parent"),
+                           "structuredQuery": add["query"].get("structuredQuery"), "latency_ms": None,
+                           "docs": None, "status": "har"}
+        elif ":runQuery" in url or ":runAggregationQuery" in url:
+            try:
+                body = json.loads(post.get("text") or "{}")
+            except ValueError:
+                continue
+            query = body.get("structuredQuery") or (body.get("structuredAggregationQuery") or {}).get("structuredQuery")
+            if query:
+                status = entry.get("response", {}).get("status", 0)
+                yield {"test_id": test_id, "kind": url.rsplit(":", 1)[-1].split("?")[0], "parent": None,
+                       "structuredQuery": query, "latency_ms": entry.get("time"), "docs": None,
+                       "status": "ok" if 0 < status < 400 else "error"}
+
+
+def recorded_queries(paths):
+    for path in paths:
+        reader = _har_queries if path.endswith(".har") else _ndjson_queries
+        yield from reader(path)
+
+
+def latest_stream():
+    streams = sorted(glob.glob(str(output_path("queries", "x").parent / "*.ndjson")), key=os.path.getmtime)
+    return streams[-1:] if streams else []
+
+
+# --- Normalization ----------------------------------------------------------
+
+def _field(ref):
+    return (ref or {}).get("fieldPath", "")
+
+
+def _disjuncts(where):
+    """The filter as OR of ANDs (Firestore plans every disjunct separately)."""
+    if not where:
+        return [[]]
+    if "compositeFilter" in where:
+        composite = where["compositeFilter"]
+        parts = [_disjuncts(f) for f in composite.get("filters", [])]
+        if composite.get("op") == "OR":
+            return [d for part in parts for d in part][:MAX_DISJUNCTS]
+        out = [[]]
+        for part in parts:
+            out = [a + b for a in out for b in part][:MAX_DISJUNCTS]
+        return out
+    if "fieldFilter" in where:
+        f = where["fieldFilter"]
+        return [[(_field(f.get("field")), f.get("op"))]]
+    if "unaryFilter" in where:
+        f = where["unaryFilter"]
+        return [[(_field(f.get("field")), f.get("op"))]]
+    return [[]]
+
+
+def shapes(query):
+    """Normalized shapes of a structuredQuery, one per disjunct.
+
+    A shape is ``(collection, scope, equality fields, array-contains field,
+    ((field, direction), ...))``. Inequality fields without an explicit order
+    get the implicit ascending orderBy the SDK and the backend add, and the
+    trailing ``__name__`` order is dropped since every index ends with it.
+    """
+    source = (query.get("from") or [{}])[0]
+    collection = source.get("collectionId", "")
+    scope = "COLLECTION_GROUP" if source.get("allDescendants") else "COLLECTION"
+    explicit = [(_field(o.get("field")), o.get("direction") or "ASCENDING") for o in query.get("orderBy", [])]
+    out = []
+    for conjunction in _disjuncts(query.get("where")):
+        equality = sorted({field for field, op in conjunction if op in EQUALITY_OPS})
+        arrays = sorted({field for field, op in conjunction if op in ARRAY_OPS})
+        inequality = sorted({field for field, op in conjunction if op in INEQUALITY_OPS})
+        order = list(explicit)
+        while order and order[-1][0] == "__name__":
+            order.pop()
+        ordered = {field for field, _ in order}
+        direction = order[-1][1] if order else "ASCENDING"
+        order += [(field, direction) for field in inequality if field not in ordered]
+        out.append((collection, scope, tuple(equality), arrays[0] if arrays else None, tuple(order)))
+    return out
+
+
+def needs_composite(shape):
+    """False when Firestore's automatic single-field indexes serve the shape."""
+    _, _, equality, array, order = shape
+    if not order:
+        return False  # equality / array-contains filters are merged from single-field indexes
+    fields = set(equality) | {field for field, _ in order} | ({array} if array else set())
+    return len(fields) > 1
+
+
+def shape_text(shape):
+    collection, scope, equality, array, order = shape
+    parts = ["%s ==" % field for field in equality]
+    if array:
+        parts.append("%s array-contains" % array)
+    parts += ["%s %s" % (field, "desc" if direction == "DESCENDING" else "asc") for field, direction in order]
+    return "%s%s [%s]" % (collection, " (group)" if scope == "COLLECTION_GROUP" else "", ", ".join(parts))
+
+
+# --- Declared indexes -------------------------------------------------------
+
+def load_indexes(path=INDEXES_PATH):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh).get("indexes", [])
+
+
+def _index_fields(index):
+    fields = [(f["fieldPath"], f.get("order") or f.get("arrayConfig")) for f in index.get("fields", [])]
+    while fields and fields[-1][0] == "__name__":
+        fields.pop()
+    return fields
+
+
+def index_text(index):
+    return "%s [%s]" % (index["collectionGroup"], ", ".join(
+        "%s %s" % (field, {"ASCENDING": "asc", "DESCENDING": "desc"}.get(mode, mode.lower()))
+        for field, mode in _index_fields(index)))
+
+
+def serves(index, shape):
+    """Whether ``index`` can serve ``shape``: equality fields first (any order), then the exact orderBy."""
+    collection, scope, equality, array, order = shape
+    if index["collectionGroup"] != collection or index.get("queryScope", "COLLECTION") != scope:
+        return False
+    fields = _index_fields(index)
+    prefix = len(equality) + (1 if array else 0)
+    head, tail = fields[:prefix], fields[prefix:]
+    expected = {(field, "EQ") for field in equality} | ({(array, "CONTAINS")} if array else set())
+    if {(field, "CONTAINS" if mode == "CONTAINS" else "EQ") for field, mode in head} != expected or len(head) != prefix:
+        return False
+    return tail == list(order)
+
+
+def suggest(shape):
+    """The ``firestore.indexes.json`` entry that serves ``shape``."""
+    collection, scope, equality, array, order = shape
+    fields = [{"fieldPath": field, "order": "ASCENDING"} for field in equality]
+    if array:
+        fields.append({"fieldPath": array, "arrayConfig": "CONTAINS"})
+    fields += [{"fieldPath": field, "order": direction} for field, direction in order]
+    return {"collectionGroup": collection, "queryScope": scope, "fields": fields}
+
+
+def redundant_indexes(indexes):
+    out, seen = [], {}
+    for i, index in enumerate(indexes):
+        key = (index["collectionGroup"], index.get("queryScope", "COLLECTION"), tuple(_index_fields(index)))
+        if key in seen:
+            out.append({"index": i, "text": index_text(index), "reason": "duplicate of #%d" % seen[key]})
+        elif len(key[2]) < 2:
+            out.append({"index": i, "text": index_text(index), "reason": "single field (automatic index)"})
+        seen.setdefault(key, i)
+    return out
+
+
+# --- Report -----------------------------------------------------------------
+
+def analyze(queries, indexes):
+    """Per-shape usage against the declared indexes."""
+    by_shape = {}
+    for event in queries:
+        query = event.get("structuredQuery")
+        if not query:
+            continue
+        for shape in shapes(query):
+            entry = by_shape.setdefault(shape, {"count": 0, "tests": set(), "routes": set(), "latency_ms": [],
+                                                "docs": [], "errors": set()})
+            entry["count"] += 1
+            entry["tests"].add(event.get("test_id") or "?")
+            if event.get("route"):
+                entry["routes"].add(event["route"])
+            entry["latency_ms"].append(event.get("latency_ms"))
+            entry["docs"].append(event.get("docs"))
+            if event.get("status") == "error" and event.get("error"):
+                entry["errors"].add(event["error"][:200])
+
+    used = set()
+    rows = []
+    for shape, entry in by_shape.items():
+        composite = needs_composite(shape)
+        matches = [i for i, index in enumerate(indexes) if serves(index, shape)] if composite else []
+        missing = composite and not matches
+        used.update(matches)
+        latency = summarize(entry["latency_ms"])
+        latency["p99"] = percentile([v for v in entry["latency_ms"] if v is not None], 99)
+        rows.append({"shape": shape_text(shape), "collection": shape[0], "count": entry["count"],
+                     "tests": sorted(entry["tests"]), "routes": sorted(entry["routes"]), "latency_ms": latency,
+                     "docs": summarize(entry["docs"]), "errors": sorted(entry["errors"]),
+                     "composite": composite, "indexes": matches, "missing": missing,
+                     "suggested": suggest(shape) if missing else None})
+    # Frequent slow queries first; shapes without a latency (HAR Listen targets) rank by count
+    rows.sort(key=lambda r: (-r["missing"], -(r["count"] * (r["latency_ms"]["p95"] or 1)), r["shape"]))
+    unused = [{"index": i, "text": index_text(index)} for i, index in enumerate(indexes) if i not in used]
+    return {"run_id": RUN_ID, "queries": sum(r["count"] for r in rows), "shapes": rows,
+            "missing": [r for r in rows if r["missing"]], "unused": unused, "redundant": redundant_indexes(indexes)}
+
+
+def _ms(value):
+    return "-" if value is None else "%.0f" % value
+
+
+def print_report(report):
+    print("%d queries, %d shapes, %d missing indexes, %d unused, %d redundant" % (
+        report["queries"], len(report["shapes"]), len(report["missing"]), len(report["unused"]),
+        len(report["redundant"])))
+    print("%-7s %6s %8s %8s %7s  %s" % ("index", "count", "p50 ms", "p95 ms", "docs", "shape"))
+    for row in report["shapes"]:
+        state = "MISSING" if row["missing"] else "auto"
+        if row["indexes"]:
+            state = "#" + ",".join(map(str, row["indexes"]))
+        print("%-7s %6d %8s %8s %7s  %s" % (state, row["count"], _ms(row["latency_ms"]["median"]),
+                                          _ms(row["latency_ms"]["p95"]), _ms(row["docs"]["max"]), row["shape"]))
+        for error in row["errors"]:
+            print("%-7s %6s %8s %8s %7s    error: %s" % ("", "", "", "", "", error))
+    for row in report["missing"]:
+        print("add (%s): %s" % (", ".join(row["tests"]), json.dumps(row["suggested"], ensure_ascii=False)))
+    for entry in report["unused"]:
+        print("unused #%d: %s" % (entry["index"], entry["text"]))
+    for entry in report["redundant"]:
+        print("redundant #%d: %s (%s)" % (entry["index"], entry["text"], entry["reason"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.indexes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="match recorded queries against firestore.indexes.json")
+    report.add_argument("paths", nargs="*", help="query streams (.ndjson) or HAR files; default: latest stream")
+    report.add_argument("--indexes", default=str(INDEXES_PATH))
+    report.add_argument("--fail-on", choices=("missing", "unused", "redundant"), action="append", default=[])
+    args = parser.parse_args(argv)
+
+    paths = args.paths or latest_stream()
+    if not paths:
+        parser.error("no query stream under %s" % output_path("queries", "x").parent)
+    result = analyze(recorded_queries(paths), load_indexes(args.indexes))
+    result["sources"] = paths
+    with open(output_path("indexes", "%s.json" % RUN_ID), "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2, ensure_ascii=False)
+    print_report(result)
+    return 1 if any(result[key] for key in args.fail_on) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""Tenant-isolation fuzzer for ``firestore.rules`` on the Firestore emulator.
+
+``seed`` writes a few synthetic companies with the dataset generator (one user
+per role each), a platform superadmin and fixture documents for the
+collections the generator does not cover (elektrikKesintileri, notifications,
+auditLogs, backups, leaveRequests, musteriler, subscriptions). It also
+creates Auth emulator logins for all of them.
+
+``run`` signs every actor in, plus an anonymous one, and sends probes through
+the Firestore REST API with each user's ID token, so the emulator evaluates
+the real rules. Every actor tries ``get``, ``list``, ``create``, ``update`` and
+``delete`` on sample documents of its own company and of every other company.
+Probes run from an asyncio loop on a bounded pool of keep-alive connections.
+Update probes only add a ``harnessProbe`` field. Delete probes target copies
+made for the purpose. Documents the probes create are removed afterwards.
+
+The result is an allow/deny matrix per collection, operation, role and scope
+(own or other tenant). Any cross-tenant ``allow`` for a non-superadmin is
+reported as a leak and makes the run fail. Own-tenant listing is also diffed
+against the page table in ``docs/ROL_ERISIM_MATRISI.md``::
+
+    python -m harness.isolation seed --companies 3
+    python -m harness.isolation run --samples 3 --concurrency 64
+    python -m harness.isolation run --collections arizalar stokHareketleri --ops get list
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from .config import FIREBASE_PROJECT, REPO_ROOT, RUN_ID, output_path
+from .dataset import DEFAULT_PASSWORD, DatasetSpec, company_id, create_logins, generate, load, user_email
+from .emulator import MAX_BATCH_WRITES, AuthEmulator, EmulatorError, FirestoreEmulator, encode_fields
+
+DEFAULT_SEED = 41   # keeps the probe tenants apart from 'harness.dataset load' datasets
+ROLES = ("superadmin", "yonetici", "muhendis", "tekniker", "musteri", "bekci")
+OPS = ("get", "list", "create", "update", "delete")
+MATRIX_PATH = REPO_ROOT / "docs" / "ROL_ERISIM_MATRISI.md"
+MATRIX_ROLES = {"SuperAdmin": "superadmin", "Yönetici": "yonetici", "Mühendis": "muhendis", "Tekniker": "tekniker",
+                "Bekçi": "bekci", "Müşteri": "musteri"}
+# Page rows of the access matrix and the collection each page lists
+PAGE_COLLECTIONS = {
+    "Arıza Kayıtları": "arizalar", "Elektrik Kesintileri": "elektrikKesintileri",
+    "Elektrik Bakım": "elektrikBakimlar", "Mekanik Bakım": "mekanikBakimlar", "GES Yönetimi": "santraller",
+    "Üretim Verileri": "uretimVerileri", "Sahalar": "sahalar", "Ekip Yönetimi": "kullanicilar",
+    "İzin Yönetimi": "leaveRequests", "Stok Kontrol": "stoklar", "Vardiya": "vardiyaBildirimleri",
+    "Abonelik": "subscriptions", "Yedekleme": "backups",
+}
+PROBE_PREFIX = "harness-probe-"
+
+
+class Probe:
+    """One access attempt of ``actor`` on ``path`` (a collection for ``list``)."""
+
+    __slots__ = ("actor", "role", "scope", "collection", "target", "op", "path", "fields", "outcome")
+
+    def __init__(self, actor, role, scope, collection, target, op, path, fields=None):
+        self.actor = actor
+        self.role = role
+        self.scope = scope          # "own" or "other" tenant
+        self.collection = collection
+        self.target = target        # company id of the document
+        self.op = op
+        self.path = path
+        self.fields = fields        # document body for create probes and delete victims
+        self.outcome = None
+
+
+def isolation_spec(seed=DEFAULT_SEED, companies=3):
+    return DatasetSpec(seed=seed, companies=companies, sahalar=2, santraller=1, years=0.05, faults=3, bakim=2,
+                       vardiya=3, stok=3, movements=2,
+                       role_counts={role: 1 for role in ROLES if role != "superadmin"})
+
+
+def superadmin_email(seed):
+    return "superadmin@ds%d.test" % seed
+
+
+def seeded_login(role, company=1, seed=DEFAULT_SEED):
+    """``(email, password)`` of a seeded probe user, e.g. for UI tests that switch tenants."""
+    email = superadmin_email(seed) if role == "superadmin" else user_email(seed, company, role, 1)
+    return email, DEFAULT_PASSWORD
+
+
+def fixture_docs(spec, index, uid_for=None):
+    """Documents of the collections the dataset generator leaves empty, for company ``index``."""
+    cid = company_id(spec.seed, index)
+    uid = uid_for or (lambda email: "%s-u-%s" % (cid, email.split("@")[0]))
+    now = datetime(2025, 9, 1, 9, 0, tzinfo=timezone.utc)
+    staff = uid(user_email(spec.seed, index, "tekniker", 1))
+    manager = uid(user_email(spec.seed, index, "yonetici", 1))
+    for n in range(1, 4):
+        yield "elektrikKesintileri/%s-k%d" % (cid, n), {
+            "companyId": cid, "sahaId": "%s-s01" % cid, "baslangicTarihi": now, "sure": 30 * n,
+            "aciklama": "Şebeke kesintisi", "olusturanKisi": staff}
+        yield "notifications/%s-n%d" % (cid, n), {
+            "companyId": cid, "userId": staff, "title": "Bildirim %d" % n, "message": "Harness", "type": "info",
+            "read": False, "createdAt": now}
+        yield "auditLogs/%s-a%d" % (cid, n), {
+            "companyId": cid, "userId": manager, "action": "update", "resource": "arizalar", "timestamp": now}
+        yield "backups/%s-b%d" % (cid, n), {"companyId": cid, "createdBy": manager, "status": "completed",
+                                            "createdAt": now}
+        yield "leaveRequests/%s-l%d" % (cid, n), {"companyId": cid, "userId": staff, "status": "beklemede",
+                                                  "startDate": now, "endDate": now, "type": "yillik"}
+        yield "musteriler/%s-m%d" % (cid, n), {"companyId": cid, "ad": "Müşteri %d" % n, "createdAt": now}
+    yield "subscriptions/%s" % cid, {"companyId": cid, "plan": "enterprise", "status": "active", "startDate": now}
+
+
+def tenant_docs(spec, uid_for=None):
+    yield from generate(spec, uid_for)
+    for index in range(1, spec.companies + 1):
+        yield from fixture_docs(spec, index, uid_for)
+
+
+def manifest_path(seed):
+    return output_path("isolation", "ds%d.json" % seed)
+
+
+def seed_tenants(seed=DEFAULT_SEED, companies=3, workers=8):
+    """Load the probe tenants and their logins; return the manifest."""
+    spec = isolation_spec(seed, companies)
+    client, auth = FirestoreEmulator(), AuthEmulator()
+    credentials = output_path("isolation", "ds%d-credentials.csv" % seed)
+    uids, _ = create_logins(spec, auth, path=credentials)
+    admin = superadmin_email(seed)
+    uids[admin] = auth.ensure_user(admin, DEFAULT_PASSWORD)
+    client.set_many([("kullanicilar/%s" % uids[admin], {
+        "email": admin, "ad": "Platform Yöneticisi", "rol": "superadmin", "companyId": "ds%d-platform" % seed,
+        "aktif": True, "emailVerified": True, "adminApproved": True})])
+    with open(credentials, "a", encoding="utf-8", newline="") as fh:
+        fh.write("%s,%s,superadmin,,%s\n" % (admin, DEFAULT_PASSWORD, uids[admin]))
+    stats = load(client, tenant_docs(spec, uids.get), workers=workers)
+    manifest = {"spec": spec.as_dict(), "project": FIREBASE_PROJECT, "uids": uids, "credentials": str(credentials),
+                "stats": stats}
+    with open(manifest_path(seed), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def load_tenants(seed=DEFAULT_SEED):
+    with open(manifest_path(seed), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    spec = DatasetSpec(**manifest["spec"])
+    return spec, manifest["uids"], manifest
+
+
+def sample_documents(spec, uids, per_collection=3):
+    """``{(collection, company): [(path, fields)]}`` with the first documents of each collection and company."""
+    samples = defaultdict(list)
+    for path, fields in tenant_docs(spec, uids.get):
+        collection = path.split("/", 1)[0]
+        # companies/{id} carries no companyId field; the document id is the company
+        target = fields.get("companyId") or path.split("/", 1)[1]
+        bucket = samples[(collection, target)]
+        if len(bucket) < per_collection:
+            bucket.append((path, fields))
+    return samples
+
+
+def actors(spec, uids):
+    """``[(actor, role, company)]``: one user per role and company, the superadmin and an anonymous caller."""
+    out = [("anonymous", "anonymous", None), (superadmin_email(spec.seed), "superadmin", None)]
+    for index in range(1, spec.companies + 1):
+        for role in spec.role_counts:
+            out.append((user_email(spec.seed, index, role, 1), role, company_id(spec.seed, index)))
+    return [actor for actor in out if actor[0] == "anonymous" or actor[0] in uids]
+
+
+def build_probes(actor_list, samples, collections=None, ops=OPS):
+    """Every actor x collection x target company x operation x sample document."""
+    probes = []
+    counter = 0
+    for actor, role, own in actor_list:
+        for (collection, target), docs in sorted(samples.items()):
+            if collections and collection not in collections:
+                continue
+            scope = "own" if target == own else "other"
+            for op in ops:
+                if op == "list":
+                    probes.append(Probe(actor, role, scope, collection, target, op, collection))
+                    continue
+                for path, fields in docs:
+                    if op in ("create", "delete"):
+                        counter += 1
+                        path = "%s/%s%s-%06d" % (collection, PROBE_PREFIX, op, counter)
+                    probes.append(Probe(actor, role, scope, collection, target, op, path, fields))
+    return probes
+
+
+def _attempt(client, probe, token):
+    name = client.name(probe.path)
+    try:
+        if probe.op == "get":
+            client.get(probe.path, token=token)
+        elif probe.op == "list":
+            client.run_query({
+                "from": [{"collectionId": probe.collection}],
+                "where": {"fieldFilter": {"field": {"fieldPath": "companyId"}, "op": "EQUAL",
+                                          "value": {"stringValue": probe.target}}},
+                "limit": 5}, token=token)
+        elif probe.op == "create":
+            client.commit([{"update": {"name": name, "fields": encode_fields(probe.fields)},
+                            "currentDocument": {"exists": False}}], token=token)
+        elif probe.op == "update":
+            client.commit([{"update": {"name": name, "fields": {"harnessProbe": {"stringValue": RUN_ID}}},
+                            "updateMask": {"fieldPaths": ["harnessProbe"]}, "currentDocument": {"exists": True}}],
+                          token=token)
+        else:
+            client.commit([{"delete": name, "currentDocument": {"exists": True}}], token=token)
+    except EmulatorError as exc:
+        return "deny" if exc.status == 403 else "error %d" % exc.status
+    return "allow"
+
+
+async def run_probes(client, probes, tokens, concurrency=32):
+    """Run ``probes`` with at most ``concurrency`` requests in flight; fills ``probe.outcome``."""
+    loop = asyncio.get_running_loop()
+    # One keep-alive connection per worker thread (see emulator._Client)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        async def one(probe):
+            probe.outcome = await loop.run_in_executor(pool, _attempt, client, probe, tokens[probe.actor])
+        await asyncio.gather(*(one(probe) for probe in probes))
+    return probes
+
+
+def _cell(outcomes):
+    if not outcomes:
+        return None
+    if set(outcomes) == {"allow"}:
+        return "allow"
+    if set(outcomes) == {"deny"}:
+        return "deny"
+    return "partial" if {"allow", "deny"} & set(outcomes) else "error"
+
+
+def build_matrix(probes):
+    """``{collection: {op: {role: {scope: {"cell", "counts"}}}}}``."""
+    counts = defaultdict(Counter)
+    for probe in probes:
+        counts[(probe.collection, probe.op, probe.role, probe.scope)][probe.outcome] += 1
+    matrix = {}
+    for (collection, op, role, scope), outcome in sorted(counts.items()):
+        matrix.setdefault(collection, {}).setdefault(op, {}).setdefault(role, {})[scope] = {
+            "cell": _cell(outcome), "counts": dict(outcome)}
+    return matrix
+
+
+def find_leaks(probes):
+    """Cross-tenant (or anonymous) attempts that the rules allowed, grouped by role/collection/op."""
+    leaks = defaultdict(list)
+    for probe in probes:
+        if probe.outcome == "allow" and probe.scope == "other" and probe.role != "superadmin":
+            leaks[(probe.role, probe.collection, probe.op)].append(probe.path)
+    return [{"role": role, "collection": collection, "op": op, "count": len(paths), "example": paths[0]}
+            for (role, collection, op), paths in sorted(leaks.items())]
+
+
+def parse_access_matrix(path=MATRIX_PATH):
+    """``{page: {role: bool}}`` from the "Sayfa Erişim İzinleri" table."""
+    pages, roles = {}, None
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.startswith("|"):
+                continue
+            cells = [c.strip() for c in line.strip().strip("|").split("|")]
+            if cells[0] == "Sayfa":
+                roles = [MATRIX_ROLES.get(c) for c in cells[1:]]
+            elif roles and any(c in ("✅", "❌") for c in cells[1:]):
+                page = re.sub(r"[*├└─]", "", cells[0]).strip()
+                pages[page] = {role: c == "✅" for role, c in zip(roles, cells[1:]) if role}
+    return pages
+
+
+def diff_access_matrix(matrix, documented):
+    """Own-tenant listing the rules allow/deny against what the page table documents."""
+    findings = []
+    for page, collection in PAGE_COLLECTIONS.items():
+        if page not in documented or "list" not in matrix.get(collection, {}):
+            continue
+        for role, expected in documented[page].items():
+            scopes = matrix[collection]["list"].get(role, {})
+            # The superadmin has no tenant of its own; every company counts
+            observed = (scopes.get("other") if role == "superadmin" else scopes.get("own")) or {}
+            cell = observed.get("cell")
+            if cell is None:
+                continue
+            if expected and cell != "allow":
+                findings.append({"page": page, "collection": collection, "role": role, "documented": "✅",
+                                 "rules": cell, "kind": "blocked"})
+            elif not expected and cell in ("allow", "partial"):
+                findings.append({"page": page, "collection": collection, "role": role, "documented": "❌",
+                                 "rules": cell, "kind": "wider"})
+    return findings
+
+
+def _tokens(actor_list):
+    auth = AuthEmulator()
+    tokens = {"anonymous": ""}
+    for actor, _, _ in actor_list:
+        if actor != "anonymous":
+            tokens[actor] = auth.sign_in(actor, DEFAULT_PASSWORD)["idToken"]
+    return tokens
+
+
+def _cleanup(client, probes):
+    """Remove documents the create probes made and any delete targets the rules protected."""
+    paths = [p.path for p in probes if p.op in ("create", "delete")]
+    for start in range(0, len(paths), MAX_BATCH_WRITES):
+        client.delete_many(paths[start:start + MAX_BATCH_WRITES])
+
+
+async def sweep(seed=DEFAULT_SEED, samples=3, concurrency=32, collections=None, ops=OPS):
+    """Seeded tenants -> probes -> matrix, leaks and the diff against the documented access matrix."""
+    spec, uids, _ = load_tenants(seed)
+    actor_list = actors(spec, uids)
+    docs = sample_documents(spec, uids, samples)
+    probes = build_probes(actor_list, docs, collections, ops)
+    client = FirestoreEmulator()
+    # Delete probes need their own victims; the owner token bypasses the rules
+    victims = [(p.path, p.fields) for p in probes if p.op == "delete"]
+    load(client, iter(victims), workers=min(8, concurrency), progress_s=0)
+    tokens = _tokens(actor_list)
+
+    started = time.monotonic()
+    await run_probes(client, probes, tokens, concurrency)
+    seconds = time.monotonic() - started
+    _cleanup(client, probes)
+
+    matrix = build_matrix(probes)
+    return {"run_id": RUN_ID, "seed": seed, "probes": len(probes), "seconds": round(seconds, 2),
+            "probes_per_s": round(len(probes) / seconds) if seconds else None,
+            "outcomes": dict(Counter(p.outcome for p in probes)), "matrix": matrix, "leaks": find_leaks(probes),
+            "documented": diff_access_matrix(matrix, parse_access_matrix())}
+
+
+_SYMBOLS = {"allow": "✅", "deny": "❌", "partial": "◐", "error": "⚠", None: "·"}
+
+
+def matrix_markdown(matrix, roles=("anonymous",) + ROLES):
+    """Markdown table: one row per collection/op, ``own/other`` per role."""
+    lines = ["| Koleksiyon | İşlem | %s |" % " | ".join(roles), "|---|---|%s" % ("---|" * len(roles))]
+    for collection, ops in matrix.items():
+        for op, by_role in ops.items():
+            cells = []
+            for role in roles:
+                scopes = by_role.get(role, {})
+                cells.append("%s/%s" % (_SYMBOLS[scopes.get("own", {}).get("cell")],
+                                        _SYMBOLS[scopes.get("other", {}).get("cell")]))
+            lines.append("| %s | %s | %s |" % (collection, op, " | ".join(cells)))
+    return "\n".join(lines) + "\n"
+
+
+def print_report(report):
+    print("%d probes in %.1f s (%s/s): %s" % (report["probes"], report["seconds"], report["probes_per_s"],
+                                             ", ".join("%s %d" % kv for kv in sorted(report["outcomes"].items()))))
+    for leak in report["leaks"]:
+        print("LEAK %-10s %-22s %-6s %5d  e.g. %s" % (
+            leak["role"], leak["collection"], leak["op"], leak["count"], leak["example"]))
+    for finding in report["documented"]:
+        print("DOC  %-10s %-22s %s says %s, rules: %s (%s)" % (
+            finding["role"], finding["collection"], finding["page"], finding["documented"], finding["rules"],
+            finding["kind"]))
+    print("%d cross-tenant leaks, %d differences from %s" % (
+        len(report["leaks"]), len(report["documented"]), MATRIX_PATH.name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.isolation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="load the probe tenants and logins into the emulators")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    seed_cmd.add_argument("--companies", type=int, default=3)
+    seed_cmd.add_argument("--workers", type=int, default=8)
+    run_cmd = sub.add_parser("run", help="probe the rules and write the allow/deny matrix")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--samples", type=int, default=3, help="documents per collection and company")
+    run_cmd.add_argument("--concurrency", type=int, default=32)
+    run_cmd.add_argument("--collections", nargs="+", default=None)
+    run_cmd.add_argument("--ops", nargs="+", default=list(OPS), choices=list(OPS))
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        manifest = seed_tenants(args.seed, args.companies, args.workers)
+        print("%d documents, %d logins in %s" % (manifest["stats"]["docs"], len(manifest["uids"]),
+                                                  manifest["credentials"]))
+        return 0
+
+    report = asyncio.run(sweep(args.seed, args.samples, args.concurrency, args.collections, args.ops))
+    out = output_path("isolation", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    table = output_path("isolation", "%s.md" % RUN_ID)
+    with open(table, "w", encoding="utf-8") as fh:
+        fh.write("# Kural matrisi (%s)\n\nHücre: kendi şirketi / diğer şirketler\n\n" % RUN_ID)
+        fh.write(matrix_markdown(report["matrix"]))
+    print_report(report)
+    print("report written to %s, matrix to %s" % (out, table))
+    return 1 if report["leaks"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+"""Multi-user load generator built from the TC flows.
+
+Every virtual user (VU) gets its own lightweight browser context and a
+credential from the pool, logs in, then loops over weighted scenarios until
+the ramp schedule retires it:
+
+* ``login``         - fresh context sign-in to the dashboard (TC001)
+* ``fault_list``    - open Arıza Kayıtları and filter it (TC011)
+* ``shift_report``  - open the vardiya page and the new-shift wizard (TC014)
+* ``notification``  - createScopedNotification callable until the entry shows
+  up in the notification list (TC008)
+
+Stages follow the k6 convention: ``--stages 30:20,60:100,120:100`` ramps to 20
+users over 30 s, to 100 over the next 60 s and holds for 120 s. The report
+has per-step latency percentiles, error rates and a throughput timeline.
+With ``--trace-window`` every VU keeps a rolling Playwright trace of that
+many seconds and writes it to the artifact store when an iteration fails.
+
+Only runs against the emulator stand-in::
+
+    python -m harness.load --credentials users.csv --stages 60:200,300:200
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from .artifacts import FailureArtifacts
+from .config import RUN_ID, credential_pool, output_path
+from .console import ConsoleCapture
+from .flows import (
+    current_profile, filter_faults, login, open_fault_list, open_shift_wizard,
+    require_emulators, send_test_notification,
+)
+from .session import new_context, open_app, playwright_session
+from .stats import percentile
+
+# Heavy static assets do not change what the backend sees
+BLOCKED_ASSETS = "**/*.{png,jpg,jpeg,gif,webp,avif,svg,woff,woff2,ttf,mp4,webm}"
+DEFAULT_MIX = "login=1,fault_list=4,shift_report=2,notification=1"
+
+
+class LoadStats:
+    """Raw step timings plus the active-user curve, summarised at the end."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.steps = []        # (t_s, scenario, step, ms, error)
+        self.iterations = []   # (t_s, scenario, ok)
+        self.users = []        # (t_s, active)
+
+    def now(self):
+        return time.monotonic() - self.started
+
+    def step(self, scenario, step, ms, error=None):
+        self.steps.append((self.now(), scenario, step, ms, error))
+
+    def iteration(self, scenario, ok):
+        self.iterations.append((self.now(), scenario, ok))
+
+    def summary(self, bucket_s):
+        duration = self.now()
+        by_step = defaultdict(list)
+        errors = defaultdict(Counter)
+        for _, scenario, step, ms, error in self.steps:
+            key = "%s/%s" % (scenario, step)
+            if error:
+                errors[key][error] += 1
+            else:
+                by_step[key].append(ms)
+        steps = {}
+        for key in sorted(set(by_step) | set(errors)):
+            ok = by_step[key]
+            failed = sum(errors[key].values())
+            steps[key] = {
+                "n": len(ok) + failed,
+                "error_rate": failed / (len(ok) + failed),
+                "p50": percentile(ok, 50), "p90": percentile(ok, 90),
+                "p95": percentile(ok, 95), "p99": percentile(ok, 99),
+                "max": max(ok) if ok else None,
+                "errors": dict(errors[key].most_common(5)),
+            }
+
+        buckets = defaultdict(lambda: {"ok": 0, "failed": 0, "ms": [], "users": 0})
+        for t, _, ok in self.iterations:
+            buckets[int(t // bucket_s)]["ok" if ok else "failed"] += 1
+        for t, _, _, ms, error in self.steps:
+            if not error:
+                buckets[int(t // bucket_s)]["ms"].append(ms)
+        for t, active in self.users:
+            b = buckets[int(t // bucket_s)]
+            b["users"] = max(b["users"], active)
+        timeline = [{
+            "t_s": index * bucket_s,
+            "users": b["users"],
+            "iterations_per_s": (b["ok"] + b["failed"]) / bucket_s,
+            "error_rate": b["failed"] / (b["ok"] + b["failed"]) if b["ok"] + b["failed"] else 0.0,
+            "step_p95_ms": percentile(b["ms"], 95),
+        } for index, b in sorted(buckets.items())]
+
+        ok_iterations = sum(1 for _, _, ok in self.iterations if ok)
+        return {
+            "duration_s": duration,
+            "iterations": len(self.iterations),
+            "throughput_per_s": ok_iterations / duration if duration else 0.0,
+            "error_rate": 1 - ok_iterations / len(self.iterations) if self.iterations else 0.0,
+            "steps": steps,
+            "timeline": timeline,
+        }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError("unknown scenario %r" % name)
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_stages(text):
+    stages = []
+    for part in text.split(","):
+        duration, _, users = part.partition(":")
+        stages.append((float(duration), int(users)))
+    return stages
+
+
+def target_users(stages, t):
+    """Linearly interpolated VU target at ``t`` seconds; None once the schedule ends."""
+    start_t, start_users = 0.0, 0
+    for duration, users in stages:
+        if t < start_t + duration:
+            return round(start_users + (users - start_users) * (t - start_t) / duration)
+        start_t, start_users = start_t + duration, users
+    return None
+
+
+class VirtualUser:
+
+    def __init__(self, vu_id, browser, credential, stats, think_s, mix, seed, capture=None, trace_window=None):
+        self.vu_id = vu_id
+        self.browser = browser
+        self.credential = credential
+        self.stats = stats
+        self.think_s = think_s
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.stop = asyncio.Event()
+        self.profile = None
+        self.capture = capture
+        self.trace_window = trace_window
+        self.finished = False
+
+    async def timed(self, scenario, step, awaitable):
+        started = time.perf_counter()
+        try:
+            result = await awaitable
+        except Exception as exc:
+            self.stats.step(scenario, step, (time.perf_counter() - started) * 1000,
+                            error="%s: %s" % (type(exc).__name__, str(exc).splitlines()[0] if str(exc) else ""))
+            raise
+        self.stats.step(scenario, step, (time.perf_counter() - started) * 1000)
+        return result
+
+    async def _context(self):
+        context = await new_context(self.browser, timeout_ms=30000, service_workers="block")
+        await context.route(BLOCKED_ASSETS, lambda route: route.abort())
+        if self.capture:
+            await self.capture.attach(context)
+        return context
+
+    async def _login(self, page):
+        await self.timed("login", "login", login(
+            page, self.credential["email"], self.credential["password"], timeout_ms=60000))
+
+    async def run(self):
+        context = artifacts = None
+        try:
+            context = await self._context()
+            if self.trace_window:
+                artifacts = FailureArtifacts("load-vu%d" % self.vu_id, window_s=self.trace_window)
+                await artifacts.attach(context)
+            page = await context.new_page()
+            await self._login(page)
+            self.profile = await self.timed("login", "profile", current_profile(page))
+        except Exception:
+            # A VU that cannot start counts as a failed session; run_load replaces it
+            self.stats.iteration("session", False)
+            if artifacts:
+                await artifacts.save("session")
+            await self._close(context, artifacts)
+            return
+        try:
+            names, weights = list(self.mix), list(self.mix.values())
+            while not self.stop.is_set():
+                scenario = self.rng.choices(names, weights)[0]
+                try:
+                    await SCENARIOS[scenario](self, page)
+                    self.stats.iteration(scenario, True)
+                except Exception:
+                    self.stats.iteration(scenario, False)
+                    if artifacts:
+                        await artifacts.save(scenario)
+                    if page.is_closed():
+                        page = await context.new_page()
+                # Jittered think time, cut short when the VU is retired
+                try:
+                    await asyncio.wait_for(self.stop.wait(), self.think_s * self.rng.uniform(0.5, 1.5))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._close(context, artifacts)
+
+    async def _close(self, context, artifacts):
+        try:
+            if artifacts:
+                # Failed iterations were saved as they happened
+                artifacts.mark_passed()
+                await artifacts.finalize()
+            if context:
+                await context.close()
+        finally:
+            self.finished = True
+
+
+async def _scenario_login(vu, page):
+    context = await vu._context()
+    try:
+        await vu._login(await context.new_page())
+    finally:
+        await context.close()
+
+
+async def _scenario_fault_list(vu, page):
+    await vu.timed("fault_list", "open", open_fault_list(page))
+    await vu.timed("fault_list", "filter", filter_faults(page, durum=vu.rng.choice(["acik", "devam-ediyor", "cozuldu"])))
+
+
+async def _scenario_shift_report(vu, page):
+    await vu.timed("shift_report", "open_wizard", open_shift_wizard(page))
+    await page.keyboard.press("Escape")
+
+
+async def _scenario_notification(vu, page):
+    await vu.timed("notification", "open", open_app(page, "/bildirimler"))
+    title = "Yük testi %s-%d" % (vu.vu_id, int(time.time() * 1000))
+    await vu.timed("notification", "callable", send_test_notification(page, vu.profile, title))
+    await vu.timed("notification", "delivered", page.get_by_text(title).first.wait_for(timeout=30000))
+
+
+SCENARIOS = {
+    "login": _scenario_login,
+    "fault_list": _scenario_fault_list,
+    "shift_report": _scenario_shift_report,
+    "notification": _scenario_notification,
+}
+
+
+async def run_load(stages, mix, pool, browsers=1, think_s=2.0, headless=True, seed=0, capture=None,
+                   trace_window=None):
+    stats = LoadStats()
+    async with playwright_session(headless=headless, args=["--disable-dev-shm-usage"]) as (pw, first):
+        fleet = [first] + [await pw.chromium.launch(headless=headless, args=["--disable-dev-shm-usage"])
+                           for _ in range(browsers - 1)]
+        try:
+            # One up-front check so a misconfigured run never loads production
+            probe = await new_context(first)
+            page = await probe.new_page()
+            await login(page, pool[0]["email"], pool[0]["password"], timeout_ms=60000)
+            await require_emulators(page)
+            await probe.close()
+
+            stats.started = time.monotonic()
+            active = []
+            tasks = []
+            next_id = 0
+            while True:
+                target = target_users(stages, stats.now())
+                if target is None:
+                    break
+                # VUs that died (failed login, crashed context) are replaced to hold the target
+                active = [vu for vu in active if not vu.finished]
+                while len(active) < target:
+                    vu = VirtualUser(next_id, fleet[next_id % len(fleet)], pool[next_id % len(pool)],
+                                     stats, think_s, mix, seed + next_id, capture, trace_window)
+                    next_id += 1
+                    active.append(vu)
+                    tasks.append(asyncio.ensure_future(vu.run()))
+                while len(active) > target:
+                    active.pop().stop.set()
+                stats.users.append((stats.now(), len(active)))
+                await asyncio.sleep(1)
+            for vu in active:
+                vu.stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for browser in fleet[1:]:
+                await browser.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.load")
+    parser.add_argument("--stages", default="30:10,60:10", help="duration_s:users,... (linear ramps)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument("--credentials", default=None, help="JSON or CSV credential pool")
+    parser.add_argument("--browsers", type=int, default=1, help="Chromium processes to spread contexts over")
+    parser.add_argument("--think", type=float, default=2.0, help="mean think time between iterations (s)")
+    parser.add_argument("--bucket", type=float, default=10.0, help="timeline bucket (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-window", type=float, default=None,
+                        help="keep the last N seconds of trace per VU and save it on failed iterations")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Blocked assets show up as aborted requests, which the default allowlist ignores
+    capture = ConsoleCapture("load", fail_fast=False)
+    try:
+        stats = asyncio.run(run_load(
+            parse_stages(args.stages), parse_mix(args.mix), credential_pool(args.credentials),
+            browsers=args.browsers, think_s=args.think, headless=not args.headed, seed=args.seed,
+            capture=capture, trace_window=args.trace_window))
+    finally:
+        capture.close(check=False)
+    report = stats.summary(args.bucket)
+    report.update({"run_id": RUN_ID, "stages": args.stages, "mix": args.mix,
+                   "console": {"counts": dict(capture.counts), "violations": capture.violations(),
+                               "stream": str(capture.stream_path)}})
+    out = output_path("load", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+
+    print("%d iterations in %.0f s, %.2f/s, error rate %.1f%%" % (
+        report["iterations"], report["duration_s"], report["throughput_per_s"], report["error_rate"] * 100))
+    for key, s in report["steps"].items():
+        print("%-28s n=%-5d p50 %7s p95 %7s p99 %7s err %5.1f%%" % (
+            key, s["n"], _ms(s["p50"]), _ms(s["p95"]), _ms(s["p99"]), s["error_rate"] * 100))
+    print("report written to %s" % out)
+    return 0
+
+
+def _ms(value):
+    return "-" if value is None else "%.0f" % value
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""Semantic locators keyed by the Turkish UI labels.
+
+The generated TC files address elements by absolute XPath
+(``html/body/div/div[2]/div[2]/main/...``), which breaks on any layout change
+and is slow to evaluate on large DOMs. Here each element gets a stable key
+such as ``"Giriş Yap"`` or ``"Görüntüle"`` that compiles to a role, text,
+placeholder or test-id locator::
+
+    from harness.locators import locators
+
+    elem = await locators(page).resolve("Bakım")   # waits, records timing
+    await locators(page)["Görüntüle"].click()       # plain cached Locator
+
+Compiled locators are cached per page, and ``resolve`` records how long each
+key takes to match; the timings are written to the harness output folder at
+exit. ``python -m harness.locators migrate`` rewrites known XPaths in the TC
+files to these keys.
+"""
+import argparse
+import atexit
+import glob
+import json
+import re
+import statistics
+import sys
+import time
+import weakref
+from pathlib import Path
+
+from .config import OUTPUT_DIR, RUN_ID, TESTS_DIR, output_path
+
+# Visible once the dashboard KPI cards have rendered
+DASHBOARD_READY = "text=Bu Ay Arızalar"
+
+# Role queries skip hidden elements, so the desktop sidebar wins over the
+# collapsed mobile one without extra scoping.
+SEMANTIC_LOCATORS = {
+    # Landing page link and login form submit share the label
+    "Giriş Yap": {"role": ["link", "button"], "name": "Giriş Yap", "exact": True},
+    "E-posta": {"placeholder": "ornek@email.com"},
+    # Login form has no label; the team member modal does
+    "Şifre": [{"label": "Şifre"}, {"placeholder": "••••••••"}],
+    "Arama": {"placeholder": "Santral, arıza veya kullanıcı ara..."},
+    "Kullanıcı Menüsü": {"test_id": "user-menu"},
+    "Bildirimler": {"test_id": "notifications-menu"},
+    "Tümünü görüntüle": {"role": "button", "name": "Tümünü görüntüle"},
+    "Çıkış Yap": {"role": "button", "name": "Çıkış Yap"},
+
+    # Sidebar
+    "Dashboard": {"role": "link", "name": "Dashboard", "exact": True},
+    "Arızalar": {"role": "button", "name": "Arızalar", "exact": True},
+    "Arıza Kayıtları": {"role": "link", "name": "Arıza Kayıtları"},
+    "Bakım": {"role": "button", "name": "Bakım", "exact": True},
+    "Elektrik Bakım": {"role": "link", "name": "Elektrik Bakım"},
+    "Mekanik Bakım": {"role": "link", "name": "Mekanik Bakım"},
+    "Yapılan İşler": {"role": "link", "name": "Yapılan İşler"},
+    "GES Yönetimi": {"role": "link", "name": "GES Yönetimi"},
+    "Ekip Yönetimi": {"role": "link", "name": "Ekip Yönetimi"},
+    "İzin Yönetimi": {"role": "link", "name": "İzin Yönetimi"},
+    "Vardiya": {"role": "link", "name": "Vardiya", "exact": True},
+    "Abonelik": {"role": "link", "name": "Abonelik", "exact": True},
+    "Ayarlar": {"role": "link", "name": "Ayarlar", "exact": True},
+
+    # Page actions
+    "Görüntüle": {"role": "button", "name": "Görüntüle"},
+    "Kapat": {"role": "button", "name": "Kapat", "exact": True},
+    "Rapor": {"role": "button", "name": "Rapor", "exact": True},
+    "Excel": {"role": "button", "name": "Excel", "exact": True},
+    "Yeni Santral Ekle": {"role": "button", "name": "Yeni Santral Ekle"},
+    "Santralı Ekle": {"role": "button", "name": "Santralı Ekle"},
+    "Yeni Üye Ekle": {"role": "button", "name": "Yeni Üye Ekle"},
+    "Yeni Vardiya": {"role": "button", "name": "Yeni Vardiya"},
+    "İleri": {"role": "button", "name": "İleri"},
+    "Basit Test Bildirimi": {"role": "button", "name": "Basit Test Bildirimi"},
+
+    # Form fields. Labels are bound to their inputs by the ui/Input components
+    # and may end with a "*" for required fields, so they match as substrings.
+    "Ad Soyad": {"label": "Ad Soyad"},
+    "Telefon": {"label": "Telefon"},
+    "Rol": {"label": "Rol"},
+    "Saha": {"label": "Saha *"},
+    "Tarih": {"label": "Tarih *"},
+    "Vardiya Tipi": {"label": "Vardiya Tipi"},
+    "Durum": {"label": "Durum *"},
+    "Şirket Adı": {"label": "Şirket Adı"},
+    "Slogan": {"label": "Slogan"},
+    "Adres": {"label": "Adres"},
+    "Email": {"label": "Email"},
+    "Website": {"label": "Website"},
+    "Santral Adı": {"label": "Santral Adı"},
+    "Bağlı Saha": {"label": "Bağlı Saha"},
+    "Kurulu Güç": {"label": "Kurulu Güç (kW)"},
+    "Kurulum Tarihi": {"label": "Kurulum Tarihi"},
+}
+# Monthly production estimates on the santral form
+for _month in ("Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+               "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"):
+    SEMANTIC_LOCATORS[_month] = {"label": _month}
+
+# Absolute XPaths recorded by TestSprite, mapped to the element they hit
+XPATH_ALIASES = {
+    "html/body/div/div[2]/nav/div/div[3]/a": "Giriş Yap",
+    "html/body/div/div[2]/div/div[2]/form/div/div/div/input": "E-posta",
+    "html/body/div/div[2]/div/div[2]/form/div/div[2]/div/input": "Şifre",
+    "html/body/div/div[2]/div/div[2]/form/div[2]/button": "Giriş Yap",
+    "html/body/div/div[2]/div[2]/header/div/div[2]/div/input": "Arama",
+    "html/body/div/div[2]/div[2]/header/div/div[3]/div[3]/button": "Kullanıcı Menüsü",
+    "html/body/div/div[2]/div[2]/header/div/div[3]/div[3]/div/div[2]/button": "Çıkış Yap",
+    "html/body/div/div[2]/div/div/nav/a": "Dashboard",
+    "html/body/div/div[2]/div/div/nav/div/button": "Arızalar",
+    "html/body/div/div[2]/div/div/nav/div/div/a": "Arıza Kayıtları",
+    "html/body/div/div[2]/div/div/nav/div[2]/button": "Bakım",
+    "html/body/div/div[2]/div/div/nav/div[2]/div/a": "Elektrik Bakım",
+    "html/body/div/div[2]/div/div/nav/div[2]/div/a[2]": "Mekanik Bakım",
+    "html/body/div/div[2]/div/div/nav/div[2]/div/a[3]": "Yapılan İşler",
+    "html/body/div/div[2]/div/div/nav/a[2]": "GES Yönetimi",
+    "html/body/div/div[2]/div/div/nav/a[5]": "Ekip Yönetimi",
+    "html/body/div/div[2]/div/div/nav/a[6]": "İzin Yönetimi",
+    "html/body/div/div[2]/div/div/nav/a[9]": "Vardiya",
+    "html/body/div/div[2]/div/div/nav/a[10]": "Abonelik",
+    "html/body/div/div[2]/div/div/nav/a[11]": "Ayarlar",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[4]/div/div/div/div[2]/div[4]/button": "Görüntüle",
+    "html/body/div[21]/div/div/div/button": "Kapat",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[2]/div/div/div[2]/div/button": "Rapor",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div[2]/div/div/div[2]/div/button[2]": "Excel",
+    "html/body/div/div[2]/div[2]/main/div/div/div/div[2]/button": "Yeni Santral Ekle",
+    "html/body/div/div[2]/div[2]/main/div/div/div/button": "Yeni Üye Ekle",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/button": "Yeni Vardiya",
+    "html/body/div[21]/div/div/div[2]/div/div[3]/div[2]/button[2]": "İleri",
+    "html/body/div/div[2]/div[2]/main/div/div/div/div[2]/div/button": "Basit Test Bildirimi",
+    # Yeni Üye Ekle modal (TC012)
+    "html/body/div[21]/div/div/div[2]/div/div/div/div/input": "E-posta",
+    "html/body/div[21]/div/div/div[2]/div/div/div[2]/div/input": "Şifre",
+    "html/body/div[21]/div/div/div[2]/div/div[2]/div/input": "Ad Soyad",
+    "html/body/div[21]/div/div/div[2]/div/div[3]/div/input": "Telefon",
+    # Yeni Vardiya Bildirimi wizard, step 1 (TC014)
+    "html/body/div[21]/div/div/div[2]/div/div[2]/div/div/div/select": "Saha",
+    "html/body/div[21]/div/div/div[2]/div/div[2]/div[2]/div/div/input": "Tarih",
+    "html/body/div[21]/div/div/div[2]/div/div[2]/div[2]/div[2]/select": "Vardiya Tipi",
+    "html/body/div[21]/div/div/div[2]/div/div[2]/div[2]/div[3]/select": "Durum",
+    # Company settings (TC015)
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/div/div/div/input": "Şirket Adı",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/div/div[2]/div/input": "Slogan",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/div[2]/textarea": "Adres",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/div[3]/div/div/input": "Telefon",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/div[3]/div[2]/div/input": "Email",
+    "html/body/div/div[2]/div[2]/main/div/div/div[2]/div/div/div[2]/div[3]/div[3]/div/input": "Website",
+    # Yeni Santral Ekle form (TC006)
+    "html/body/div[27]/div/div/div[2]/form/div/div/div/div/input": "Santral Adı",
+    "html/body/div[27]/div/div/div[2]/form/div/div/div[2]/div/select": "Bağlı Saha",
+    "html/body/div[27]/div/div/div[2]/form/div/div/div[3]/div/input": "Kurulu Güç",
+    "html/body/div[27]/div/div/div[2]/form/div/div/div[4]/div/input": "Kurulum Tarihi",
+    "html/body/div[27]/div/div/div[2]/form/div[2]/div/div/div/input": "Ocak",
+    "html/body/div[27]/div/div/div[2]/form/div[2]/div/div[2]/div/input": "Şubat",
+    "html/body/div[27]/div/div/div[2]/form/div[2]/div/div[3]/div/input": "Mart",
+    "html/body/div[27]/div/div/div[2]/form/div[2]/div/div[4]/div/input": "Nisan",
+    "html/body/div[27]/div/div/div[2]/form/div[2]/div/div[5]/div/input": "Mayıs",
+}
+
+_ROLE_TAGS = {"button": {"button"}, "link": {"a"}, "textbox": {"input", "textarea"}, "combobox": {"select"}}
+_FIELD_TAGS = {"input", "textarea", "select"}
+
+
+def _roles(spec):
+    roles = spec.get("role")
+    return [roles] if isinstance(roles, str) else list(roles or [])
+
+
+def compile_locator(root, spec):
+    """Build a Playwright locator for ``spec`` under ``root`` (page, frame or locator).
+
+    A list of specs matches whichever alternative is present on the page.
+    """
+    if isinstance(spec, list):
+        locator = None
+        for alternative in spec:
+            candidate = _compile_one(root, alternative)
+            locator = candidate if locator is None else locator.or_(candidate)
+        return locator.first
+    return _compile_one(root, spec).nth(spec.get("nth", 0))
+
+
+def _compile_one(root, spec):
+    if "scope" in spec:
+        root = root.locator(spec["scope"])
+    exact = spec.get("exact", False)
+    if spec.get("role"):
+        locator = None
+        for role in _roles(spec):
+            candidate = root.get_by_role(role, name=spec.get("name"), exact=exact)
+            locator = candidate if locator is None else locator.or_(candidate)
+    elif "test_id" in spec:
+        locator = root.get_by_test_id(spec["test_id"])
+    elif "placeholder" in spec:
+        locator = root.get_by_placeholder(spec["placeholder"], exact=exact)
+    elif "label" in spec:
+        locator = root.get_by_label(spec["label"], exact=exact)
+    elif "text" in spec:
+        locator = root.get_by_text(spec["text"], exact=exact)
+    elif "css" in spec:
+        locator = root.locator(spec["css"])
+    else:
+        raise ValueError("locator spec needs role, test_id, placeholder, label, text or css: %r" % spec)
+    return locator
+
+
+class LocatorProfiler:
+    """Per-key resolution timings, dumped as JSON when the process exits."""
+
+    def __init__(self):
+        self.timings = {}
+        self.failures = {}
+        self._registered = False
+
+    def record(self, key, ms, ok):
+        self.timings.setdefault(key, []).append(ms)
+        if not ok:
+            self.failures[key] = self.failures.get(key, 0) + 1
+        if not self._registered:
+            atexit.register(self.dump)
+            self._registered = True
+
+    def summary(self):
+        return {
+            key: {"n": len(values), "median_ms": statistics.median(values), "max_ms": max(values),
+                  "failures": self.failures.get(key, 0)}
+            for key, values in self.timings.items()
+        }
+
+    def dump(self):
+        if not self.timings:
+            return None
+        path = output_path("locators", "%s-%s.json" % (RUN_ID, Path(sys.argv[0]).stem or "session"))
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.summary(), fh, indent=2, ensure_ascii=False)
+        return path
+
+
+PROFILER = LocatorProfiler()
+
+
+class SemanticLocators:
+    """Compiled locators for one page; use :func:`locators` to get the cached instance."""
+
+    def __init__(self, page, registry=SEMANTIC_LOCATORS, profiler=PROFILER):
+        self.page = page
+        self.registry = registry
+        self.profiler = profiler
+        self._compiled = {}
+
+    def __getitem__(self, key):
+        locator = self._compiled.get(key)
+        if locator is None:
+            try:
+                spec = self.registry[key]
+            except KeyError:
+                raise KeyError("no semantic locator named %r" % key) from None
+            locator = self._compiled[key] = compile_locator(self.page, spec)
+        return locator
+
+    async def resolve(self, key, state="visible", timeout_ms=None):
+        """Wait for ``key`` to reach ``state`` and record how long matching took."""
+        locator = self[key]
+        started = time.perf_counter()
+        ok = False
+        try:
+            await locator.wait_for(state=state, timeout=timeout_ms)
+            ok = True
+        finally:
+            self.profiler.record(key, (time.perf_counter() - started) * 1000, ok)
+        return locator
+
+
+_per_page = weakref.WeakKeyDictionary()
+
+
+def locators(page):
+    """Return the cached :class:`SemanticLocators` for ``page``."""
+    compiled = _per_page.get(page)
+    if compiled is None:
+        compiled = _per_page[page] = SemanticLocators(page)
+    return compiled
+
+
+# --- codemod -----------------------------------------------------------------
+
+_XPATH_CALL = re.compile(r"""(?P<root>\w+)\.locator\('xpath=(?P<xpath>[^']+)'\)\.nth\(0\)""")
+_ASSIGN = re.compile(r"""^(?P<indent>\s*)elem = (?P<root>\w+)\.locator\('xpath=(?P<xpath>[^']+)'\)\.nth\(0\)\s*$""")
+_QUOTED = re.compile(r"'([^']+)'")
+_IMPORT = "from harness.locators import locators\n"
+
+
+def _tags(spec):
+    if isinstance(spec, list):
+        tags = [_tags(alternative) for alternative in spec]
+        return None if None in tags else set().union(*tags)
+    if spec.get("role"):
+        return set().union(*(_ROLE_TAGS.get(r, set()) for r in _roles(spec)))
+    if "placeholder" in spec or "label" in spec:
+        return _FIELD_TAGS
+    return None  # text / test id / css can be any element
+
+
+def infer_key(xpath, comment, registry=SEMANTIC_LOCATORS, aliases=XPATH_ALIASES):
+    """Map an XPath to a semantic key, via the alias table or the step comment."""
+    if xpath in aliases:
+        return aliases[xpath]
+    tag = re.sub(r"\[\d+\]$", "", xpath.rsplit("/", 1)[-1])
+    for label in _QUOTED.findall(comment or ""):
+        spec = registry.get(label)
+        if spec is None:
+            continue
+        tags = _tags(spec)
+        if tags is None or tag in tags:
+            return label
+    return None
+
+
+def migrate_source(source):
+    """Rewrite known XPath locators in a TC file; return (new_source, unmapped)."""
+    out, unmapped = [], []
+    comment = ""
+    for lineno, line in enumerate(source.splitlines(keepends=True), 1):
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            comment = stripped
+        m = _ASSIGN.match(line.rstrip("\n"))
+        if m:
+            key = infer_key(m.group("xpath"), comment)
+            if key:
+                out.append("%selem = await locators(%s).resolve(%r)\n" % (m.group("indent"), m.group("root"), key))
+                continue
+
+        def replace(match):
+            key = infer_key(match.group("xpath"), comment)
+            if key is None:
+                unmapped.append((lineno, match.group("xpath")))
+                return match.group(0)
+            return "locators(%s)[%r]" % (match.group("root"), key)
+
+        out.append(_XPATH_CALL.sub(replace, line))
+    new = "".join(out)
+    if new != source and _IMPORT not in new:
+        new = new.replace("from playwright import async_api\n", "from playwright import async_api\n" + _IMPORT, 1)
+    return new, unmapped
+
+
+def _migrate(paths, write):
+    changed = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as fh:
+            source = fh.read()
+        new, unmapped = migrate_source(source)
+        for lineno, xpath in unmapped:
+            print("%s:%d: no semantic key for %s" % (path, lineno, xpath))
+        if new != source:
+            changed += 1
+            if write:
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write(new)
+            print("%s %s" % ("migrated" if write else "would migrate", path))
+    return changed
+
+
+def _report():
+    merged = {}
+    for path in sorted(glob.glob(str(OUTPUT_DIR / "locators" / "*.json"))):
+        with open(path, encoding="utf-8") as fh:
+            for key, s in json.load(fh).items():
+                merged.setdefault(key, []).append(s["median_ms"])
+    for key, medians in sorted(merged.items(), key=lambda kv: -statistics.median(kv[1])):
+        print("%-24s median %8.1f ms over %d runs" % (key, statistics.median(medians), len(medians)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.locators")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="rewrite absolute XPaths in TC files to semantic keys")
+    migrate.add_argument("paths", nargs="*")
+    migrate.add_argument("--write", action="store_true", help="edit files in place (default: dry run)")
+    sub.add_parser("report", help="slowest keys across recorded runs")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        paths = args.paths or sorted(glob.glob(str(TESTS_DIR / "TC*.py")))
+        _migrate(paths, args.write)
+    else:
+        _report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
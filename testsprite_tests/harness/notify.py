@@ -0,0 +1,372 @@
+"""Notification delivery latency and fan-out benchmark (TC008).
+
+The push path under test is ``createScopedNotification`` writing one
+notifications document per recipient, then ``sendPushOnNotificationCreate``
+sending FCM multicasts to every device in the recipient's ``devices`` map
+(``multiDeviceTokenService``). In the Functions emulator those multicasts go
+to ``PUSH_SINK_URL`` instead of FCM, so the sink in this module stands in for
+FCM and records every device it "delivers" to. Set the URL for the emulator
+before starting it::
+
+    echo PUSH_SINK_URL=http://127.0.0.1:9300/fcm >> functions/.env.local
+
+``seed`` loads one company with a field team of ``--team`` users, each with
+``--devices`` registered devices, plus logins. ``run`` starts the sink, signs
+the yönetici in and calls the callable ``--count`` times at ``--rate`` calls
+per second. Meanwhile ``--observers`` team members keep /bildirimler open in
+their own browser contexts. It reports, with p50/p95/p99:
+
+* ``callable_ms``   - call until the callable returned (documents written)
+* ``push_ms``       - call until the sink got the push, per device
+* ``fanout_ms``     - call until the last device of the notification got it
+* ``in_app_ms``     - call until the title showed in an observer's list
+
+It also reports fan-out throughput (pushes and notification documents per
+second) and the pushes that never arrived::
+
+    python -m harness.notify seed --team 200 --devices 3
+    python -m harness.notify run --count 50 --rate 5 --observers 3
+    python -m harness.notify run --count 20 --rate 2 --roles tekniker bekci
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import FIREBASE_PROJECT, RUN_ID, output_path
+from .dataset import DEFAULT_PASSWORD, DatasetSpec, company_id, create_logins, generate, load, user_email
+from .emulator import AuthEmulator, FirestoreEmulator, FunctionsEmulator
+from .flows import login
+from .session import browser_session, new_context, open_app
+from .stats import percentile, summarize
+
+DEFAULT_SEED = 43
+DEFAULT_TEAM = 50
+DEVICES_PER_USER = 3
+SINK_PORT = 9300
+PLATFORMS = ("android", "ios", "web")
+SETTLE_TIMEOUT_S = 60.0
+
+# First time each match of a pattern shows up in the page, keyed by its first
+# group, in epoch ms like the sink's receive times (browser and harness share
+# the machine's clock)
+SEEN_SCRIPT = """
+(() => {
+  const pattern = new RegExp(%s, 'g');
+  window.__harnessSeen = window.__harnessSeen || {};
+  const scan = () => {
+    const text = document.body ? document.body.innerText : '';
+    for (const match of text.matchAll(pattern)) {
+      if (!(match[1] in window.__harnessSeen)) window.__harnessSeen[match[1]] = Date.now();
+    }
+  };
+  const start = () => new MutationObserver(scan).observe(document.body, { childList: true, subtree: true,
+                                                                          characterData: true });
+  if (document.body) start(); else document.addEventListener('DOMContentLoaded', start);
+})();
+"""
+
+
+def seen_script(pattern):
+    """Init script for ``window.__harnessSeen``; ``pattern`` is a regex source with one group."""
+    return SEEN_SCRIPT % json.dumps(pattern)
+
+
+def team_spec(seed=DEFAULT_SEED, team=DEFAULT_TEAM):
+    """One company whose ``team`` users are mostly technicians and guards, like a field crew."""
+    muhendis, bekci = max(1, team // 10), max(1, team // 5)
+    tekniker = max(1, team - 2 - muhendis - bekci)
+    return DatasetSpec(seed=seed, companies=1, sahalar=4, santraller=1, years=0, faults=0, bakim=0, vardiya=0,
+                       stok=0, movements=0, production=False,
+                       role_counts={"yonetici": 1, "muhendis": muhendis, "tekniker": tekniker, "musteri": 1,
+                                    "bekci": bekci})
+
+
+def device_map(uid, devices, when):
+    """``devices`` field as ``registerDevice`` writes it, keyed by platform and token prefix."""
+    out = {}
+    for n in range(devices):
+        token = "d%02d-%s-harness" % (n, uid)
+        platform = PLATFORMS[n % len(PLATFORMS)]
+        out["%s_%s" % (platform, token[:12])] = {"token": token, "platform": platform, "browser": "Harness",
+                                                 "os": "Harness", "lastUsed": when, "addedAt": when}
+    return out
+
+
+def manifest_path(seed, folder="notify"):
+    return output_path(folder, "ds%d.json" % seed)
+
+
+def seed_devices(spec, devices=DEVICES_PER_USER, folder="notify", extra=(), workers=8):
+    """Load ``spec`` (plus ``extra`` documents) with registered devices per user and create its logins.
+
+    Returns the manifest, which ``load_team`` reads back from ``folder``.
+    """
+    client, auth = FirestoreEmulator(), AuthEmulator()
+    uids, credentials = create_logins(spec, auth, path=output_path(folder, "ds%d-credentials.csv" % spec.seed))
+    when = datetime.now(timezone.utc)
+
+    def docs():
+        for path, fields in generate(spec, uids.get):
+            if path.startswith("kullanicilar/"):
+                fields = dict(fields, devices=device_map(path.split("/", 1)[1], devices, when))
+            yield path, fields
+        yield from extra
+
+    stats = load(client, docs(), workers=workers)
+    manifest = {"spec": spec.as_dict(), "project": FIREBASE_PROJECT, "devices": devices, "uids": uids,
+                "credentials": str(credentials), "stats": stats}
+    with open(manifest_path(spec.seed, folder), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def seed_team(seed=DEFAULT_SEED, team=DEFAULT_TEAM, devices=DEVICES_PER_USER, workers=8):
+    """Load the team with registered devices and create its logins; return the manifest."""
+    return seed_devices(team_spec(seed, team), devices, workers=workers)
+
+
+def load_team(seed=DEFAULT_SEED, folder="notify"):
+    with open(manifest_path(seed, folder), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    return DatasetSpec(**manifest["spec"]), manifest
+
+
+class PushSink:
+    """Local HTTP stand-in for FCM; accepts ``MulticastMessage`` bodies and records one push per token."""
+
+    def __init__(self, port=SINK_PORT, host="127.0.0.1"):
+        self.pushes = []
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received = time.time() * 1000
+                message = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                tokens = message.get("tokens") or []
+                sink.record(received, message, tokens)
+                body = json.dumps({"responses": [{"success": True, "messageId": "sink-%d" % n}
+                                                 for n in range(len(tokens))]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return "http://%s:%d/fcm" % self.server.server_address[:2]
+
+    def record(self, received_ms, message, tokens):
+        notification = message.get("notification") or {}
+        data = message.get("data") or {}
+        with self._lock:
+            for token in tokens:
+                self.pushes.append({"t_ms": received_ms, "title": notification.get("title"),
+                                    "body": notification.get("body"), "token": token,
+                                    "userId": data.get("userId"), "notificationId": data.get("notificationId")})
+
+    def count(self):
+        with self._lock:
+            return len(self.pushes)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def latency_summary(values):
+    """``stats.summarize`` plus p99."""
+    summary = summarize(values)
+    summary["p99"] = percentile([v for v in values if v is not None], 99)
+    return summary
+
+
+def analyze(triggers, pushes, seen, tag, devices):
+    """Latency and throughput figures from trigger records, sink pushes and observer first-seen times."""
+    pattern = re.compile(re.escape(tag) + r" #(\d+)")
+    by_index = {t["index"]: t for t in triggers}
+    push_ms, per_notification = [], {}
+    for push in pushes:
+        match = pattern.search(push["title"] or "")
+        trigger = by_index.get(int(match.group(1))) if match else None
+        if trigger is None:
+            continue
+        push_ms.append(push["t_ms"] - trigger["t_ms"])
+        per_notification.setdefault(trigger["index"], []).append(push["t_ms"])
+    fanout_ms = [max(times) - by_index[index]["t_ms"] for index, times in per_notification.items()]
+    in_app_ms = [t - by_index[int(index)]["t_ms"] for observer in seen for index, t in observer.items()
+                 if int(index) in by_index]
+
+    created = sum(t["created"] or 0 for t in triggers)
+    expected = created * devices
+    received = len(push_ms)
+    started = min(t["t_ms"] for t in triggers) if triggers else 0
+    last = max([p["t_ms"] for p in pushes] or [started])
+    window_s = max(last - started, 1.0) / 1000
+    return {
+        "notifications": len(triggers), "documents": created, "errors": sum(1 for t in triggers if t["error"]),
+        "pushes_expected": expected, "pushes_received": received, "pushes_missing": max(0, expected - received),
+        "callable_ms": latency_summary([t["callable_ms"] for t in triggers]),
+        "push_ms": latency_summary(push_ms), "fanout_ms": latency_summary(fanout_ms),
+        "in_app_ms": latency_summary(in_app_ms),
+        "pushes_per_s": round(received / window_s, 1), "documents_per_s": round(created / window_s, 1),
+        "window_s": round(window_s, 3),
+    }
+
+
+def _trigger(functions, token, index, payload):
+    started = time.time() * 1000
+    record = {"index": index, "t_ms": started, "callable_ms": None, "created": None, "error": None}
+    try:
+        result = functions.call("createScopedNotification", payload, token=token) or {}
+        record["created"] = result.get("created", 0)
+        record["callable_ms"] = round(time.time() * 1000 - started, 1)
+    except Exception as exc:    # keep triggering; the report counts failed calls
+        record["error"] = str(exc)[:200]
+    return record
+
+
+async def observer(browser, email, pattern, timeout_ms, path="/bildirimler"):
+    """Context signed in as ``email`` on ``path`` that records when ``pattern`` matches first show up."""
+    context = await new_context(browser, timeout_ms=timeout_ms)
+    await context.add_init_script(seen_script(pattern))
+    page = await context.new_page()
+    await login(page, email, DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+    await open_app(page, path)
+    return context, page
+
+
+async def _settle(sink, expected, triggers_done, timeout_s):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if triggers_done() and sink.count() >= expected():
+            return True
+        await asyncio.sleep(0.25)
+    return False
+
+
+async def run_notify(seed=DEFAULT_SEED, count=20, rate=2.0, roles=None, observers=2, port=SINK_PORT,
+                     concurrency=16, timeout_s=SETTLE_TIMEOUT_S, browser=None):
+    """Fire ``count`` scoped notifications at ``rate``/s through the sink and return the report.
+
+    Pass ``browser`` to reuse a running browser (TC008) instead of launching one.
+    """
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_notify(seed, count, rate, roles, observers, port, concurrency, timeout_s,
+                                    own_browser)
+    spec, manifest = load_team(seed)
+    cid = company_id(seed, 1)
+    tag = "NB-%s" % RUN_ID[-6:]
+    sender = AuthEmulator().sign_in(user_email(seed, 1, "yonetici", 1), DEFAULT_PASSWORD)["idToken"]
+    functions = FunctionsEmulator()
+    watchers = [user_email(seed, 1, role, n) for role in ("tekniker", "bekci")
+                for n in range(1, spec.role_counts[role] + 1)
+                if roles is None or role in roles][:observers]
+    loop = asyncio.get_running_loop()
+    triggers, contexts = [], []
+    with PushSink(port) as sink, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        try:
+            for email in watchers:
+                contexts.append(await observer(browser, email, re.escape(tag) + r" #(\d+)", int(timeout_s * 1000)))
+            started = time.monotonic()
+            jobs = []
+            for index in range(count):
+                delay = started + index / rate - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                payload = {"companyId": cid, "title": "Saha duyurusu %s #%d" % (tag, index),
+                           "message": "Harness bildirim gecikme testi", "type": "info",
+                           "actionUrl": "/bildirimler"}
+                if roles:
+                    payload["roles"] = list(roles)
+                jobs.append(loop.run_in_executor(pool, _trigger, functions, sender, index, payload))
+            pending = asyncio.gather(*jobs)
+            settled = await _settle(sink, lambda: sum(t.result()["created"] or 0 for t in jobs
+                                                      if t.done()) * manifest["devices"],
+                                    pending.done, timeout_s)
+            triggers = await pending
+            seen = [await page.evaluate("() => window.__harnessSeen || {}") for _, page in contexts]
+        finally:
+            for context, _ in contexts:
+                await context.close()
+        pushes = list(sink.pushes)
+    report = analyze(triggers, pushes, seen, tag, manifest["devices"])
+    report.update({"run_id": RUN_ID, "seed": seed, "team": sum(spec.role_counts.values()),
+                   "devices_per_user": manifest["devices"], "rate": rate, "roles": roles, "observers": watchers,
+                   "settled": settled, "sink": sink.url})
+    return report
+
+
+def print_report(report):
+    print("%d notifications at %.1f/s to a team of %d x %d devices: %d documents, %d/%d pushes (%d missing)" % (
+        report["notifications"], report["rate"], report["team"], report["devices_per_user"], report["documents"],
+        report["pushes_received"], report["pushes_expected"], report["pushes_missing"]))
+    print("%-12s %6s %9s %9s %9s %9s" % ("", "n", "p50", "p95", "p99", "max"))
+    for metric in ("callable_ms", "push_ms", "fanout_ms", "in_app_ms"):
+        s = report[metric]
+        if not s["n"]:
+            print("%-12s %6d %9s" % (metric, 0, "-"))
+            continue
+        print("%-12s %6d %9.0f %9.0f %9.0f %9.0f" % (metric, s["n"], s["median"], s["p95"], s["p99"], s["max"]))
+    print("fan-out: %.1f pushes/s, %.1f documents/s over %.1f s%s" % (
+        report["pushes_per_s"], report["documents_per_s"], report["window_s"],
+        "" if report["settled"] else " (timed out waiting for pushes)"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.notify")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="load a field team with registered devices and logins")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    seed_cmd.add_argument("--team", type=int, default=DEFAULT_TEAM)
+    seed_cmd.add_argument("--devices", type=int, default=DEVICES_PER_USER, help="devices per user")
+    seed_cmd.add_argument("--workers", type=int, default=8)
+    run_cmd = sub.add_parser("run", help="trigger notifications and measure delivery")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--count", type=int, default=20)
+    run_cmd.add_argument("--rate", type=float, default=2.0, help="callable invocations per second")
+    run_cmd.add_argument("--roles", nargs="+", default=None, help="target roles (default: whole company)")
+    run_cmd.add_argument("--observers", type=int, default=2, help="team members watching /bildirimler")
+    run_cmd.add_argument("--port", type=int, default=SINK_PORT)
+    run_cmd.add_argument("--concurrency", type=int, default=16, help="callables in flight")
+    run_cmd.add_argument("--timeout", type=float, default=SETTLE_TIMEOUT_S, help="seconds to wait for pushes")
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        manifest = seed_team(args.seed, args.team, args.devices, args.workers)
+        print("%d users x %d devices, logins in %s" % (len(manifest["uids"]), manifest["devices"],
+                                                       manifest["credentials"]))
+        return 0
+
+    report = asyncio.run(run_notify(args.seed, args.count, args.rate, args.roles, args.observers, args.port,
+                                    args.concurrency, args.timeout))
+    out = output_path("notify", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if report["pushes_missing"] or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Offline data-entry throughput against Firestore's IndexedDB write queue.
+
+The scenario logs in, opens the fault list, takes the context offline and
+enters a batch of fault and shift records through the app's own services
+(``createFault`` / ``createVardiyaBildirimi``), exactly as the forms do but
+without typing each one. It then reconnects and records:
+
+* local entry time until every write is persisted in the IndexedDB queue
+* queue depth (Firestore ``mutations`` store) and origin storage usage
+* drain time until the backend acknowledged every write
+* main-thread lag and long tasks while the queue drains
+
+Needs an app build running against the emulators, dev server or preview::
+
+    VITE_USE_FIREBASE_EMULATORS=true npm run dev
+    python -m harness.offline_entry --faults 300 --shifts 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .config import RUN_ID, output_path
+from .flows import current_profile, login, require_emulators
+from .perf import PerfRecorder
+from .session import browser_session, new_context, open_app
+from .stats import summarize
+
+PROBES_SCRIPT = r"""
+async () => {
+  // Load the services while online; their chunks cannot be fetched offline
+  await window.__harness.service('arizaService');
+  await window.__harness.service('vardiyaService');
+  window.__harnessQueueDepth = async () => {
+    const dbs = indexedDB.databases ? await indexedDB.databases() : [];
+    const info = dbs.find((d) => d.name && d.name.startsWith('firestore/') && d.name.endsWith('/main'));
+    if (!info) return null;
+    return await new Promise((resolve) => {
+      const req = indexedDB.open(info.name);
+      req.onerror = () => resolve(null);
+      req.onsuccess = () => {
+        const db = req.result;
+        try {
+          const count = db.transaction('mutations', 'readonly').objectStore('mutations').count();
+          count.onsuccess = () => { db.close(); resolve(count.result); };
+          count.onerror = () => { db.close(); resolve(null); };
+        } catch (e) {
+          db.close();
+          resolve(null);
+        }
+      };
+    });
+  };
+  window.__harnessStorageUsage = async () => {
+    const estimate = navigator.storage ? await navigator.storage.estimate() : {};
+    return estimate.usage || null;
+  };
+  // setTimeout drift: how late a 50 ms timer fires while the drain runs
+  const lag = window.__harnessLag = { samples: [] };
+  let last = performance.now();
+  const tick = () => {
+    const now = performance.now();
+    lag.samples.push(Math.max(0, now - last - 50));
+    last = now;
+    setTimeout(tick, 50);
+  };
+  setTimeout(tick, 50);
+}
+"""
+
+ENTER_BATCH_SCRIPT = r"""
+async ({ faults, shifts, profile }) => {
+  const { createFault } = await window.__harness.service('arizaService');
+  const { createVardiyaBildirimi } = await window.__harness.service('vardiyaService');
+  const state = window.__harnessOffline = { issued: 0, acked: 0, failed: 0, errors: [] };
+  const track = (promise) => {
+    state.issued += 1;
+    promise.then(
+      () => { state.acked += 1; },
+      (err) => { state.failed += 1; if (state.errors.length < 5) state.errors.push(String(err)); },
+    );
+  };
+  const started = performance.now();
+  for (let i = 0; i < faults; i++) {
+    track(createFault({
+      companyId: profile.companyId,
+      santralId: '',
+      sahaId: '',
+      saha: 'Harness Offline Saha',
+      baslik: `Offline arıza #${i + 1}`,
+      aciklama: 'Offline veri girişi yük testi',
+      oncelik: 'normal',
+      fotograflar: [],
+      raporlayanId: profile.uid,
+    }));
+  }
+  for (let i = 0; i < shifts; i++) {
+    track(createVardiyaBildirimi({
+      companyId: profile.companyId,
+      olusturanId: profile.uid,
+      olusturanAdi: profile.ad,
+      olusturanRol: profile.rol,
+      sahaId: 'harness-offline-saha',
+      sahaAdi: 'Harness Offline Saha',
+      tarih: new Date(),
+      vardiyaTipi: ['sabah', 'ogle', 'aksam', 'gece'][i % 4],
+      vardiyaSaatleri: { baslangic: '08:00', bitis: '16:00' },
+      personeller: [{ id: profile.uid, ad: profile.ad, rol: profile.rol }],
+      durum: 'normal',
+      acilDurum: false,
+      gozlemler: [],
+      yapılanIsler: [`Offline vardiya #${i + 1}`],
+      fotograflar: [],
+    }));
+  }
+  return performance.now() - started;
+}
+"""
+
+
+async def _poll(page, timeout_s, done, interval_s=0.2):
+    """Sample queue state until ``done(sample, state)`` is true; return (elapsed_ms, timeline)."""
+    timeline = []
+    started = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - started
+        state = await page.evaluate("() => window.__harnessOffline")
+        depth = await page.evaluate("() => window.__harnessQueueDepth()")
+        sample = {"t_ms": round(elapsed * 1000), "queue_depth": depth,
+                  "acked": state["acked"], "failed": state["failed"]}
+        timeline.append(sample)
+        if done(sample, state):
+            return elapsed * 1000, timeline
+        if elapsed > timeout_s:
+            raise TimeoutError("offline queue did not settle within %ss: %s" % (timeout_s, sample))
+        await asyncio.sleep(interval_s)
+
+
+async def run_offline_batch(context, page, faults, shifts, timeout_s=300):
+    """Enter ``faults`` + ``shifts`` records offline, reconnect and measure the drain."""
+    await require_emulators(page)
+    profile = await current_profile(page)
+    await open_app(page, "/arizalar")
+    await page.evaluate(PROBES_SCRIPT)
+    total = faults + shifts
+
+    await context.set_offline(True)
+    issue_ms = await page.evaluate(ENTER_BATCH_SCRIPT, {"faults": faults, "shifts": shifts, "profile": profile})
+    # Local entry is done once every write sits in the persisted mutation queue
+    entry_ms, _ = await _poll(page, timeout_s, lambda s, _: (s["queue_depth"] or 0) >= total)
+    queued_depth = await page.evaluate("() => window.__harnessQueueDepth()")
+    storage_offline = await page.evaluate("() => window.__harnessStorageUsage()")
+
+    await page.evaluate("() => { window.__harnessLag.samples = []; }")
+    await context.set_offline(False)
+    drain_ms, timeline = await _poll(
+        page, timeout_s,
+        lambda s, state: state["acked"] + state["failed"] >= total and not s["queue_depth"])
+    lag = await page.evaluate("() => window.__harnessLag.samples")
+    state = await page.evaluate("() => window.__harnessOffline")
+    storage_after = await page.evaluate("() => window.__harnessStorageUsage()")
+
+    return {
+        "records": total,
+        "faults": faults,
+        "shifts": shifts,
+        "issue_ms": issue_ms,
+        "entry_ms": entry_ms,
+        "entry_per_s": total / (entry_ms / 1000) if entry_ms else None,
+        "queue_depth_offline": queued_depth,
+        "storage_bytes_offline": storage_offline,
+        "storage_bytes_after": storage_after,
+        "drain_ms": drain_ms,
+        "drain_per_s": total / (drain_ms / 1000) if drain_ms else None,
+        "acked": state["acked"],
+        "failed": state["failed"],
+        "errors": state["errors"],
+        "lag_ms": summarize(lag),
+        "timeline": timeline,
+    }
+
+
+async def _main(args):
+    perf = PerfRecorder("offline_entry")
+    try:
+        async with browser_session(headless=not args.headed) as browser:
+            context = await new_context(browser)
+            await perf.attach(context)
+            page = await context.new_page()
+            await login(page)
+            result = await run_offline_batch(context, page, args.faults, args.shifts, args.timeout)
+            await perf.flush()
+            await context.close()
+    finally:
+        perf.close()
+    result["run_id"] = RUN_ID
+    result["long_task_ms"] = sum(s["long_task_ms"] or 0 for s in perf.samples)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.offline_entry")
+    parser.add_argument("--faults", type=int, default=200)
+    parser.add_argument("--shifts", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per phase")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(_main(args))
+    out = output_path("offline", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print("%d records: entry %.0f ms (%.0f/s), drain %.0f ms (%.0f/s), queue %s, storage %s bytes" % (
+        result["records"], result["entry_ms"], result["entry_per_s"] or 0, result["drain_ms"],
+        result["drain_per_s"] or 0, result["queue_depth_offline"], result["storage_bytes_offline"]))
+    print("main-thread lag while draining: p95 %s ms, max %s ms" % (result["lag_ms"]["p95"], result["lag_ms"]["max"]))
+    print("report written to %s" % out)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
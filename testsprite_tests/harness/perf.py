@@ -0,0 +1,337 @@
+"""Web performance metrics for every page a harness test visits.
+
+A ``PerfRecorder`` attached to a browser context injects a small
+``PerformanceObserver`` script into each page and takes a sample whenever the
+main frame navigates (including React Router history navigations). A sample
+holds navigation timing, FCP/LCP/CLS/INP, long tasks, the JS heap and the bytes
+transferred per resource type. Samples go into a SQLite time-series store and
+are checked against the per-route budgets in ``perf_budgets.json``.
+
+Compare releases from the command line::
+
+    python -m harness.perf report --metric lcp_ms
+"""
+import argparse
+import asyncio
+import json
+import re
+import sqlite3
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from playwright import async_api
+
+from .config import RUN_ID, output_path, release_label
+
+BUDGETS_PATH = Path(__file__).resolve().parent / "perf_budgets.json"
+
+METRICS = (
+    "ttfb_ms", "dcl_ms", "load_ms", "fcp_ms", "lcp_ms", "cls", "inp_ms",
+    "long_tasks", "long_task_ms", "heap_bytes", "transfer_bytes",
+)
+
+# Injected before any app script runs. Everything is accumulated in the page
+# and handed over (then reset) by __harnessPerfTake so each sample only covers
+# what happened since the previous one.
+PERF_INIT_SCRIPT = r"""
+(() => {
+  if (window.__harnessPerf) return;
+  const state = { lcp: null, fcp: null, cls: 0, interactions: new Map(), longTasks: [], resourceIndex: 0, navReported: false };
+  window.__harnessPerf = state;
+  try { performance.setResourceTimingBufferSize(10000); } catch (e) {}
+  const observe = (type, cb, extra) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(cb)).observe(Object.assign({ type, buffered: true }, extra));
+    } catch (e) {}
+  };
+  observe('largest-contentful-paint', (e) => { state.lcp = e.startTime; });
+  observe('paint', (e) => { if (e.name === 'first-contentful-paint') state.fcp = e.startTime; });
+  observe('layout-shift', (e) => { if (!e.hadRecentInput) state.cls += e.value; });
+  observe('longtask', (e) => { state.longTasks.push(e.duration); });
+  observe('event', (e) => {
+    if (!e.interactionId) return;
+    const prev = state.interactions.get(e.interactionId) || 0;
+    if (e.duration > prev) state.interactions.set(e.interactionId, e.duration);
+  }, { durationThreshold: 16 });
+
+  const bucket = (r) => {
+    const t = r.initiatorType, n = r.name.split('?')[0];
+    if (t === 'fetch' || t === 'xmlhttprequest' || t === 'beacon') return 'xhr';
+    if (/\.(m?js|jsx|tsx?)$/.test(n) || t === 'script') return 'script';
+    if (/\.css$/.test(n) || t === 'css') return 'stylesheet';
+    if (/\.(woff2?|ttf|otf|eot)$/.test(n)) return 'font';
+    if (/\.(png|jpe?g|gif|svg|webp|avif|ico)$/.test(n) || t === 'img' || t === 'image') return 'image';
+    return 'other';
+  };
+
+  window.__harnessPerfTake = () => {
+    const out = { route: location.pathname, navigation: null, fcp: null, lcp: null };
+    if (!state.navReported) {
+      const nav = performance.getEntriesByType('navigation')[0];
+      if (nav) {
+        out.navigation = {
+          ttfb: nav.responseStart,
+          domContentLoaded: nav.domContentLoadedEventEnd,
+          load: nav.loadEventEnd || null,
+          transferSize: nav.transferSize || 0,
+        };
+        out.fcp = state.fcp;
+        out.lcp = state.lcp;
+        state.navReported = true;
+      }
+    }
+    out.cls = state.cls;
+    state.cls = 0;
+    const durations = Array.from(state.interactions.values());
+    out.inp = durations.length ? Math.max.apply(null, durations) : null;
+    state.interactions.clear();
+    out.longTasks = { count: state.longTasks.length, total: state.longTasks.reduce((a, b) => a + b, 0) };
+    state.longTasks = [];
+    const entries = performance.getEntriesByType('resource');
+    const resources = {};
+    for (const r of entries.slice(state.resourceIndex)) {
+      const key = bucket(r);
+      const agg = resources[key] || (resources[key] = { count: 0, transfer: 0, decoded: 0 });
+      agg.count += 1;
+      agg.transfer += r.transferSize || 0;
+      agg.decoded += r.decodedBodySize || 0;
+    }
+    state.resourceIndex = entries.length;
+    out.resources = resources;
+    out.heap = performance.memory ? performance.memory.usedJSHeapSize : null;
+    return out;
+  };
+})();
+"""
+
+_ID_SEGMENT = re.compile(r"^(?:\d+|[0-9a-f-]{16,}|[A-Za-z0-9]{20,})$")
+
+
+def normalize_route(path):
+    """Collapse document ids in a path so budgets apply per route, not per record."""
+    parts = [":id" if _ID_SEGMENT.match(p) else p for p in path.split("/") if p]
+    return "/" + "/".join(parts)
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def budget_for(route, budgets):
+    limits = dict(budgets.get("default", {}))
+    limits.update(budgets.get("routes", {}).get(route, {}))
+    return limits
+
+
+def check_budgets(sample, budgets):
+    """Return a human readable line for every metric over its route budget."""
+    violations = []
+    for metric, limit in budget_for(sample["route"], budgets).items():
+        value = sample.get(metric)
+        if value is not None and value > limit:
+            violations.append("%s %s: %s=%g exceeds budget %g" % (
+                sample["test_id"], sample["route"], metric, value, limit))
+    return violations
+
+
+def _to_sample(raw, test_id, label):
+    nav = raw.get("navigation") or {}
+    resources = raw.get("resources") or {}
+    transfer = sum(r["transfer"] for r in resources.values()) + (nav.get("transferSize") or 0)
+    return {
+        "run_id": RUN_ID,
+        "release": release_label(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "test_id": test_id,
+        "route": normalize_route(raw.get("route") or "/"),
+        "label": label,
+        "ttfb_ms": nav.get("ttfb"),
+        "dcl_ms": nav.get("domContentLoaded"),
+        "load_ms": nav.get("load"),
+        "fcp_ms": raw.get("fcp"),
+        "lcp_ms": raw.get("lcp"),
+        "cls": raw.get("cls"),
+        "inp_ms": raw.get("inp"),
+        "long_tasks": raw["longTasks"]["count"],
+        "long_task_ms": raw["longTasks"]["total"],
+        "heap_bytes": raw.get("heap"),
+        "transfer_bytes": transfer,
+        "resources": resources,
+    }
+
+
+def _is_empty(sample):
+    return (sample["ttfb_ms"] is None and not sample["resources"] and not sample["long_tasks"]
+            and sample["inp_ms"] is None and not sample["cls"])
+
+
+class PerfStore:
+    """Append-only SQLite time series of perf samples, indexed by route and time."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS samples (
+        id INTEGER PRIMARY KEY,
+        run_id TEXT NOT NULL,
+        release TEXT NOT NULL,
+        recorded_at TEXT NOT NULL,
+        test_id TEXT NOT NULL,
+        route TEXT NOT NULL,
+        label TEXT,
+        ttfb_ms REAL, dcl_ms REAL, load_ms REAL, fcp_ms REAL, lcp_ms REAL,
+        cls REAL, inp_ms REAL, long_tasks INTEGER, long_task_ms REAL,
+        heap_bytes INTEGER, transfer_bytes INTEGER,
+        resources TEXT
+    );
+    CREATE INDEX IF NOT EXISTS samples_route_time ON samples (route, recorded_at);
+    CREATE INDEX IF NOT EXISTS samples_release ON samples (release, route);
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else output_path("perf.sqlite")
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(self.SCHEMA)
+
+    def add(self, sample):
+        columns = ("run_id", "release", "recorded_at", "test_id", "route", "label") + METRICS
+        values = [sample.get(c) for c in columns] + [json.dumps(sample.get("resources") or {})]
+        self.db.execute(
+            "INSERT INTO samples (%s, resources) VALUES (%s)" % (", ".join(columns), ", ".join("?" * len(values))),
+            values,
+        )
+        self.db.commit()
+
+    def releases(self):
+        rows = self.db.execute("SELECT release, MIN(recorded_at) AS first FROM samples GROUP BY release ORDER BY first")
+        return [r[0] for r in rows]
+
+    def medians(self, release, metric):
+        if metric not in METRICS:
+            raise ValueError("unknown metric %r" % metric)
+        rows = self.db.execute(
+            "SELECT route, %s FROM samples WHERE release = ? AND %s IS NOT NULL" % (metric, metric), (release,))
+        by_route = {}
+        for route, value in rows:
+            by_route.setdefault(route, []).append(value)
+        return {route: statistics.median(values) for route, values in by_route.items()}
+
+    def close(self):
+        self.db.close()
+
+
+class PerfRecorder:
+    """Collects perf samples for every page opened in the attached contexts."""
+
+    def __init__(self, test_id, store=None, budgets=None, settle_ms=1500):
+        self.test_id = test_id
+        self.store = store or PerfStore()
+        self._owns_store = store is None
+        self.budgets = budgets if budgets is not None else load_budgets()
+        self.settle_ms = settle_ms
+        self.samples = []
+        self.violations = []
+        self._pages = []
+        self._pending = {}
+
+    async def attach(self, context):
+        await context.add_init_script(PERF_INIT_SCRIPT)
+        context.on("page", self._track)
+        for page in context.pages:
+            self._track(page)
+
+    def _track(self, page):
+        self._pages.append(page)
+
+        def on_navigated(frame):
+            if frame == page.main_frame:
+                self._schedule(page)
+
+        page.on("framenavigated", on_navigated)
+
+    def _schedule(self, page):
+        # Redirect chains (/ -> /login -> /dashboard) collapse into one sample
+        task = self._pending.get(page)
+        if task and not task.done():
+            task.cancel()
+        self._pending[page] = asyncio.ensure_future(self._sample_later(page))
+
+    async def _sample_later(self, page):
+        await asyncio.sleep(self.settle_ms / 1000)
+        if not page.is_closed():
+            await self.sample(page)
+
+    async def sample(self, page, label=None):
+        """Record everything measured on ``page`` since its previous sample."""
+        try:
+            raw = await page.evaluate("() => window.__harnessPerfTake ? window.__harnessPerfTake() : null")
+        except async_api.Error:
+            return None
+        if not raw:
+            return None
+        sample = _to_sample(raw, self.test_id, label)
+        if _is_empty(sample):
+            return None
+        self.store.add(sample)
+        self.samples.append(sample)
+        self.violations.extend(check_budgets(sample, self.budgets))
+        return sample
+
+    async def settle(self):
+        """Wait for the samples scheduled after navigations."""
+        pending = [t for t in self._pending.values() if not t.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._pending.clear()
+
+    def navigation_sample(self):
+        """First sample holding navigation timing and LCP (reported once per document), or None."""
+        return next((sample for sample in self.samples if sample["ttfb_ms"] is not None), None)
+
+    async def flush(self):
+        """Wait for scheduled samples and record whatever is left on open pages."""
+        await self.settle()
+        for page in self._pages:
+            if not page.is_closed():
+                await self.sample(page, label="flush")
+
+    def close(self):
+        if self._owns_store:
+            self.store.close()
+
+
+def compare_releases(store, metric, threshold):
+    """Yield (route, previous, latest, change, regressed) for routes present in the last two releases."""
+    releases = store.releases()
+    if len(releases) < 2:
+        return
+    previous, latest = store.medians(releases[-2], metric), store.medians(releases[-1], metric)
+    for route in sorted(set(previous) & set(latest)):
+        before, after = previous[route], latest[route]
+        change = (after - before) / before if before else 0.0
+        yield route, before, after, change, change > threshold
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.perf")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="compare the last two releases per route")
+    report.add_argument("--metric", default="lcp_ms", choices=METRICS)
+    report.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    report.add_argument("--db", default=None)
+    args = parser.parse_args(argv)
+
+    store = PerfStore(args.db)
+    try:
+        regressions = 0
+        for route, before, after, change, regressed in compare_releases(store, args.metric, args.threshold):
+            regressions += regressed
+            print("%-32s %10.1f -> %10.1f  %+6.1f%%%s" % (route, before, after, change * 100, "  REGRESSION" if regressed else ""))
+    finally:
+        store.close()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
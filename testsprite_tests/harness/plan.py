@@ -0,0 +1,236 @@
+"""Compile ``testsprite_frontend_test_plan.json`` into step lists for one in-process interpreter.
+
+The plan describes every test as prose steps. ``STEP_BINDINGS`` maps step
+phrases to a few ops over the semantic locator keys of ``harness.locators``
+(``click``, ``fill``, ``goto``, ``heading``...). The compiler turns each plan
+entry into lightweight ``Step`` objects and reports the steps that have no
+binding yet. Those steps are listed in the results and are not executed; a
+test with any unbound or skipped step is recorded as BLOCKED, never PASSED.
+
+All compiled tests run in one process with one browser, so Python,
+Playwright and Chromium start once per run instead of once per TC file. A
+leading "Log in as ..." step is hoisted out of the test. Tests that then only
+navigate and assert are batched per role into one logged-in context. Tests
+that fill forms or log in again get a fresh context of their own. The
+interpreter is in ``harness.plan_run``, so ``compile`` needs no Playwright::
+
+    python -m harness.plan compile
+    python -m harness.plan run TC013 TC015 --credentials users.csv
+    python -m harness.results ingest .harness/plan/<run_id>.json
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+
+from .config import RUN_ID, TESTS_DIR, credential_pool, output_path
+from .locators import DASHBOARD_READY, SEMANTIC_LOCATORS
+
+PLAN_PATH = TESTS_DIR / "testsprite_frontend_test_plan.json"
+STEP_TIMEOUT_MS = 10000
+DASHBOARD_TEXT = DASHBOARD_READY.split("=", 1)[1]
+
+# Plan role names -> UserRole values in src/types; None means the default credential
+ROLES = {
+    "superadmin": "superadmin",
+    "company admin": "yonetici",
+    "manager": "yonetici",
+    "engineer": "muhendis",
+    "technician": "tekniker",
+    "customer": "musteri",
+    "guard": "bekci",
+}
+_ROLE_WORDS = re.compile(r"\b(%s)\b" % "|".join(sorted(ROLES, key=len, reverse=True)), re.IGNORECASE)
+_ASSERTION_VERBS = re.compile(r"^(verify|check|confirm|ensure|validate)\b", re.IGNORECASE)
+_LOGIN_STEP = re.compile(r"^log in as\b", re.IGNORECASE)
+
+# First matching pattern wins; every op is (name, *args). "{email}" and
+# "{password}" are filled in from the credential of the test's role.
+# "Log in as <role>" steps are handled by the compiler.
+STEP_BINDINGS = [
+    (r"^navigate to login page", [("goto", "/login"), ("visible", "E-posta")]),
+    (r"^enter valid username/email and password", [("fill", "E-posta", "{email}"), ("fill", "Şifre", "{password}")]),
+    (r"^complete 2fa", [("skip", "the web login has no second factor")]),
+    (r"^click login button", [("click", "Giriş Yap"), ("url", "**/dashboard**")]),
+    (r"^verify successful login", [("text", DASHBOARD_TEXT)]),
+    (r"^navigate to the main dashboard", [("goto", "/dashboard")]),
+    (r"^validate that all kpis and charts load within (\d+) seconds",
+     lambda m: [("text", DASHBOARD_TEXT, int(m.group(1)) * 1000)]),
+    (r"^check that minimum stock alerts are generated and visible",
+     [("goto", "/stok"), ("heading", "Stok Kontrol"), ("text", "Stok Uyarıları")]),
+    (r"^filter records on dashboard", [("flow", "open_fault_list"), ("flow", "filter_faults", "acik")]),
+    (r"^navigate through all key pages", [
+        ("goto", "/dashboard"), ("text", DASHBOARD_TEXT),
+        ("goto", "/arizalar"), ("heading", "ARIZALAR"),
+        ("goto", "/bakim"), ("heading", "Bakım Yönetimi"),
+        ("goto", "/ges"), ("heading", "GES Yönetimi"),
+        ("goto", "/stok"), ("heading", "Stok Kontrol"),
+        ("goto", "/vardiya"), ("heading", "Vardiya Bildirimleri"),
+        ("goto", "/bildirimler"), ("heading", "Bildirimler"),
+    ]),
+    (r"^navigate to profile and settings pages",
+     [("goto", "/profile"), ("heading", "Profil Ayarları"), ("goto", "/settings"), ("heading", "Şirket Ayarları")]),
+    (r"^launch mobile app on ios", [("skip", "native app start is measured by harness.startup_bench")]),
+]
+STEP_BINDINGS = [(re.compile(pattern, re.IGNORECASE), ops) for pattern, ops in STEP_BINDINGS]
+
+# Coroutines of harness.flows a "flow" op may call
+FLOWS = ("open_fault_list", "filter_faults", "open_shift_wizard", "wait_for_spinners")
+# Ops that change data or session state; a test using them gets its own context
+WRITE_OPS = {"fill", "login"}
+
+
+class Step:
+    """One op of a compiled test, tagged with the plan step it came from."""
+
+    __slots__ = ("index", "description", "assertion", "op", "args")
+
+    def __init__(self, index, description, assertion, op, args=()):
+        self.index = index
+        self.description = description
+        self.assertion = assertion
+        self.op = op
+        self.args = tuple(args)
+
+    def __str__(self):
+        return "%s(%s)" % (self.op, ", ".join(repr(a) for a in self.args))
+
+
+class CompiledTest:
+    """Steps of one plan entry; ``role`` is the hoisted login, ``unbound`` the prose steps without ops."""
+
+    def __init__(self, entry):
+        self.id = entry["id"]
+        self.title = entry["title"]
+        self.description = entry.get("description", "")
+        self.role = None
+        self.logs_in = False
+        self.login_step = None
+        self.steps = []
+        self.unbound = []
+
+    @property
+    def shareable(self):
+        """Read-only tests that start logged in can share one context per role."""
+        return self.logs_in and not any(step.op in WRITE_OPS for step in self.steps)
+
+    @property
+    def runnable(self):
+        return any(step.op not in ("skip", "login") for step in self.steps)
+
+    @property
+    def bound(self):
+        """Number of plan steps that compiled to ops."""
+        return len({step.index for step in self.steps}) + (self.login_step is not None)
+
+    def source(self):
+        """Readable listing of the compiled steps; its hash identifies the test version."""
+        lines = ["# %s %s" % (self.id, self.title)]
+        if self.logs_in:
+            lines.append("login(%r)" % self.role)
+        lines.extend("%s  # step %d" % (step, step.index + 1) for step in self.steps)
+        lines.extend("# unbound step %d: %s" % (index + 1, text) for index, text in self.unbound)
+        return "\n".join(lines) + "\n"
+
+
+def _role(text):
+    match = _ROLE_WORDS.search(text)
+    return ROLES[match.group(1).lower()] if match else None
+
+
+def bind(description):
+    """Ops for one plan step, or None when no binding matches."""
+    for pattern, ops in STEP_BINDINGS:
+        match = pattern.search(description)
+        if match:
+            return ops(match) if callable(ops) else ops
+    return None
+
+
+def compile_test(entry, registry=SEMANTIC_LOCATORS):
+    test = CompiledTest(entry)
+    for index, step in enumerate(entry.get("steps", [])):
+        description = step["description"]
+        assertion = step.get("type") == "assertion" or bool(_ASSERTION_VERBS.match(description))
+        if _LOGIN_STEP.match(description):
+            if not test.logs_in and not test.steps:
+                test.logs_in, test.role, test.login_step = True, _role(description), index
+            else:
+                test.steps.append(Step(index, description, assertion, "login", [_role(description)]))
+            continue
+        ops = bind(description)
+        if ops is None:
+            test.unbound.append((index, description))
+            continue
+        for op, *args in ops:
+            if op in ("click", "fill", "visible") and args[0] not in registry:
+                raise KeyError("%s step %d uses unknown locator key %r" % (test.id, index + 1, args[0]))
+            if op == "flow" and args[0] not in FLOWS:
+                raise KeyError("%s step %d uses unknown flow %r" % (test.id, index + 1, args[0]))
+            test.steps.append(Step(index, description, assertion, op, args))
+    # Every route except /login sits behind ProtectedRoute, so a test that
+    # does not go through the login form itself starts logged in
+    if not test.logs_in and not any(step.op == "fill" for step in test.steps):
+        test.logs_in = True
+    return test
+
+
+def compile_plan(path=PLAN_PATH, only=None):
+    with open(path, encoding="utf-8") as fh:
+        entries = json.load(fh)
+    return [compile_test(entry) for entry in entries if not only or entry["id"] in only]
+
+
+def credential_for(pool, role):
+    """First credential with a matching ``role`` column, else the first one."""
+    if role:
+        for credential in pool:
+            if credential.get("role") == role:
+                return credential
+    return pool[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.plan")
+    parser.add_argument("--plan", default=str(PLAN_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    compile_cmd = sub.add_parser("compile", help="print the compiled steps and unbound plan steps")
+    compile_cmd.add_argument("tests", nargs="*")
+    run = sub.add_parser("run", help="run compiled tests in one browser")
+    run.add_argument("tests", nargs="*", help="TC ids (default: every test with bound steps)")
+    run.add_argument("--credentials", default=None, help="JSON or CSV pool; a role column picks per-role logins")
+    run.add_argument("--jobs", type=int, default=1, help="isolated tests run concurrently")
+    run.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    tests = compile_plan(args.plan, set(args.tests))
+    if args.command == "compile":
+        for test in tests:
+            print("%s  %d/%d steps bound  %s" % (
+                test.id, test.bound, test.bound + len(test.unbound),
+                "shared:%s" % (test.role or "default") if test.shareable else "isolated"))
+            for line in test.source().splitlines()[1:]:
+                print("    " + line)
+        return 0
+
+    # Only the run needs Playwright
+    from .plan_run import run_plan
+
+    tests = [test for test in tests if test.runnable]
+    print("running %s" % ", ".join(test.id for test in tests))
+    started = time.monotonic()
+    records = asyncio.run(run_plan(tests, credential_pool(args.credentials), not args.headed, args.jobs))
+    out = output_path("plan", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(records, fh, indent=2, ensure_ascii=False)
+    for record in records:
+        print("%-6s %-7s %-18s %s" % (record["title"][:5], record["testStatus"], record["context"],
+                                      record["testError"][:120]))
+    print("%d tests in %.1f s; results written to %s" % (len(records), time.monotonic() - started, out))
+    return 1 if any(record["testStatus"] != "PASSED" for record in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
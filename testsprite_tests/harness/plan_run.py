@@ -0,0 +1,190 @@
+"""Interpreter for the tests ``harness.plan`` compiles.
+
+Kept apart from the compiler so ``python -m harness.plan compile`` works
+where Playwright is not installed; ``python -m harness.plan run`` imports it.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from . import flows
+from .artifacts import FailureArtifacts
+from .console import ConsoleCapture
+from .locators import locators
+from .plan import STEP_TIMEOUT_MS, credential_for
+from .results import utc_now
+from .session import new_context, open_app, playwright_session
+
+
+class Interpreter:
+    """Runs compiled steps on a page; every op is an ``_op_<name>`` coroutine."""
+
+    def __init__(self, pool, timeout_ms=STEP_TIMEOUT_MS):
+        self.pool = pool
+        self.timeout_ms = timeout_ms
+
+    async def login(self, page, role):
+        credential = credential_for(self.pool, role)
+        await flows.login(page, credential["email"], credential["password"], timeout_ms=30000)
+        return credential
+
+    async def run(self, page, test, credential):
+        """Run ``test`` on ``page``; return ``(status, error, step timings)``.
+
+        The status is BLOCKED when every executed step passed but some plan
+        steps were unbound or skipped.
+        """
+        timings = []
+        for step in test.steps:
+            started = time.perf_counter()
+            try:
+                credential = await getattr(self, "_op_" + step.op)(page, credential, *step.args) or credential
+            except (async_api.Error, AssertionError) as exc:
+                timings.append(self._timing(step, started, "FAILED"))
+                kind = "assertion" if step.assertion else "action"
+                first = str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+                return "FAILED", "step %d (%s) %s failed: %s" % (step.index + 1, kind, step, first), timings
+            timings.append(self._timing(step, started, "SKIPPED" if step.op == "skip" else "PASSED"))
+        missing = sorted({index for index, _ in test.unbound} | {s.index for s in test.steps if s.op == "skip"})
+        if missing:
+            total = test.bound + len(test.unbound)
+            return "BLOCKED", "%d of %d plan steps not executed: %s" % (
+                len(missing), total, ", ".join("step %d" % (index + 1) for index in missing)), timings
+        return "PASSED", None, timings
+
+    def _timing(self, step, started, status):
+        return {"step": step.index + 1, "op": str(step), "status": status,
+                "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    async def _op_goto(self, page, credential, path):
+        # Consecutive tests in a shared context often start on the page the last one ended on
+        if urlsplit(page.url).path != path:
+            await open_app(page, path)
+
+    async def _op_click(self, page, credential, key):
+        await (await locators(page).resolve(key, timeout_ms=self.timeout_ms)).click()
+
+    async def _op_fill(self, page, credential, key, value):
+        await (await locators(page).resolve(key, timeout_ms=self.timeout_ms)).fill(value.format_map(credential))
+
+    async def _op_visible(self, page, credential, key):
+        await locators(page).resolve(key, timeout_ms=self.timeout_ms)
+
+    async def _op_text(self, page, credential, text, timeout_ms=None):
+        await page.get_by_text(text).first.wait_for(timeout=timeout_ms or self.timeout_ms)
+
+    async def _op_heading(self, page, credential, name):
+        await page.get_by_role("heading", name=name).first.wait_for(timeout=self.timeout_ms)
+
+    async def _op_url(self, page, credential, pattern):
+        await page.wait_for_url(pattern, timeout=self.timeout_ms)
+
+    async def _op_flow(self, page, credential, name, *args):
+        await getattr(flows, name)(page, *args)
+
+    async def _op_login(self, page, credential, role):
+        if "/login" not in page.url:
+            await locators(page)["Kullanıcı Menüsü"].click()
+            await locators(page)["Çıkış Yap"].click()
+            await page.wait_for_url("**/login**", timeout=self.timeout_ms)
+        return await self.login(page, role)
+
+    async def _op_skip(self, page, credential, reason):
+        pass
+
+
+def _record(test, status, error, timings, context, started):
+    """One result in the ``tmp/test_results.json`` shape, so ``harness.results ingest`` reads it."""
+    return {
+        "testId": "plan-%s" % test.id, "title": "%s-%s" % (test.id, test.title),
+        "description": test.description, "code": test.source(), "testStatus": status, "testError": error or "",
+        "testType": "FRONTEND", "createFrom": "harness.plan", "created": started, "modified": utc_now(),
+        "context": context, "steps": timings, "unbound": [text for _, text in test.unbound],
+    }
+
+
+async def _run_shared(browser, interpreter, role, tests, capture):
+    """Run read-only tests of one role in a single logged-in context."""
+    context = await new_context(browser)
+    await capture.attach(context)
+    artifacts = FailureArtifacts("plan-%s" % (role or "default"))
+    await artifacts.attach(context)
+    records = []
+    label = "shared:%s" % (role or "default")
+    try:
+        page = await context.new_page()
+        try:
+            credential = await interpreter.login(page, role)
+        except async_api.Error as exc:
+            error = "login failed: %s" % str(exc).splitlines()[0]
+            return [_record(test, "FAILED", error, [], label, utc_now()) for test in tests]
+        for test in tests:
+            capture.test_id = test.id
+            started = utc_now()
+            await artifacts.discard()
+            status, error, timings = await interpreter.run(page, test, credential)
+            if status == "FAILED":
+                await artifacts.save(test.id)
+                # A failed step can leave a modal open or the page closed; start the next test clean
+                if page.is_closed():
+                    page = await context.new_page()
+                await open_app(page, "/dashboard")
+            records.append(_record(test, status, error, timings, label, started))
+    finally:
+        artifacts.mark_passed()
+        await artifacts.finalize()
+        await context.close()
+    return records
+
+
+async def _run_isolated(browser, interpreter, test, capture):
+    started = utc_now()
+    context = await new_context(browser)
+    await capture.attach(context)
+    artifacts = FailureArtifacts(test.id)
+    await artifacts.attach(context)
+    try:
+        capture.test_id = test.id
+        page = await context.new_page()
+        credential = credential_for(interpreter.pool, test.role)
+        if test.logs_in:
+            credential = await interpreter.login(page, test.role)
+        status, error, timings = await interpreter.run(page, test, credential)
+        if status != "FAILED":
+            artifacts.mark_passed()
+    except async_api.Error as exc:
+        status, error, timings = "FAILED", "login failed: %s" % str(exc).splitlines()[0], []
+    finally:
+        await artifacts.finalize()
+        await context.close()
+    return _record(test, status, error, timings, "isolated", started)
+
+
+async def run_plan(tests, pool, headless=True, jobs=1):
+    """Run compiled tests in one browser; return result records in plan order."""
+    interpreter = Interpreter(pool)
+    capture = ConsoleCapture("plan", fail_fast=False)
+    shared = defaultdict(list)
+    isolated = []
+    for test in tests:
+        (shared[test.role] if test.shareable else isolated).append(test)
+    records = {}
+    try:
+        async with playwright_session(headless=headless) as (_, browser):
+            for role, group in shared.items():
+                for record in await _run_shared(browser, interpreter, role, group, capture):
+                    records[record["testId"]] = record
+            limit = asyncio.Semaphore(jobs)
+
+            async def isolated_test(test):
+                async with limit:
+                    return await _run_isolated(browser, interpreter, test, capture)
+
+            for record in await asyncio.gather(*(isolated_test(test) for test in isolated)):
+                records[record["testId"]] = record
+    finally:
+        capture.close(check=False)
+    return [records["plan-%s" % test.id] for test in tests]
@@ -0,0 +1,362 @@
+"""Üretim time-series ingestion and aggregation benchmark.
+
+``seed`` loads one tenant per ``--plants`` size (the company index is the
+size, like ``harness.scale``) and fills it with ``--years`` of 15-minute
+inverter readings per santral, generated as NumPy arrays:
+
+* the daily energy follows the model behind the seeded ``aylikTahminler``
+  (peak sun hours x capacity x PR) with overcast days and 0.5 % yearly
+  degradation on top, so actual lands around 80 % of expected
+* the intraday curve is a daylight bell with per-reading noise; the readings
+  are kW, ``float32``, 96 per day
+
+The readings are then reduced to the documents the app reads and imported in
+``--chunk``-sized batched commits:
+
+* ``uretimOlcumleri/<santral>-<yyyymm>`` - the month's raw readings as packed
+  little-endian float32 bytes (skip with ``--no-raw``)
+* ``uretimVerileri/<santral>-<yyyymmdd>`` - the daily record
+  ``uretimService`` lists (gunlukUretim, anlikGuc, performansOrani, gelir ...)
+* ``santraller/<santral>/aylikUretim/<yıl>`` - the monthly totals
+  ``santralService.getAylikUretim`` reads, in the ``setAylikUretim`` layout
+* ``santraller/<santral>`` - sonUretim and toplamUretim from the readings
+
+The seed report covers generation time, array bytes and import throughput
+(documents/min, readings/s). ``run`` opens each page cold as the tenant's
+yönetici and reports, per size:
+
+* ``uretim``    - /uretim until every production document is in
+  (``getProductionData`` reads the whole company)
+* ``monthly``   - "Tümünü Seç" for the last data year until the monthly
+  expected-vs-actual table has settled (``getAylikUretim`` per santral)
+* ``ges``       - /ges, santral statistics without production documents
+* ``dashboard`` - /dashboard, for comparison
+
+With growth exponents against the daily document count (see ``harness.scale``)::
+
+    python -m harness.production seed --plants 10 50 200 --years 2
+    python -m harness.production run --plants 10 50 200 --runs 3
+    python -m harness.production run --plants 200 --pages uretim monthly
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from playwright import async_api
+
+from .config import FIREBASE_PROJECT, FIRESTORE_EMULATOR, RUN_ID, output_path
+from .dataset import (DEFAULT_PASSWORD, END_DATE, MONTHS, DatasetSpec, company_id, create_logins, generate, load,
+                      user_email)
+from .emulator import MAX_BATCH_WRITES, AuthEmulator, FirestoreEmulator
+from .flows import login, require_emulators, wait_for_spinners
+from .locators import DASHBOARD_READY
+from .scale import READS_INIT_SCRIPT, frame_now, growth, heap_after_gc, settle_reads
+from .session import browser_session, new_context, open_app
+from .stats import summarize
+
+DEFAULT_SEED = 49
+DEFAULT_PLANTS = (10, 50, 200)
+DEFAULT_YEARS = 2
+SANTRALLER_PER_SAHA = 10
+SLOTS = 96                      # 15-minute readings per day
+SLOT_H = 24 / SLOTS
+CO2_KG_PER_KWH = 0.44           # as in harness.dataset
+PAGE_TIMEOUT_MS = 180000
+PAGES = ("uretim", "monthly", "ges", "dashboard")
+PAGE_READY = {"uretim": "text=Santral Seçimi", "monthly": "text=Santral Seçimi", "ges": "text=/GES-\\d+/",
+              "dashboard": DASHBOARD_READY}
+PAGE_PATHS = {"uretim": "/uretim", "monthly": "/uretim", "ges": "/ges", "dashboard": "/dashboard"}
+MONTHLY_TABLE = "Yılı Aylık Üretim Tablosu"
+
+
+def production_spec(seed, plants, years=DEFAULT_YEARS):
+    """One company with ``plants`` santraller (rounded up to whole sahalar) and no other records."""
+    per_saha = min(plants, SANTRALLER_PER_SAHA)
+    return DatasetSpec(seed=seed, companies=1, sahalar=math.ceil(plants / per_saha), santraller=per_saha,
+                       years=years, faults=0, bakim=0, vardiya=0, stok=0, movements=0, production=False)
+
+
+def sun_hours(doy, lat):
+    """``dataset._sun_hours`` over an array of days of the year."""
+    season = np.cos(2 * np.pi * (doy - 172) / 365)
+    return np.maximum(0.5, 5.0 + 2.5 * season - 0.08 * (lat - 37))
+
+
+def readings(plant, start, days, rng):
+    """``(days, SLOTS)`` float32 kW of one santral from ``start``; zero before its kurulum date."""
+    doy = np.array([(start + timedelta(days=d)).timetuple().tm_yday for d in range(days)])
+    season = np.cos(2 * np.pi * (doy - 172) / 365)
+    cloud = 1.0 - rng.random(days) ** 3 * 0.85
+    installed = (plant["kurulumTarihi"].date() - start).days
+    age = np.maximum(0, np.arange(days) - installed) / 365
+    energy = plant["kapasite"] * sun_hours(doy, plant["konum"]["lat"]) * plant["performans"] / 100 * cloud
+    energy *= (1 - 0.005 * age) * (np.arange(days) >= installed)
+
+    # Daylight from ~9 h in winter to ~15 h in summer around 12:30 local time
+    length = 12 + 3 * season
+    hours = (np.arange(SLOTS) + 0.5) * SLOT_H
+    phase = (hours[None, :] - (12.5 - length[:, None] / 2)) / length[:, None]
+    shape = np.where((phase > 0) & (phase < 1), np.sin(np.pi * np.clip(phase, 0, 1)) ** 1.5, 0.0)
+    shape /= shape.sum(axis=1, keepdims=True) * SLOT_H
+    noise = np.clip(rng.normal(1.0, 0.04 + 0.2 * (1 - cloud)[:, None], (days, SLOTS)), 0.2, 1.3)
+    return np.minimum(energy[:, None] * shape * noise, plant["kapasite"]).astype(np.float32)
+
+
+def production_docs(plant, cid, start, kw):
+    """Raw, daily, monthly and santral documents for the readings ``kw`` of one santral."""
+    pid = plant["id"]
+    days = np.array([start + timedelta(days=d) for d in range(len(kw))])
+    daily = kw.sum(axis=1, dtype=np.float64) * SLOT_H
+    peak = kw.max(axis=1)
+    potential = plant["kapasite"] * sun_hours(np.array([d.timetuple().tm_yday for d in days]), plant["konum"]["lat"])
+    months = np.array([d.year * 100 + d.month for d in days])
+    live = daily > 0
+
+    for month in np.unique(months[live]):
+        rows = (months == month) & live
+        yield "uretimOlcumleri/%s-%d" % (pid, month), {
+            "companyId": cid, "santralId": pid, "ay": int(month), "baslangic": _at(days[rows][0], 0),
+            "gunSayisi": int(rows.sum()), "aralikDakika": int(SLOT_H * 60), "format": "float32-le",
+            "guc": kw[rows].astype("<f4").tobytes()}
+
+    for i in np.flatnonzero(live):
+        kwh = round(float(daily[i]), 1)
+        yield "uretimVerileri/%s-%s" % (pid, days[i].strftime("%Y%m%d")), {
+            "companyId": cid, "santralId": pid, "tarih": _at(days[i], 20), "gunlukUretim": kwh,
+            "anlikGuc": round(float(peak[i]), 1), "performansOrani": round(float(daily[i] / potential[i] * 100), 1),
+            "gelir": round(kwh * plant["elektrikFiyati"], 2), "dagitimBedeli": round(kwh * plant["dagitimBedeli"], 2),
+            "tasarrufEdilenCO2": round(kwh * CO2_KG_PER_KWH, 1),
+            "hava": {"radyasyon": round(float(daily[i] / plant["kapasite"] * 1000 / 8), 1)},
+            "olusturanKisi": {"id": "harness", "ad": "Veri üretici"}, "olusturmaTarihi": _at(days[i], 20)}
+
+    for year in np.unique(months // 100):
+        totals = np.bincount(months[months // 100 == year] % 100 - 1, weights=daily[months // 100 == year],
+                             minlength=12)
+        aylik = {name: round(float(v)) for name, v in zip(MONTHS, totals)}
+        total = sum(aylik.values())
+        yield "santraller/%s/aylikUretim/%d" % (pid, year), dict(
+            aylik, aylik=aylik, yillikToplam=total, co2Tasarrufukg=round(total * 0.756, 1),
+            guncellenmeTarihi=datetime.now(timezone.utc))
+
+    last = np.flatnonzero(live)
+    fields = {key: value for key, value in plant.items() if key != "id"}
+    yield "santraller/%s" % pid, dict(fields, sonUretim=round(float(daily[last[-1]]), 1) if len(last) else 0.0,
+                                      toplamUretim=round(float(daily.sum()), 1))
+
+
+def _at(day, hour):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+
+
+class _Generation:
+    """Document stream of one tenant that times the NumPy work and counts the readings."""
+
+    def __init__(self, spec, index, uid_for, raw=True):
+        self.spec = spec
+        self.index = index
+        self.uid_for = uid_for
+        self.raw = raw
+        self.plants = 0
+        self.readings = 0
+        self.array_bytes = 0
+        self.seconds = 0.0
+        self.docs = {}
+
+    def __iter__(self):
+        cid = company_id(self.spec.seed, self.index)
+        start = END_DATE - timedelta(days=self.spec.days)
+        for path, fields in generate(self.spec, self.uid_for, companies=[self.index]):
+            if not path.startswith("santraller/"):
+                yield path, fields
+                continue
+            plant = dict(fields, id=path.split("/", 1)[1])
+            began = time.perf_counter()
+            kw = readings(plant, start, self.spec.days, np.random.default_rng([self.spec.seed, self.index,
+                                                                               self.plants]))
+            docs = list(production_docs(plant, cid, start, kw))
+            self.seconds += time.perf_counter() - began
+            self.plants += 1
+            self.readings += int(np.count_nonzero(kw.any(axis=1))) * SLOTS
+            self.array_bytes += kw.nbytes
+            for doc_path, doc in docs:
+                if not self.raw and doc_path.startswith("uretimOlcumleri/"):
+                    continue
+                kind = doc_path.split("/")[0] if "/aylikUretim/" not in doc_path else "aylikUretim"
+                self.docs[kind] = self.docs.get(kind, 0) + 1
+                yield doc_path, doc
+
+    def stats(self):
+        return {"plants": self.plants, "days": self.spec.days, "readings": self.readings,
+                "array_mb": round(self.array_bytes / 1024 ** 2, 1), "generate_s": round(self.seconds, 2),
+                "documents": dict(self.docs)}
+
+
+def manifest_path(seed):
+    return output_path("production", "ds%d.json" % seed)
+
+
+def seed_tenants(plants, seed=DEFAULT_SEED, years=DEFAULT_YEARS, chunk=MAX_BATCH_WRITES, raw=True, workers=8):
+    """Generate and import one production tenant per size; return the manifest."""
+    client, auth = FirestoreEmulator(), AuthEmulator()
+    manifest = {"seed": seed, "years": years, "project": FIREBASE_PROJECT, "tenants": {}}
+    for size in plants:
+        spec = production_spec(seed, size, years)
+        credentials = output_path("production", "ds%d-c%d-credentials.csv" % (seed, size))
+        uids, _ = create_logins(spec, auth, companies=[size], path=credentials)
+        print("plants %d: generating %d days of 15-minute readings into %s" % (size, spec.days, FIRESTORE_EMULATOR))
+        stream = _Generation(spec, size, uids.get, raw)
+        stats = load(client, stream, workers=workers, batch_size=chunk)
+        generated = stream.stats()
+        stats["readings_per_s"] = round(generated["readings"] / stats["seconds"]) if stats["seconds"] else None
+        manifest["tenants"][str(size)] = {
+            "companyId": company_id(seed, size), "email": user_email(seed, size, "yonetici", 1),
+            "password": DEFAULT_PASSWORD, "credentials": str(credentials), "chunk": chunk,
+            "generated": generated, "import": stats}
+        print("plants %d: %d readings, %d documents in %.1f s (%d docs/min, %d readings/s; NumPy %.1f s)" % (
+            generated["plants"], generated["readings"], stats["docs"], stats["seconds"], stats["docs_per_min"] or 0,
+            stats["readings_per_s"] or 0, generated["generate_s"]))
+    with open(manifest_path(seed), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+    return manifest
+
+
+async def measure_page(browser, name, tenant, year):
+    """One cold visit of ``name`` as the tenant's yönetici; return the metrics of that visit."""
+    context = await new_context(browser, timeout_ms=PAGE_TIMEOUT_MS)
+    try:
+        await context.add_init_script(READS_INIT_SCRIPT)
+        page = await context.new_page()
+        cdp = await context.new_cdp_session(page)
+        await login(page, tenant["email"], tenant["password"], timeout_ms=PAGE_TIMEOUT_MS)
+        await page.locator(DASHBOARD_READY).first.wait_for()
+        await require_emulators(page)
+
+        # A full navigation restarts both performance.now() and the read counter
+        await open_app(page, PAGE_PATHS[name], timeout_ms=PAGE_TIMEOUT_MS)
+        await page.locator(PAGE_READY[name]).first.wait_for()
+        sample = {"ready_ms": await frame_now(page)}
+        sample["reads"] = await settle_reads(page)
+        sample["settled_ms"] = await frame_now(page)
+        if name == "monthly":
+            await page.locator("select", has=page.locator("option[value='%d']" % year)).first.select_option(
+                str(year))
+            before = await page.evaluate("() => window.__harnessReads")
+            started = await frame_now(page)
+            await page.get_by_role("button", name="Tümünü Seç").click()
+            await page.get_by_text(MONTHLY_TABLE).first.wait_for()
+            await wait_for_spinners(page, PAGE_TIMEOUT_MS)
+            sample["ready_ms"] = await frame_now(page) - started
+            sample["reads"] = await settle_reads(page) - before
+            sample["settled_ms"] = await frame_now(page) - started
+        sample["heap_bytes"] = await heap_after_gc(cdp)
+        return sample
+    finally:
+        await context.close()
+
+
+async def run_production(manifest, plants, pages=PAGES, runs=3, browser=None):
+    """Time ``pages`` ``runs`` times per seeded size; return the results with growth exponents."""
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_production(manifest, plants, pages, runs, own_browser)
+    year = (END_DATE - timedelta(days=1)).year
+    results = {}
+    for name in pages:
+        results[name] = {"sizes": {}, "growth": {}}
+        for size in plants:
+            tenant = manifest["tenants"].get(str(size))
+            if tenant is None:
+                raise SystemExit("plants %d is not seeded; run 'python -m harness.production seed --plants %d'"
+                                 % (size, size))
+            samples, errors = [], []
+            for _ in range(runs):
+                try:
+                    samples.append(await measure_page(browser, name, tenant, year))
+                except (async_api.Error, TimeoutError) as exc:
+                    errors.append(str(exc).splitlines()[0])
+            results[name]["sizes"][str(size)] = {
+                "runs": runs, "errors": errors, "daily_docs": tenant["generated"]["documents"].get("uretimVerileri", 0),
+                "metrics": {key: summarize([s.get(key) for s in samples])
+                            for key in ("ready_ms", "settled_ms", "reads", "heap_bytes")}}
+            print("%-9s %5d plants  %d/%d runs ok" % (name, size, len(samples), runs), flush=True)
+        for metric in ("settled_ms", "reads", "heap_bytes"):
+            points = [(results[name]["sizes"][str(size)]["daily_docs"] or size,
+                       results[name]["sizes"][str(size)]["metrics"][metric]["median"]) for size in plants]
+            results[name]["growth"][metric] = growth(points)
+    return results
+
+
+def print_seed(manifest):
+    print("%7s %10s %11s %9s %9s %11s %11s" % ("plants", "readings", "array MB", "NumPy s", "docs",
+                                                "docs/min", "readings/s"))
+    for size, tenant in sorted(manifest["tenants"].items(), key=lambda item: int(item[0])):
+        g, i = tenant["generated"], tenant["import"]
+        print("%7s %10d %11.1f %9.1f %9d %11s %11s" % (size, g["readings"], g["array_mb"], g["generate_s"],
+                                                      i["docs"], i["docs_per_min"], i["readings_per_s"]))
+
+
+def print_report(results, plants):
+    print("%-9s %7s %10s %10s %10s %8s %9s" % ("page", "plants", "daily docs", "ready ms", "settled ms", "reads",
+                                              "heap MB"))
+    for name, result in results.items():
+        for size in plants:
+            entry = result["sizes"][str(size)]
+            m = {k: v["median"] for k, v in entry["metrics"].items()}
+            print("%-9s %7d %10d %10s %10s %8s %9s%s" % (
+                name, size, entry["daily_docs"], _fmt(m["ready_ms"]), _fmt(m["settled_ms"]), _fmt(m["reads"]),
+                _fmt(m["heap_bytes"] / 1024 ** 2 if m["heap_bytes"] else None, "%.1f"),
+                "  (%d errors)" % len(entry["errors"]) if entry["errors"] else ""))
+        print("%-9s growth   settled %s  reads %s  heap %s" % (
+            name, *("/".join("?" if v is None else "%.2f" % v for v in result["growth"][k])
+                    for k in ("settled_ms", "reads", "heap_bytes"))))
+
+
+def _fmt(value, pattern="%.0f"):
+    return "-" if value is None else pattern % value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.production")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("seed", "generate the readings and import one tenant per size"),
+                            ("run", "time the production pages against the seeded tenants")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--plants", type=int, nargs="+", default=list(DEFAULT_PLANTS))
+        cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    seed_cmd = sub.choices["seed"]
+    seed_cmd.add_argument("--years", type=float, default=DEFAULT_YEARS)
+    seed_cmd.add_argument("--chunk", type=int, default=MAX_BATCH_WRITES, help="documents per batched commit")
+    seed_cmd.add_argument("--no-raw", action="store_true", help="skip the uretimOlcumleri reading archive")
+    seed_cmd.add_argument("--workers", type=int, default=8)
+    run_cmd = sub.choices["run"]
+    run_cmd.add_argument("--pages", nargs="+", default=list(PAGES), choices=PAGES)
+    run_cmd.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    plants = sorted(args.plants)
+    if args.command == "seed":
+        if not 0 < args.chunk <= MAX_BATCH_WRITES:
+            parser.error("--chunk must be between 1 and %d" % MAX_BATCH_WRITES)
+        print_seed(seed_tenants(plants, args.seed, args.years, args.chunk, not args.no_raw, args.workers))
+        return 0
+
+    with open(manifest_path(args.seed), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    results = asyncio.run(run_production(manifest, plants, args.pages, args.runs))
+    report = {"run_id": RUN_ID, "seed": args.seed, "plants": plants, "runs": args.runs,
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "seeded": manifest["tenants"], "results": results}
+    out = output_path("production", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print_report(results, plants)
+    print("report written to %s" % out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""Fill the analysis placeholders of TestSprite reports from the results themselves.
+
+TestSprite pastes the whole browser console into every test section of
+``raw_report.md`` and leaves ``{{TODO:AI_ANALYSIS}}`` for the findings. This
+builder streams the report (or ``test_results.json``) one test at a time:
+
+* console messages are fingerprinted (level, text without timestamps, query
+  strings and numbers, source file) and each test section only lists the
+  fingerprints it hit; the message text appears once in an index
+* every failure gets a root-cause signature such as ``auth/invalid-credential``,
+  ``timeout`` or ``http-400 firestore.googleapis.com``, and failures sharing
+  a signature are grouped in the gaps section
+* the coverage table is filled per requirement group
+
+The input is read twice (counting, then writing), so memory grows with the
+number of distinct messages, not with the report size::
+
+    python -m harness.report
+    python -m harness.report tmp/test_results.json --out report.md
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from .config import TMP_DIR, output_path
+from .impact import TC_FEATURES, tc_scripts
+
+DEFAULT_REPORT_PATH = TMP_DIR / "raw_report.md"
+ANALYSIS_PLACEHOLDER = "{{TODO:AI_ANALYSIS}}"
+GAPS_PLACEHOLDER = "{AI_GNERATED_KET_GAPS_AND_RISKS}"
+SAMPLE_CHARS = 200
+# A message seen in at least this share of tests is environment noise
+NOISE_SHARE = 0.5
+
+_SECTION = re.compile(r"^#### Test (TC\d{3})")
+_MESSAGE = re.compile(r"^\[(ERROR|WARNING|LOG|INFO|DEBUG|VERBOSE)\] (.*)$")
+_LOCATION = re.compile(r"\(at (\S+?):(\d+):(\d+)\)\s*$")
+_TIMESTAMP = re.compile(r"\[\d{4}-\d\d-\d\dT[\d:.]+Z\]\s*")
+_QUERY = re.compile(r"\?[^\s:)]*")
+_NUMBER = re.compile(r"\d+")
+_FIREBASE_CODE = re.compile(r"\b((?:auth|firestore|storage|functions|messaging|app-check)/[a-z-]+)\b")
+_HTTP_STATUS = re.compile(r"status of (\d{3})")
+_HOST = re.compile(r"^https?://([^/:?]+)")
+
+# Failure texts are prose written by the test agent; these map the recurring
+# phrasings to a signature. Checked after timeouts and Firebase error codes.
+PROSE_SIGNATURES = (
+    ("ui/validation-blocked", re.compile(r"validation error", re.I)),
+    ("ui/navigation", re.compile(r"navigation (?:failure|issue)|does not navigate|navigate to .* failed", re.I)),
+    ("ui/action-no-effect", re.compile(r"does not (?:trigger|produce)|not advancing|cannot be submitted|not working", re.I)),
+    ("ui/element-missing", re.compile(r"could not locate|missing or inaccessible|inability to (?:access|create)", re.I)),
+    ("env/native-device", re.compile(r"\biOS device\b|launch the mobile app", re.I)),
+)
+
+
+def parse_console(lines):
+    """Split console log lines into ``(level, text, source)`` messages.
+
+    Stack trace lines belong to the message above them; ``source`` is the
+    ``(at url:line:col)`` location the browser appended to the message.
+    """
+    messages, current = [], None
+    for line in lines:
+        match = _MESSAGE.match(line)
+        if match:
+            if current:
+                messages.append(current)
+            current = [match.group(1), [match.group(2)]]
+        elif current:
+            current[1].append(line)
+    if current:
+        messages.append(current)
+    out = []
+    for level, body in messages:
+        location = _LOCATION.search(body[-1])
+        source = location.group(1).split("?")[0] if location else None
+        text = _LOCATION.sub("", body[0]).strip() if len(body) == 1 else body[0].strip()
+        out.append((level, text, source))
+    return out
+
+
+def fingerprint(level, text, source):
+    normalized = _NUMBER.sub("#", _QUERY.sub("", _TIMESTAMP.sub("", text)))
+    return hashlib.sha1(("%s|%s|%s" % (level, normalized, source or "")).encode("utf-8")).hexdigest()[:10]
+
+
+def failure_signature(error, messages):
+    """Root-cause signature of a failed test; None for a passing one."""
+    if error is None:
+        return None
+    if re.search(r"timed out after", error, re.I):
+        return "timeout"
+    errors = [text for level, text, _ in messages if level == "ERROR"]
+    for text in [error] + errors:
+        code = _FIREBASE_CODE.search(text)
+        if code:
+            return code.group(1)
+        if "insufficient permissions" in text:
+            return "firestore/permission-denied"
+    for signature, pattern in PROSE_SIGNATURES:
+        if pattern.search(error):
+            return signature
+    for level, text, source in messages:
+        status = _HTTP_STATUS.search(text)
+        host = _HOST.match(source or "")
+        if level == "ERROR" and status and host:
+            return "http-%s %s" % (status.group(1), host.group(1))
+    return "unclassified"
+
+
+def iter_markdown(path):
+    """Yield ``("text", line)`` outside test sections and ``("test", section)`` per test."""
+    section = None
+    with open(path, encoding="utf-8") as fh:
+        for raw in fh:
+            line = raw.rstrip("\n")
+            if _SECTION.match(line):
+                if section:
+                    yield "test", section
+                section = {"tc": _SECTION.match(line).group(1), "fields": [], "console": [], "error": None}
+                continue
+            if section is None:
+                yield "text", line
+                continue
+            if line == "---" or line.startswith("## "):
+                yield "test", section
+                section = None
+                yield "text", line
+                continue
+            if line.startswith("- **Test Error:** "):
+                section["error"] = line[len("- **Test Error:** "):]
+            elif line == "Browser Console Logs:":
+                section["in_console"] = True
+            elif line.startswith("- **"):
+                section.pop("in_console", None)
+                section["fields"].append(line)
+            elif section.get("in_console"):
+                section["console"].append(line)
+            elif section["error"] is not None:
+                section["error"] += "\n" + line
+    if section:
+        yield "test", section
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON array without loading the file at once."""
+    decoder = json.JSONDecoder()
+    buffer, started = "", False
+    with open(path, encoding="utf-8") as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            buffer += chunk
+            while True:
+                buffer = buffer.lstrip()
+                if not started:
+                    if not buffer:
+                        break
+                    if buffer[0] != "[":
+                        raise ValueError("%s is not a JSON array" % path)
+                    buffer, started = buffer[1:], True
+                    continue
+                if buffer[:1] in (",", "]"):
+                    buffer = buffer[1:]
+                    continue
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    break  # element continues in the next chunk
+                yield item
+                buffer = buffer[end:]
+            if not chunk:
+                return
+
+
+def iter_results_json(path):
+    """Same events as ``iter_markdown`` built from ``test_results.json``."""
+    scripts = tc_scripts()
+    yield "text", "# TestSprite AI Testing Report(MCP)"
+    yield "text", ""
+    yield "text", "## 2️⃣ Requirement Validation Summary"
+    yield "text", ""
+    for record in iter_json_array(path):
+        tc = record["title"][:5]
+        error, _, console = (record.get("testError") or "").partition("\nBrowser Console Logs:\n")
+        script = scripts.get(tc, "null")
+        yield "test", {
+            "tc": tc,
+            "error": error or None,
+            "console": console.splitlines(),
+            "fields": [
+                "- **Test Name:** %s" % record["title"][6:],
+                "- **Test Code:** [%s](./%s)" % (script, script),
+                "- **Test Visualization and Result:** https://www.testsprite.com/dashboard/mcp/tests/%s/%s" % (
+                    record.get("projectId"), record["testId"]),
+                "- **Status:** %s" % ("✅ Passed" if record["testStatus"] == "PASSED" else "❌ Failed"),
+                "- **Analysis / Findings:** %s." % ANALYSIS_PLACEHOLDER,
+            ],
+        }
+        yield "text", "---"
+        yield "text", ""
+    yield "text", "## 3️⃣ Coverage & Matching Metrics"
+    yield "text", ""
+    yield "text", "| Requirement        | Total Tests | ✅ Passed | ❌ Failed  |"
+    yield "text", "|--------------------|-------------|-----------|------------|"
+    yield "text", "| ...                | ...         | ...       | ...        |"
+    yield "text", ""
+    yield "text", "## 4️⃣ Key Gaps / Risks"
+    yield "text", GAPS_PLACEHOLDER
+
+
+def _passed(section):
+    return any(f.startswith("- **Status:**") and "Passed" in f for f in section["fields"])
+
+
+class ReportBuilder:
+    """Two streaming passes over the report events; see the module docstring."""
+
+    def __init__(self, events):
+        self.events = events  # callable returning a fresh iterator
+        self.messages = {}    # fingerprint -> {"id", "level", "text", "source", "count", "tests"}
+        self.tests = 0
+        self.signatures = {}  # signature -> [tc, ...]
+        self.coverage = {}    # requirement -> Counter(passed/failed)
+
+    def _scan(self, section):
+        seen = Counter()
+        parsed = parse_console(section["console"])
+        for level, text, source in parsed:
+            key = fingerprint(level, text, source)
+            entry = self.messages.get(key)
+            if entry is None:
+                entry = self.messages[key] = {
+                    "id": "C%d" % (len(self.messages) + 1), "level": level,
+                    "text": _TIMESTAMP.sub("", text)[:SAMPLE_CHARS], "source": source, "count": 0, "tests": 0}
+            entry["count"] += 1
+            seen[key] += 1
+        for key in seen:
+            self.messages[key]["tests"] += 1
+        return parsed, seen
+
+    def collect(self):
+        for kind, payload in self.events():
+            if kind != "test":
+                continue
+            self.tests += 1
+            parsed, _ = self._scan(payload)
+            passed = _passed(payload)
+            signature = None if passed else failure_signature(payload["error"] or "", parsed)
+            if signature:
+                self.signatures.setdefault(signature, []).append(payload["tc"])
+            requirement = TC_FEATURES.get(payload["tc"], ("Other",))[0]
+            self.coverage.setdefault(requirement, Counter())["passed" if passed else "failed"] += 1
+
+    def is_noise(self, key):
+        return self.tests > 1 and self.messages[key]["tests"] >= self.tests * NOISE_SHARE
+
+    def analysis(self, section, parsed, seen):
+        if _passed(section):
+            own = [k for k in seen if not self.is_noise(k) and self.messages[k]["level"] == "ERROR"]
+            if not own:
+                return "Passed; the console only shows the messages shared by every run"
+            return "Passed, with console errors %s" % ", ".join(self.messages[k]["id"] for k in own)
+        signature = failure_signature(section["error"] or "", parsed)
+        peers = [tc for tc in self.signatures.get(signature, []) if tc != section["tc"]]
+        parts = ["Root cause signature `%s`" % signature]
+        if peers:
+            more = " and %d more" % (len(peers) - 5) if len(peers) > 5 else ""
+            parts.append("shared with %s%s" % (", ".join(peers[:5]), more))
+        own = [k for k in seen if not self.is_noise(k)]
+        errors = [k for k in own if self.messages[k]["level"] == "ERROR"]
+        if errors:
+            parts.append("test-specific console errors %s" % ", ".join(self.messages[k]["id"] for k in errors))
+        elif signature == "timeout":
+            parts.append("no report came back within the run limit")
+        noise = len(seen) - len(own)
+        if noise:
+            parts.append("%d shared environment message%s ignored" % (noise, "" if noise == 1 else "s"))
+        return "; ".join(parts)
+
+    def write(self, out):
+        for kind, payload in self.events():
+            if kind == "text":
+                if payload.startswith("## 3️⃣"):
+                    self._write_index(out)
+                if payload.startswith("| ...") and self.coverage:
+                    for requirement, counts in sorted(self.coverage.items()):
+                        total = counts["passed"] + counts["failed"]
+                        out.write("| %s | %d | %d | %d |\n" % (requirement, total, counts["passed"], counts["failed"]))
+                    continue
+                if payload.strip() == GAPS_PLACEHOLDER:
+                    self._write_gaps(out)
+                    continue
+                out.write(payload + "\n")
+                continue
+            self._write_section(out, payload)
+
+    def _write_section(self, out, section):
+        parsed = parse_console(section["console"])
+        seen = Counter(fingerprint(*message) for message in parsed)
+        out.write("#### Test %s\n" % section["tc"])
+        fields = iter(section["fields"])
+        for field in fields:
+            if field.startswith("- **Test Code:**") and section["error"] is not None:
+                out.write(field + "\n")
+                out.write("- **Test Error:** %s\n" % section["error"].strip())
+                if seen:
+                    out.write("- **Console:** %s\n" % ", ".join(
+                        "%s%s" % (self.messages[k]["id"], " ×%d" % n if n > 1 else "")
+                        for k, n in sorted(seen.items(), key=lambda item: int(self.messages[item[0]]["id"][1:]))))
+                continue
+            if ANALYSIS_PLACEHOLDER in field:
+                field = field.replace(ANALYSIS_PLACEHOLDER, self.analysis(section, parsed, seen))
+            out.write(field + "\n")
+
+    def _write_index(self, out):
+        if not self.messages:
+            return
+        out.write("### Console message index\n\n")
+        out.write("| Id | Level | Tests | Count | Message | Source |\n|----|-------|-------|-------|---------|--------|\n")
+        for key, m in sorted(self.messages.items(), key=lambda item: -item[1]["tests"]):
+            out.write("| %s%s | %s | %d | %d | %s | %s |\n" % (
+                m["id"], " (shared)" if self.is_noise(key) else "", m["level"], m["tests"], m["count"],
+                m["text"].replace("|", "\\|"), m["source"] or ""))
+        out.write("\n")
+
+    def _write_gaps(self, out):
+        out.write("| Signature | Failed tests |\n|-----------|--------------|\n")
+        for signature, tcs in sorted(self.signatures.items(), key=lambda item: -len(item[1])):
+            out.write("| `%s` | %s |\n" % (signature, ", ".join(tcs)))
+
+
+def build_report(source, out_path):
+    source = Path(source)
+    if source.suffix == ".json":
+        events = lambda: iter_results_json(source)
+    else:
+        events = lambda: iter_markdown(source)
+    builder = ReportBuilder(events)
+    builder.collect()
+    with open(out_path, "w", encoding="utf-8") as out:
+        builder.write(out)
+    return builder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.report")
+    parser.add_argument("source", nargs="?", default=str(DEFAULT_REPORT_PATH),
+                        help="raw_report.md or test_results.json")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    out = Path(args.out) if args.out else output_path("report.md")
+    started = time.perf_counter()
+    builder = build_report(args.source, out)
+    print("%d tests, %d distinct console messages, %d failure signatures in %.0f ms" % (
+        builder.tests, len(builder.messages), len(builder.signatures), (time.perf_counter() - started) * 1000))
+    print("report written to %s" % out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""Results store and trend dashboard for TestSprite runs.
+
+Each ``tmp/test_results.json`` is one run. ``ingest`` appends it to a SQLite
+store (re-ingesting the same file is a no-op) and keeps the generated test code
+once per content hash instead of once per run. From there the store answers
+per-test duration, pass rate and flakiness (how often the status flips between
+consecutive runs) and renders a static HTML dashboard. ``harness.flaky`` adds
+its local runs here too, with every rerun attempt and a flake score per test::
+
+    python -m harness.results ingest
+    python -m harness.results summary --days 90
+    python -m harness.results dashboard
+"""
+import argparse
+import hashlib
+import html
+import json
+import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from .config import TMP_DIR, output_path, release_label
+from .stats import percentile
+
+DEFAULT_RESULTS_PATH = TMP_DIR / "test_results.json"
+_TC_ID = re.compile(r"^(TC\d{3})")
+
+
+def utc_now():
+    """Current UTC time as ISO 8601 with a ``Z`` suffix, the format TestSprite records use."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def _tc_id(record):
+    match = _TC_ID.match(record.get("title") or "")
+    return match.group(1) if match else record["testId"]
+
+
+class ResultsStore:
+    """Append-only SQLite store of test runs, indexed by test and time."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        content_hash TEXT NOT NULL UNIQUE,
+        source TEXT,
+        release TEXT,
+        ingested_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS code (
+        hash TEXT PRIMARY KEY,
+        body TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL REFERENCES runs (id),
+        tc TEXT NOT NULL,
+        test_id TEXT NOT NULL,
+        title TEXT,
+        status TEXT NOT NULL,
+        error TEXT,
+        created TEXT,
+        modified TEXT,
+        duration_s REAL,
+        code_hash TEXT REFERENCES code (hash),
+        video TEXT,
+        UNIQUE (run_id, test_id)
+    );
+    CREATE TABLE IF NOT EXISTS attempts (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL REFERENCES runs (id),
+        tc TEXT NOT NULL,
+        attempt INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        duration_s REAL,
+        signature TEXT,
+        UNIQUE (run_id, tc, attempt)
+    );
+    CREATE TABLE IF NOT EXISTS flake_scores (
+        tc TEXT PRIMARY KEY,
+        score REAL NOT NULL,
+        runs INTEGER NOT NULL,
+        flaky_runs INTEGER NOT NULL,
+        quarantined INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_tc_created ON results (tc, created);
+    CREATE INDEX IF NOT EXISTS results_created ON results (created);
+    CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else output_path("results.sqlite")
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(self.SCHEMA)
+
+    def ingest(self, path=DEFAULT_RESULTS_PATH, release=None):
+        """Append the run in ``path``; return its run id, or None if it was already stored."""
+        raw = Path(path).read_bytes()
+        records = json.loads(raw)
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if self.db.execute("SELECT 1 FROM runs WHERE content_hash = ?", (content_hash,)).fetchone():
+            return None
+        created = [r["created"] for r in records if r.get("created")]
+        modified = [r["modified"] for r in records if r.get("modified")]
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (content_hash, source, release, ingested_at, started_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, str(path), release or release_label(),
+                 utc_now(),
+                 min(created) if created else None, max(modified) if modified else None),
+            ).lastrowid
+            for record in records:
+                self._add_result(run_id, record)
+        return run_id
+
+    def _add_result(self, run_id, record):
+        code_hash = None
+        if record.get("code"):
+            code_hash = hashlib.sha256(record["code"].encode("utf-8")).hexdigest()
+            self.db.execute("INSERT OR IGNORE INTO code (hash, body) VALUES (?, ?)", (code_hash, record["code"]))
+        started, finished = _parse_time(record.get("created")), _parse_time(record.get("modified"))
+        # TestSprite leaves modified == created when a test never reported back (timeouts)
+        duration = (finished - started).total_seconds() if started and finished and finished > started else None
+        self.db.execute(
+            "INSERT INTO results (run_id, tc, test_id, title, status, error, created, modified, "
+            "duration_s, code_hash, video) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, _tc_id(record), record["testId"], record.get("title"), record["testStatus"],
+             record.get("testError") or None, record.get("created"), record.get("modified"),
+             duration, code_hash, record.get("testVisualization")),
+        )
+
+    def add_local_run(self, run_key, release=None):
+        """Register a run of the local runner; ``run_key`` plays the role of the content hash."""
+        now = utc_now()
+        with self.db:
+            return self.db.execute(
+                "INSERT INTO runs (content_hash, source, release, ingested_at, started_at) VALUES (?, ?, ?, ?, ?)",
+                ("local:%s" % run_key, "harness", release or release_label(), now, now),
+            ).lastrowid
+
+    def add_attempts(self, run_id, tc, attempts):
+        """Store every attempt of ``tc`` plus a results row for the first one.
+
+        ``attempts`` is a list of ``{"status", "started", "duration_s", "signature", "error"}``;
+        trends keep using the first attempt so reruns do not hide failures.
+        """
+        first = attempts[0]
+        with self.db:
+            for number, attempt in enumerate(attempts, 1):
+                self.db.execute(
+                    "INSERT INTO attempts (run_id, tc, attempt, status, duration_s, signature) VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, tc, number, attempt["status"], attempt["duration_s"], attempt["signature"]))
+            self.db.execute(
+                "INSERT INTO results (run_id, tc, test_id, title, status, error, created, duration_s) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, tc, tc, tc, first["status"], first.get("error"), first["started"], first["duration_s"]))
+
+    def flake_score(self, tc):
+        row = self.db.execute(
+            "SELECT score, runs, flaky_runs, quarantined FROM flake_scores WHERE tc = ?", (tc,)).fetchone()
+        return dict(zip(("score", "runs", "flaky_runs", "quarantined"), row)) if row else None
+
+    def set_flake_score(self, tc, score, runs, flaky_runs, quarantined):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO flake_scores (tc, score, runs, flaky_runs, quarantined, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (tc, score, runs, flaky_runs, int(quarantined), utc_now()))
+
+    def flake_scores(self):
+        rows = self.db.execute("SELECT tc, score, runs, flaky_runs, quarantined FROM flake_scores ORDER BY score DESC")
+        return {r[0]: dict(zip(("score", "runs", "flaky_runs", "quarantined"), r[1:])) for r in rows}
+
+    def history(self, since=None):
+        """``{tc: [(created, status, duration_s, code_hash), ...]}`` in time order."""
+        query = "SELECT tc, created, status, duration_s, code_hash FROM results"
+        params = ()
+        if since:
+            query += " WHERE created >= ?"
+            params = (since,)
+        history = {}
+        for tc, created, status, duration, code_hash in self.db.execute(query + " ORDER BY tc, created", params):
+            history.setdefault(tc, []).append((created, status, duration, code_hash))
+        return history
+
+    def runs(self, since=None):
+        query = ("SELECT r.id, r.started_at, r.release, COUNT(x.id), SUM(x.status = 'PASSED') "
+                 "FROM runs r JOIN results x ON x.run_id = r.id")
+        params = ()
+        if since:
+            query += " WHERE r.started_at >= ?"
+            params = (since,)
+        return self.db.execute(query + " GROUP BY r.id ORDER BY r.started_at", params).fetchall()
+
+    def code(self, code_hash):
+        row = self.db.execute("SELECT body FROM code WHERE hash = ?", (code_hash,)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.db.close()
+
+
+def flakiness(statuses):
+    """Share of consecutive runs whose status differs (0 = stable, 1 = flips every run)."""
+    if len(statuses) < 2:
+        return 0.0
+    return sum(a != b for a, b in zip(statuses, statuses[1:])) / (len(statuses) - 1)
+
+
+def trends(store, since=None, window=30):
+    """Per-test pass rate, flakiness and duration over the stored history.
+
+    Flakiness only counts flips between runs of the same test code, so a fix
+    that turns a test green is not mistaken for flakiness.
+    """
+    out = {}
+    for tc, rows in store.history(since).items():
+        statuses = [status for _, status, _, _ in rows]
+        durations = [d for _, _, d, _ in rows if d is not None]
+        by_code = {}
+        for _, status, _, code_hash in rows:
+            by_code.setdefault(code_hash, []).append(status)
+        flips = sum(flakiness(s) * (len(s) - 1) for s in by_code.values())
+        pairs = sum(len(s) - 1 for s in by_code.values())
+        out[tc] = {
+            "runs": len(rows),
+            "pass_rate": statuses.count("PASSED") / len(statuses),
+            "flakiness": flips / pairs if pairs else 0.0,
+            "duration_p50_s": percentile(durations, 50),
+            "duration_p95_s": percentile(durations, 95),
+            "last_status": statuses[-1],
+            "recent": [(created, status, duration) for created, status, duration, _ in rows[-window:]],
+        }
+    return out
+
+
+def _since(days):
+    if not days:
+        return None
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _sparkline(recent, width=180, height=28):
+    """Inline SVG: one square per run coloured by status, plus a duration line."""
+    if not recent:
+        return ""
+    step = width / len(recent)
+    parts = []
+    for i, (_, status, _) in enumerate(recent):
+        colour = {"PASSED": "#16a34a", "BLOCKED": "#d97706"}.get(status, "#dc2626")
+        parts.append('<rect x="%.1f" y="%d" width="%.1f" height="6" fill="%s"/>' % (
+            i * step, height - 6, max(step - 1, 1), colour))
+    durations = [d for _, _, d in recent if d is not None]
+    if len(durations) > 1:
+        top = max(durations) or 1
+        points = ["%.1f,%.1f" % (i * step + step / 2, (height - 9) * (1 - d / top) + 1)
+                  for i, (_, _, d) in enumerate(recent) if d is not None]
+        parts.append('<polyline points="%s" fill="none" stroke="#2563eb" stroke-width="1.5"/>' % " ".join(points))
+    return '<svg width="%d" height="%d">%s</svg>' % (width, height, "".join(parts))
+
+
+def render_dashboard(store, since=None, window=30):
+    data = trends(store, since, window)
+    runs = store.runs(since)
+    scores = store.flake_scores()
+    rows = []
+    for tc in sorted(data):
+        t = data[tc]
+        score = scores.get(tc)
+        rows.append(
+            "<tr><td>%s</td><td>%d</td><td>%.0f%%</td><td>%.0f%%</td><td>%s</td><td>%s</td><td>%s</td>"
+            "<td class=%s>%s</td><td>%s</td></tr>" % (
+                html.escape(tc), t["runs"], t["pass_rate"] * 100, t["flakiness"] * 100,
+                "-" if score is None else "%.2f%s" % (score["score"], " (karantina)" if score["quarantined"] else ""),
+                _seconds(t["duration_p50_s"]), _seconds(t["duration_p95_s"]),
+                "pass" if t["last_status"] == "PASSED" else "fail", html.escape(t["last_status"]),
+                _sparkline(t["recent"])))
+    run_rows = "".join(
+        "<tr><td>%s</td><td>%s</td><td>%d/%d</td></tr>" % (
+            html.escape(started or ""), html.escape(release or ""), passed or 0, total)
+        for _, started, release, total, passed in reversed(runs[-window:]))
+    return """<!doctype html>
+<html lang="tr"><head><meta charset="utf-8"><title>Test trendleri</title>
+<style>
+body { font: 14px system-ui, sans-serif; margin: 24px; color: #111827; }
+table { border-collapse: collapse; margin-bottom: 32px; }
+th, td { padding: 6px 12px; border-bottom: 1px solid #e5e7eb; text-align: left; }
+.pass { color: #16a34a; } .fail { color: #dc2626; }
+</style></head><body>
+<h1>Test trendleri</h1>
+<p>%d koşu, %d test. Oluşturulma: %s</p>
+<table><tr><th>Test</th><th>Koşu</th><th>Başarı</th><th>Kararsızlık</th><th>Flake skoru</th><th>Süre p50</th><th>Süre p95</th>
+<th>Son durum</th><th>Son %d koşu</th></tr>%s</table>
+<h2>Koşular</h2>
+<table><tr><th>Başlangıç</th><th>Sürüm</th><th>Geçen</th></tr>%s</table>
+</body></html>
+""" % (len(runs), len(data), datetime.now().strftime("%d.%m.%Y %H:%M"), window, "".join(rows), run_rows)
+
+
+def _seconds(value):
+    return "-" if value is None else "%.0f s" % value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.results")
+    parser.add_argument("--db", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="append test_results.json runs to the store")
+    ingest.add_argument("paths", nargs="*", default=[str(DEFAULT_RESULTS_PATH)])
+    ingest.add_argument("--release", default=None)
+    summary = sub.add_parser("summary", help="print per-test trends")
+    summary.add_argument("--days", type=int, default=None)
+    dashboard = sub.add_parser("dashboard", help="render the static HTML dashboard")
+    dashboard.add_argument("--days", type=int, default=None)
+    dashboard.add_argument("--window", type=int, default=30, help="runs shown per sparkline")
+    dashboard.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    try:
+        if args.command == "ingest":
+            for path in args.paths:
+                run_id = store.ingest(path, args.release)
+                print("%s: %s" % (path, "run %d" % run_id if run_id else "already ingested"))
+        elif args.command == "summary":
+            for tc, t in sorted(trends(store, _since(args.days)).items()):
+                print("%-6s runs %4d  pass %5.1f%%  flaky %5.1f%%  p50 %7s  last %s" % (
+                    tc, t["runs"], t["pass_rate"] * 100, t["flakiness"] * 100,
+                    _seconds(t["duration_p50_s"]), t["last_status"]))
+        else:
+            out = Path(args.out) if args.out else output_path("dashboard.html")
+            out.write_text(render_dashboard(store, _since(args.days), args.window), encoding="utf-8")
+            print("dashboard written to %s" % out)
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Dataset-scale benchmark for the arıza, bakım, stok and vardiya list pages.
+
+``seed`` loads one tenant per size (see ``dataset.scale_tenant``) with about
+that many records in every list collection, plus logins. ``run`` opens each
+list page as the tenant's yönetici in a fresh context, so the IndexedDB cache
+is cold. For each size it measures:
+
+* ``ttfr_ms``  - navigation start until the first record is visible
+* ``reads``    - documents the Listen channel delivered until the page settled
+* ``heap_bytes`` - JS heap after a forced GC, with the page settled
+* ``filter_ms`` / ``filter_reads`` - one status/type/year filter
+* ``more_ms``  - each "Daha Fazla Yükle" page (paginated lists only)
+
+The report adds a growth exponent between consecutive sizes,
+``log(m2 / m1) / log(n2 / n1)``. Values near 0 mean the page cost does not
+depend on the tenant size. Values near 1 mean it grows linearly, i.e. the
+page reads or renders every record::
+
+    python -m harness.scale seed --sizes 1k 10k 100k --seed 7
+    python -m harness.scale run --sizes 1k 10k 100k --runs 3
+    python -m harness.scale run --pages arizalar stok --sizes 1k 10k
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+import time
+
+from playwright import async_api
+
+from .config import FIREBASE_PROJECT, FIRESTORE_EMULATOR, RUN_ID, output_path
+from .dataset import (DEFAULT_PASSWORD, FAULT_TITLES, ROLE_NAMES, company_id, create_logins, generate, load,
+                      scale_tenant, user_email)
+from .emulator import AuthEmulator, FirestoreEmulator
+from .flows import login, require_emulators, wait_for_spinners
+from .locators import DASHBOARD_READY
+from .session import browser_session, new_context, open_app
+from .stats import summarize
+
+DEFAULT_SIZES = ("1k", "10k", "100k")
+SETTLE_QUIET_MS = 1000
+PAGE_TIMEOUT_MS = 120000
+
+# path, a locator for one rendered record, the filter to apply and the
+# pagination button (None where the page loads every record at once)
+SCALE_PAGES = {
+    "arizalar": {"path": "/arizalar", "row": re.compile("|".join(map(re.escape, FAULT_TITLES))),
+                 "filter": ("Tüm Durumlar", "acik"), "more": "Daha Fazla Yükle"},
+    "bakim": {"path": "/bakim/elektrik", "row": re.compile(r"(%s|%s) \d+" % (ROLE_NAMES["tekniker"],
+                                                                              ROLE_NAMES["muhendis"])),
+              "filter": ("Tüm Yıllar", {"index": 1}), "more": None},
+    "stok": {"path": "/stok", "row": re.compile(r" #\d+$"), "filter": ("Tüm Durumlar", "dusuk"), "more": None},
+    "vardiya": {"path": "/vardiya", "row": re.compile(r"(%s|%s|%s) \d+" % (
+                    ROLE_NAMES["bekci"], ROLE_NAMES["tekniker"], ROLE_NAMES["muhendis"])),
+                "filter": ("Tüm Vardiyalar", "sabah"), "more": None},
+}
+
+# The web SDK streams query results over WebChannel XHRs, whose bodies
+# Playwright only sees once the long poll ends. Count "documentChange"
+# frames in the growing responseText instead (one per document read).
+READS_INIT_SCRIPT = r"""
+(() => {
+  window.__harnessReads = 0;
+  const MARKER = '"documentChange"';
+  const open = XMLHttpRequest.prototype.open;
+  XMLHttpRequest.prototype.open = function (method, url) {
+    if (String(url).includes('/Listen/channel')) {
+      let offset = 0;
+      const scan = () => {
+        let text;
+        try { text = this.responseText; } catch (e) { return; }
+        let i = text.indexOf(MARKER, offset);
+        while (i >= 0) {
+          window.__harnessReads += 1;
+          offset = i + MARKER.length;
+          i = text.indexOf(MARKER, offset);
+        }
+        offset = Math.max(offset, text.length - MARKER.length);
+      };
+      this.addEventListener('progress', scan);
+      this.addEventListener('load', scan);
+    }
+    return open.apply(this, arguments);
+  };
+})();
+"""
+
+
+def parse_size(text):
+    """``"10k"`` -> 10000."""
+    text = str(text).lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def manifest_path(seed):
+    return output_path("scale", "ds%d.json" % seed)
+
+
+def seed_tenants(sizes, seed, workers=8):
+    """Load one scale tenant per size with logins; return the manifest written next to the reports."""
+    client, auth = FirestoreEmulator(), AuthEmulator()
+    manifest = {"seed": seed, "project": FIREBASE_PROJECT, "tenants": {}}
+    for size in sizes:
+        spec = scale_tenant(seed, size)
+        credentials = output_path("scale", "ds%d-c%d-credentials.csv" % (seed, size))
+        uids, _ = create_logins(spec, auth, companies=[size], path=credentials)
+        print("size %d: loading %d documents into %s" % (size, sum(spec.counts().values()), FIRESTORE_EMULATOR))
+        stats = load(client, generate(spec, uids.get, companies=[size]), workers=workers)
+        manifest["tenants"][str(size)] = {
+            "companyId": company_id(seed, size), "email": user_email(seed, size, "yonetici", 1),
+            "password": DEFAULT_PASSWORD, "credentials": str(credentials), "counts": spec.counts(), "stats": stats}
+        print("size %d: %d documents in %.1f s" % (size, stats["docs"], stats["seconds"]))
+    with open(manifest_path(seed), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+    return manifest
+
+
+async def _reads(page):
+    return await page.evaluate("() => window.__harnessReads")
+
+
+async def settle_reads(page, quiet_ms=SETTLE_QUIET_MS, timeout_ms=PAGE_TIMEOUT_MS):
+    """Wait until spinners are gone and no document arrived for ``quiet_ms``; return the read count."""
+    await wait_for_spinners(page, timeout_ms)
+    reads, since = await _reads(page), time.monotonic()
+    deadline = since + timeout_ms / 1000
+    while time.monotonic() < deadline:
+        await page.wait_for_timeout(200)
+        now = await _reads(page)
+        if now != reads:
+            reads, since = now, time.monotonic()
+        elif (time.monotonic() - since) * 1000 >= quiet_ms:
+            return reads
+    raise TimeoutError("reads never settled (%d so far)" % reads)
+
+
+async def heap_after_gc(cdp):
+    await cdp.send("HeapProfiler.collectGarbage")
+    usage = await cdp.send("Runtime.getHeapUsage")
+    return usage["usedSize"]
+
+
+async def frame_now(page):
+    # Wait for the next frame so the timestamp includes the render
+    return await page.evaluate("() => new Promise(r => requestAnimationFrame(() => r(performance.now())))")
+
+
+async def measure_page(browser, name, tenant, more_pages=3):
+    """One cold visit of ``name`` as the tenant's yönetici; return the metrics of that visit."""
+    spec = SCALE_PAGES[name]
+    context = await new_context(browser, timeout_ms=PAGE_TIMEOUT_MS)
+    try:
+        await context.add_init_script(READS_INIT_SCRIPT)
+        page = await context.new_page()
+        cdp = await context.new_cdp_session(page)
+        await login(page, tenant["email"], tenant["password"], timeout_ms=PAGE_TIMEOUT_MS)
+        await page.locator(DASHBOARD_READY).first.wait_for()
+        await require_emulators(page)
+
+        # A full navigation restarts both performance.now() and the read counter
+        await open_app(page, spec["path"], timeout_ms=PAGE_TIMEOUT_MS)
+        rows = page.get_by_text(spec["row"])
+        await rows.first.wait_for(state="visible")
+        sample = {"ttfr_ms": await frame_now(page)}
+        sample["reads"] = await settle_reads(page)
+        sample["rendered"] = await rows.count()
+        sample["heap_bytes"] = await heap_after_gc(cdp)
+
+        label, value = spec["filter"]
+        before = await _reads(page)
+        started = await frame_now(page)
+        select = page.locator("select", has_text=label).first
+        await (select.select_option(**value) if isinstance(value, dict) else select.select_option(value))
+        await wait_for_spinners(page, PAGE_TIMEOUT_MS)
+        sample["filter_ms"] = await frame_now(page) - started
+        sample["filter_reads"] = await settle_reads(page) - before
+
+        if spec["more"]:
+            await select.select_option(index=0)
+            await settle_reads(page)
+            sample["more_ms"] = []
+            button = page.get_by_role("button", name=spec["more"])
+            for _ in range(more_pages):
+                if not await button.count():
+                    break
+                shown = await rows.count()
+                started = await frame_now(page)
+                await button.click()
+                await page.wait_for_function(
+                    "([pattern, shown]) => "
+                    "(document.body.innerText.match(new RegExp(pattern, 'g')) || []).length > shown",
+                    [spec["row"].pattern, shown], timeout=PAGE_TIMEOUT_MS)
+                sample["more_ms"].append(await frame_now(page) - started)
+        return sample
+    finally:
+        await context.close()
+
+
+def growth(points):
+    """Growth exponents between consecutive ``[(size, value)]`` points."""
+    out = []
+    for (n1, v1), (n2, v2) in zip(points, points[1:]):
+        if v1 and v2 and v1 > 0 and v2 > 0:
+            out.append(round(math.log(v2 / v1) / math.log(n2 / n1), 2))
+        else:
+            out.append(None)
+    return out
+
+
+def summarize_runs(samples):
+    metrics = {}
+    for key in ("ttfr_ms", "reads", "rendered", "heap_bytes", "filter_ms", "filter_reads"):
+        metrics[key] = summarize([s.get(key) for s in samples])
+    metrics["more_ms"] = summarize([ms for s in samples for ms in s.get("more_ms") or []])
+    return metrics
+
+
+async def run_scale(manifest, sizes, pages, runs=3, headless=True, more_pages=3):
+    results = {}
+    async with browser_session(headless=headless) as browser:
+        for name in pages:
+            results[name] = {"sizes": {}, "growth": {}}
+            for size in sizes:
+                tenant = manifest["tenants"].get(str(size))
+                if tenant is None:
+                    raise SystemExit("size %d is not seeded; run 'python -m harness.scale seed --sizes %d'"
+                                     % (size, size))
+                samples, errors = [], []
+                for _ in range(runs):
+                    try:
+                        samples.append(await measure_page(browser, name, tenant, more_pages))
+                    except (async_api.Error, TimeoutError) as exc:
+                        errors.append(str(exc).splitlines()[0])
+                results[name]["sizes"][str(size)] = {"runs": runs, "errors": errors,
+                                                     "metrics": summarize_runs(samples)}
+                print("%-9s %7d  %d/%d runs ok" % (name, size, len(samples), runs), flush=True)
+            for metric in ("ttfr_ms", "reads", "heap_bytes", "filter_ms"):
+                points = [(size, results[name]["sizes"][str(size)]["metrics"][metric]["median"]) for size in sizes]
+                results[name]["growth"][metric] = growth(points)
+    return results
+
+
+def print_report(results, sizes):
+    print("%-9s %7s %9s %8s %9s %9s %8s %9s" % (
+        "page", "size", "ttfr ms", "reads", "heap MB", "filter ms", "f.reads", "more ms"))
+    for name, result in results.items():
+        for size in sizes:
+            entry = result["sizes"][str(size)]
+            m = {k: v["median"] for k, v in entry["metrics"].items()}
+            print("%-9s %7d %9s %8s %9s %9s %8s %9s%s" % (
+                name, size, _fmt(m["ttfr_ms"]), _fmt(m["reads"]),
+                _fmt(m["heap_bytes"] / 1024 ** 2 if m["heap_bytes"] else None, "%.1f"), _fmt(m["filter_ms"]),
+                _fmt(m["filter_reads"]), _fmt(m["more_ms"]),
+                "  (%d errors)" % len(entry["errors"]) if entry["errors"] else ""))
+        print("%-9s growth   ttfr %s  reads %s  heap %s  filter %s" % (
+            name, *(_fmt_growth(result["growth"][k]) for k in ("ttfr_ms", "reads", "heap_bytes", "filter_ms"))))
+
+
+def _fmt(value, pattern="%.0f"):
+    return "-" if value is None else pattern % value
+
+
+def _fmt_growth(values):
+    return "/".join("?" if v is None else "%.2f" % v for v in values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.scale")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("seed", "load one tenant per size into the emulators"),
+                            ("run", "measure the list pages against the seeded tenants")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES))
+        cmd.add_argument("--seed", type=int, default=1)
+    sub.choices["seed"].add_argument("--workers", type=int, default=8)
+    run_cmd = sub.choices["run"]
+    run_cmd.add_argument("--pages", nargs="+", default=list(SCALE_PAGES), choices=list(SCALE_PAGES))
+    run_cmd.add_argument("--runs", type=int, default=3)
+    run_cmd.add_argument("--more-pages", type=int, default=3, help="'Daha Fazla Yükle' clicks per visit")
+    run_cmd.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = sorted(parse_size(s) for s in args.sizes)
+    if args.command == "seed":
+        seed_tenants(sizes, args.seed, args.workers)
+        return 0
+
+    with open(manifest_path(args.seed), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    results = asyncio.run(run_scale(manifest, sizes, args.pages, args.runs, not args.headed, args.more_pages))
+    report = {"run_id": RUN_ID, "seed": args.seed, "sizes": sizes, "runs": args.runs,
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "results": results}
+    out = output_path("scale", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print_report(results, sizes)
+    print("report written to %s" % out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Browser lifecycle helpers shared by the harness scenarios.
+
+These mirror the boilerplate at the top of every generated TC file (launch
+flags, default timeout, ``goto`` followed by best-effort load-state waits) so
+the scenarios behave like the TestSprite runs they are compared against.
+"""
+from contextlib import asynccontextmanager
+
+from playwright import async_api
+
+from .config import BASE_URL, DEFAULT_TIMEOUT_MS, LAUNCH_ARGS
+
+
+@asynccontextmanager
+async def playwright_session(headless=True, args=None):
+    """Start Playwright and Chromium, yielding both (for device descriptors, CDP...)."""
+    pw = await async_api.async_playwright().start()
+    browser = None
+    try:
+        browser = await pw.chromium.launch(headless=headless, args=LAUNCH_ARGS if args is None else args)
+        yield pw, browser
+    finally:
+        if browser:
+            await browser.close()
+        await pw.stop()
+
+
+@asynccontextmanager
+async def browser_session(headless=True, args=None):
+    """Start Playwright and Chromium, yielding the browser."""
+    async with playwright_session(headless=headless, args=args) as (_, browser):
+        yield browser
+
+
+async def new_context(browser, timeout_ms=DEFAULT_TIMEOUT_MS, **kwargs):
+    """Create an isolated context with the harness default timeout."""
+    context = await browser.new_context(**kwargs)
+    context.set_default_timeout(timeout_ms)
+    return context
+
+
+async def open_app(page, path="/", wait_until="commit", timeout_ms=10000):
+    """Navigate to ``path`` on the app and wait for DOMContentLoaded in all frames."""
+    url = path if path.startswith("http") else BASE_URL + path
+    await page.goto(url, wait_until=wait_until, timeout=timeout_ms)
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    for frame in page.frames:
+        try:
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+    return page
@@ -0,0 +1,322 @@
+"""Company-settings propagation across sessions of one tenant (TC015).
+
+A yönetici saves "Şirket Bilgileri" on /settings (name, slogan, adres,
+telefon, website) while other sessions of the same company are open on
+/dashboard, one per role by default. Every saved name carries a round marker
+(``EDEON ENERJİ UPDATED <tag>-r<n>``) so each session can record when it first
+rendered the new value. Per round, the report shows when the change became
+visible at each step:
+
+* ``commit_ms``   - "Değişiklikleri Kaydet" until the Firestore emulator
+  returns the new document
+* ``writer_ms``   - until the writer's own sidebar shows it
+* ``live_ms``     - until an observer's sidebar shows it without any action,
+  waited for ``--live-window`` seconds (Firestore listener)
+* ``navigate_ms`` - after an in-app route change, which keeps React state
+  and ``cacheService`` entries
+* ``pdf``         - whether the header of the "Rapor İndir" PDF on /arizalar
+  carries the new name, the previous one or neither
+* ``reload_ms``   - after a full reload, measured from the reload
+
+The stale-read window of an observer is the time from the commit until the
+first of those steps showed the new name. The original company fields are
+restored at the end::
+
+    python -m harness.settingsprop seed
+    python -m harness.settingsprop run --rounds 3 --live-window 10
+    python -m harness.settingsprop run --roles yonetici bekci --sessions 2
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+
+from .config import RUN_ID, output_path
+from .dataset import DEFAULT_PASSWORD, company_id, user_email
+from .emulator import FirestoreEmulator
+from .flows import login
+from .isolation import ROLES, load_tenants, seed_tenants
+from .notify import latency_summary, seen_script
+from .session import browser_session, new_context, open_app
+
+DEFAULT_SEED = 48
+ROUNDS = 3
+LIVE_WINDOW_S = 10.0
+SETTLE_TIMEOUT_S = 30.0
+OBSERVER_ROLES = tuple(role for role in ROLES if role != "superadmin")
+# The desktop sidebar, which shows the company name, is ``hidden xl:block``
+VIEWPORT = {"width": 1440, "height": 900}
+FIELDS = ("name", "slogan", "address", "phone", "website")
+LABELS = {"name": "Şirket Adı", "slogan": "Slogan", "address": "Adres", "phone": "Telefon", "website": "Website"}
+SAVED_TOAST = "Şirket bilgileri güncellendi"
+PDF_BUTTON = "Rapor İndir"
+
+# In-app navigation without a reload: React Router follows popstate
+NAVIGATE_SCRIPT = """
+(path) => {
+  window.history.pushState({}, '', path);
+  window.dispatchEvent(new PopStateEvent('popstate'));
+}
+"""
+
+CACHE_SCRIPT = """
+async () => (await window.__harness.service('cacheService')).cacheService.getStats().keys
+"""
+
+
+def seed_settings(seed=DEFAULT_SEED):
+    """One tenant with one user per role (``harness.isolation`` layout)."""
+    return seed_tenants(seed, companies=1)
+
+
+def round_values(tag, n):
+    """Company fields saved in round ``n``; the marker ``<tag>-r<n>`` identifies them in every surface."""
+    marker = "%s-r%d" % (tag, n)
+    return marker, {"name": "EDEON ENERJİ UPDATED %s" % marker, "slogan": "Enerjiniz Hiç Bitmesin %s" % marker,
+                    "address": "Ankara Çankaya %s" % marker, "phone": "0532 987 65 %02d" % (n % 100),
+                    "website": "www.updatededeonenerji.com/%s" % marker.lower()}
+
+
+# pdfReportUtils.fixTurkishChars, applied to the company name in every PDF header
+PDF_CHARS = str.maketrans("çÇğĞıİöÖşŞüÜ", "cCgGiIoOsSuU")
+
+
+def pdf_state(data, name, previous):
+    """``fresh``, ``stale`` or ``missing`` for the company name in a PDF (jsPDF writes literal strings)."""
+    def written(text):
+        return text.translate(PDF_CHARS).encode("latin-1", "replace")
+    if written(name) in data:
+        return "fresh"
+    return "stale" if previous and written(previous) in data else "missing"
+
+
+class _Observer:
+    """A signed-in session on /dashboard that records when each round marker first renders."""
+
+    def __init__(self, role, email, context, page):
+        self.role = role
+        self.email = email
+        self.context = context
+        self.page = page
+
+    async def seen(self, marker):
+        return await self.page.evaluate("(marker) => (window.__harnessSeen || {})[marker] || null", marker)
+
+    async def navigate(self, path):
+        await self.page.evaluate(NAVIGATE_SCRIPT, path)
+        await self.page.wait_for_url("**%s" % path)
+
+    async def export_pdf(self, timeout_ms):
+        """Bytes of the Arıza PDF this session exports now."""
+        await self.navigate("/arizalar")
+        button = self.page.get_by_role("button", name=PDF_BUTTON)
+        await button.wait_for(timeout=timeout_ms)
+        async with self.page.expect_download(timeout=timeout_ms) as info:
+            await button.click()
+        download = await info.value
+        with open(await download.path(), "rb") as fh:
+            return fh.read()
+
+
+async def _observer(browser, role, email, pattern, timeout_ms):
+    context = await new_context(browser, timeout_ms=timeout_ms, viewport=VIEWPORT, accept_downloads=True)
+    await context.add_init_script(seen_script(pattern))
+    page = await context.new_page()
+    await login(page, email, DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+    return _Observer(role, email, context, page)
+
+
+async def save_settings(page, values, timeout_ms):
+    """Fill "Şirket Bilgileri" and save; return the harness time of the click."""
+    for field in FIELDS:
+        await page.get_by_label(LABELS[field], exact=True).fill(values[field])
+    clicked = time.time() * 1000
+    await page.get_by_role("button", name="Değişiklikleri Kaydet").click()
+    await page.get_by_text(SAVED_TOAST).first.wait_for(timeout=timeout_ms)
+    return clicked
+
+
+async def _committed(client, path, name, timeout_s):
+    """Harness time at which the emulator first returned ``name`` for the company, or None."""
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        doc = await asyncio.get_running_loop().run_in_executor(None, client.get, path)
+        if doc and doc.get("name") == name:
+            return time.time() * 1000
+        await asyncio.sleep(0.05)
+    return None
+
+
+def _since(start, seen):
+    return None if start is None or seen is None else round(seen - start, 1)
+
+
+async def _round(writer, observers, client, path, tag, n, previous, live_window_s, timeout_s):
+    timeout_ms = int(timeout_s * 1000)
+    marker, values = round_values(tag, n)
+    clicked = await save_settings(writer.page, values, timeout_ms)
+    committed = await _committed(client, path, values["name"], timeout_s)
+    await asyncio.sleep(live_window_s)
+    rows = [{"role": o.role, "email": o.email, "live_ms": _since(committed, await o.seen(marker))}
+            for o in observers]
+
+    async def after_navigation(observer, row):
+        try:
+            await observer.navigate("/dashboard")
+            await asyncio.sleep(1)
+            row["navigate_ms"] = _since(committed, await observer.seen(marker))
+            row["cache_keys"] = await observer.page.evaluate(CACHE_SCRIPT)
+            row["pdf"] = pdf_state(await observer.export_pdf(timeout_ms), values["name"], previous)
+            started = time.time() * 1000
+            await observer.page.reload()
+            await observer.page.wait_for_function(
+                "(marker) => (window.__harnessSeen || {})[marker]", arg=marker, timeout=timeout_ms)
+            reloaded = await observer.seen(marker)
+            row["reload_ms"] = _since(started, reloaded)
+            row["error"] = None
+        except Exception as exc:    # the other sessions keep going; the report shows the error
+            reloaded = None
+            row["error"] = (str(exc).splitlines() or [type(exc).__name__])[0][:200]
+        # Until the reload the page keeps one __harnessSeen, so the first sighting is the earliest non-empty step
+        row["stale_ms"] = next((v for v in (row["live_ms"], row.get("navigate_ms")) if v is not None),
+                               _since(committed, reloaded))
+        return row
+
+    rows = await asyncio.gather(*(after_navigation(o, row) for o, row in zip(observers, rows)))
+    await open_app(writer.page, "/settings")
+    return {"round": n, "marker": marker, "name": values["name"], "commit_ms": _since(clicked, committed),
+            "writer_ms": _since(clicked, await writer.seen(marker)), "observers": list(rows)}
+
+
+def summarize_rounds(rounds):
+    rows = [row for r in rounds for row in r["observers"]]
+    return {
+        "commit_ms": latency_summary([r["commit_ms"] for r in rounds]),
+        "writer_ms": latency_summary([r["writer_ms"] for r in rounds]),
+        "stale_ms": latency_summary([row["stale_ms"] for row in rows]),
+        "reload_ms": latency_summary([row.get("reload_ms") for row in rows]),
+        "live": sum(1 for row in rows if row["live_ms"] is not None),
+        "after_navigation": sum(1 for row in rows if row["live_ms"] is None and row.get("navigate_ms") is not None),
+        "reload_only": sum(1 for row in rows if row["live_ms"] is None and row.get("navigate_ms") is None
+                           and row.get("reload_ms") is not None),
+        "never": sum(1 for row in rows if row["stale_ms"] is None),
+        "pdf": dict((state, sum(1 for row in rows if row.get("pdf") == state))
+                    for state in ("fresh", "stale", "missing")),
+        "sessions": len(rows),
+    }
+
+
+async def run_propagation(seed=DEFAULT_SEED, roles=OBSERVER_ROLES, sessions=1, rounds=ROUNDS,
+                          live_window_s=LIVE_WINDOW_S, timeout_s=SETTLE_TIMEOUT_S, browser=None):
+    """Save the settings ``rounds`` times with ``sessions`` observers per role open and return the report.
+
+    Pass ``browser`` to reuse a running browser (TC015) instead of launching one.
+    """
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_propagation(seed, roles, sessions, rounds, live_window_s, timeout_s, own_browser)
+    load_tenants(seed)
+    client = FirestoreEmulator()
+    cid = company_id(seed, 1)
+    path = "companies/%s" % cid
+    original = client.get(path)
+    tag = "S%d-%s" % (seed, RUN_ID[-6:])
+    pattern = "(%s-r\\d+)" % re.escape(tag)
+    timeout_ms = int(timeout_s * 1000)
+
+    writer = await _observer(browser, "yonetici", user_email(seed, 1, "yonetici", 1), pattern, timeout_ms)
+    observers = []
+    results = []
+    try:
+        await open_app(writer.page, "/settings")
+        await writer.page.get_by_label(LABELS["name"], exact=True).wait_for()
+        observers = await asyncio.gather(*(_observer(browser, role, user_email(seed, 1, role, 1), pattern, timeout_ms)
+                                           for role in roles for _ in range(sessions)))
+        for n in range(1, rounds + 1):
+            previous = results[-1]["name"] if results else (original or {}).get("name")
+            results.append(await _round(writer, observers, client, path, tag, n, previous, live_window_s,
+                                        timeout_s))
+    finally:
+        for session in [writer] + list(observers):
+            await session.context.close()
+        if original:
+            client.update_many([(path, {field: original.get(field, "") for field in FIELDS})])
+    return {"run_id": RUN_ID, "seed": seed, "tag": tag, "company": cid, "live_window_s": live_window_s,
+            "rounds": results, "summary": summarize_rounds(results)}
+
+
+def findings(report):
+    """Sessions that kept showing the old company name after navigating, or exported it in a PDF."""
+    out = []
+    for r in report["rounds"]:
+        for row in r["observers"]:
+            where = "round %d, %s (%s)" % (r["round"], row["role"], row["email"])
+            if row.get("error"):
+                out.append("%s: %s" % (where, row["error"]))
+            elif row["live_ms"] is None and row.get("navigate_ms") is None:
+                out.append("%s: old company name until reload" % where)
+            if row.get("pdf") == "stale":
+                out.append("%s: PDF header carries the old company name" % where)
+    return out
+
+
+def _ms(value):
+    return "-" if value is None else "%.0f" % value
+
+
+def print_report(report):
+    summary = report["summary"]
+    print("settings propagation, %d sessions, live window %.0f s" % (summary["sessions"], report["live_window_s"]))
+    for r in report["rounds"]:
+        print("round %d: commit %s ms, writer %s ms" % (r["round"], _ms(r["commit_ms"]), _ms(r["writer_ms"])))
+        for row in r["observers"]:
+            print("  %-9s live %6s  nav %6s  reload %6s  stale %7s  pdf %-7s  cache %d%s" % (
+                row["role"], _ms(row["live_ms"]), _ms(row.get("navigate_ms")), _ms(row.get("reload_ms")),
+                _ms(row["stale_ms"]), row.get("pdf", "-"), len(row.get("cache_keys") or ()),
+                "  ERROR %s" % row["error"] if row.get("error") else ""))
+    stale = summary["stale_ms"]
+    print("fresh live %d, after navigation %d, only after reload %d, never %d" % (
+        summary["live"], summary["after_navigation"], summary["reload_only"], summary["never"]))
+    if stale["n"]:
+        print("stale-read window p50 %.0f / p95 %.0f / max %.0f ms" % (stale["median"], stale["p95"], stale["max"]))
+    print("PDF headers: %(fresh)d fresh, %(stale)d stale, %(missing)d without name" % summary["pdf"])
+    problems = findings(report)
+    for problem in problems:
+        print("FINDING  %s" % problem)
+    print("%d findings" % len(problems))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.settingsprop")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="load the tenant and one login per role")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd = sub.add_parser("run", help="save the company settings and time the other sessions")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--roles", nargs="+", choices=OBSERVER_ROLES, default=list(OBSERVER_ROLES))
+    run_cmd.add_argument("--sessions", type=int, default=1, help="observer sessions per role")
+    run_cmd.add_argument("--rounds", type=int, default=ROUNDS)
+    run_cmd.add_argument("--live-window", type=float, default=LIVE_WINDOW_S,
+                         help="seconds to wait for open sessions to update on their own")
+    run_cmd.add_argument("--timeout", type=float, default=SETTLE_TIMEOUT_S)
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        manifest = seed_settings(args.seed)
+        print("%d users, logins in %s" % (len(manifest["uids"]), manifest["credentials"]))
+        return 0
+
+    report = asyncio.run(run_propagation(args.seed, args.roles, args.sessions, args.rounds, args.live_window,
+                                         args.timeout))
+    out = output_path("settingsprop", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if findings(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""Shift-report workflow throughput with concurrent guards (TC014).
+
+Every guard (bekçi) has a browser context of their own and fills the
+"Yeni Vardiya Bildirimi" wizard (``VardiyaForm``) at the same time as the
+others:
+
+1. Konum ve Zaman - saha, vardiya tipi and durum
+2. Vardiya Personeli - the guard is already selected
+3. Vardiya Detayları - one security check plus ``--photos`` synthetic JPEGs
+   of ``--photo-kb`` each, through the hidden file input
+4. Vardiya Özeti - "Oluştur" uploads the photos one by one to the Storage
+   emulator, writes vardiyaBildirimleri and calls ``createScopedNotification``
+
+``seed`` loads one company with a yönetici and ``--guards`` bekçiler, each
+assigned a saha of their own ("<il> Saha <n>"), so every notification can be
+traced to its guard. Devices are registered for the push sink of
+``harness.notify``. ``run`` submits one wave per ``--concurrency`` level and
+reports, per level:
+
+* per-step latency of the wizard (``open``, ``konum``, ``personel``,
+  ``detay``, ``submit``)
+* upload throughput from the Storage emulator requests (MB/s over the wave
+  and per upload)
+* ``notify_ms`` - "Oluştur" until the yönetici's devices got the push
+* ``ui_ms``     - the same, until it showed in the yönetici's /bildirimler
+
+The notifications of the company are cleared before each wave. Like
+``harness.notify`` it needs ``PUSH_SINK_URL`` in ``functions/.env.local``::
+
+    python -m harness.shiftload seed --guards 20
+    python -m harness.shiftload run --concurrency 1 5 10 20 --photos 3 --photo-kb 800
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+
+from .config import RUN_ID, output_path
+from .dataset import DEFAULT_PASSWORD, DatasetSpec, company_id, user_email
+from .emulator import MAX_BATCH_WRITES, FirestoreEmulator
+from .flows import login, open_shift_wizard
+from .notify import DEVICES_PER_USER, SINK_PORT, PushSink, latency_summary, load_team, observer, seed_devices
+from .session import browser_session, new_context, open_app
+
+DEFAULT_SEED = 45
+GUARDS = 10
+LEVELS = (1, 5, 10)
+PHOTOS = 3
+PHOTO_KB = 500
+SETTLE_TIMEOUT_S = 60.0
+STEPS = ("open", "konum", "personel", "detay", "submit")
+NOTIFICATION_TITLE = "Vardiya Bildirimi"
+CREATED_TOAST = "Vardiya bildirimi oluşturuldu"
+# uploadBytes posts to /v0/b/<bucket>/o; getDownloadURL reads the same path
+UPLOAD_PATH = "/v0/b/"
+SAHA_PATTERN = r"(Saha \d+) - [^\s]+ vardiyası"
+
+
+def shift_spec(seed=DEFAULT_SEED, guards=GUARDS):
+    """One company; as many sahalar as guards, so each guard gets exactly one."""
+    return DatasetSpec(seed=seed, companies=1, sahalar=guards, santraller=1, years=0, faults=0, bakim=0,
+                       vardiya=0, stok=0, movements=0, production=False,
+                       role_counts={"yonetici": 1, "bekci": guards})
+
+
+def seed_shifts(seed=DEFAULT_SEED, guards=GUARDS, devices=DEVICES_PER_USER):
+    return seed_devices(shift_spec(seed, guards), devices, folder="shiftload")
+
+
+def synthetic_photo(name, size_kb, rng):
+    """``set_input_files`` payload: a JPEG header, ``size_kb`` of random payload and an end marker."""
+    header = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    body = rng.randbytes(max(0, size_kb * 1024 - len(header) - 2))
+    return {"name": name, "mimeType": "image/jpeg", "buffer": header + body + b"\xff\xd9"}
+
+
+def clear_notifications(client, cid):
+    """Delete the company's notifications so a wave's observer only sees its own."""
+    rows = client.run_query({
+        "from": [{"collectionId": "notifications"}],
+        "where": {"fieldFilter": {"field": {"fieldPath": "companyId"}, "op": "EQUAL",
+                                  "value": {"stringValue": cid}}},
+    })
+    paths = [path for path, _ in rows]
+    for start in range(0, len(paths), MAX_BATCH_WRITES):
+        client.delete_many(paths[start:start + MAX_BATCH_WRITES])
+    return len(paths)
+
+
+def _select(page, label):
+    return page.locator("xpath=//label[normalize-space()='%s']/following-sibling::select" % label)
+
+
+async def _timed(steps, name, action):
+    started = time.monotonic()
+    await action
+    steps[name] = round((time.monotonic() - started) * 1000, 1)
+
+
+class _Guard:
+    """A signed-in bekçi context that records its Storage uploads."""
+
+    def __init__(self, n, context, page):
+        self.n = n
+        self.context = context
+        self.page = page
+        self.uploads = []
+        self._started = {}
+        page.on("request", self._request)
+        page.on("requestfinished", self._finished)
+
+    def _request(self, request):
+        if request.method == "POST" and UPLOAD_PATH in request.url:
+            self._started[request] = time.time() * 1000
+
+    def _finished(self, request):
+        started = self._started.pop(request, None)
+        if started is not None:
+            self.uploads.append({"start_ms": started, "end_ms": time.time() * 1000})
+
+    async def submit(self, photos, tag, timeout_ms):
+        """Walk the wizard once; return step timings, the submit time and the uploads of this report."""
+        page, steps = self.page, {}
+        record = {"guard": self.n, "saha": "Saha %d" % self.n, "steps": steps, "submitted_ms": None,
+                  "uploads": [], "error": None}
+        first_upload = len(self.uploads)
+        try:
+            await _timed(steps, "open", open_shift_wizard(page))
+
+            async def konum():
+                await _select(page, "Saha *").select_option(index=1)
+                await _select(page, "Vardiya Tipi *").select_option("sabah")
+                await _select(page, "Durum *").select_option("normal")
+                await page.get_by_role("button", name="İleri").click()
+                await page.get_by_text("Vardiya Personeli").first.wait_for()
+
+            async def personel():
+                await page.get_by_role("button", name="İleri").click()
+                await page.get_by_text("Vardiya Detayları").first.wait_for()
+
+            async def detay():
+                await page.get_by_text("Kamera Sistemleri").first.click()
+                await page.get_by_placeholder("Vardiya ile ilgili genel notlarınız...").fill(
+                    "Harness vardiya yükü %s" % tag)
+                await page.locator("input[type=file][accept='image/*']").set_input_files(photos)
+                await page.get_by_role("button", name="İleri").click()
+                await page.get_by_text("Vardiya Özeti").first.wait_for()
+
+            async def submit():
+                record["submitted_ms"] = time.time() * 1000
+                await page.get_by_role("button", name="Oluştur").click()
+                await page.get_by_text(CREATED_TOAST).first.wait_for(timeout=timeout_ms)
+
+            for name, step in (("konum", konum), ("personel", personel), ("detay", detay), ("submit", submit)):
+                await _timed(steps, name, step())
+        except Exception as exc:    # keep the wave going; the report counts failed guards
+            record["error"] = (str(exc).splitlines() or [type(exc).__name__])[0][:200]
+        record["uploads"] = self.uploads[first_upload:]
+        return record
+
+
+async def _guard(browser, seed, n, timeout_ms):
+    context = await new_context(browser, timeout_ms=timeout_ms)
+    try:
+        page = await context.new_page()
+        await login(page, user_email(seed, 1, "bekci", n), DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+        return _Guard(n, context, page)
+    except Exception:
+        await context.close()
+        raise
+
+
+def analyze_wave(level, records, pushes, seen, manager_uid, photo_bytes, wall_s):
+    """Step latency, upload throughput and manager-side notification latency of one wave."""
+    by_saha = {r["saha"]: r for r in records if r["submitted_ms"] is not None and r["error"] is None}
+    notify_ms, pushed = [], set()
+    for push in pushes:
+        match = re.search(r"(Saha \d+) - ", push.get("body") or "")
+        record = by_saha.get(match.group(1)) if match else None
+        if (record is None or push["userId"] != manager_uid or NOTIFICATION_TITLE not in (push["title"] or "")
+                or record["saha"] in pushed):
+            continue
+        pushed.add(record["saha"])
+        notify_ms.append(push["t_ms"] - record["submitted_ms"])
+    ui_ms = [t - by_saha[saha]["submitted_ms"] for saha, t in seen.items() if saha in by_saha]
+
+    uploads = [u for r in records for u in r["uploads"]]
+    upload_s = (max(u["end_ms"] for u in uploads) - min(u["start_ms"] for u in uploads)) / 1000 if uploads else 0
+    return {
+        "concurrency": level, "guards": len(records), "wall_s": round(wall_s, 2),
+        "submitted": len(by_saha), "errors": [{"guard": r["guard"], "error": r["error"]}
+                                              for r in records if r["error"]],
+        "steps_ms": {name: latency_summary([r["steps"].get(name) for r in records]) for name in STEPS},
+        "uploads": len(uploads), "upload_mb": round(len(uploads) * photo_bytes / 1e6, 2),
+        "upload_mb_s": round(len(uploads) * photo_bytes / 1e6 / upload_s, 2) if upload_s else None,
+        "upload_ms": latency_summary([u["end_ms"] - u["start_ms"] for u in uploads]),
+        "reports_per_min": round(len(by_saha) / wall_s * 60, 1) if wall_s else None,
+        "notify_ms": latency_summary(notify_ms), "ui_ms": latency_summary(ui_ms),
+        "missing_notifications": sorted(set(by_saha) - pushed),
+    }
+
+
+async def _settle(pending, timeout_s):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline and not pending():
+        await asyncio.sleep(0.25)
+
+
+async def run_shifts(seed=DEFAULT_SEED, levels=LEVELS, photos=PHOTOS, photo_kb=PHOTO_KB, port=SINK_PORT,
+                     timeout_s=SETTLE_TIMEOUT_S, browser=None):
+    """Submit one wave of shift reports per concurrency level and return the report.
+
+    Pass ``browser`` to reuse a running browser (TC014) instead of launching one.
+    """
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_shifts(seed, levels, photos, photo_kb, port, timeout_s, own_browser)
+    spec, manifest = load_team(seed, folder="shiftload")
+    levels = sorted({min(level, spec.role_counts["bekci"]) for level in levels})
+    cid = company_id(seed, 1)
+    manager = user_email(seed, 1, "yonetici", 1)
+    manager_uid = manifest["uids"][manager]
+    tag = "SL-%s" % RUN_ID[-6:]
+    timeout_ms = int(timeout_s * 1000)
+    client = FirestoreEmulator()
+    rng = random.Random(seed)
+    files = [synthetic_photo("%s-%02d.jpg" % (tag, n), photo_kb, rng) for n in range(photos)]
+
+    waves, guards, watcher = [], [], None
+    with PushSink(port) as sink:
+        try:
+            watcher = await observer(browser, manager, SAHA_PATTERN, timeout_ms)
+            guards = list(await asyncio.gather(*(_guard(browser, seed, n, timeout_ms)
+                                                 for n in range(1, max(levels) + 1))))
+            for level in levels:
+                clear_notifications(client, cid)
+                await open_app(watcher[1], "/bildirimler")
+                await watcher[1].evaluate("() => { window.__harnessSeen = {}; }")
+                since = len(sink.pushes)
+                started = time.monotonic()
+                records = await asyncio.gather(*(guard.submit(files, tag, timeout_ms) for guard in guards[:level]))
+                wall_s = time.monotonic() - started
+                ok = {r["saha"] for r in records if r["error"] is None}
+
+                def notified():
+                    got = {re.search(r"(Saha \d+) - ", p["body"] or "") for p in sink.pushes[since:]
+                           if p["userId"] == manager_uid}
+                    return ok <= {m.group(1) for m in got if m}
+
+                await _settle(notified, timeout_s)
+                seen = await watcher[1].evaluate("() => window.__harnessSeen || {}")
+                waves.append(analyze_wave(level, records, list(sink.pushes[since:]), seen, manager_uid,
+                                          photo_kb * 1024, wall_s))
+        finally:
+            for context in [g.context for g in guards] + ([watcher[0]] if watcher else []):
+                await context.close()
+
+    return {"run_id": RUN_ID, "seed": seed, "tag": tag, "photos": photos, "photo_kb": photo_kb,
+            "devices_per_user": manifest["devices"], "waves": waves}
+
+
+def print_report(report):
+    print("%d photos x %d KB per report" % (report["photos"], report["photo_kb"]))
+    for wave in report["waves"]:
+        print("concurrency %d: %d/%d submitted in %.1f s (%.1f reports/min), %d uploads, %.2f MB at %s MB/s" % (
+            wave["concurrency"], wave["submitted"], wave["guards"], wave["wall_s"], wave["reports_per_min"] or 0,
+            wave["uploads"], wave["upload_mb"], wave["upload_mb_s"]))
+        print("  %-10s %5s %8s %8s %8s %8s" % ("", "n", "p50", "p95", "p99", "max"))
+        rows = [(name, wave["steps_ms"][name]) for name in STEPS]
+        rows += [("upload", wave["upload_ms"]), ("notify", wave["notify_ms"]), ("in-app", wave["ui_ms"])]
+        for name, s in rows:
+            if s["n"]:
+                print("  %-10s %5d %8.0f %8.0f %8.0f %8.0f" % (name, s["n"], s["median"], s["p95"], s["p99"],
+                                                             s["max"]))
+            else:
+                print("  %-10s %5d %8s" % (name, 0, "-"))
+        for error in wave["errors"]:
+            print("  FAILED  bekçi %d: %s" % (error["guard"], error["error"]))
+        if wave["missing_notifications"]:
+            print("  no yönetici push for %s" % ", ".join(wave["missing_notifications"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.shiftload")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="load the company, its guards and devices")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    seed_cmd.add_argument("--guards", type=int, default=GUARDS)
+    seed_cmd.add_argument("--devices", type=int, default=DEVICES_PER_USER, help="devices per user")
+    run_cmd = sub.add_parser("run", help="submit shift reports concurrently, one wave per level")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--concurrency", type=int, nargs="+", default=list(LEVELS),
+                         help="guards submitting at once, one wave per value (capped at the seeded guards)")
+    run_cmd.add_argument("--photos", type=int, default=PHOTOS, help="photos per report (the form takes 10)")
+    run_cmd.add_argument("--photo-kb", type=int, default=PHOTO_KB)
+    run_cmd.add_argument("--port", type=int, default=SINK_PORT)
+    run_cmd.add_argument("--timeout", type=float, default=SETTLE_TIMEOUT_S,
+                         help="seconds per submit and to wait for notifications")
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        manifest = seed_shifts(args.seed, args.guards, args.devices)
+        print("%d users, logins in %s" % (len(manifest["uids"]), manifest["credentials"]))
+        return 0
+
+    report = asyncio.run(run_shifts(args.seed, args.concurrency, args.photos, args.photo_kb, args.port,
+                                    args.timeout))
+    out = output_path("shiftload", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if any(w["errors"] or w["missing_notifications"] for w in report["waves"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
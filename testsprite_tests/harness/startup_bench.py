@@ -0,0 +1,280 @@
+"""Cold/warm start benchmark for the web bundle under mobile emulation.
+
+Each repetition runs in an emulated iPhone with the CPU throttled through CDP
+and one of the network profiles below:
+
+* ``cold``  - fresh context, empty HTTP cache, service worker and IndexedDB
+* ``warm``  - second load in a primed context (HTTP cache, SW, IndexedDB);
+  offline it is skipped unless a service worker filled Cache Storage (the
+  app only registers ``firebase-messaging-sw.js``, which caches nothing)
+* ``dashboard_tti`` - login to an interactive dashboard (no long task for
+  ``quiet_ms`` after the KPI cards render)
+
+Usage::
+
+    python -m harness.startup_bench --serve-build --runs 10
+    python -m harness.startup_bench compare old.json new.json
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from playwright import async_api
+
+from .config import BASE_URL, REPO_ROOT, output_path, release_label
+from .flows import login
+from .locators import DASHBOARD_READY
+from .perf import PERF_INIT_SCRIPT
+from .session import new_context, open_app, playwright_session
+from .stats import summarize
+
+DEVICE = "iPhone 13"
+CPU_THROTTLING = 4
+PREVIEW_PORT = 4173
+
+# DevTools presets; throughput is in bytes per second
+NETWORK_PROFILES = {
+    "wifi": None,
+    "fast3g": {"offline": False, "latency": 562.5,
+               "downloadThroughput": 1.6 * 1024 * 1024 / 8 * 0.9,
+               "uploadThroughput": 750 * 1024 / 8 * 0.9},
+    "offline": {"offline": True, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1},
+}
+
+LONG_TASK_END_SCRIPT = """
+(() => {
+  window.__harnessLastLongTaskEnd = 0;
+  try {
+    new PerformanceObserver((list) => {
+      for (const e of list.getEntries()) {
+        window.__harnessLastLongTaskEnd = Math.max(window.__harnessLastLongTaskEnd, e.startTime + e.duration);
+      }
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) {}
+})();
+"""
+
+
+class ScenarioSkipped(Exception):
+    """The scenario cannot run against this build; the reason goes into the report."""
+
+
+async def _emulated_context(pw, browser):
+    context = await new_context(browser, timeout_ms=30000, **pw.devices[DEVICE])
+    await context.add_init_script(PERF_INIT_SCRIPT)
+    await context.add_init_script(LONG_TASK_END_SCRIPT)
+    page = await context.new_page()
+    cdp = await context.new_cdp_session(page)
+    await cdp.send("Emulation.setCPUThrottlingRate", {"rate": CPU_THROTTLING})
+    await cdp.send("Network.enable")
+    return context, page, cdp
+
+
+async def _apply_network(cdp, profile):
+    conditions = NETWORK_PROFILES[profile]
+    if conditions is None:
+        conditions = {"offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1}
+    await cdp.send("Network.emulateNetworkConditions", conditions)
+
+
+async def _load_metrics(page, base_url):
+    started = time.perf_counter()
+    await open_app(page, base_url + "/", wait_until="load", timeout_ms=60000)
+    wall = (time.perf_counter() - started) * 1000
+    raw = await page.evaluate("() => window.__harnessPerfTake()")
+    nav = raw.get("navigation") or {}
+    return {"wall_ms": wall, "fcp_ms": raw.get("fcp"), "lcp_ms": raw.get("lcp"), "load_ms": nav.get("load")}
+
+
+async def _cold_start(pw, browser, base_url, profile):
+    context, page, cdp = await _emulated_context(pw, browser)
+    try:
+        await _apply_network(cdp, profile)
+        return await _load_metrics(page, base_url)
+    finally:
+        await context.close()
+
+
+async def _warm_start(pw, browser, base_url, profile):
+    context, page, cdp = await _emulated_context(pw, browser)
+    try:
+        # Prime caches on a normal connection, then reload under the profile
+        await open_app(page, base_url + "/", wait_until="load", timeout_ms=60000)
+        await page.wait_for_timeout(1000)
+        if NETWORK_PROFILES[profile] and NETWORK_PROFILES[profile]["offline"]:
+            cached = await page.evaluate("async () => 'caches' in window ? (await caches.keys()).length : 0")
+            if not cached:
+                raise ScenarioSkipped("no service worker caches the app shell, an offline start cannot succeed")
+        await _apply_network(cdp, profile)
+        return await _load_metrics(page, base_url)
+    finally:
+        await context.close()
+
+
+async def _dashboard_tti(pw, browser, base_url, profile, quiet_ms=2000, timeout_ms=60000):
+    context, page, cdp = await _emulated_context(pw, browser)
+    try:
+        await _apply_network(cdp, profile)
+        await open_app(page, base_url + "/login", wait_until="load", timeout_ms=timeout_ms)
+        clicked_at = await page.evaluate("() => performance.now()")
+        await login(page, timeout_ms=timeout_ms)
+        await page.locator(DASHBOARD_READY).first.wait_for(state="visible", timeout=timeout_ms)
+        visible_at = await page.evaluate("() => performance.now()")
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            now, last_long_task = await page.evaluate(
+                "() => [performance.now(), window.__harnessLastLongTaskEnd || 0]")
+            if now - max(visible_at, last_long_task) >= quiet_ms:
+                break
+            await page.wait_for_timeout(250)
+        else:
+            raise TimeoutError("dashboard never became quiet")
+        return {"tti_ms": max(visible_at, last_long_task) - clicked_at, "visible_ms": visible_at - clicked_at}
+    finally:
+        await context.close()
+
+
+SCENARIOS = {
+    "cold": _cold_start,
+    "warm": _warm_start,
+    "dashboard_tti": _dashboard_tti,
+}
+
+
+def _applicable(scenario, profile):
+    # Nothing can load cold or log in without a network
+    return profile != "offline" or scenario == "warm"
+
+
+async def _run(base_url, runs, profiles, scenarios, headless):
+    results = {}
+    # Device emulation sets its own viewport, so skip the desktop window flags
+    async with playwright_session(headless=headless, args=[]) as (pw, browser):
+        for profile in profiles:
+            for scenario in scenarios:
+                if not _applicable(scenario, profile):
+                    continue
+                samples, errors, skipped = [], [], None
+                for _ in range(runs):
+                    try:
+                        samples.append(await SCENARIOS[scenario](pw, browser, base_url, profile))
+                    except ScenarioSkipped as exc:
+                        skipped = str(exc)
+                        break
+                    except (async_api.Error, TimeoutError) as exc:
+                        errors.append(str(exc).splitlines()[0])
+                metrics = sorted({k for s in samples for k in s})
+                results["%s/%s" % (scenario, profile)] = {
+                    "runs": runs,
+                    "errors": errors,
+                    "skipped": skipped,
+                    "metrics": {m: summarize([s.get(m) for s in samples]) for m in metrics},
+                }
+    return results
+
+
+def _serve_build(build):
+    """Build the Vite bundle (optionally) and serve it with ``vite preview``."""
+    if build:
+        subprocess.run(["npm", "run", "build"], cwd=REPO_ROOT, check=True)
+    proc = subprocess.Popen(
+        ["npx", "vite", "preview", "--port", str(PREVIEW_PORT), "--strictPort"],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = "http://localhost:%d" % PREVIEW_PORT
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return proc, url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("vite preview did not start on port %d" % PREVIEW_PORT)
+
+
+def _print_report(report):
+    print("release %s, %s, CPU x%d" % (report["release"], report["device"], report["cpu_throttling"]))
+    for key, result in report["results"].items():
+        if result.get("skipped"):
+            print("%-24s skipped: %s" % (key, result["skipped"]))
+        for metric, s in result["metrics"].items():
+            if s["n"]:
+                print("%-24s %-10s median %8.0f  p95 %8.0f  (n=%d)" % (key, metric, s["median"], s["p95"], s["n"]))
+        if result["errors"]:
+            print("%-24s %d/%d runs failed: %s" % (key, len(result["errors"]), result["runs"], result["errors"][0]))
+
+
+def compare(old_path, new_path, threshold=0.10):
+    """Print median changes between two saved reports; return the number of regressions."""
+    with open(old_path, encoding="utf-8") as fh:
+        old = json.load(fh)["results"]
+    with open(new_path, encoding="utf-8") as fh:
+        new = json.load(fh)["results"]
+    regressions = 0
+    for key in sorted(set(old) & set(new)):
+        for metric, after in new[key]["metrics"].items():
+            before = old[key]["metrics"].get(metric)
+            if not before or not before["median"] or after["median"] is None:
+                continue
+            change = (after["median"] - before["median"]) / before["median"]
+            regressed = change > threshold
+            regressions += regressed
+            print("%-24s %-10s %8.0f -> %8.0f  %+6.1f%%%s" % (
+                key, metric, before["median"], after["median"], change * 100, "  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="python -m harness.startup_bench compare")
+        parser.add_argument("old")
+        parser.add_argument("new")
+        parser.add_argument("--threshold", type=float, default=0.10)
+        args = parser.parse_args(argv[1:])
+        return 1 if compare(args.old, args.new, args.threshold) else 0
+
+    parser = argparse.ArgumentParser(prog="python -m harness.startup_bench")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profiles", nargs="+", default=list(NETWORK_PROFILES), choices=list(NETWORK_PROFILES))
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--serve-build", action="store_true", help="benchmark the production bundle via vite preview")
+    parser.add_argument("--build", action="store_true", help="run 'npm run build' before serving")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    proc, base_url = None, args.base_url
+    if args.serve_build:
+        proc, base_url = _serve_build(args.build)
+    try:
+        results = asyncio.run(_run(base_url, args.runs, args.profiles, args.scenarios, not args.headed))
+    finally:
+        if proc:
+            proc.terminate()
+
+    report = {
+        "release": release_label(),
+        "base_url": base_url,
+        "device": DEVICE,
+        "cpu_throttling": CPU_THROTTLING,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+    out = args.out or output_path("startup", "%s.json" % report["release"])
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    _print_report(report)
+    print("report written to %s" % out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""Small summary helpers shared by the benchmarks."""
+import math
+import statistics
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; ``pct`` is 0-100. Returns None for no data."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"n": 0, "median": None, "p95": None, "min": None, "max": None}
+    return {
+        "n": len(values),
+        "median": statistics.median(values),
+        "p95": percentile(values, 95),
+        "min": min(values),
+        "max": max(values),
+    }
@@ -0,0 +1,329 @@
+"""Low-stock alert propagation and stock contention benchmark (TC007).
+
+Stock is only consumed through ``stokService.addStokHareket`` ("cikis"). The
+maintenance forms record used materials as free text and leave stoklar
+alone. Each consumer here is a mühendis in their own browser context. They
+book maintenance material usage against the same few items at the same time,
+through the app's own service module. ``addStokHareket`` reads
+``mevcutStok``, writes the movement, updates the item and then asks
+``createScopedNotification`` for a "Düşük Stok Uyarısı" once the new level is
+at or under the minimum.
+
+``seed`` loads one company (a yönetici, ``--consumers`` mühendis, a tekniker,
+each with registered devices for the push sink of ``harness.notify``). ``run``
+resets the alert items to ``--initial`` units, lets every consumer book
+``--per-consumer`` movements of ``--quantity`` and reports:
+
+* contention: expected vs actual ``mevcutStok`` per item, lost decrements,
+  movements that read the same ``eskiMiktar`` and movements whose stock
+  update failed (orphans)
+* ``sink_ms`` - threshold-crossing movement until the first low-stock push
+* ``ui_ms``   - the same, until the alert shows in a yönetici's /bildirimler
+* the "Stok Uyarıları" card of /stok after a reload, against the real levels
+
+Like ``harness.notify`` it needs ``PUSH_SINK_URL`` in ``functions/.env.local``::
+
+    python -m harness.stockalerts seed --consumers 6
+    python -m harness.stockalerts run --items 4 --initial 40 --minimum 10 --per-consumer 20
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from .config import RUN_ID, output_path
+from .dataset import DEFAULT_PASSWORD, DatasetSpec, company_id, user_email
+from .emulator import FirestoreEmulator
+from .flows import login, wait_for_spinners
+from .notify import DEVICES_PER_USER, SINK_PORT, PushSink, latency_summary, load_team, observer, seed_devices
+from .session import browser_session, new_context, open_app
+
+DEFAULT_SEED = 44
+CONSUMERS = 6
+ITEMS = 4
+INITIAL = 40
+MINIMUM = 10
+PER_CONSUMER = 20
+QUANTITY = 1
+ALERT_TITLE = "Düşük Stok Uyarısı"
+SETTLE_TIMEOUT_S = 60.0
+
+CONSUME_SCRIPT = """
+async ({ plan, companyId, miktar, aciklama, yapanKisi }) => {
+  const { addStokHareket } = await window.__harness.service('stokService');
+  const out = [];
+  for (const stokId of plan) {
+    const started = Date.now();
+    try {
+      const id = await addStokHareket(stokId, { companyId, hareketTipi: 'cikis', miktar, aciklama, yapanKisi });
+      out.push({ stokId, id, started, ended: Date.now(), error: null });
+    } catch (e) {
+      out.push({ stokId, id: null, started, ended: Date.now(), error: String((e && e.message) || e) });
+    }
+  }
+  return out;
+}
+"""
+
+
+def stock_spec(seed=DEFAULT_SEED, consumers=CONSUMERS):
+    return DatasetSpec(seed=seed, companies=1, sahalar=1, santraller=1, years=0, faults=0, bakim=0, vardiya=0,
+                       stok=0, movements=0, production=False,
+                       role_counts={"yonetici": 1, "muhendis": consumers, "tekniker": 1})
+
+
+def item_name(tag, n):
+    return "Alarm malzemesi %s-%d" % (tag, n)
+
+
+def alert_items(seed, items, initial, minimum, tag):
+    """``[(path, fields)]`` of the contended stoklar items, reset to ``initial`` units."""
+    cid = company_id(seed, 1)
+    now = datetime.now(timezone.utc)
+    return [("stoklar/%s-alarm-%02d" % (cid, n), {
+        "companyId": cid, "sahaId": "%s-s01" % cid, "malzemeAdi": item_name(tag, n), "kategori": "Bakım Sarf",
+        "birim": "adet", "mevcutStok": initial, "minimumStok": minimum, "minimumStokSeviyesi": minimum,
+        "birimFiyat": 10.0, "tedarikci": "Tedarikçi 1", "durum": "normal", "sonGuncelleme": now,
+        "olusturmaTarihi": now}) for n in range(items)]
+
+
+def seed_stock(seed=DEFAULT_SEED, consumers=CONSUMERS, devices=DEVICES_PER_USER):
+    return seed_devices(stock_spec(seed, consumers), devices, folder="stockalerts",
+                        extra=alert_items(seed, ITEMS, INITIAL, MINIMUM, "seed"))
+
+
+def consumer_plans(items, consumers, per_consumer):
+    """Item paths per consumer; consumers start on different items so every item sees overlapping writers."""
+    return [[items[(c + j) % len(items)] for j in range(per_consumer)] for c in range(consumers)]
+
+
+def ledger(client, note):
+    """``{movement id: fields}`` of the stokHareketleri written in this run."""
+    rows = client.run_query({
+        "from": [{"collectionId": "stokHareketleri"}],
+        "where": {"fieldFilter": {"field": {"fieldPath": "aciklama"}, "op": "EQUAL",
+                                  "value": {"stringValue": note}}},
+    })
+    return {path.split("/", 1)[1]: fields for path, fields in rows}
+
+
+def check_contention(items, calls, movements, finals, initial, quantity):
+    """Per-item bookkeeping: what the successful calls should have left against what the item holds."""
+    out = []
+    for path, fields in items:
+        stok_id = path.split("/", 1)[1]
+        item_calls = [c for c in calls if c["stokId"] == stok_id]
+        ok = sum(1 for c in item_calls if c["error"] is None)
+        moves = [m for m in movements.values() if m.get("stokId") == stok_id]
+        reads = Counter(m.get("eskiMiktar") for m in moves)
+        expected = initial - ok * quantity
+        actual = finals.get(stok_id)
+        out.append({
+            "stokId": stok_id, "name": fields["malzemeAdi"], "calls": len(item_calls), "ok": ok,
+            "errors": Counter(c["error"] for c in item_calls if c["error"]).most_common(),
+            "movements": len(moves), "orphans": len(moves) - ok,
+            "stale_reads": sum(n - 1 for n in reads.values() if n > 1),
+            "expected": expected, "actual": actual,
+            "lost": (actual - expected) // quantity if actual is not None else None,
+        })
+    return out
+
+
+def alert_latency(items, calls, movements, pushes, seen, minimum):
+    """Per item: the first movement at or under ``minimum`` and when its alert reached the sink and the UI."""
+    by_id = {c["id"]: c for c in calls if c["id"]}
+    out = []
+    for n, (path, fields) in enumerate(items):
+        stok_id = path.split("/", 1)[1]
+        crossing = [by_id[mid] for mid, m in movements.items()
+                    if m.get("stokId") == stok_id and (m.get("yeniMiktar") or 0) <= minimum and mid in by_id]
+        first = min(crossing, key=lambda c: c["ended"]) if crossing else None
+        pushed = [p["t_ms"] for p in pushes
+                  if p["title"] == ALERT_TITLE and (p.get("body") or "").startswith(fields["malzemeAdi"] + " ")]
+        shown = [observed[str(n)] for observed in seen if str(n) in observed]
+        out.append({
+            "stokId": stok_id, "crossed": first is not None,
+            "sink_ms": round(min(pushed) - first["started"], 1) if first and pushed else None,
+            "ui_ms": round(min(shown) - first["started"], 1) if first and shown else None,
+            "alerts": len(pushed),
+        })
+    return out
+
+
+async def stock_page_levels(page, items, timeout_ms):
+    """Reload /stok and read "Mevcut" of each item from the Stok Uyarıları card (None if not listed)."""
+    await open_app(page, "/stok")
+    await wait_for_spinners(page, timeout_ms)
+    levels = {}
+    for path, fields in items:
+        row = page.locator("div.bg-red-50", has_text=fields["malzemeAdi"])
+        if not await row.count():
+            levels[path.split("/", 1)[1]] = None
+            continue
+        match = re.search(r"Mevcut:\s*(-?\d+)", await row.first.inner_text())
+        levels[path.split("/", 1)[1]] = int(match.group(1)) if match else None
+    return levels
+
+
+async def _consumer(browser, email, timeout_ms):
+    context = await new_context(browser, timeout_ms=timeout_ms)
+    try:
+        page = await context.new_page()
+        await login(page, email, DEFAULT_PASSWORD, timeout_ms=timeout_ms)
+        await open_app(page, "/stok")
+        return context, page
+    except Exception:
+        await context.close()
+        raise
+
+
+async def _settle(pending, timeout_s):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline and not pending():
+        await asyncio.sleep(0.25)
+
+
+async def run_alerts(seed=DEFAULT_SEED, items=ITEMS, initial=INITIAL, minimum=MINIMUM, per_consumer=PER_CONSUMER,
+                     quantity=QUANTITY, consumers=None, port=SINK_PORT, timeout_s=SETTLE_TIMEOUT_S, browser=None):
+    """Reset the items, consume them concurrently and return the contention and alert report.
+
+    Pass ``browser`` to reuse a running browser (TC007) instead of launching one.
+    """
+    if browser is None:
+        async with browser_session() as own_browser:
+            return await run_alerts(seed, items, initial, minimum, per_consumer, quantity, consumers, port,
+                                    timeout_s, own_browser)
+    spec, _ = load_team(seed, folder="stockalerts")
+    consumers = min(consumers or spec.role_counts["muhendis"], spec.role_counts["muhendis"])
+    cid = company_id(seed, 1)
+    tag = "SA-%s" % RUN_ID[-6:]
+    note = "Bakım malzeme kullanımı %s" % tag
+    timeout_ms = int(timeout_s * 1000)
+    client = FirestoreEmulator()
+    docs = alert_items(seed, items, initial, minimum, tag)
+    client.set_many(docs)
+    ids = [path.split("/", 1)[1] for path, _ in docs]
+    plans = consumer_plans(ids, consumers, per_consumer)
+
+    contexts = []
+    with PushSink(port) as sink:
+        try:
+            watcher = await observer(browser, user_email(seed, 1, "yonetici", 1),
+                                     re.escape("Alarm malzemesi %s-" % tag) + r"(\d+) stoku", timeout_ms)
+            contexts.append(watcher)
+            pages = []
+            for n in range(consumers):
+                email = user_email(seed, 1, "muhendis", n + 1)
+                context, page = await _consumer(browser, email, timeout_ms)
+                contexts.append((context, page))
+                pages.append(page)
+            started = time.monotonic()
+            batches = await asyncio.gather(*(
+                page.evaluate(CONSUME_SCRIPT, {"plan": plans[n], "companyId": cid, "miktar": quantity,
+                                               "aciklama": note, "yapanKisi": "Mühendis %d" % (n + 1)})
+                for n, page in enumerate(pages)))
+            consume_s = time.monotonic() - started
+            calls = [call for batch in batches for call in batch]
+            movements = ledger(client, note)
+            crossed = {m.get("stokId") for m in movements.values() if (m.get("yeniMiktar") or 0) <= minimum}
+
+            def alerted():
+                got = {p["body"].split(" stoku", 1)[0] for p in list(sink.pushes)
+                       if p["title"] == ALERT_TITLE and p["body"]}
+                return all(item_name(tag, ids.index(stok_id)) in got for stok_id in crossed)
+
+            await _settle(alerted, timeout_s)
+            seen = [await watcher[1].evaluate("() => window.__harnessSeen || {}")]
+            ui_levels = await stock_page_levels(watcher[1], docs, timeout_ms)
+        finally:
+            for context, _ in contexts:
+                await context.close()
+        pushes = list(sink.pushes)
+
+    finals = {stok_id: (client.get("stoklar/%s" % stok_id) or {}).get("mevcutStok") for stok_id in ids}
+    contention = check_contention(docs, calls, movements, finals, initial, quantity)
+    alerts = alert_latency(docs, calls, movements, pushes, seen, minimum)
+    # Items at or under the minimum must be in the warning card with their real level
+    stale_ui = [{"stokId": stok_id, "ui": ui_levels.get(stok_id), "actual": finals[stok_id]} for stok_id in ids
+                if finals[stok_id] is not None and finals[stok_id] <= minimum
+                and ui_levels.get(stok_id) != finals[stok_id]]
+    return {
+        "run_id": RUN_ID, "seed": seed, "tag": tag, "items": items, "initial": initial, "minimum": minimum,
+        "consumers": consumers, "per_consumer": per_consumer, "quantity": quantity,
+        "calls": len(calls), "call_errors": sum(1 for c in calls if c["error"]),
+        "consume_s": round(consume_s, 2),
+        "movements_per_s": round(len(movements) / consume_s, 1) if consume_s else None,
+        "call_ms": latency_summary([c["ended"] - c["started"] for c in calls]),
+        "sink_ms": latency_summary([a["sink_ms"] for a in alerts]),
+        "ui_ms": latency_summary([a["ui_ms"] for a in alerts]),
+        "contention": contention, "alerts": alerts, "stale_ui": stale_ui,
+        "lost_updates": sum(c["lost"] or 0 for c in contention),
+        "missing_alerts": [a["stokId"] for a in alerts if a["crossed"] and a["sink_ms"] is None],
+    }
+
+
+def print_report(report):
+    print("%d consumers x %d movements of %d on %d items (%d -> min %d): %d errors, %.1f movements/s" % (
+        report["consumers"], report["per_consumer"], report["quantity"], report["items"], report["initial"],
+        report["minimum"], report["call_errors"], report["movements_per_s"] or 0))
+    print("%-22s %5s %5s %8s %8s %5s %6s %7s" % ("item", "ok", "moves", "expected", "actual", "lost", "stale",
+                                               "orphans"))
+    for row in report["contention"]:
+        print("%-22s %5d %5d %8d %8s %5s %6d %7d" % (row["stokId"][-22:], row["ok"], row["movements"],
+                                                    row["expected"], row["actual"], row["lost"], row["stale_reads"],
+                                                    row["orphans"]))
+        for error, count in row["errors"]:
+            print("    %3d x %s" % (count, error))
+    for metric in ("call_ms", "sink_ms", "ui_ms"):
+        s = report[metric]
+        if s["n"]:
+            print("%-8s n=%-3d p50 %6.0f  p95 %6.0f  p99 %6.0f ms" % (
+                metric, s["n"], s["median"], s["p95"], s["p99"]))
+        else:
+            print("%-8s -" % metric)
+    for row in report["stale_ui"]:
+        print("STALE  /stok shows %s for %s, stoklar holds %s" % (row["ui"], row["stokId"], row["actual"]))
+    print("%d lost decrements, %d items without a low-stock push" % (report["lost_updates"],
+                                                                     len(report["missing_alerts"])))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.stockalerts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="load the company, its consumers and devices")
+    seed_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    seed_cmd.add_argument("--consumers", type=int, default=CONSUMERS)
+    seed_cmd.add_argument("--devices", type=int, default=DEVICES_PER_USER, help="devices per user")
+    run_cmd = sub.add_parser("run", help="consume stock concurrently and time the low-stock alerts")
+    run_cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_cmd.add_argument("--items", type=int, default=ITEMS)
+    run_cmd.add_argument("--initial", type=int, default=INITIAL)
+    run_cmd.add_argument("--minimum", type=int, default=MINIMUM)
+    run_cmd.add_argument("--per-consumer", type=int, default=PER_CONSUMER)
+    run_cmd.add_argument("--quantity", type=int, default=QUANTITY)
+    run_cmd.add_argument("--consumers", type=int, default=None, help="default: every seeded mühendis")
+    run_cmd.add_argument("--port", type=int, default=SINK_PORT)
+    run_cmd.add_argument("--timeout", type=float, default=SETTLE_TIMEOUT_S, help="seconds to wait for alerts")
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        manifest = seed_stock(args.seed, args.consumers, args.devices)
+        print("%d users, logins in %s" % (len(manifest["uids"]), manifest["credentials"]))
+        return 0
+
+    report = asyncio.run(run_alerts(args.seed, args.items, args.initial, args.minimum, args.per_consumer,
+                                    args.quantity, args.consumers, args.port, args.timeout))
+    out = output_path("stockalerts", "%s.json" % RUN_ID)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print_report(report)
+    print("report written to %s" % out)
+    return 1 if report["lost_updates"] or report["missing_alerts"] or report["stale_ui"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())